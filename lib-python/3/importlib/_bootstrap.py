@@ -826,7 +826,17 @@ class FrozenImporter:
     @classmethod
     def find_spec(cls, fullname, path=None, target=None):
         if _imp.is_frozen(fullname):
-            return spec_from_loader(fullname, cls, origin=cls._ORIGIN)
+            spec = spec_from_loader(fullname, cls, origin=cls._ORIGIN)
+            # PyPy change: the stdlib modules compiled into the executable
+            # (see the objspace.frozen_modules option) keep the __file__
+            # and __path__ of their source
+            location = _imp._frozen_module_location(fullname)
+            if location is not None:
+                spec.origin, package_dir = location
+                spec.has_location = True
+                if package_dir is not None:
+                    spec.submodule_search_locations = [package_dir]
+            return spec
         else:
             return None
 
@@ -694,6 +694,22 @@ def _compile_bytecode(data, name=None, bytecode_path=None, source_path=None):
                           name=name, path=bytecode_path)
 
 
+def _load_mapped_pyc(loader, bytecode_path, source_mtime, source_size):
+    """PyPy addition: return the code object of an up-to-date, timestamp-based
+    pyc without reading the file into a bytes object, or None.
+
+    This is only done for loaders that read their data with
+    FileLoader.get_data().  None is returned if the pyc is stale, hash-based
+    or invalid; the caller then validates it the usual way.
+
+    """
+    if type(loader).get_data is not FileLoader.get_data:
+        return None
+    header = (MAGIC_NUMBER + _pack_uint32(0) + _pack_uint32(source_mtime) +
+              _pack_uint32(source_size))
+    return marshal._load_pyc(bytecode_path, header)
+
+
 def _code_to_timestamp_pyc(code, mtime=0, source_size=0):
     "Produce the data for a timestamp-based pyc."
     data = bytearray(MAGIC_NUMBER)
@@ -986,10 +1002,21 @@ class SourceLoader(_LoaderBasics):
             else:
                 source_mtime = int(st['mtime'])
                 try:
-                    data = self.get_data(bytecode_path)
+                    # PyPy change: try to load the pyc without reading it
+                    code = _load_mapped_pyc(self, bytecode_path,
+                                            source_mtime, st['size'])
+                    if code is None:
+                        data = self.get_data(bytecode_path)
                 except OSError:
                     pass
                 else:
+                    if code is not None:
+                        _bootstrap._verbose_message('{} matches {}',
+                                                    bytecode_path, source_path)
+                        _bootstrap._verbose_message('code object from {!r}',
+                                                    bytecode_path)
+                        _imp._fix_co_filename(code, source_path)
+                        return code
                     exc_details = {
                         'name': fullname,
                         'path': bytecode_path,
@@ -1513,13 +1540,22 @@ class FileFinder:
         for loader, suffixes in loader_details:
             loaders.extend((suffix, loader) for suffix in suffixes)
         self._loaders = loaders
+        self._suffixes = [suffix for suffix, loader in loaders]
         # Base (directory) path
         self.path = path or '.'
         if not _path_isabs(self.path):
             self.path = _path_join(_os.getcwd(), self.path)
-        self._path_mtime = -1
-        self._path_cache = set()
-        self._relaxed_path_cache = set()
+        # PyPy change: the directory listing is cached and searched at
+        # interp-level, see pypy/module/imp/dircache.py
+        self._cache = _imp._DirectoryCache(self.path)
+
+    @property
+    def _path_mtime(self):
+        return self._cache.mtime
+
+    @_path_mtime.setter
+    def _path_mtime(self, mtime):
+        self._cache.mtime = mtime
 
     def invalidate_caches(self):
         """Invalidate the directory mtime."""
@@ -1547,87 +1583,44 @@ class FileFinder:
         return spec_from_file_location(fullname, path, loader=loader,
                                        submodule_search_locations=smsl)
 
+    def _trace_probes(self, tail_module, found):
+        # the -vv messages for the files that the search above tried
+        # (the '__init__' files of a package are not reported)
+        if found is None or found[0] < 0:
+            suffixes = self._suffixes
+        elif found[2] is None:
+            suffixes = self._suffixes[:found[0] + 1]
+        else:
+            return
+        for suffix in suffixes:
+            full_path = _path_join(self.path, tail_module + suffix)
+            _bootstrap._verbose_message('trying {}', full_path, verbosity=2)
+
     def find_spec(self, fullname, target=None):
         """Try to find a spec for the specified module.
 
         Returns the matching spec, or None if not found.
         """
-        is_namespace = False
         tail_module = fullname.rpartition('.')[2]
         try:
-            mtime = _path_stat(self.path or _os.getcwd()).st_mtime
-        except OSError:
-            mtime = -1
-        if mtime != self._path_mtime:
-            self._fill_cache()
-            self._path_mtime = mtime
-        # tail_module keeps the original casing, for __file__ and friends
-        if _relax_case():
-            cache = self._relaxed_path_cache
-            cache_module = tail_module.lower()
-        else:
-            cache = self._path_cache
-            cache_module = tail_module
-        # Check if the module is the name of a directory (and thus a package).
-        if cache_module in cache:
-            base_path = _path_join(self.path, tail_module)
-            for suffix, loader_class in self._loaders:
-                init_filename = '__init__' + suffix
-                full_path = _path_join(base_path, init_filename)
-                if _path_isfile(full_path):
-                    return self._get_spec(loader_class, fullname, full_path, [base_path], target)
-            else:
-                # If a namespace package, return the path if we don't
-                #  find a module in the next section.
-                is_namespace = _path_isdir(base_path)
-        # Check for a file w/ a proper suffix exists.
-        for suffix, loader_class in self._loaders:
-            try:
-                full_path = _path_join(self.path, tail_module + suffix)
-            except ValueError:
-                return None
-            _bootstrap._verbose_message('trying {}', full_path, verbosity=2)
-            if cache_module + suffix in cache:
-                if _path_isfile(full_path):
-                    return self._get_spec(loader_class, fullname, full_path,
-                                          None, target)
-        if is_namespace:
-            _bootstrap._verbose_message('possible namespace for {}', base_path)
-            spec = _bootstrap.ModuleSpec(fullname, None)
-            spec.submodule_search_locations = [base_path]
-            return spec
-        return None
-
-    def _fill_cache(self):
-        """Fill the cache of potential modules and packages for this directory."""
-        path = self.path
-        try:
-            contents = _os.listdir(path or _os.getcwd())
-        except (FileNotFoundError, PermissionError, NotADirectoryError):
-            # Directory has either been removed, turned into a file, or made
-            # unreadable.
-            contents = []
-        # We store two cached versions, to handle runtime changes of the
-        # PYTHONCASEOK environment variable.
-        if not sys.platform.startswith('win'):
-            self._path_cache = set(contents)
-        else:
-            # Windows users can import modules with case-insensitive file
-            # suffixes (for legacy reasons). Make the suffix lowercase here
-            # so it's done once instead of for every import. This is safe as
-            # the specified suffixes to check against are always specified in a
-            # case-sensitive manner.
-            lower_suffix_contents = set()
-            for item in contents:
-                name, dot, suffix = item.partition('.')
-                if dot:
-                    new_name = '{}.{}'.format(name, suffix.lower())
-                else:
-                    new_name = name
-                lower_suffix_contents.add(new_name)
-            self._path_cache = lower_suffix_contents
-        if sys.platform.startswith(_CASE_INSENSITIVE_PLATFORMS):
-            self._relaxed_path_cache = {fn.lower() for fn in contents}
+            found = self._cache.find(tail_module, self._suffixes,
+                                     _relax_case())
+        except ValueError:
+            return None
+        if sys.flags.verbose >= 2:
+            self._trace_probes(tail_module, found)
+        if found is None:
+            return None
+        index, full_path, base_path = found
+        if index >= 0:
+            loader_class = self._loaders[index][1]
+            smsl = [base_path] if base_path is not None else None
+            return self._get_spec(loader_class, fullname, full_path, smsl,
+                                  target)
+        _bootstrap._verbose_message('possible namespace for {}', base_path)
+        spec = _bootstrap.ModuleSpec(fullname, None)
+        spec.submodule_search_locations = [base_path]
+        return spec
 
     @classmethod
     def path_hook(cls, *loader_details):
@@ -182,6 +182,12 @@ class JSONEncoder(object):
         '{"foo": ["bar", "baz"]}'
 
         """
+        if _pypyjson_encode is not None:
+            return _pypyjson_encode(o, self.default, self.ensure_ascii,
+                                    self.check_circular, self.allow_nan,
+                                    self.sort_keys, self.skipkeys,
+                                    self.indent_str, self.item_separator,
+                                    self.key_separator)
         if self.check_circular:
             markers = {}
         else:
@@ -506,3 +512,7 @@ try:
     from _pypyjson import raw_encode_basestring_ascii
 except ImportError:
     pass
+try:
+    from _pypyjson import encode as _pypyjson_encode
+except ImportError:
+    _pypyjson_encode = None
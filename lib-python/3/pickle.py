@@ -58,6 +58,14 @@ try:
 except ImportError:
     _HAVE_PICKLE_BUFFER = False
 
+# PyPy: interp-level fast paths for lists of ints/floats and for runs of
+# atomic values when unpickling
+try:
+    from _pickle_support import pack_list_slice as _pack_list_slice
+    from _pickle_support import load_primitives as _load_primitives
+except ImportError:
+    _pack_list_slice = _load_primitives = None
+
 
 # Shortcut for use in isinstance testing
 bytes_types = (bytes, bytearray)
@@ -279,6 +287,7 @@ class _Unframer:
         self.file_read = file_read
         self.file_readline = file_readline
         self.current_frame = None
+        self.current_frame_data = None
 
     def readinto(self, buf):
         if self.current_frame:
@@ -327,7 +336,9 @@ class _Unframer:
         if self.current_frame and self.current_frame.read() != b'':
             raise UnpicklingError(
                 "beginning of a new frame before end of current frame")
-        self.current_frame = io.BytesIO(self.file_read(frame_size))
+        data = self.file_read(frame_size)
+        self.current_frame_data = data
+        self.current_frame = io.BytesIO(data)
 
 
 # Tools used for pickling.
@@ -959,6 +970,26 @@ class _Pickler:
                 write(APPEND)
             return
 
+        if self._can_pack_items(items):
+            # PyPy: lists of unboxed ints or floats are written by the
+            # interpreter, a batch at a time
+            start = 0
+            data = _pack_list_slice(items, 0, self._BATCHSIZE)
+            while data is not None:
+                self.framer.commit_frame()
+                n = min(len(items) - start, self._BATCHSIZE)
+                if n > 1:
+                    write(MARK)
+                    write(data)
+                    write(APPENDS)
+                elif n:
+                    write(data)
+                    write(APPEND)
+                if n < self._BATCHSIZE:
+                    return
+                start += n
+                data = _pack_list_slice(items, start, start + self._BATCHSIZE)
+
         it = iter(items)
         while True:
             tmp = list(islice(it, self._BATCHSIZE))
@@ -975,6 +1006,16 @@ class _Pickler:
             if n < self._BATCHSIZE:
                 return
 
+    def _can_pack_items(self, items):
+        # the fast path bypasses save(), so it is only correct if nothing
+        # changes how ints and floats are saved
+        return (_pack_list_slice is not None and self.proto >= 2 and
+                type(items) is list and
+                type(self).persistent_id is _Pickler.persistent_id and
+                getattr(self, "reducer_override", None) is None and
+                self.dispatch.get(int) is _Pickler.save_long and
+                self.dispatch.get(float) is _Pickler.save_float)
+
     def save_dict(self, obj):
         if self.bin:
             self.write(EMPTY_DICT)
@@ -1750,6 +1791,15 @@ class _Unpickler:
         self.metastack.append(self.stack)
         self.stack = []
         self.append = self.stack.append
+        # PyPy: decode the atomic values following the mark (typically the
+        # items of an APPENDS or SETITEMS batch) at interp-level
+        frame = self._unframer.current_frame
+        if _load_primitives is not None and frame is not None:
+            pos = frame.tell()
+            newpos = _load_primitives(self._unframer.current_frame_data, pos,
+                                      self.stack, self.memo)
+            if newpos != pos:
+                frame.seek(newpos)
     dispatch[MARK[0]] = load_mark
 
     def load_stop(self):
@@ -41,7 +41,7 @@ working_modules.update([
     "binascii", "_multiprocessing", '_warnings', "_collections",
     "_multibytecodec", "_continuation", "_cffi_backend",
     "_csv", "_pypyjson", "_posixsubprocess", "_cppyy", # "micronumpy",
-    "_jitlog", "_hpy_universal"
+    "_jitlog", "_hpy_universal", "_bisect", "_heapq",
     # "_hashlib", "crypt"
 ])
 
@@ -154,6 +154,12 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
               cmdline="--ext",
               default=None),
 
+    StrOption("frozen_modules",
+              "Comma-separated list of pure-Python stdlib modules to "
+              "compile into the executable",
+              cmdline="--frozen-modules",
+              default=None),
+
     BoolOption("translationmodules",
           "use only those modules that are needed to run translate.py on pypy",
                default=False,
@@ -219,6 +225,22 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
                    "use specialised tuples",
                    default=False),
 
+        BoolOption("withunboxedtuple",
+                   "store tuples of ints or of floats unboxed",
+                   default=False),
+
+        BoolOption("withunboxeddictvalues",
+                   "store the int or float values of some dicts unboxed",
+                   default=False),
+
+        BoolOption("withintpairset",
+                   "store the tuples of two ints in a set unboxed",
+                   default=False),
+
+        BoolOption("withstrbuf",
+                   "use bytes and str objects optimized for repeated addition",
+                   default=False),
+
         BoolOption("withliststrategies",
                    "enable optimized ways to store lists of primitives ",
                    default=True),
@@ -259,6 +281,8 @@ def set_pypy_opt_level(config, level):
         config.objspace.std.suggest(optimized_list_getitem=True)
         #config.objspace.std.suggest(newshortcut=True)
         config.objspace.std.suggest(withspecialisedtuple=True)
+        config.objspace.std.suggest(withunboxedtuple=True)
+        config.objspace.std.suggest(withunboxeddictvalues=True)
         #if not IS_64_BITS:
         #    config.objspace.std.suggest(withsmalllong=True)
 
@@ -272,6 +296,8 @@ def set_pypy_opt_level(config, level):
     if level == 'mem':
         config.objspace.std.suggest(withprebuiltint=True)
         config.objspace.std.suggest(withliststrategies=True)
+        config.objspace.std.suggest(withunboxedtuple=True)
+        config.objspace.std.suggest(withunboxeddictvalues=True)
         if not IS_64_BITS:
             config.objspace.std.suggest(withsmalllong=True)
 
@@ -80,6 +80,9 @@ PYPY_IRC_TOPIC: if set to a non-empty value, print a random #pypy IRC
    topic at startup of interactive mode.
 PYPYLOG: If set to a non-empty value, enable logging.
 PYPY_DISABLE_JIT: if set to a non-empty value, disable JIT.
+PYPY_JIT_WARMUP_CACHE: file in which the JIT records the loops that got
+   compiled, so that they are traced without the normal warmup in the
+   following runs.
 """
 
 try:
@@ -783,6 +786,12 @@ def run_command_line(interactive,
             except ValueError:
                 pass      # ignore "2 is not a valid file descriptor"
 
+    if 'pypyjit' in sys.builtin_module_names and readenv:
+        warmup_cache = getenv('PYPY_JIT_WARMUP_CACHE')
+        if warmup_cache:
+            import pypyjit
+            pypyjit.warmup_cache_enable(warmup_cache)
+
     pycache_prefix = sys._xoptions.get('pycache_prefix', None)
     if pycache_prefix is True:
         # "-Xpycache_prefix"
@@ -419,6 +419,7 @@ def _do_combine_starstarargs_wrapped(space, keys_w, w_starstararg, keyword_names
     i = 0
     seen = {}
     for w_key in keys_w:
+        w_key = space.force_str_buffer(w_key)
         try:
             key = space.text_w(w_key)
         except OperationError as e:
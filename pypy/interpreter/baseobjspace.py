@@ -17,6 +17,7 @@ from pypy.interpreter.executioncontext import (ExecutionContext, ActionFlag,
     make_finalizer_queue)
 from pypy.interpreter.error import OperationError, new_exception_class, oefmt
 from pypy.interpreter.argument import Arguments
+from pypy.interpreter import monitoring
 from pypy.interpreter.miscutils import ThreadLocals, make_weak_value_dictionary
 from pypy.tool.generate_stdlib_module_names import get_stdlib_names
 
@@ -1134,6 +1135,12 @@ class ObjSpace(object):
         """
         return None
 
+    def force_str_buffer(self, w_obj):
+        """ Return 'w_obj', or the exact str object that it stands for if
+        it is a lazy concatenation (see objspace.std.withstrbuf).  For the
+        places that need the exact class, like the strategies. """
+        return w_obj
+
     def listview_int(self, w_list):
         """ Return a list of unwrapped int out of a list of int. If the
         argument is not a list or does not contain only int, return None.
@@ -1232,6 +1239,10 @@ class ObjSpace(object):
     def call_valuestack(self, w_func, nargs, frame, methodcall=False):
         # methodcall is only used for better error messages in argument.py
         from pypy.interpreter.function import Function, _Method, is_builtin_code
+        if monitoring.calls_monitored(frame):
+            args = frame.make_arguments(nargs, methodcall=methodcall,
+                                        w_function=w_func)
+            return monitoring.call_args(frame, w_func, args)
         if frame.get_is_being_profiled() and is_builtin_code(w_func):
             # XXX: this code is copied&pasted :-( from the slow path below
             # call_valuestack().
@@ -1897,10 +1908,10 @@ class ObjSpace(object):
     def realutf8_w(self, w_obj):
         # Like utf8_w(), but only works if w_obj is really of type
         # 'unicode'.  On Python 3 this is the same as utf8_w().
-        from pypy.objspace.std.unicodeobject import W_UnicodeObject
+        from pypy.objspace.std.unicodeobject import W_AbstractUnicodeObject
         # for z_translation tests
         if hasattr(self, 'is_fake_objspace'): return self.newtext("foobar")
-        if not isinstance(w_obj, W_UnicodeObject):
+        if not isinstance(w_obj, W_AbstractUnicodeObject):
             raise oefmt(self.w_TypeError, "argument must be a unicode")
         return self.utf8_w(w_obj)
 
@@ -0,0 +1,443 @@
+"""
+Support for sys.monitoring (PEP 669).
+
+Up to NUM_TOOLS tools can register callbacks for events.  A tool enables
+events either globally or for a single code object ("local events").  All
+the state is global to the space; it is only changed by the functions of
+sys.monitoring, while the checks for events happen all the time.  That's
+why the checks only look at immutable data: the quasi-immutable fields of
+MonitoringState, and a CodeMonitoring instance attached to the code object
+that is replaced, not modified, when something changes.  Whether a tool
+wants a given event at a given location is then an elidable function, so
+in JIT-compiled code an event that is not enabled at a location costs
+nothing, and neither does one that a callback switched off there by
+returning sys.monitoring.DISABLE.
+
+The interface at app-level is in pypy/module/sys/monitoring.py.
+"""
+
+from rpython.rlib import jit
+from rpython.rlib.objectmodel import always_inline
+from pypy.interpreter.error import OperationError, oefmt
+
+
+# the events, in the same order as in CPython
+PY_START = 0
+PY_RESUME = 1
+PY_RETURN = 2
+PY_YIELD = 3
+CALL = 4
+LINE = 5
+INSTRUCTION = 6
+JUMP = 7
+BRANCH = 8
+STOP_ITERATION = 9
+RAISE = 10
+EXCEPTION_HANDLED = 11
+PY_UNWIND = 12
+PY_THROW = 13
+RERAISE = 14
+C_RETURN = 15
+C_RAISE = 16
+
+EVENT_NAMES = ['PY_START', 'PY_RESUME', 'PY_RETURN', 'PY_YIELD', 'CALL',
+               'LINE', 'INSTRUCTION', 'JUMP', 'BRANCH', 'STOP_ITERATION',
+               'RAISE', 'EXCEPTION_HANDLED', 'PY_UNWIND', 'PY_THROW',
+               'RERAISE', 'C_RETURN', 'C_RAISE']
+NUM_EVENTS = len(EVENT_NAMES)
+
+ALL_EVENTS = (1 << NUM_EVENTS) - 1
+# the events that can be enabled for a single code object, and that a
+# callback can switch off by returning DISABLE
+LOCAL_EVENTS = (1 << (STOP_ITERATION + 1)) - 1
+
+FRAME_START_EVENTS = (1 << PY_START) | (1 << PY_RESUME) | (1 << PY_THROW)
+FRAME_EXIT_EVENTS = (1 << PY_RETURN) | (1 << PY_YIELD)
+INSTRUCTION_EVENTS = (1 << LINE) | (1 << INSTRUCTION)
+CALL_EVENTS = (1 << CALL) | (1 << C_RETURN) | (1 << C_RAISE)
+
+NUM_TOOLS = 6
+
+
+class CodeMonitoring(object):
+    """ The monitoring state of one code object: the local events of every
+    tool, and the locations where a callback returned DISABLE.  Never
+    modified; PyCode.monitoring_data is replaced instead. """
+    _immutable_fields_ = ['local_events[*]', 'disabled', 'version']
+
+    def __init__(self, local_events, disabled, version):
+        self.local_events = local_events
+        # {offset * NUM_EVENTS + event: bitmask of the tools}
+        self.disabled = disabled
+        # the entries in 'disabled' are only valid as long as
+        # sys.monitoring.restart_events() was not called
+        self.version = version
+
+    def get_disabled(self, version):
+        if self.version != version:
+            return {}
+        return self.disabled
+
+
+@jit.elidable
+def _tools_for(global_events, tools_in_use, codemon, version, offset, event):
+    """ bitmask of the tools that want 'event' at 'offset' """
+    bit = 1 << event
+    tools = 0
+    for tool in range(NUM_TOOLS):
+        events = global_events[tool]
+        if codemon is not None:
+            events |= codemon.local_events[tool]
+        if events & bit:
+            tools |= 1 << tool
+    tools &= tools_in_use
+    if tools and codemon is not None and codemon.version == version:
+        tools &= ~codemon.disabled.get(offset * NUM_EVENTS + event, 0)
+    return tools
+
+
+class MonitoringState(object):
+    _immutable_fields_ = ['active_events?', 'global_events?[*]',
+                          'tools_in_use?', 'version?']
+
+    def __init__(self, space):
+        self.space = space
+        self.tool_names_w = [None] * NUM_TOOLS
+        self.callbacks_w = [None] * (NUM_TOOLS * NUM_EVENTS)
+        self.global_events = [0] * NUM_TOOLS
+        self.tools_in_use = 0
+        # all the local events ever enabled on any code object
+        self.local_events_seen = 0
+        # the events that need to be checked for at all
+        self.active_events = 0
+        self.version = 0
+        from pypy.module.sys.monitoring import W_MonitoringSentinel
+        self.w_DISABLE = W_MonitoringSentinel("DISABLE")
+        self.w_MISSING = W_MonitoringSentinel("MISSING")
+
+    def _update_active_events(self):
+        events = self.local_events_seen
+        for tool in range(NUM_TOOLS):
+            events |= self.global_events[tool]
+        self.active_events = events
+
+    # ____________________________________________________________
+    # the functions of sys.monitoring
+
+    def check_tool(self, tool_id):
+        if not 0 <= tool_id < NUM_TOOLS:
+            raise oefmt(self.space.w_ValueError,
+                        "invalid tool %d (must be between 0 and %d)",
+                        tool_id, NUM_TOOLS - 1)
+
+    def check_tool_in_use(self, tool_id):
+        self.check_tool(tool_id)
+        if self.tool_names_w[tool_id] is None:
+            raise oefmt(self.space.w_ValueError,
+                        "tool %d is not in use", tool_id)
+
+    def check_event_set(self, event_set):
+        if event_set & ~ALL_EVENTS or event_set < 0:
+            raise oefmt(self.space.w_ValueError,
+                        "invalid event set %d", event_set)
+
+    def check_local_event_set(self, event_set):
+        if event_set & ~LOCAL_EVENTS or event_set < 0:
+            raise oefmt(self.space.w_ValueError,
+                        "invalid local event set %d", event_set)
+
+    def use_tool_id(self, tool_id, w_name):
+        self.check_tool(tool_id)
+        if self.tool_names_w[tool_id] is not None:
+            raise oefmt(self.space.w_ValueError,
+                        "tool %d is already in use", tool_id)
+        self.tool_names_w[tool_id] = w_name
+        self.tools_in_use |= 1 << tool_id
+
+    def free_tool_id(self, tool_id):
+        self.check_tool(tool_id)
+        if self.tool_names_w[tool_id] is None:
+            return
+        self.set_events(tool_id, 0)
+        for event in range(NUM_EVENTS):
+            self.callbacks_w[tool_id * NUM_EVENTS + event] = None
+        self.tool_names_w[tool_id] = None
+        self.tools_in_use &= ~(1 << tool_id)
+
+    def get_tool(self, tool_id):
+        self.check_tool(tool_id)
+        return self.tool_names_w[tool_id]
+
+    def register_callback(self, tool_id, event_set, w_callback):
+        self.check_tool(tool_id)
+        event = 0
+        while event < NUM_EVENTS and event_set != 1 << event:
+            event += 1
+        if event == NUM_EVENTS:
+            raise oefmt(self.space.w_ValueError,
+                        "invalid event %d", event_set)
+        index = tool_id * NUM_EVENTS + event
+        w_previous = self.callbacks_w[index]
+        self.callbacks_w[index] = w_callback
+        return w_previous
+
+    def get_events(self, tool_id):
+        self.check_tool_in_use(tool_id)
+        return self.global_events[tool_id]
+
+    def set_events(self, tool_id, event_set):
+        self.check_tool_in_use(tool_id)
+        self.check_event_set(event_set)
+        global_events = self.global_events[:]
+        global_events[tool_id] = event_set
+        self.global_events = global_events
+        self._update_active_events()
+
+    def get_local_events(self, tool_id, code):
+        self.check_tool_in_use(tool_id)
+        codemon = code.monitoring_data
+        if codemon is None:
+            return 0
+        return codemon.local_events[tool_id]
+
+    def set_local_events(self, tool_id, code, event_set):
+        self.check_tool_in_use(tool_id)
+        self.check_local_event_set(event_set)
+        codemon = code.monitoring_data
+        if codemon is None:
+            local_events = [0] * NUM_TOOLS
+            disabled = {}
+        else:
+            local_events = codemon.local_events[:]
+            disabled = codemon.get_disabled(self.version)
+        local_events[tool_id] = event_set
+        code.monitoring_data = CodeMonitoring(local_events, disabled,
+                                              self.version)
+        self.local_events_seen |= event_set
+        self._update_active_events()
+
+    def restart_events(self):
+        self.version += 1
+
+    # ____________________________________________________________
+    # calling the tools
+
+    @always_inline
+    def tools_for(self, code, offset, event):
+        if not self.active_events & (1 << event):
+            return 0
+        return _tools_for(self.global_events, self.tools_in_use,
+                          code.monitoring_data, self.version, offset, event)
+
+    @jit.dont_look_inside
+    def call_tools(self, frame, offset, tools, event, w_arg, w_arg2=None,
+                   w_arg3=None):
+        """ call the callbacks of the 'tools' for 'event' at 'offset' in the
+        code of 'frame', with the arguments (code, w_arg[, w_arg2[, w_arg3]])
+        """
+        space = self.space
+        ec = space.getexecutioncontext()
+        if ec.is_tracing or frame.hide():
+            return
+        code = frame.pycode
+        for tool in range(NUM_TOOLS):
+            if not tools & (1 << tool):
+                continue
+            w_callback = self.callbacks_w[tool * NUM_EVENTS + event]
+            if w_callback is None:
+                continue
+            ec.is_tracing += 1
+            try:
+                if w_arg2 is None:
+                    w_result = space.call_function(w_callback, code, w_arg)
+                elif w_arg3 is None:
+                    w_result = space.call_function(w_callback, code, w_arg,
+                                                   w_arg2)
+                else:
+                    w_result = space.call_function(w_callback, code, w_arg,
+                                                   w_arg2, w_arg3)
+            finally:
+                ec.is_tracing -= 1
+            if w_result is self.w_DISABLE:
+                self._disable(code, offset, tool, event)
+
+    def _disable(self, code, offset, tool, event):
+        if not LOCAL_EVENTS & (1 << event):
+            self.callbacks_w[tool * NUM_EVENTS + event] = None
+            raise oefmt(self.space.w_ValueError,
+                        "cannot disable %s events. Callback removed.",
+                        EVENT_NAMES[event])
+        codemon = code.monitoring_data
+        if codemon is None:
+            local_events = [0] * NUM_TOOLS
+            disabled = {}
+        else:
+            local_events = codemon.local_events
+            disabled = codemon.get_disabled(self.version).copy()
+        key = offset * NUM_EVENTS + event
+        disabled[key] = disabled.get(key, 0) | (1 << tool)
+        code.monitoring_data = CodeMonitoring(local_events, disabled,
+                                              self.version)
+
+
+def get_state(space):
+    return space.fromcache(MonitoringState)
+
+# ____________________________________________________________
+# the hooks called by the interpreter.  They must be cheap if the event
+# is not active at all, which is checked first.
+
+@always_inline
+def frame_start(frame, w_arg_or_err):
+    """ called when 'frame' starts or resumes executing """
+    state = get_state(frame.space)
+    if state.active_events & FRAME_START_EVENTS:
+        _frame_start(state, frame, w_arg_or_err)
+
+def _frame_start(state, frame, w_arg_or_err):
+    from pypy.interpreter.pyopcode import SApplicationException
+    space = frame.space
+    code = frame.getcode()
+    if frame.last_instr == -1:
+        tools = state.tools_for(code, 0, PY_START)
+        if tools:
+            state.call_tools(frame, 0, tools, PY_START, space.newint(0))
+    elif isinstance(w_arg_or_err, SApplicationException):
+        offset = frame.last_instr
+        tools = state.tools_for(code, offset, PY_THROW)
+        if tools:
+            state.call_tools(frame, offset, tools, PY_THROW,
+                             space.newint(offset),
+                             w_arg_or_err.operr.get_w_value(space))
+    else:
+        offset = frame.last_instr + 2
+        tools = state.tools_for(code, offset, PY_RESUME)
+        if tools:
+            state.call_tools(frame, offset, tools, PY_RESUME,
+                             space.newint(offset))
+
+@always_inline
+def frame_exit(frame, w_exitvalue):
+    """ called when 'frame' returns or yields 'w_exitvalue' """
+    state = get_state(frame.space)
+    if state.active_events & FRAME_EXIT_EVENTS:
+        if frame.frame_finished_execution:
+            event = PY_RETURN
+        else:
+            event = PY_YIELD
+        _event_with_arg(state, frame, event, w_exitvalue)
+
+@always_inline
+def instruction(frame):
+    """ called before every instruction of 'frame' """
+    state = get_state(frame.space)
+    if state.active_events & INSTRUCTION_EVENTS:
+        _instruction(state, frame)
+
+def _instruction(state, frame):
+    space = frame.space
+    code = frame.getcode()
+    offset = frame.last_instr
+    if code._is_line_start_for_monitoring(offset):
+        tools = state.tools_for(code, offset, LINE)
+        if tools:
+            lineno = code._get_lineno_for_pc_tracing(offset)
+            state.call_tools(frame, offset, tools, LINE, space.newint(lineno))
+    tools = state.tools_for(code, offset, INSTRUCTION)
+    if tools:
+        state.call_tools(frame, offset, tools, INSTRUCTION,
+                         space.newint(offset))
+
+@always_inline
+def jump(frame, event, target):
+    """ called when the JUMP or BRANCH instruction at frame.last_instr
+    continues at 'target' """
+    state = get_state(frame.space)
+    if state.active_events & ((1 << event) | (1 << LINE)):
+        _jump(state, frame, event, target)
+
+def _jump(state, frame, event, target):
+    space = frame.space
+    code = frame.getcode()
+    offset = frame.last_instr
+    tools = state.tools_for(code, offset, event)
+    if tools:
+        state.call_tools(frame, offset, tools, event, space.newint(offset),
+                         space.newint(target))
+    # the LINE event for the first instruction of a line is produced by
+    # _instruction(); here we produce it for the other instructions that
+    # are reached by a jump backwards or from another line, like the
+    # FOR_ITER at the start of a loop
+    if code._is_line_start_for_monitoring(target):
+        return
+    lineno = code._get_lineno_for_pc_tracing(target)
+    if target > offset and lineno == code._get_lineno_for_pc_tracing(offset):
+        return
+    tools = state.tools_for(code, target, LINE)
+    if tools and lineno != -1:
+        state.call_tools(frame, target, tools, LINE, space.newint(lineno))
+
+@always_inline
+def exception(frame, event, operr):
+    """ called for the RAISE, STOP_ITERATION, PY_UNWIND, RERAISE and
+    EXCEPTION_HANDLED events """
+    state = get_state(frame.space)
+    if state.active_events & (1 << event):
+        _event_with_arg(state, frame, event, operr.get_w_value(frame.space))
+
+def _event_with_arg(state, frame, event, w_arg):
+    offset = frame.last_instr
+    tools = state.tools_for(frame.getcode(), offset, event)
+    if tools:
+        state.call_tools(frame, offset, tools, event,
+                         frame.space.newint(offset), w_arg)
+
+@always_inline
+def calls_monitored(frame):
+    """ True if the calls done by 'frame' must go through call_args() """
+    return bool(get_state(frame.space).active_events & CALL_EVENTS)
+
+def call_args(frame, w_func, args):
+    """ call 'w_func' from the instruction at frame.last_instr, producing
+    the CALL event and, if 'w_func' is not a Python function, the C_RETURN
+    or C_RAISE event """
+    from pypy.interpreter.function import is_builtin_code
+    space = frame.space
+    state = get_state(space)
+    code = frame.getcode()
+    offset = frame.last_instr
+    if args.arguments_w:
+        w_arg0 = args.arguments_w[0]
+    else:
+        w_arg0 = state.w_MISSING
+    tools = state.tools_for(code, offset, CALL)
+    if tools:
+        state.call_tools(frame, offset, tools, CALL, space.newint(offset),
+                         w_func, w_arg0)
+    if _is_python_function(w_func):
+        return space.call_args(w_func, args)
+    try:
+        if frame.get_is_being_profiled() and is_builtin_code(w_func):
+            w_result = space.call_args_and_c_profile(frame, w_func, args)
+        else:
+            w_result = space.call_args(w_func, args)
+    except OperationError:
+        tools = state.tools_for(code, offset, C_RAISE)
+        if tools:
+            state.call_tools(frame, offset, tools, C_RAISE,
+                             space.newint(offset), w_func, w_arg0)
+        raise
+    tools = state.tools_for(code, offset, C_RETURN)
+    if tools:
+        state.call_tools(frame, offset, tools, C_RETURN,
+                         space.newint(offset), w_func, w_arg0)
+    return w_result
+
+def _is_python_function(w_func):
+    # like CPython, the C_RETURN and C_RAISE events are produced for all
+    # the callables that are not functions or methods written in Python
+    from pypy.interpreter.function import Function, _Method
+    from pypy.interpreter.pycode import PyCode
+    if isinstance(w_func, _Method):
+        w_func = w_func.w_function
+    return isinstance(w_func, Function) and isinstance(w_func.code, PyCode)
@@ -70,6 +70,7 @@ def make_signature(code):
 class CodeHookCache(object):
     def __init__(self, space):
         self._code_hook = None
+        self._jit_warmup_cache = None    # see pypy/module/pypyjit/warmup.py
 
 app = applevel("""
 def replace(self, kwds):
@@ -101,6 +102,7 @@ class PyCode(eval.Code):
                           "_args_as_cellvars[*]",
                           "co_linetable",
                           "w_globals?",
+                          "monitoring_data?",
                           "cell_families[*]"]
 
     def __init__(self, space,  argcount, posonlyargcount, kwonlyargcount,
@@ -146,6 +148,10 @@ class PyCode(eval.Code):
         self.new_code_hook()
 
         self._linelist = None # lazily initialized list of line numbers
+        # the sys.monitoring state specific to this code object, see
+        # pypy/interpreter/monitoring.py
+        self.monitoring_data = None
+        self._monitoring_line_starts = None
 
     def frame_stores_global(self, w_globals):
         if self.w_globals is None:
@@ -156,7 +162,10 @@ class PyCode(eval.Code):
         return True
 
     def new_code_hook(self):
-        code_hook = self.space.fromcache(CodeHookCache)._code_hook
+        cache = self.space.fromcache(CodeHookCache)
+        if cache._jit_warmup_cache is not None:
+            cache._jit_warmup_cache.new_code(self)
+        code_hook = cache._code_hook
         if code_hook is not None:
             try:
                 self.space.call_function(code_hook, self)
@@ -544,6 +553,22 @@ class PyCode(eval.Code):
             self._linelist = l
         return self._linelist[pc // 2]
 
+    @jit.elidable
+    def _is_line_start_for_monitoring(self, pc):
+        """ is the instruction at pc the first one of a line?  Used for the
+        sys.monitoring LINE event. """
+        if self._monitoring_line_starts is None:
+            numinstrs = len(self.co_code) // 2
+            line_starts = [False] * numinstrs
+            prevline = -1
+            for i in range(numinstrs):
+                line = self._get_lineno_for_pc_tracing(i * 2)
+                if line != -1 and line != prevline:
+                    line_starts[i] = True
+                    prevline = line
+            self._monitoring_line_starts = line_starts
+        return self._monitoring_line_starts[pc // 2]
+
     def _marklines(self):
         """ return a list of len(co_code) // 2 where every entry is -1 except
         for those opcodes that start a new line, where the entry is the line
@@ -335,6 +335,7 @@ class PyFrame(W_Root):
         is the input argument -or- an SApplicationException instance.
         """
         from pypy.interpreter import pyopcode as pyopcode
+        from pypy.interpreter import monitoring
         # the following 'assert' is an annotation hint: it hides from
         # the annotator all methods that are defined in PyFrame but
         # overridden in the {,Host}FrameClass subclasses of PyFrame.
@@ -351,6 +352,7 @@ class PyFrame(W_Root):
             # last_instr is -1.  After a generator suspends it points to
             # the YIELD_VALUE/YIELD_FROM instruction.
             try:
+                monitoring.frame_start(self, w_arg_or_err)
                 try:
                     if w_arg_or_err is None:
                         assert self.last_instr == -1
@@ -362,7 +364,9 @@ class PyFrame(W_Root):
                 else:
                     w_exitvalue = self.dispatch(self.pycode, next_instr,
                                                 executioncontext)
-            except OperationError:
+                monitoring.frame_exit(self, w_exitvalue)
+            except OperationError as e:
+                monitoring.exception(self, monitoring.PY_UNWIND, e)
                 raise
             except Exception as e:      # general fall-back
                 raise self._convert_unexpected_exception(e)
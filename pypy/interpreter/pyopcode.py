@@ -13,7 +13,7 @@ from rpython.rlib.rarithmetic import r_uint, intmask
 from rpython.tool.sourcetools import func_with_new_name
 
 from pypy.interpreter import (
-    gateway, function, eval, pyframe, pytraceback, pycode
+    gateway, function, eval, pyframe, pytraceback, pycode, monitoring
 )
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt, oefmt_name_error, raise_import_error
@@ -146,6 +146,7 @@ class __extend__(pyframe.PyFrame):
             pytraceback.record_application_traceback(
                 self.space, operr, self, self.last_instr)
             ec.exception_trace(self, operr)
+            monitoring.exception(self, monitoring.RAISE, operr)
 
         block = self.unrollstack()
         if block is None:
@@ -158,6 +159,7 @@ class __extend__(pyframe.PyFrame):
                 tb = sys.exc_info()[2]
                 raise OperationError, operr, tb
         else:
+            monitoring.exception(self, monitoring.EXCEPTION_HANDLED, operr)
             unroller = SApplicationException(operr)
             next_instr = block.handle(self, unroller)
             return next_instr
@@ -176,6 +178,7 @@ class __extend__(pyframe.PyFrame):
                 ec.bytecode_trace(self)
             next_instr = r_uint(self.last_instr)
             assert next_instr & 1 == 0
+            monitoring.instruction(self)
             opcode = ord(co_code[next_instr])
             oparg = ord(co_code[next_instr + 1])
             next_instr += 2
@@ -197,6 +200,7 @@ class __extend__(pyframe.PyFrame):
                 self.frame_finished_execution = True  # for generators
                 raise Return
             elif opcode == opcodedesc.JUMP_ABSOLUTE.index:
+                monitoring.jump(self, monitoring.JUMP, oparg * 2)
                 return self.jump_absolute(oparg, next_instr, ec)
             elif opcode == opcodedesc.RERAISE.index:
                 return self.RERAISE(oparg, next_instr)
@@ -902,16 +906,24 @@ class __extend__(pyframe.PyFrame):
 
     def STORE_ATTR(self, nameindex, next_instr):
         "obj.attributename = newvalue"
-        w_attributename = self.getname_w(nameindex)
         w_obj = self.popvalue()
         w_newvalue = self.popvalue()
-        self.space.setattr(w_obj, w_attributename, w_newvalue)
+        if not jit.we_are_jitted():
+            from pypy.objspace.std.mapdict import STORE_ATTR_caching
+            STORE_ATTR_caching(self.getcode(), w_obj, nameindex, w_newvalue)
+        else:
+            w_attributename = self.getname_w(nameindex)
+            self.space.setattr(w_obj, w_attributename, w_newvalue)
 
     def DELETE_ATTR(self, nameindex, next_instr):
         "del obj.attributename"
-        w_attributename = self.getname_w(nameindex)
         w_obj = self.popvalue()
-        self.space.delattr(w_obj, w_attributename)
+        if not jit.we_are_jitted():
+            from pypy.objspace.std.mapdict import DELETE_ATTR_caching
+            DELETE_ATTR_caching(self.getcode(), w_obj, nameindex)
+        else:
+            w_attributename = self.getname_w(nameindex)
+            self.space.delattr(w_obj, w_attributename)
 
     def STORE_GLOBAL(self, nameindex, next_instr):
         #varname = self.getname_u(nameindex)
@@ -1067,10 +1079,10 @@ class __extend__(pyframe.PyFrame):
         w_2 = self.popvalue()
         w_1 = self.popvalue()
         res = self.cmp_exc_match(w_1, w_2)
-        if res:
-            return next_instr
-        else:
-            return target * 2
+        if not res:
+            next_instr = r_uint(target * 2)
+        monitoring.jump(self, monitoring.BRANCH, intmask(next_instr))
+        return next_instr
 
     def IMPORT_NAME(self, nameindex, next_instr):
         from pypy.module.imp.importing import import_name_fast_path
@@ -1096,6 +1108,13 @@ class __extend__(pyframe.PyFrame):
         w_default_import = space.w_default_importlib_import
         if (w_default_import is not None and
                 space.is_w(w_default_import, w_import)):
+            if self._import_lazily(w_modulename, w_globals, w_locals,
+                                   w_fromlist, w_flag, next_instr):
+                from pypy.objspace.std.celldict import LazyImportCell
+                # the name of the following STORE_NAME
+                key = self.getname_u(ord(self.pycode.co_code[next_instr + 1]))
+                self.pushvalue(LazyImportCell(w_modulename, w_globals, key))
+                return
             w_obj = import_name_fast_path(space, w_modulename, w_globals,
                     w_locals, w_fromlist, w_flag)
         else:
@@ -1104,6 +1123,33 @@ class __extend__(pyframe.PyFrame):
 
         self.pushvalue(w_obj)
 
+    def _import_lazily(self, w_modulename, w_globals, w_locals, w_fromlist,
+                       w_flag, next_instr):
+        """Can this import bind the name to a placeholder, which imports
+        the module only when the name is first used?  Only plain 'import
+        name' statements at the top level of a module, outside of any
+        try or with block, can be lazy, see __pypy__.set_lazy_imports().
+        'import a.b' is not lazy, as it binds 'a' to a package that may
+        already hold other submodules."""
+        from pypy.objspace.std.celldict import ModuleDictStrategy
+        from pypy.objspace.std.dictmultiobject import W_ModuleDictObject
+        from pypy.module.imp.importing import should_import_lazily
+        space = self.space
+        co_code = self.pycode.co_code
+        if (w_locals is not w_globals or
+                not isinstance(w_globals, W_ModuleDictObject) or
+                not isinstance(w_globals.mstrategy, ModuleDictStrategy) or
+                not space.is_w(w_fromlist, space.w_None) or
+                self.lastblock is not None or
+                next_instr >= len(co_code) or
+                ord(co_code[next_instr]) != opcodedesc.STORE_NAME.index or
+                space.int_w(w_flag) != 0):
+            return False
+        modulename = space.text_w(w_modulename)
+        if '.' in modulename:
+            return False
+        return should_import_lazily(space, modulename)
+
     def IMPORT_STAR(self, oparg, next_instr):
         w_module = self.popvalue()
         w_locals = self.getdictscope()
@@ -1222,32 +1268,41 @@ class __extend__(pyframe.PyFrame):
 
     def JUMP_FORWARD(self, jumpby, next_instr):
         next_instr += jumpby * 2
+        monitoring.jump(self, monitoring.JUMP, intmask(next_instr))
         return next_instr
 
     def POP_JUMP_IF_FALSE(self, target, next_instr, ec):
         w_value = self.popvalue()
         if not self.space.is_true(w_value):
+            monitoring.jump(self, monitoring.BRANCH, target * 2)
             return self.jump_absolute(target, next_instr, ec)
+        monitoring.jump(self, monitoring.BRANCH, intmask(next_instr))
         return next_instr
 
     def POP_JUMP_IF_TRUE(self, target, next_instr, ec):
         w_value = self.popvalue()
         if self.space.is_true(w_value):
+            monitoring.jump(self, monitoring.BRANCH, target * 2)
             return self.jump_absolute(target, next_instr, ec)
+        monitoring.jump(self, monitoring.BRANCH, intmask(next_instr))
         return next_instr
 
     def JUMP_IF_FALSE_OR_POP(self, target, next_instr, ec):
         w_value = self.peekvalue()
         if not self.space.is_true(w_value):
+            monitoring.jump(self, monitoring.BRANCH, target * 2)
             return self.jump_absolute(target, next_instr, ec)
         self.popvalue()
+        monitoring.jump(self, monitoring.BRANCH, intmask(next_instr))
         return next_instr
 
     def JUMP_IF_TRUE_OR_POP(self, target, next_instr, ec):
         w_value = self.peekvalue()
         if self.space.is_true(w_value):
+            monitoring.jump(self, monitoring.BRANCH, target * 2)
             return self.jump_absolute(target, next_instr, ec)
         self.popvalue()
+        monitoring.jump(self, monitoring.BRANCH, intmask(next_instr))
         return next_instr
 
     def GET_ITER(self, oparg, next_instr):
@@ -1268,6 +1323,7 @@ class __extend__(pyframe.PyFrame):
             next_instr += jumpby * 2
         else:
             self.pushvalue(w_nextitem)
+        monitoring.jump(self, monitoring.BRANCH, intmask(next_instr))
         return next_instr
 
     def _report_stopiteration_sometimes(self, w_iterator, operr):
@@ -1288,6 +1344,7 @@ class __extend__(pyframe.PyFrame):
                 isinstance(w_iterator, AsyncGenASend) or
                 operr.has_any_traceback()):
             self.space.getexecutioncontext().exception_trace(self, operr)
+            monitoring.exception(self, monitoring.STOP_ITERATION, operr)
 
     def SETUP_EXCEPT(self, offsettoend, next_instr):
         block = ExceptBlock(self.valuestackdepth,
@@ -1335,6 +1392,7 @@ class __extend__(pyframe.PyFrame):
         unroller = self.popvalue()
         if not isinstance(unroller, SApplicationException):
             assert 0
+        monitoring.exception(self, monitoring.RERAISE, unroller.operr)
         if reset_last_instr:
             block = self.lastblock
             assert isinstance(block, SysExcInfoRestorer)
@@ -1344,6 +1402,8 @@ class __extend__(pyframe.PyFrame):
             w_result = unroller.reraise()
             assert 0, "unreachable"
         else:
+            monitoring.exception(self, monitoring.EXCEPTION_HANDLED,
+                                 unroller.operr)
             next_instr = block.handle(self, unroller)
         return next_instr
 
@@ -1377,7 +1437,10 @@ class __extend__(pyframe.PyFrame):
         w_function  = self.popvalue()
         args = self.argument_factory(arguments, keyword_names_w, keywords_w, None, None,
                                      w_function=w_function)
-        if self.get_is_being_profiled() and function.is_builtin_code(w_function):
+        if monitoring.calls_monitored(self):
+            w_result = monitoring.call_args(self, w_function, args)
+        elif (self.get_is_being_profiled() and
+                function.is_builtin_code(w_function)):
             w_result = self.space.call_args_and_c_profile(self, w_function,
                                                           args)
         else:
@@ -1392,7 +1455,10 @@ class __extend__(pyframe.PyFrame):
         w_function = self.popvalue()
         args = self.argument_factory(
             [], None, None, w_star=w_args, w_starstar=w_kwargs, w_function=w_function)
-        if self.get_is_being_profiled() and function.is_builtin_code(w_function):
+        if monitoring.calls_monitored(self):
+            w_result = monitoring.call_args(self, w_function, args)
+        elif (self.get_is_being_profiled() and
+                function.is_builtin_code(w_function)):
             w_result = self.space.call_args_and_c_profile(self, w_function,
                                                           args)
         else:
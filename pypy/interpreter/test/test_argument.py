@@ -167,6 +167,9 @@ class DummySpace(object):
     def utf8_w(self, s):
         return s._utf8
 
+    def force_str_buffer(self, w_obj):
+        return w_obj
+
     def str(self, obj):
         if type(obj) is W_Uni:
             return obj
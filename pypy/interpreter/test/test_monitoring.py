@@ -0,0 +1,47 @@
+from rpython.jit.metainterp.test.support import LLJitMixin
+from rpython.rlib import jit
+
+from pypy.interpreter import monitoring
+from pypy.interpreter.monitoring import (
+    CodeMonitoring, MonitoringState, NUM_EVENTS, NUM_TOOLS, LINE, BRANCH)
+
+
+class FakeCode(object):
+    _immutable_fields_ = ['monitoring_data?']
+
+    def __init__(self, monitoring_data):
+        self.monitoring_data = monitoring_data
+
+
+class TestMonitoringJit(LLJitMixin):
+    def setup_method(self, meth):
+        # tool 0 wants LINE events everywhere, but returned DISABLE at
+        # offset 4 of 'code'
+        state = MonitoringState(None)
+        state.tools_in_use = 1
+        state.global_events = [1 << LINE] + [0] * (NUM_TOOLS - 1)
+        state._update_active_events()
+        self.state = state
+        self.code = FakeCode(CodeMonitoring(
+            [0] * NUM_TOOLS, {4 * NUM_EVENTS + LINE: 1}, state.version))
+
+    def test_disabled_event_folds_away(self):
+        state = self.state
+        code = self.code
+        def f(offset, event):
+            offset = jit.promote(offset)
+            event = jit.promote(event)
+            return state.tools_for(code, offset, event)
+        assert self.interp_operations(f, [4, LINE]) == 0
+        self.check_operations_history(call_i=0, call_pure_i=0)
+        assert self.interp_operations(f, [6, LINE]) == 1
+        self.check_operations_history(call_i=0, call_pure_i=0)
+
+    def test_inactive_event_folds_away(self):
+        state = self.state
+        code = self.code
+        def f(offset):
+            return state.tools_for(code, offset, BRANCH)
+        # 'offset' is not even a constant here
+        assert self.interp_operations(f, [6]) == 0
+        self.check_operations_history(call_i=0, call_pure_i=0)
@@ -253,10 +253,9 @@ def pyos_inputhook(space):
 def utf8content(space, w_u):
     """ Given a unicode string u, return it's internal byte representation.
     Useful for debugging only. """
-    from pypy.objspace.std.unicodeobject import W_UnicodeObject
-    if type(w_u) is not W_UnicodeObject:
+    if not space.is_w(space.type(w_u), space.w_unicode):
         raise oefmt(space.w_TypeError, "expected unicode string, got %T", w_u)
-    return space.newbytes(w_u._utf8)
+    return space.newbytes(space.utf8_w(w_u))
 
 def set_exc_info(space, w_type, w_value, w_traceback=None):
     ec = space.getexecutioncontext()
@@ -311,3 +310,36 @@ def _testing_clear_audithooks(space):
     from pypy.module.sys.vm import AuditHolder
     holder = space.fromcache(AuditHolder)
     holder.hook_chain = None
+
+@unwrap_spec(enabled=bool, w_modules=WrappedDefault(None),
+             w_excluding=WrappedDefault(None))
+def set_lazy_imports(space, enabled=True, w_modules=None, w_excluding=None):
+    """set_lazy_imports(enabled=True, modules=None, excluding=None)
+
+    Enable or disable lazy imports.  When enabled, a plain 'import name'
+    statement at the top level of a module, outside of any try or with
+    block, binds 'name' to a placeholder and only imports the module
+    when the name is first used.  Dotted names ('import a.b') are always
+    imported directly.  If 'modules' is given, only the imports of these
+    modules are lazy.  The imports of the modules in 'excluding' are
+    never lazy.
+    """
+    from pypy.module.imp.importing import LazyImportState
+    modules = None
+    if not space.is_none(w_modules):
+        modules = [space.text_w(w_name)
+                   for w_name in space.unpackiterable(w_modules)]
+    excluding = []
+    if not space.is_none(w_excluding):
+        excluding = [space.text_w(w_name)
+                     for w_name in space.unpackiterable(w_excluding)]
+    space.fromcache(LazyImportState).set(enabled, modules, excluding)
+
+@unwrap_spec(name='text')
+def is_lazy_import(space, w_dict, name):
+    """is_lazy_import(dict, name)
+
+    Return True if 'name' is bound in the module dict 'dict' to a module
+    which has not been imported yet, see set_lazy_imports()."""
+    from pypy.objspace.std.celldict import is_lazy_import
+    return space.newbool(is_lazy_import(space, w_dict, name))
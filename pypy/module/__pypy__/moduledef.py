@@ -129,6 +129,8 @@ class Module(MixedModule):
         'set_contextvar_context'    : 'interp_magic.set_contextvar_context',
 
         'write_unraisable'          : 'interp_magic.write_unraisable',
+        'set_lazy_imports'          : 'interp_magic.set_lazy_imports',
+        'is_lazy_import'            : 'interp_magic.is_lazy_import',
 
         'PickleBuffer'              : 'interp_buffer.W_PickleBuffer',
     }
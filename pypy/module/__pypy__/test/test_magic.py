@@ -127,4 +127,106 @@ def f():
         from __pypy__ import list_get_physical_size
         l = [1, 2]
         l.append(3)
-        assert list_get_physical_size(l) >= 3 # should be 6, but untranslated 3
\ No newline at end of file
+        assert list_get_physical_size(l) >= 3 # should be 6, but untranslated 3
+
+class AppTestLazyImports:
+    spaceconfig = dict(usemodules=['__pypy__'])
+
+    def setup_class(cls):
+        from rpython.tool.udir import udir
+        d = udir.ensure('lazyimports', dir=True)
+        d.join('lazy_a.py').write("VALUE = 42\n")
+        d.join('lazy_b.py').write("VALUE = 43\n")
+        d.join('lazy_broken.py').write("raise ValueError('broken')\n")
+        d.join('lazy_main.py').write(
+            "import lazy_a\n"
+            "import lazy_b\n"
+            "import lazy_broken\n"
+            "try:\n"
+            "    import lazy_c\n"
+            "except ImportError:\n"
+            "    pass\n"
+            "def get_a():\n"
+            "    return lazy_a.VALUE\n")
+        pkg = d.ensure('lazy_pkg', dir=True)
+        pkg.join('__init__.py').write("")
+        pkg.join('sub_b.py').write("X = 1\n")
+        pkg.join('sub_c.py').write("Y = 2\n")
+        d.join('lazy_dotted.py').write(
+            "import lazy_pkg.sub_b\n"
+            "import lazy_pkg.sub_c\n"
+            "import lazy_a as lazy_alias\n"
+            "def get():\n"
+            "    return lazy_pkg.sub_b.X + lazy_pkg.sub_c.Y\n"
+            "def get_alias():\n"
+            "    return lazy_alias\n")
+        cls.w_dir = cls.space.wrap(str(d))
+
+    def test_lazy_imports(self):
+        import sys, __pypy__
+        sys.path.insert(0, self.dir)
+        __pypy__.set_lazy_imports(True, excluding=['lazy_b'])
+        try:
+            import lazy_main
+        finally:
+            __pypy__.set_lazy_imports(False)
+            del sys.path[0]
+        d = lazy_main.__dict__
+        assert __pypy__.is_lazy_import(d, 'lazy_a')
+        assert 'lazy_a' not in sys.modules
+        assert not __pypy__.is_lazy_import(d, 'lazy_b')   # excluded
+        assert 'lazy_b' in sys.modules
+        assert not __pypy__.is_lazy_import(d, 'lazy_c')   # in a try block
+        assert 'lazy_a' in list(d)            # listing keys doesn't import
+        assert 'lazy_a' not in sys.modules
+        sys.path.insert(0, self.dir)
+        try:
+            assert lazy_main.get_a() == 42
+            assert not __pypy__.is_lazy_import(d, 'lazy_a')
+            assert d['lazy_a'] is sys.modules['lazy_a']
+            # errors are raised on first use, and again on the next one
+            for i in range(2):
+                exc = raises(ValueError, getattr, lazy_main, 'lazy_broken')
+                assert str(exc.value) == 'broken'
+        finally:
+            del sys.path[0]
+
+    def test_allowlist(self):
+        import sys, __pypy__
+        sys.path.insert(0, self.dir)
+        __pypy__.set_lazy_imports(True, modules=['lazy_a', 'lazy_broken'])
+        try:
+            for name in ['lazy_main', 'lazy_a', 'lazy_b']:
+                sys.modules.pop(name, None)
+            import lazy_main
+        finally:
+            __pypy__.set_lazy_imports(False)
+            del sys.path[0]
+        d = lazy_main.__dict__
+        assert __pypy__.is_lazy_import(d, 'lazy_a')
+        assert not __pypy__.is_lazy_import(d, 'lazy_b')
+        assert __pypy__.is_lazy_import(d, 'lazy_broken')
+        assert not __pypy__.is_lazy_import({}, 'lazy_a')
+
+    def test_dotted_and_aliased(self):
+        import sys, __pypy__
+        sys.path.insert(0, self.dir)
+        __pypy__.set_lazy_imports(True)
+        try:
+            for name in ['lazy_dotted', 'lazy_a']:
+                sys.modules.pop(name, None)
+            import lazy_dotted
+        finally:
+            __pypy__.set_lazy_imports(False)
+        try:
+            d = lazy_dotted.__dict__
+            # 'import a.b' is never lazy: the package keeps both submodules
+            assert not __pypy__.is_lazy_import(d, 'lazy_pkg')
+            assert lazy_dotted.get() == 3
+            assert __pypy__.is_lazy_import(d, 'lazy_alias')
+            assert 'lazy_a' not in d
+            for i in range(3):    # the cached LOAD_GLOBAL path, too
+                assert lazy_dotted.get_alias() is sys.modules['lazy_a']
+            assert not __pypy__.is_lazy_import(d, 'lazy_alias')
+        finally:
+            del sys.path[0]
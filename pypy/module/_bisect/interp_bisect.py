@@ -0,0 +1,129 @@
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import WrappedDefault, unwrap_spec
+from pypy.objspace.std.floatobject import W_FloatObject
+from pypy.objspace.std.listobject import (
+    W_ListObject, IntegerListStrategy, FloatListStrategy, is_plain_int1,
+    plain_int_w)
+from rpython.rlib.objectmodel import specialize
+
+
+@specialize.argtype(1)
+def _bisect_unboxed(lst, x, lo, hi, right):
+    # 'lst' is a list of ints or of floats, like 'x'; comparing them cannot
+    # call app-level code
+    while lo < hi:
+        mid = lo + ((hi - lo) >> 1)
+        if right:
+            if x < lst[mid]:
+                hi = mid
+            else:
+                lo = mid + 1
+        else:
+            if lst[mid] < x:
+                lo = mid + 1
+            else:
+                hi = mid
+    return lo
+
+def _bisect(space, w_a, w_x, lo, w_hi, w_key, right):
+    if lo < 0:
+        raise oefmt(space.w_ValueError, "lo must be non-negative")
+    if space.is_none(w_hi):
+        hi = space.len_w(w_a)
+    else:
+        hi = space.getindex_w(w_hi, None)
+    if type(w_a) is W_ListObject and w_key is None:
+        # fast paths for lists of ints and lists of floats
+        if w_a.strategy is space.fromcache(IntegerListStrategy):
+            if is_plain_int1(w_x):
+                lst = w_a.getitems_int()
+                if hi <= len(lst):
+                    x = plain_int_w(space, w_x)
+                    return _bisect_unboxed(lst, x, lo, hi, right)
+        elif w_a.strategy is space.fromcache(FloatListStrategy):
+            if type(w_x) is W_FloatObject:
+                lst = w_a.getitems_float()
+                if hi <= len(lst):
+                    x = space.float_w(w_x)
+                    return _bisect_unboxed(lst, x, lo, hi, right)
+    while lo < hi:
+        mid = lo + ((hi - lo) >> 1)
+        w_item = space.getitem(w_a, space.newint(mid))
+        if w_key is not None:
+            w_item = space.call_function(w_key, w_item)
+        if right:
+            if space.is_true(space.lt(w_x, w_item)):
+                hi = mid
+            else:
+                lo = mid + 1
+        else:
+            if space.is_true(space.lt(w_item, w_x)):
+                lo = mid + 1
+            else:
+                hi = mid
+    return lo
+
+def _insort(space, w_a, w_x, lo, w_hi, w_key, right):
+    if space.is_none(w_key):
+        index = _bisect(space, w_a, w_x, lo, w_hi, None, right)
+    else:
+        w_keyx = space.call_function(w_key, w_x)
+        index = _bisect(space, w_a, w_keyx, lo, w_hi, w_key, right)
+    if type(w_a) is W_ListObject:
+        # like list.insert(), which clamps 'index' to the list
+        w_a.descr_insert(space, index, w_x)
+    else:
+        space.call_method(w_a, 'insert', space.newint(index), w_x)
+
+
+@unwrap_spec(lo='index', w_key=WrappedDefault(None))
+def bisect_left(space, w_a, w_x, lo=0, w_hi=None, __kwonly__=None,
+                w_key=None):
+    """Return the index where to insert item x in list a, assuming a is sorted.
+
+The return value i is such that all e in a[:i] have e < x, and all e in
+a[i:] have e >= x.  So if x already appears in the list, i points just
+before the leftmost x already there.
+
+Optional args lo (default 0) and hi (default len(a)) bound the
+slice of a to be searched."""
+    if space.is_none(w_key):
+        w_key = None
+    return space.newint(_bisect(space, w_a, w_x, lo, w_hi, w_key, False))
+
+@unwrap_spec(lo='index', w_key=WrappedDefault(None))
+def bisect_right(space, w_a, w_x, lo=0, w_hi=None, __kwonly__=None,
+                 w_key=None):
+    """Return the index where to insert item x in list a, assuming a is sorted.
+
+The return value i is such that all e in a[:i] have e <= x, and all e in
+a[i:] have e > x.  So if x already appears in the list, i points just
+beyond the rightmost x already there
+
+Optional args lo (default 0) and hi (default len(a)) bound the
+slice of a to be searched."""
+    if space.is_none(w_key):
+        w_key = None
+    return space.newint(_bisect(space, w_a, w_x, lo, w_hi, w_key, True))
+
+@unwrap_spec(lo='index', w_key=WrappedDefault(None))
+def insort_left(space, w_a, w_x, lo=0, w_hi=None, __kwonly__=None,
+                w_key=None):
+    """Insert item x in list a, and keep it sorted assuming a is sorted.
+
+If x is already in a, insert it to the left of the leftmost x.
+
+Optional args lo (default 0) and hi (default len(a)) bound the
+slice of a to be searched."""
+    _insort(space, w_a, w_x, lo, w_hi, w_key, False)
+
+@unwrap_spec(lo='index', w_key=WrappedDefault(None))
+def insort_right(space, w_a, w_x, lo=0, w_hi=None, __kwonly__=None,
+                 w_key=None):
+    """Insert item x in list a, and keep it sorted assuming a is sorted.
+
+If x is already in a, insert it to the right of the rightmost x.
+
+Optional args lo (default 0) and hi (default len(a)) bound the
+slice of a to be searched."""
+    _insort(space, w_a, w_x, lo, w_hi, w_key, True)
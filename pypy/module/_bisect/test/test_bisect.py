@@ -0,0 +1,116 @@
+
+class AppTestBisect:
+    spaceconfig = dict(usemodules=['_bisect'])
+
+    def test_bisect_left(self):
+        from _bisect import bisect_left
+        a = [0, 5, 6, 6, 6, 7]
+        assert bisect_left(a, None, 0, 0) == 0
+        assert bisect_left(a, -1) == 0
+        assert bisect_left(a, 0) == 0
+        assert bisect_left(a, 3) == 1
+        assert bisect_left(a, 5) == 1
+        assert bisect_left(a, 5.5) == 2
+        assert bisect_left(a, 6) == 2
+        assert bisect_left(a, 6.0) == 2
+        assert bisect_left(a, 99) == 6
+        assert bisect_left(a, 6, 3) == 3
+        assert bisect_left(a, 6, 6) == 6
+        assert bisect_left(a, 6, 0, 1) == 1
+        assert bisect_left(a, 6, hi=4) == 2
+        raises(ValueError, bisect_left, a, 6, -1)
+
+    def test_bisect_right(self):
+        from _bisect import bisect_right
+        a = [0, 5, 6, 6, 6, 7]
+        assert bisect_right(a, None, 0, 0) == 0
+        assert bisect_right(a, -1) == 0
+        assert bisect_right(a, 0) == 1
+        assert bisect_right(a, 5) == 2
+        assert bisect_right(a, 6) == 5
+        assert bisect_right(a, 6.5) == 5
+        assert bisect_right(a, 99) == 6
+        assert bisect_right(a, 6, 0, 3) == 3
+        raises(ValueError, bisect_right, a, 6, -1)
+
+    def test_bisect_floats(self):
+        from _bisect import bisect_left, bisect_right
+        a = [0.5, 1.5, 1.5, 2.5]
+        assert bisect_left(a, 1.5) == 1
+        assert bisect_right(a, 1.5) == 3
+        assert bisect_left(a, 2) == 3
+        assert bisect_right(a, -1.0) == 0
+        assert bisect_left(a, 3.0, 0, 2) == 2
+
+    def test_bisect_hi_beyond_length(self):
+        from _bisect import bisect_left, bisect_right
+        a = [1, 2, 3]
+        raises(IndexError, bisect_left, a, 10, 0, 5)
+        assert bisect_right(a, 0, 0, 5) == 0
+
+    def test_bisect_sequence(self):
+        from _bisect import bisect_left, bisect_right
+        assert bisect_left((1, 2, 3, 4), 3) == 2
+        assert bisect_right("abcdef", "c") == 3
+        class L(list):
+            def __getitem__(self, index):
+                return list.__getitem__(self, index) * 10
+        assert bisect_left(L([1, 2, 3]), 25) == 2
+
+    def test_bisect_key(self):
+        from _bisect import bisect_left, bisect_right
+        a = [(1, 'a'), (2, 'b'), (2, 'c'), (3, 'd')]
+        key = lambda t: t[0]
+        assert bisect_left(a, 2, key=key) == 1
+        assert bisect_right(a, 2, key=key) == 3
+        assert bisect_left([1, 2, 3], -2, key=lambda x: -x) == 0
+
+    def test_insort_left(self):
+        from _bisect import insort_left
+        a = []
+        for x in [6, 3, 7, 1, 3, 2, 9]:
+            insort_left(a, x)
+        assert a == [1, 2, 3, 3, 6, 7, 9]
+        b = [1, 2.5, 3]
+        insort_left(b, 2.5)
+        assert b == [1, 2.5, 2.5, 3]
+        insort_left(a, 5, 0, 2)
+        assert a == [1, 2, 5, 3, 3, 6, 7, 9]
+
+    def test_insort_right(self):
+        from _bisect import insort_right
+        a = [1.0, 3.0]
+        insort_right(a, 2.0)
+        insort_right(a, 3.0)
+        assert a == [1.0, 2.0, 3.0, 3.0]
+        a = [1, 2]
+        insort_right(a, 1.0)
+        assert a == [1, 1.0, 2]
+        assert type(a[1]) is float
+
+    def test_insort_key(self):
+        from _bisect import insort_left, insort_right
+        a = [(1, 'a'), (3, 'c')]
+        insort_left(a, (2, 'b'), key=lambda t: t[0])
+        insort_right(a, (3, 'd'), key=lambda t: t[0])
+        assert a == [(1, 'a'), (2, 'b'), (3, 'c'), (3, 'd')]
+
+    def test_insort_custom_insert(self):
+        from _bisect import insort_left
+        class List(list):
+            data = []
+            def insert(self, index, item):
+                self.data.insert(index, item)
+        lst = List()
+        insort_left(lst, 10)
+        insort_left(lst, 5)
+        assert lst.data == [5, 10]
+
+    def test_bisect_big_list(self):
+        from _bisect import bisect_left, bisect_right
+        a = list(range(0, 20000, 2))
+        for x in range(0, 20000, 7):
+            assert bisect_left(a, x) == (x + 1) // 2
+            assert bisect_right(a, x) == x // 2 + 1
+        assert bisect_left(a, -1) == bisect_right(a, -1) == 0
+        assert bisect_left(a, 20000) == bisect_right(a, 20000) == 10000
@@ -0,0 +1,203 @@
+from pypy.interpreter.error import oefmt
+from pypy.objspace.std.listobject import (
+    W_ListObject, IntegerListStrategy, FloatListStrategy)
+
+
+def _make_unboxed_sift(kind):
+    # siftdown/siftup on the storage of a list of ints or of floats:
+    # comparing the items cannot call app-level code, so there is no need
+    # to check that the list did not change size
+    def siftdown(lst, startpos, pos, is_max):
+        newitem = lst[pos]
+        while pos > startpos:
+            parentpos = (pos - 1) >> 1
+            parent = lst[parentpos]
+            if is_max:
+                lt = parent < newitem
+            else:
+                lt = newitem < parent
+            if not lt:
+                break
+            lst[pos] = parent
+            pos = parentpos
+        lst[pos] = newitem
+
+    def siftup(lst, pos, is_max):
+        endpos = len(lst)
+        startpos = pos
+        newitem = lst[pos]
+        childpos = 2 * pos + 1
+        while childpos < endpos:
+            rightpos = childpos + 1
+            if rightpos < endpos:
+                if is_max:
+                    lt = lst[rightpos] < lst[childpos]
+                else:
+                    lt = lst[childpos] < lst[rightpos]
+                if not lt:
+                    childpos = rightpos
+            lst[pos] = lst[childpos]
+            pos = childpos
+            childpos = 2 * pos + 1
+        lst[pos] = newitem
+        siftdown(lst, startpos, pos, is_max)
+
+    siftdown.func_name = 'siftdown_' + kind
+    siftup.func_name = 'siftup_' + kind
+    return siftdown, siftup
+
+_siftdown_int, _siftup_int = _make_unboxed_sift('int')
+_siftdown_float, _siftup_float = _make_unboxed_sift('float')
+
+
+def _lt(space, w_a, w_b, is_max):
+    if is_max:
+        return space.is_true(space.lt(w_b, w_a))
+    return space.is_true(space.lt(w_a, w_b))
+
+def _check_size(space, w_heap, size):
+    if w_heap.length() != size:
+        raise oefmt(space.w_RuntimeError, "list changed size during iteration")
+
+def _swap(w_heap, i, j):
+    w_tmp = w_heap.getitem(i)
+    w_heap.setitem(i, w_heap.getitem(j))
+    w_heap.setitem(j, w_tmp)
+
+def _siftdown(space, w_heap, startpos, pos, is_max):
+    if w_heap.strategy is space.fromcache(IntegerListStrategy):
+        _siftdown_int(w_heap.getitems_int(), startpos, pos, is_max)
+        return
+    if w_heap.strategy is space.fromcache(FloatListStrategy):
+        _siftdown_float(w_heap.getitems_float(), startpos, pos, is_max)
+        return
+    # generic version, like CPython's: the comparisons can run arbitrary
+    # code, so the items are swapped one at a time and the size is checked
+    size = w_heap.length()
+    if pos >= size:
+        raise oefmt(space.w_RuntimeError, "list changed size during iteration")
+    while pos > startpos:
+        parentpos = (pos - 1) >> 1
+        lt = _lt(space, w_heap.getitem(pos), w_heap.getitem(parentpos),
+                 is_max)
+        _check_size(space, w_heap, size)
+        if not lt:
+            break
+        _swap(w_heap, pos, parentpos)
+        pos = parentpos
+
+def _siftup(space, w_heap, pos, is_max):
+    if w_heap.strategy is space.fromcache(IntegerListStrategy):
+        _siftup_int(w_heap.getitems_int(), pos, is_max)
+        return
+    if w_heap.strategy is space.fromcache(FloatListStrategy):
+        _siftup_float(w_heap.getitems_float(), pos, is_max)
+        return
+    endpos = w_heap.length()
+    startpos = pos
+    if pos >= endpos:
+        raise oefmt(space.w_RuntimeError, "list changed size during iteration")
+    # bubble up the smaller child until hitting a leaf
+    limit = endpos >> 1
+    while pos < limit:
+        childpos = 2 * pos + 1
+        if childpos + 1 < endpos:
+            lt = _lt(space, w_heap.getitem(childpos),
+                     w_heap.getitem(childpos + 1), is_max)
+            _check_size(space, w_heap, endpos)
+            if not lt:
+                childpos += 1
+        _swap(w_heap, pos, childpos)
+        pos = childpos
+    # the leaf at pos is empty now; put newitem there and bubble it up
+    _siftdown(space, w_heap, startpos, pos, is_max)
+
+
+def _check_heap(space, w_heap):
+    if not isinstance(w_heap, W_ListObject):
+        raise oefmt(space.w_TypeError, "heap argument must be a list")
+    return w_heap
+
+def _heappop(space, w_heap, is_max):
+    w_heap = _check_heap(space, w_heap)
+    if w_heap.length() == 0:
+        raise oefmt(space.w_IndexError, "index out of range")
+    w_lastelt = w_heap.pop_end()
+    if w_heap.length() == 0:
+        return w_lastelt
+    w_returnitem = w_heap.getitem(0)
+    w_heap.setitem(0, w_lastelt)
+    _siftup(space, w_heap, 0, is_max)
+    return w_returnitem
+
+def _heapreplace(space, w_heap, w_item, is_max):
+    w_heap = _check_heap(space, w_heap)
+    if w_heap.length() == 0:
+        raise oefmt(space.w_IndexError, "index out of range")
+    w_returnitem = w_heap.getitem(0)
+    w_heap.setitem(0, w_item)
+    _siftup(space, w_heap, 0, is_max)
+    return w_returnitem
+
+def _heapify(space, w_heap, is_max):
+    w_heap = _check_heap(space, w_heap)
+    n = w_heap.length()
+    for i in range(n // 2 - 1, -1, -1):
+        _siftup(space, w_heap, i, is_max)
+
+
+def heappush(space, w_heap, w_item):
+    """Push item onto heap, maintaining the heap invariant."""
+    w_heap = _check_heap(space, w_heap)
+    w_heap.append(w_item)
+    _siftdown(space, w_heap, 0, w_heap.length() - 1, False)
+
+def heappop(space, w_heap):
+    """Pop the smallest item off the heap, maintaining the heap invariant."""
+    return _heappop(space, w_heap, False)
+
+def heapreplace(space, w_heap, w_item):
+    """Pop and return the current smallest value, and add the new item.
+
+This is more efficient than heappop() followed by heappush(), and can be
+more appropriate when using a fixed-size heap.  Note that the value
+returned may be larger than item!  That constrains reasonable uses of
+this routine unless written as part of a conditional replacement:
+
+    if item > heap[0]:
+        item = heapreplace(heap, item)
+"""
+    return _heapreplace(space, w_heap, w_item, False)
+
+def heappushpop(space, w_heap, w_item):
+    """Push item on the heap, then pop and return the smallest item
+from the heap. The combined action runs more efficiently than
+heappush() followed by a separate call to heappop()."""
+    w_heap = _check_heap(space, w_heap)
+    if w_heap.length() == 0:
+        return w_item
+    w_top = w_heap.getitem(0)
+    if not space.is_true(space.lt(w_top, w_item)):
+        return w_item
+    if w_heap.length() == 0:
+        raise oefmt(space.w_IndexError, "index out of range")
+    w_returnitem = w_heap.getitem(0)
+    w_heap.setitem(0, w_item)
+    _siftup(space, w_heap, 0, False)
+    return w_returnitem
+
+def heapify(space, w_heap):
+    """Transform list into a heap, in-place, in O(len(heap)) time."""
+    _heapify(space, w_heap, False)
+
+def heappop_max(space, w_heap):
+    """Maxheap variant of heappop."""
+    return _heappop(space, w_heap, True)
+
+def heapreplace_max(space, w_heap, w_item):
+    """Maxheap variant of heapreplace."""
+    return _heapreplace(space, w_heap, w_item, True)
+
+def heapify_max(space, w_heap):
+    """Maxheap variant of heapify."""
+    _heapify(space, w_heap, True)
@@ -0,0 +1,24 @@
+from pypy.interpreter.mixedmodule import MixedModule
+
+
+class Module(MixedModule):
+    """Heap queue algorithm (a.k.a. priority queue).
+
+Heaps are arrays for which a[k] <= a[2*k+1] and a[k] <= a[2*k+2] for
+all k, counting elements from 0.  For the sake of comparison,
+non-existing elements are considered to be infinite.  The interesting
+property of a heap is that a[0] is always its smallest element."""
+
+    appleveldefs = {
+        }
+
+    interpleveldefs = {
+        'heappush'         : 'interp_heapq.heappush',
+        'heappop'          : 'interp_heapq.heappop',
+        'heapreplace'      : 'interp_heapq.heapreplace',
+        'heappushpop'      : 'interp_heapq.heappushpop',
+        'heapify'          : 'interp_heapq.heapify',
+        '_heappop_max'     : 'interp_heapq.heappop_max',
+        '_heapreplace_max' : 'interp_heapq.heapreplace_max',
+        '_heapify_max'     : 'interp_heapq.heapify_max',
+        }
@@ -0,0 +1,120 @@
+
+class AppTestHeapq:
+    spaceconfig = dict(usemodules=['_heapq'])
+
+    def setup_class(cls):
+        cls.w_check_invariant = cls.space.appexec([], """():
+            def check_invariant(heap, is_max=False):
+                for pos, item in enumerate(heap):
+                    if pos:
+                        parent = heap[(pos - 1) >> 1]
+                        if is_max:
+                            assert item <= parent
+                        else:
+                            assert parent <= item
+            return check_invariant
+        """)
+
+    def test_push_pop(self):
+        import _heapq
+        data = [5, 3, 8, 1, 9, 2, 7, 3, 0, 6]
+        for values in [data, [x + 0.5 for x in data],
+                       [str(x) for x in data]]:
+            heap = []
+            for x in values:
+                _heapq.heappush(heap, x)
+                self.check_invariant(heap)
+            result = [_heapq.heappop(heap) for i in range(len(values))]
+            assert result == sorted(values)
+            assert heap == []
+
+    def test_heapify(self):
+        import _heapq
+        for size in range(30):
+            for heap in [[(x * 7) % 11 for x in range(size)],
+                         [(x * 7) % 11 + 0.25 for x in range(size)],
+                         [[(x * 7) % 11] for x in range(size)]]:
+                expected = sorted(heap)
+                _heapq.heapify(heap)
+                self.check_invariant(heap)
+                assert sorted(heap) == expected
+
+    def test_heapify_max(self):
+        import _heapq
+        for heap in [[(x * 7) % 11 for x in range(20)],
+                     [(x * 7) % 11 + 0.5 for x in range(20)],
+                     [str((x * 7) % 11) for x in range(20)]]:
+            expected = sorted(heap, reverse=True)
+            _heapq._heapify_max(heap)
+            self.check_invariant(heap, is_max=True)
+            result = [_heapq._heappop_max(heap) for i in range(20)]
+            assert result == expected
+
+    def test_heapreplace(self):
+        import _heapq
+        heap = [1, 4, 2]
+        assert _heapq.heapreplace(heap, 3) == 1
+        assert heap == [2, 4, 3]
+        heap = [4.5, 2.5, 1.5]
+        _heapq._heapify_max(heap)
+        assert _heapq._heapreplace_max(heap, 0.5) == 4.5
+        self.check_invariant(heap, is_max=True)
+        raises(IndexError, _heapq.heapreplace, [], 1)
+        raises(IndexError, _heapq._heapreplace_max, [], 1)
+
+    def test_heappushpop(self):
+        import _heapq
+        heap = []
+        assert _heapq.heappushpop(heap, 5) == 5
+        assert heap == []
+        heap = [5]
+        assert _heapq.heappushpop(heap, 3) == 3
+        assert heap == [5]
+        assert _heapq.heappushpop(heap, 7) == 5
+        assert heap == [7]
+        heap = [1.5, 2.5, 3.5]
+        assert _heapq.heappushpop(heap, 3.0) == 1.5
+        assert heap == [2.5, 3.0, 3.5]
+
+    def test_mixed_types(self):
+        import _heapq
+        heap = [3, 1]
+        _heapq.heapify(heap)
+        _heapq.heappush(heap, 2.5)
+        _heapq.heappush(heap, 0.5)
+        assert [_heapq.heappop(heap) for i in range(4)] == [0.5, 1, 2.5, 3]
+
+    def test_errors(self):
+        import _heapq
+        raises(TypeError, _heapq.heappush, (), 1)
+        raises(TypeError, _heapq.heapify, None)
+        raises(TypeError, _heapq.heappop, "abc")
+        raises(IndexError, _heapq.heappop, [])
+        raises(IndexError, _heapq._heappop_max, [])
+        raises(TypeError, _heapq.heappush, [1], "a")
+
+    def test_list_subclass(self):
+        import _heapq
+        class L(list):
+            pass
+        heap = L([5, 2, 8, 1])
+        _heapq.heapify(heap)
+        assert _heapq.heappop(heap) == 1
+        assert _heapq.heappop(heap) == 2
+
+    def test_size_changed(self):
+        import _heapq
+        class EvilCmp:
+            def __init__(self, value, heap):
+                self.value = value
+                self.heap = heap
+            def __lt__(self, other):
+                del self.heap[:]
+                return self.value < other.value
+        heap = []
+        heap.extend([EvilCmp(i, heap) for i in range(10, 0, -1)])
+        raises((RuntimeError, IndexError), _heapq.heapify, heap)
+        heap = [EvilCmp(1, None)]
+        heap[0].heap = heap
+        raises((RuntimeError, IndexError), _heapq.heappush, heap,
+               EvilCmp(0, heap))
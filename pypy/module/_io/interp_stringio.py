@@ -11,7 +11,8 @@ from pypy.interpreter.gateway import interp2app, unwrap_spec, WrappedDefault
 from pypy.module._io.interp_textio import (
     W_TextIOBase, W_IncrementalNewlineDecoder)
 from pypy.module._io.interp_iobase import convert_size
-from pypy.objspace.std.unicodeobject import W_UnicodeObject
+from pypy.objspace.std.unicodeobject import (
+    W_AbstractUnicodeObject, W_UnicodeObject)
 from rpython.rlib import rarithmetic
 
 
@@ -211,7 +212,8 @@ class W_StringIO(W_TextIOBase):
                         "%T.__setstate__ argument should be a 4-tuple, got %T",
                         self, w_state)
         w_initval, w_readnl, w_pos, w_dict = space.unpackiterable(w_state, 4)
-        self.w_value = space.interp_w(W_UnicodeObject, w_initval)
+        w_initval = space.interp_w(W_AbstractUnicodeObject, w_initval)
+        self.w_value = w_initval.convert_to_w_unicode(space)
         self.buf = None
         self.builder = None
         self.state = READING
@@ -258,8 +260,8 @@ class W_StringIO(W_TextIOBase):
                 space.newtext("\n"),
                 space.newutf8(writenl, codepoints_in_utf8(writenl)),
             )
-        w_decoded = space.interp_w(W_UnicodeObject, w_decoded)
-        return w_decoded
+        w_decoded = space.interp_w(W_AbstractUnicodeObject, w_decoded)
+        return w_decoded.convert_to_w_unicode(space)
 
     def write_w(self, space, w_obj):
         w_decoded = self._decode_string(space, w_obj)
@@ -0,0 +1,264 @@
+"""Interp-level fast paths for the pure Python pickle module.
+
+They only deal with the common, simple cases (lists of unboxed ints or
+floats when pickling, runs of opcodes for atomic values when unpickling)
+and give up on everything else, leaving it to lib-python/3/pickle.py.
+"""
+
+import sys
+
+from rpython.rlib import jit, rutf8
+from rpython.rlib.rarithmetic import intmask, r_uint
+from rpython.rlib.rbigint import rbigint
+from rpython.rlib.rstring import StringBuilder
+from rpython.rlib.rstruct.ieee import float_pack, unpack_float
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.objspace.std.listobject import W_ListObject
+
+# opcodes, see lib-python/3/pickle.py
+MARK = '('
+NONE = 'N'
+NEWTRUE = '\x88'
+NEWFALSE = '\x89'
+BININT = 'J'
+BININT1 = 'K'
+BININT2 = 'M'
+LONG1 = '\x8a'
+BINFLOAT = 'G'
+SHORT_BINUNICODE = '\x8c'
+BINUNICODE = 'X'
+SHORT_BINBYTES = 'C'
+BINBYTES = 'B'
+MEMOIZE = '\x94'
+BINPUT = 'q'
+LONG_BINPUT = 'r'
+BINGET = 'h'
+LONG_BINGET = 'j'
+
+
+# ____________________________________________________________
+# pickling
+
+def _append_uint(builder, value, nbytes):
+    # 'value' is an r_uint, written in little-endian order
+    for i in range(nbytes):
+        builder.append(chr(intmask((value >> (i * 8)) & 0xff)))
+
+def _append_long1(builder, value):
+    # like pickle.encode_long(): the shortest little-endian two's complement
+    # representation, empty for zero
+    nbytes = 0
+    if value != 0:
+        # count the bytes needed, including the sign bit
+        x = value
+        if x < 0:
+            x = ~x
+        nbytes = 1
+        while x >= 0x80:
+            x >>= 8
+            nbytes += 1
+    builder.append(LONG1)
+    builder.append(chr(nbytes))
+    _append_uint(builder, r_uint(value), nbytes)
+
+def save_int(builder, value):
+    if 0 <= value <= 0xff:
+        builder.append(BININT1)
+        builder.append(chr(value))
+    elif 0 <= value <= 0xffff:
+        builder.append(BININT2)
+        _append_uint(builder, r_uint(value), 2)
+    elif -0x80000000 <= value <= 0x7fffffff:
+        builder.append(BININT)
+        _append_uint(builder, r_uint(value), 4)
+    else:
+        _append_long1(builder, value)
+
+def save_float(builder, value):
+    builder.append(BINFLOAT)
+    packed = float_pack(value, 8)
+    for i in range(7, -1, -1):
+        builder.append(chr(intmask((packed >> (i * 8)) & 0xff)))
+
+@unwrap_spec(start=int, stop=int)
+def pack_list_slice(space, w_list, start, stop):
+    """pack_list_slice(lst, start, stop) -> bytes or None
+
+Return the protocol 2+ pickle opcodes that push lst[start:stop] on the
+stack, if lst is a list that stores unboxed ints or floats.  Returns None
+for other lists, which must be pickled item by item."""
+    if not isinstance(w_list, W_ListObject):
+        return space.w_None
+    length = w_list.length()
+    start = max(0, start)
+    stop = min(length, stop)
+    if start >= stop:
+        return space.newbytes("")
+    ints = w_list.getitems_int()
+    if ints is not None:
+        return space.newbytes(_pack_ints(ints, start, stop))
+    floats = w_list.getitems_float()
+    if floats is not None:
+        return space.newbytes(_pack_floats(floats, start, stop))
+    return space.w_None
+
+def _pack_ints(ints, start, stop):
+    builder = StringBuilder(2 * (stop - start))
+    for i in range(start, stop):
+        save_int(builder, ints[i])
+    return builder.build()
+
+def _pack_floats(floats, start, stop):
+    builder = StringBuilder(9 * (stop - start))
+    for i in range(start, stop):
+        save_float(builder, floats[i])
+    return builder.build()
+
+
+# ____________________________________________________________
+# unpickling
+
+def _read_uint(data, pos, nbytes):
+    # nbytes is at most 4; returns -1 if the value doesn't fit in an int,
+    # which can only happen on 32-bit
+    result = r_uint(0)
+    for i in range(nbytes - 1, -1, -1):
+        result = (result << 8) | r_uint(ord(data[pos + i]))
+    if result > r_uint(sys.maxint):
+        return -1
+    return intmask(result)
+
+def _read_int4(data, pos):
+    # like get_int() in pypy/module/marshal/interp_marshal.py
+    high = ord(data[pos + 3])
+    if high & 0x80:
+        high -= 0x100
+    return intmask(r_uint(_read_uint(data, pos, 3)) | (r_uint(high) << 24))
+
+@jit.dont_look_inside
+@unwrap_spec(data='bytes', pos=int)
+def load_primitives(space, data, pos, w_stack, w_memo):
+    """load_primitives(data, pos, stack, memo) -> int
+
+Decode the run of pickle opcodes for atomic values (ints, floats, str,
+bytes, None, booleans) and memo operations starting at data[pos], pushing
+the values on the list 'stack' and updating the dict 'memo' like
+Unpickler does.  Returns the position of the first opcode that was not
+handled, which the caller must then decode itself."""
+    if not isinstance(w_stack, W_ListObject):
+        raise oefmt(space.w_TypeError, "stack must be a list")
+    end = len(data)
+    while 0 <= pos < end:
+        op = data[pos]
+        arg = pos + 1
+        if op == BININT1:
+            if arg + 1 > end:
+                break
+            w_obj = space.newint(ord(data[arg]))
+            pos = arg + 1
+        elif op == BININT2:
+            if arg + 2 > end:
+                break
+            w_obj = space.newint(_read_uint(data, arg, 2))
+            pos = arg + 2
+        elif op == BININT:
+            if arg + 4 > end:
+                break
+            w_obj = space.newint(_read_int4(data, arg))
+            pos = arg + 4
+        elif op == LONG1:
+            if arg + 1 > end:
+                break
+            n = ord(data[arg])
+            if arg + 1 + n > end:
+                break
+            num = rbigint.frombytes(data[arg + 1:arg + 1 + n], 'little',
+                                    signed=True)
+            w_obj = space.newlong_from_rbigint(num)
+            pos = arg + 1 + n
+        elif op == BINFLOAT:
+            if arg + 8 > end:
+                break
+            w_obj = space.newfloat(unpack_float(data[arg:arg + 8], True))
+            pos = arg + 8
+        elif op == NONE:
+            w_obj = space.w_None
+            pos = arg
+        elif op == NEWTRUE:
+            w_obj = space.w_True
+            pos = arg
+        elif op == NEWFALSE:
+            w_obj = space.w_False
+            pos = arg
+        elif op == SHORT_BINUNICODE or op == BINUNICODE:
+            if op == SHORT_BINUNICODE:
+                nsize = 1
+            else:
+                nsize = 4
+            if arg + nsize > end:
+                break
+            n = _read_uint(data, arg, nsize)
+            start = arg + nsize
+            if n < 0 or n > end - start:
+                break
+            s = data[start:start + n]
+            try:
+                length = rutf8.check_utf8(s, True)
+            except rutf8.CheckError:
+                break    # let the caller raise the error
+            w_obj = space.newutf8(s, length)
+            pos = start + n
+        elif op == SHORT_BINBYTES or op == BINBYTES:
+            if op == SHORT_BINBYTES:
+                nsize = 1
+            else:
+                nsize = 4
+            if arg + nsize > end:
+                break
+            n = _read_uint(data, arg, nsize)
+            start = arg + nsize
+            if n < 0 or n > end - start:
+                break
+            w_obj = space.newbytes(data[start:start + n])
+            pos = start + n
+        elif op == MEMOIZE or op == BINPUT or op == LONG_BINPUT:
+            if w_stack.length() == 0:
+                break
+            if op == MEMOIZE:
+                w_index = space.len(w_memo)
+                pos = arg
+            elif op == BINPUT:
+                if arg + 1 > end:
+                    break
+                w_index = space.newint(ord(data[arg]))
+                pos = arg + 1
+            else:
+                if arg + 4 > end:
+                    break
+                index = _read_int4(data, arg)
+                if index < 0:
+                    break
+                w_index = space.newint(index)
+                pos = arg + 4
+            space.setitem(w_memo, w_index,
+                          w_stack.getitem(w_stack.length() - 1))
+            continue
+        elif op == BINGET or op == LONG_BINGET:
+            if op == BINGET:
+                nsize = 1
+            else:
+                nsize = 4
+            if arg + nsize > end:
+                break
+            index = _read_uint(data, arg, nsize)
+            if index < 0:
+                break
+            w_obj = space.finditem(w_memo, space.newint(index))
+            if w_obj is None:
+                break
+            pos = arg + nsize
+        else:
+            break
+        w_stack.append(w_obj)
+    return space.newint(pos)
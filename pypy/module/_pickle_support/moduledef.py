@@ -22,4 +22,6 @@ class Module(MixedModule):
         'intrangeiter_new': 'maker.intrangeiter_new',
         'builtin_code': 'maker.builtin_code',
         'builtin_function' : 'maker.builtin_function',
+        'pack_list_slice' : 'accel.pack_list_slice',
+        'load_primitives' : 'accel.load_primitives',
     }
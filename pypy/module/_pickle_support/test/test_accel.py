@@ -0,0 +1,85 @@
+class AppTestAccel:
+    spaceconfig = {"usemodules": ["struct"]}
+
+    def test_pack_ints(self):
+        import _pickle_support, struct
+        l = [0, 255, 256, 65535, 65536, -1, 2**31 - 1, -2**31, 2**31, -2**31 - 1,
+             2**63 - 1, -2**63, 127, 128, -128, -129]
+        data = _pickle_support.pack_list_slice(l, 0, len(l))
+        expected = (b'K\x00' + b'K\xff' + b'M\x00\x01' + b'M\xff\xff' +
+                    b'J' + struct.pack('<i', 65536) +
+                    b'J' + struct.pack('<i', -1) +
+                    b'J' + struct.pack('<i', 2**31 - 1) +
+                    b'J' + struct.pack('<i', -2**31) +
+                    b'\x8a\x05\x00\x00\x00\x80\x00' +
+                    b'\x8a\x05\xff\xff\xff\x7f\xff' +
+                    b'\x8a\x08' + struct.pack('<q', 2**63 - 1) +
+                    b'\x8a\x08' + struct.pack('<q', -2**63) +
+                    b'K\x7f' + b'K\x80' +
+                    b'J' + struct.pack('<i', -128) +
+                    b'J' + struct.pack('<i', -129))
+        assert data == expected
+        assert _pickle_support.pack_list_slice(l, 2, 4) == (
+            b'M\x00\x01M\xff\xff')
+        assert _pickle_support.pack_list_slice(l, 100, 200) == b''
+
+    def test_pack_floats_and_others(self):
+        import _pickle_support, struct
+        l = [1.5, -0.0]
+        assert _pickle_support.pack_list_slice(l, 0, 2) == (
+            b'G' + struct.pack('>d', 1.5) + b'G' + struct.pack('>d', -0.0))
+        assert _pickle_support.pack_list_slice(["a"], 0, 1) is None
+        assert _pickle_support.pack_list_slice([1, "a"], 0, 2) is None
+        assert _pickle_support.pack_list_slice((1, 2), 0, 2) is None
+
+    def test_load_primitives(self):
+        import _pickle_support, struct
+        data = (b'(K\x05M\x00\x01J\xff\xff\xff\xff\x8a\x05\x00\x00\x00\x80\x00'
+                b'G' + struct.pack('>d', 2.5) + b'N\x88\x89'
+                b'\x8c\x02\xc3\xa9\x94X\x01\x00\x00\x00aC\x01bh\x00'
+                b'e.')
+        stack = []
+        memo = {}
+        pos = _pickle_support.load_primitives(data, 1, stack, memo)
+        assert data[pos:] == b'e.'
+        assert stack == [5, 256, -1, 2**31, 2.5, None, True, False,
+                         '\xe9', 'a', b'b', '\xe9']
+        assert memo == {0: '\xe9'}
+        # unknown memo entries and invalid utf-8 are left to the caller
+        assert _pickle_support.load_primitives(b'h\x05', 0, [], {}) == 0
+        assert _pickle_support.load_primitives(b'K\x01\x8c\x01\xff', 0,
+                                               [], {}) == 2
+        # truncated data
+        assert _pickle_support.load_primitives(b'J\x00\x00', 0, [], {}) == 0
+
+    def test_load_primitives_4byte_values(self):
+        import _pickle_support
+        stack = []
+        pos = _pickle_support.load_primitives(
+            b'J\x00\x00\x00\x80J\xff\xff\xff\x7f.', 0, stack, {})
+        assert pos == 10
+        assert stack == [-2**31, 2**31 - 1]
+        # sizes and memo indexes of 2**31 and more are left to the caller
+        for data, expected in [(b'X\x00\x00\x00\x80a', 0),
+                               (b'B\xff\xff\xff\xffb', 0),
+                               (b'K\x01r\x00\x00\x00\x80', 2),
+                               (b'j\xff\xff\xff\xff', 0)]:
+            assert _pickle_support.load_primitives(data, 0, [], {}) == expected
+
+    def test_pickle_roundtrip(self):
+        import pickle
+        class MyPickler(pickle._Pickler):
+            def persistent_id(self, obj):
+                if obj == 42:
+                    return "answer"
+        lists = [list(range(2500)), [x * 0.5 for x in range(1001)], [7],
+                 [], [2**40, -2**40, 1], ["a", "a", b"b", None, True, 3]]
+        for l in lists:
+            for proto in range(0, pickle.HIGHEST_PROTOCOL + 1):
+                s = pickle.dumps(l, proto)
+                assert pickle.loads(s) == l
+                assert pickle._loads(s) == l
+        import io
+        f = io.BytesIO()
+        MyPickler(f, 4).dump([1, 42, 3])
+        assert b'answer' in f.getvalue()
@@ -81,15 +81,12 @@ class JSONDecoder(W_Root):
         self.space = space
         self.w_empty_string = space.newutf8("", 0)
 
-        self.s = s
-
-        # we put our string in a raw buffer so:
-        # 1) we automatically get the '\0' sentinel at the end of the string,
-        #    which means that we never have to check for the "end of string"
-        # 2) we can pass the buffer directly to strtod
-        self.ll_chars, self.llobj, self.flag = rffi.get_nonmovingbuffer_ll_final_null(self.s)
+        self._init_buffer(s)
+        # the size of the whole input, which decides whether the string
+        # cache is worth using. For streaming decoding it is the number of
+        # bytes read so far, see set_buffer()
+        self.input_size = len(s)
         self.end_ptr = lltype.malloc(rffi.CCHARPP.TO, 1, flavor='raw')
-        self.pos = 0
         self.intcache = space.fromcache(IntCache)
 
         # two caches, one for keys, one for general strings. they both have the
@@ -117,14 +114,39 @@ class JSONDecoder(W_Root):
         self.scratch = [[None] * self.DEFAULT_SIZE_SCRATCH]
 
 
-    def close(self):
+    def _init_buffer(self, s):
+        self.s = s
+
+        # we put our string in a raw buffer so:
+        # 1) we automatically get the '\0' sentinel at the end of the string,
+        #    which means that we never have to check for the "end of string"
+        # 2) we can pass the buffer directly to strtod
+        self.ll_chars, self.llobj, self.flag = rffi.get_nonmovingbuffer_ll_final_null(self.s)
+        self.pos = 0
+
+    def _free_buffer(self):
         rffi.free_nonmovingbuffer_ll(self.ll_chars, self.llobj, self.flag)
+
+    def set_buffer(self, s, input_size):
+        """ Continue decoding in the new string s. All the caches (maps, key
+        and value strings) are kept, which is what makes decoding a stream of
+        similar values chunk by chunk fast. """
+        self._free_buffer()
+        self._init_buffer(s)
+        self.input_size = input_size
+
+    def close(self):
+        self._free_buffer()
         lltype.free(self.end_ptr, flavor='raw')
+        self.cleanup_unclear_objects()
+
+    def cleanup_unclear_objects(self):
         # clean up objects that are instances of now blocked maps
         for w_obj in self.unclear_objects:
             jsonmap = self._get_jsonmap_from_dict(w_obj)
             if jsonmap.is_state_blocked():
                 self._devolve_jsonmap_dict(w_obj)
+        self.unclear_objects = []
 
     def getslice(self, start, end):
         assert start >= 0
@@ -570,7 +592,7 @@ class JSONDecoder(W_Root):
             contextmap.decoded_strings += 1
             if not contextmap.should_cache_strings():
                 cache = False
-        if len(self.s) < self.MIN_SIZE_FOR_STRING_CACHE:
+        if self.input_size < self.MIN_SIZE_FOR_STRING_CACHE:
             cache = False
 
         if not cache:
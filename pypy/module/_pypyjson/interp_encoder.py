@@ -1,5 +1,17 @@
 from rpython.rlib.rstring import StringBuilder
-from rpython.rlib.rutf8 import Utf8StringIterator
+from rpython.rlib.rutf8 import (
+    Utf8StringIterator, codepoints_in_utf8, first_non_ascii_char)
+from rpython.rlib import jit
+from rpython.rlib.rfloat import isfinite
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.objspace.std.boolobject import W_BoolObject
+from pypy.objspace.std.dictmultiobject import W_DictMultiObject
+from pypy.objspace.std.floatobject import W_FloatObject, float_repr
+from pypy.objspace.std.intobject import W_IntObject
+from pypy.objspace.std.listobject import (
+    W_ListObject, KeyContainer, CustomKeySort)
+from pypy.objspace.std.unicodeobject import W_AbstractUnicodeObject
 
 HEX = '0123456789abcdef'
 
@@ -25,7 +37,14 @@ def raw_encode_basestring_ascii(space, w_unicode):
         return w_unicode
 
     sb = StringBuilder(len(u) + 20)
+    escape_ascii(sb, u)
+    res = sb.build()
+    return space.newtext(res)
 
+
+def escape_ascii(sb, u):
+    """Append the utf-8 string 'u' to the builder 'sb', escaped so that the
+    result contains only ASCII characters."""
     for c in Utf8StringIterator(u):
         if c <= ord('~'):
             if c == ord('"') or c == ord('\\'):
@@ -55,5 +74,393 @@ def raw_encode_basestring_ascii(space, w_unicode):
                 sb.append(HEX[(s2 >> 4) & 0x0f])
                 sb.append(HEX[s2 & 0x0f])
 
-    res = sb.build()
-    return space.newtext(res)
+
+def escape_utf8(sb, u):
+    """Append the utf-8 string 'u' to the builder 'sb', escaping only the
+    characters that JSON requires (quotes, backslashes and control
+    characters); non-ASCII characters are copied unchanged."""
+    start = 0
+    for i in range(len(u)):
+        ch = u[i]
+        if ch == '"' or ch == '\\' or ord(ch) < 32:
+            sb.append_slice(u, start, i)
+            if ch == '"' or ch == '\\':
+                sb.append('\\')
+                sb.append(ch)
+            else:
+                sb.append(ESCAPE_BEFORE_SPACE[ord(ch)])
+            start = i + 1
+    sb.append_slice(u, start, len(u))
+
+
+class JSONEncoder(object):
+    """Serializes a tree of wrapped objects into a single StringBuilder.
+
+    The exact built-in types are dispatched on directly and, for lists and
+    dicts, iterated through their strategies so that unwrapped int, float
+    and ASCII string storage never needs to be boxed.  Subclasses of the
+    container types go through the regular app-level protocols, like the
+    pure Python encoder does.
+    """
+
+    def __init__(self, space, w_default, ensure_ascii, check_circular,
+                 allow_nan, sort_keys, skipkeys, indent, item_separator,
+                 key_separator):
+        self.space = space
+        self.w_default = w_default
+        self.ensure_ascii = ensure_ascii
+        self.check_circular = check_circular
+        self.allow_nan = allow_nan
+        self.sort_keys = sort_keys
+        self.skipkeys = skipkeys
+        self.indent = indent            # None for the compact form
+        self.item_separator = item_separator
+        self.key_separator = key_separator
+        self.markers_w = []
+        self.builder = StringBuilder()
+        # is the output guaranteed to be pure ASCII?
+        self.ascii_only = (ensure_ascii and
+                first_non_ascii_char(item_separator) < 0 and
+                first_non_ascii_char(key_separator) < 0 and
+                (indent is None or first_non_ascii_char(indent) < 0))
+
+    def build(self):
+        res = self.builder.build()
+        if self.ascii_only:
+            length = len(res)
+        else:
+            length = codepoints_in_utf8(res)
+        return self.space.newutf8(res, length)
+
+    # ____________________________________________________________
+    # leaves
+
+    def append_string(self, u):
+        sb = self.builder
+        sb.append('"')
+        if self.ensure_ascii:
+            escape_ascii(sb, u)
+        else:
+            escape_utf8(sb, u)
+        sb.append('"')
+
+    def append_ascii_string(self, u):
+        # 'u' is known to be ASCII, both escaping modes are equivalent
+        sb = self.builder
+        sb.append('"')
+        escape_utf8(sb, u)
+        sb.append('"')
+
+    def floatstr(self, x):
+        if isfinite(x):
+            return float_repr(x)
+        if x != x:
+            text = 'NaN'
+        elif x > 0.0:
+            text = 'Infinity'
+        else:
+            text = '-Infinity'
+        if not self.allow_nan:
+            raise oefmt(self.space.w_ValueError,
+                        "Out of range float values are not JSON compliant: "
+                        "%s", float_repr(x))
+        return text
+
+    def intstr(self, w_obj):
+        # like int.__str__(w_obj): ignores __str__ overrides in subclasses,
+        # e.g. IntEnum
+        space = self.space
+        if isinstance(w_obj, W_IntObject):
+            return str(w_obj.intval)
+        w_int_repr = space.getattr(space.w_int, space.newtext('__repr__'))
+        return space.utf8_w(space.call_function(w_int_repr, w_obj))
+
+    # ____________________________________________________________
+    # circular reference detection
+
+    def mark(self, w_obj):
+        if not self.check_circular:
+            return
+        for w_marker in self.markers_w:
+            if w_marker is w_obj:
+                raise oefmt(self.space.w_ValueError,
+                            "Circular reference detected")
+        self.markers_w.append(w_obj)
+
+    def unmark(self, w_obj):
+        if not self.check_circular:
+            return
+        w_last = self.markers_w.pop()
+        assert w_last is w_obj
+
+    # ____________________________________________________________
+    # indentation
+
+    def emit_indent(self, level):
+        if self.indent is None:
+            return self.item_separator
+        sb = self.builder
+        newline_indent = '\n' + self.indent * level
+        sb.append(newline_indent)
+        return self.item_separator + newline_indent
+
+    def emit_unindent(self, level):
+        if self.indent is not None:
+            self.builder.append('\n')
+            self.builder.append(self.indent * (level - 1))
+
+    # ____________________________________________________________
+    # dispatch
+
+    def encode_any(self, w_obj, level):
+        space = self.space
+        if isinstance(w_obj, W_AbstractUnicodeObject):
+            self.append_string(w_obj.convert_to_w_unicode(space)._utf8)
+        elif space.is_w(w_obj, space.w_None):
+            self.builder.append('null')
+        elif isinstance(w_obj, W_BoolObject):
+            if space.is_true(w_obj):
+                self.builder.append('true')
+            else:
+                self.builder.append('false')
+        elif isinstance(w_obj, W_IntObject):
+            self.builder.append(str(w_obj.intval))
+        elif isinstance(w_obj, W_FloatObject):
+            self.builder.append(self.floatstr(w_obj.floatval))
+        elif space.isinstance_w(w_obj, space.w_int):
+            self.builder.append(self.intstr(w_obj))
+        elif isinstance(w_obj, W_ListObject):
+            self.encode_list(w_obj, level)
+        elif space.isinstance_w(w_obj, space.w_tuple):
+            self.encode_sequence(w_obj, level)
+        elif isinstance(w_obj, W_DictMultiObject):
+            self.encode_dict(w_obj, level)
+        else:
+            self.encode_default(w_obj, level)
+
+    def encode_default(self, w_obj, level):
+        self.mark(w_obj)
+        w_res = self.space.call_function(self.w_default, w_obj)
+        self.encode_any(w_res, level)
+        self.unmark(w_obj)
+
+    # ____________________________________________________________
+    # sequences
+
+    def encode_list(self, w_list, level):
+        space = self.space
+        if not space.is_w(space.type(w_list), space.w_list):
+            self.encode_sequence(w_list, level)
+            return
+        length = w_list.length()
+        if length == 0:
+            self.builder.append('[]')
+            return
+        ints = w_list.getitems_int()
+        if ints is not None:
+            self.encode_int_list(ints, level)
+            return
+        floats = w_list.getitems_float()
+        if floats is not None:
+            self.encode_float_list(floats, level)
+            return
+        asciis = w_list.getitems_ascii()
+        if asciis is not None:
+            self.encode_ascii_list(asciis, level)
+            return
+        self.mark(w_list)
+        sb = self.builder
+        sb.append('[')
+        level += 1
+        separator = self.emit_indent(level)
+        i = 0
+        # the list can be mutated by a 'default' callback, so re-check the
+        # length every time
+        while i < w_list.length():
+            if i > 0:
+                sb.append(separator)
+            self.encode_any(w_list.getitem(i), level)
+            i += 1
+        self.emit_unindent(level)
+        sb.append(']')
+        self.unmark(w_list)
+
+    def encode_int_list(self, ints, level):
+        sb = self.builder
+        sb.append('[')
+        level += 1
+        separator = self.emit_indent(level)
+        for i in range(len(ints)):
+            if i > 0:
+                sb.append(separator)
+            sb.append(str(ints[i]))
+        self.emit_unindent(level)
+        sb.append(']')
+
+    def encode_float_list(self, floats, level):
+        sb = self.builder
+        sb.append('[')
+        level += 1
+        separator = self.emit_indent(level)
+        for i in range(len(floats)):
+            if i > 0:
+                sb.append(separator)
+            sb.append(self.floatstr(floats[i]))
+        self.emit_unindent(level)
+        sb.append(']')
+
+    def encode_ascii_list(self, asciis, level):
+        sb = self.builder
+        sb.append('[')
+        level += 1
+        separator = self.emit_indent(level)
+        for i in range(len(asciis)):
+            if i > 0:
+                sb.append(separator)
+            self.append_ascii_string(asciis[i])
+        self.emit_unindent(level)
+        sb.append(']')
+
+    def encode_sequence(self, w_seq, level):
+        items_w = self.space.listview(w_seq)
+        if not items_w:
+            self.builder.append('[]')
+            return
+        self.mark(w_seq)
+        sb = self.builder
+        sb.append('[')
+        level += 1
+        separator = self.emit_indent(level)
+        for i in range(len(items_w)):
+            if i > 0:
+                sb.append(separator)
+            self.encode_any(items_w[i], level)
+        self.emit_unindent(level)
+        sb.append(']')
+        self.unmark(w_seq)
+
+    # ____________________________________________________________
+    # dicts
+
+    def encode_dict(self, w_dict, level):
+        space = self.space
+        if space.is_w(space.type(w_dict), space.w_dict):
+            if w_dict.length() == 0:
+                self.builder.append('{}')
+                return
+            if not self.sort_keys:
+                self.encode_dict_items(w_dict, level)
+                return
+            keys_w = []
+            values_w = []
+            iterator = w_dict.iteritems()
+            while True:
+                w_key, w_value = iterator.next_item()
+                if w_key is None:
+                    break
+                keys_w.append(w_key)
+                values_w.append(w_value)
+        else:
+            keys_w = []
+            values_w = []
+            w_items = space.call_method(w_dict, 'items')
+            for w_item in space.listview(w_items):
+                w_key, w_value = space.fixedview(w_item, 2)
+                keys_w.append(w_key)
+                values_w.append(w_value)
+            if not keys_w:
+                self.builder.append('{}')
+                return
+        if self.sort_keys:
+            containers_w = [KeyContainer(keys_w[i], values_w[i])
+                            for i in range(len(keys_w))]
+            sorter = CustomKeySort(containers_w, len(containers_w))
+            sorter.space = space
+            sorter.sort()
+            for i in range(len(containers_w)):
+                w_container = containers_w[i]
+                assert isinstance(w_container, KeyContainer)
+                keys_w[i] = w_container.w_key
+                values_w[i] = w_container.w_item
+        self.mark(w_dict)
+        self.builder.append('{')
+        level += 1
+        separator = self.emit_indent(level)
+        first = True
+        for i in range(len(keys_w)):
+            if self.encode_item(keys_w[i], values_w[i], first, separator,
+                                level):
+                first = False
+        self.emit_unindent(level)
+        self.builder.append('}')
+        self.unmark(w_dict)
+
+    def encode_dict_items(self, w_dict, level):
+        # iterate directly over the strategy, without building an items list
+        self.mark(w_dict)
+        self.builder.append('{')
+        level += 1
+        separator = self.emit_indent(level)
+        first = True
+        iterator = w_dict.iteritems()
+        while True:
+            w_key, w_value = iterator.next_item()
+            if w_key is None:
+                break
+            if self.encode_item(w_key, w_value, first, separator, level):
+                first = False
+        self.emit_unindent(level)
+        self.builder.append('}')
+        self.unmark(w_dict)
+
+    def encode_item(self, w_key, w_value, first, separator, level):
+        """Write one 'key: value' pair.  Returns False if the key was
+        skipped."""
+        space = self.space
+        sb = self.builder
+        # JavaScript is weakly typed for these, so it makes sense to
+        # also allow them.  Many encoders seem to do something like this.
+        if isinstance(w_key, W_AbstractUnicodeObject):
+            key = w_key.convert_to_w_unicode(space)._utf8
+        elif isinstance(w_key, W_FloatObject):
+            key = self.floatstr(w_key.floatval)
+        elif isinstance(w_key, W_BoolObject):
+            if space.is_true(w_key):
+                key = 'true'
+            else:
+                key = 'false'
+        elif space.is_w(w_key, space.w_None):
+            key = 'null'
+        elif space.isinstance_w(w_key, space.w_int):
+            key = self.intstr(w_key)
+        elif self.skipkeys:
+            return False
+        else:
+            raise oefmt(space.w_TypeError,
+                        "keys must be str, int, float, bool or None, not %T",
+                        w_key)
+        if not first:
+            sb.append(separator)
+        self.append_string(key)
+        sb.append(self.key_separator)
+        self.encode_any(w_value, level)
+        return True
+
+
+@jit.dont_look_inside
+@unwrap_spec(ensure_ascii=bool, check_circular=bool, allow_nan=bool,
+             sort_keys=bool, skipkeys=bool)
+def encode(space, w_obj, w_default, ensure_ascii, check_circular, allow_nan,
+           sort_keys, skipkeys, w_indent, w_item_separator, w_key_separator):
+    """Return the JSON representation of w_obj as a str.  This is the
+    interp-level equivalent of json.encoder.JSONEncoder.encode()."""
+    if space.is_none(w_indent):
+        indent = None
+    else:
+        indent = space.utf8_w(w_indent)
+    encoder = JSONEncoder(space, w_default, ensure_ascii, check_circular,
+                          allow_nan, sort_keys, skipkeys, indent,
+                          space.utf8_w(w_item_separator),
+                          space.utf8_w(w_key_separator))
+    encoder.encode_any(w_obj, 0)
+    return encoder.build()
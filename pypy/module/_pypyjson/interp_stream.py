@@ -0,0 +1,322 @@
+from rpython.rlib import jit, rutf8
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import oefmt, OperationError
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.interpreter.typedef import TypeDef, interp2app
+from pypy.module._pypyjson.interp_decoder import (
+    JSONDecoder, DecoderError, is_whitespace)
+
+# states of W_JSONStreamDecoder
+(STATE_VALUES,          # a sequence of top-level values, e.g. json lines
+ STATE_ARRAY_START,     # before the '[' of a top-level array
+ STATE_ARRAY_FIRST,     # after the '[', before the first element or ']'
+ STATE_ARRAY_NEXT,      # after an element, before the ',' or ']'
+ STATE_DONE) = range(5)
+
+# source kinds
+SOURCE_TEXT, SOURCE_READ, SOURCE_BUFFER = range(3)
+
+
+def scan_string_end(s, i):
+    """ Return the index just after the closing quote of the string whose
+    content starts at s[i], or -1 if the string is not complete in s. """
+    n = len(s)
+    while i < n:
+        ch = s[i]
+        if ch == '"':
+            return i + 1
+        if ch == '\\':
+            i += 1
+        i += 1
+    return -1
+
+def scan_value_end(s, i):
+    """ Return the index just after the JSON value that starts at s[i], or -1
+    if the value might not be complete in s. This is only a cheap scan for
+    the extent of the value, syntax errors are reported by the decoder. """
+    n = len(s)
+    ch = s[i]
+    if ch == '{' or ch == '[':
+        depth = 0
+        while i < n:
+            ch = s[i]
+            if ch == '"':
+                i = scan_string_end(s, i + 1)
+                if i < 0:
+                    return -1
+                continue
+            if ch == '{' or ch == '[':
+                depth += 1
+            elif ch == '}' or ch == ']':
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+            i += 1
+        return -1
+    elif ch == '"':
+        return scan_string_end(s, i + 1)
+    while i < n:
+        ch = s[i]
+        if (is_whitespace(ch) or ch == ',' or ch == ']' or ch == '}' or
+                ch == '[' or ch == '{' or ch == '"'):
+            return i
+        i += 1
+    return -1    # a number or constant can continue in the next chunk
+
+def incomplete_utf8_tail(s):
+    """ Return the index at which a utf-8 sequence that is cut off at the end
+    of s starts, or len(s) if s does not end in the middle of a character. """
+    n = len(s)
+    i = n - 1
+    while i >= 0 and i >= n - 3:
+        ch = ord(s[i])
+        if ch < 0x80:
+            return n
+        if ch >= 0xC0:
+            if ch >= 0xF0:
+                needed = 4
+            elif ch >= 0xE0:
+                needed = 3
+            else:
+                needed = 2
+            if n - i < needed:
+                return i
+            return n
+        i -= 1
+    return n
+
+
+class W_JSONStreamDecoder(W_Root):
+    """ Decodes JSON values one by one from a file-like object or a buffer,
+    reading it in chunks. A single JSONDecoder is reused for all the chunks,
+    so that the key maps and the string caches carry over from one value to
+    the next. Only the current chunk and the value being decoded are kept in
+    memory. """
+
+    def __init__(self, space, w_source, kind, items, chunk_size, w_errorcls):
+        self.space = space
+        self.w_source = w_source
+        self.kind = kind
+        self.chunk_size = chunk_size
+        self.w_errorcls = w_errorcls
+        if items:
+            self.state = STATE_ARRAY_START
+        else:
+            self.state = STATE_VALUES
+        # self.buf[self.pos:] is the part of the input not decoded yet
+        self.buf = ""
+        self.pos = 0
+        self.utf8_tail = ""   # incomplete character at the end of a read
+        self.bytes_read = 0   # total input size so far
+        self.eof = False
+        self.decoder = JSONDecoder(space, "")
+        self.register_finalizer(space)
+
+    def _finalize_(self):
+        self.close_w()
+
+    def iter_w(self):
+        return self
+
+    def close_w(self):
+        if self.decoder is not None:
+            self.decoder.close()
+            self.decoder = None
+        self.state = STATE_DONE
+        self.buf = ""
+        self.pos = 0
+
+    def _error(self, msg, pos):
+        # like for loads(), the error gets the document and the position in
+        # it; here that is the current chunk and the position in the chunk
+        space = self.space
+        w_errorcls = self.w_errorcls
+        if w_errorcls is None:
+            w_errorcls = space.w_ValueError
+        w_e = space.call_function(w_errorcls, space.newtext(msg),
+                                  space.newtext(self.buf),
+                                  space.newint(pos))
+        self.close_w()
+        return OperationError(w_errorcls, w_e)
+
+    # ____________________________________________________________
+    # reading
+
+    def _read_chunk(self, size):
+        """ Return the next piece of the input as a utf-8 string, or "" at
+        the end of the input. """
+        while True:
+            data = self._read_raw_chunk(size)
+            if data or self.eof:
+                return data
+            # only read part of a character so far
+
+    def _read_raw_chunk(self, size):
+        space = self.space
+        if self.kind == SOURCE_TEXT:
+            self.eof = True
+            data = space.utf8_w(self.w_source)
+            self.w_source = None
+            return data
+        if self.kind == SOURCE_READ:
+            w_data = space.call_method(self.w_source, 'read',
+                                       space.newint(size))
+            if space.isinstance_w(w_data, space.w_unicode):
+                data = space.utf8_w(w_data)
+                if not data:
+                    self.eof = True
+                return data
+            data = space.bytes_w(w_data)
+        else:
+            buf = space.buffer_w(self.w_source, space.BUF_SIMPLE)
+            start = self.bytes_read + len(self.utf8_tail)
+            size = min(size, buf.getlength() - start)
+            if size > 0:
+                data = buf.getbytes(start, size)
+            else:
+                data = ""
+        return self._check_utf8(data)
+
+    def _check_utf8(self, data):
+        if not data:
+            self.eof = True
+            if self.utf8_tail:
+                raise self._error("Invalid utf-8 at the end of the input",
+                                  len(self.buf))
+            return data
+        data = self.utf8_tail + data
+        end = incomplete_utf8_tail(data)
+        self.utf8_tail = data[end:]
+        data = data[:end]
+        try:
+            rutf8.check_utf8(data, True)
+        except rutf8.CheckError as e:
+            raise self._error("Invalid utf-8 in the input", len(self.buf))
+        return data
+
+    def _fill(self):
+        """ Read more input, dropping the already decoded part of the
+        buffer. Returns False at the end of the input. """
+        if self.eof:
+            return False
+        # grow the reads with the size of the pending data, so that a value
+        # larger than chunk_size is scanned a bounded number of times
+        size = max(self.chunk_size, len(self.buf) - self.pos)
+        data = self._read_chunk(size)
+        if not data:
+            return False
+        self.bytes_read += len(data)
+        pos = self.pos
+        assert pos >= 0
+        self.buf = self.buf[pos:] + data
+        self.pos = 0
+        self.decoder.set_buffer(self.buf, self.bytes_read)
+        return True
+
+    def _skip_whitespace(self):
+        """ Skip whitespace, reading more input as needed. Returns False at
+        the end of the input. """
+        while True:
+            i = self.pos
+            buf = self.buf
+            while i < len(buf) and is_whitespace(buf[i]):
+                i += 1
+            self.pos = i
+            if i < len(buf):
+                return True
+            if not self._fill():
+                return False
+
+    # ____________________________________________________________
+    # decoding
+
+    def _decode_value(self):
+        """ Decode the value at self.pos, which is not whitespace. """
+        while True:
+            end = scan_value_end(self.buf, self.pos)
+            if end >= 0:
+                break
+            if not self._fill():
+                # incomplete value at the end of the input, let the decoder
+                # report the error
+                break
+        decoder = self.decoder
+        try:
+            w_res = decoder.decode_any(self.pos)
+        except DecoderError as e:
+            raise self._error(e.msg, e.pos)
+        self.pos = decoder.pos
+        decoder.cleanup_unclear_objects()
+        return w_res
+
+    @jit.dont_look_inside
+    def next_w(self):
+        space = self.space
+        state = self.state
+        if state == STATE_DONE:
+            raise OperationError(space.w_StopIteration, space.w_None)
+        if state == STATE_VALUES:
+            if not self._skip_whitespace():
+                self.close_w()
+                raise OperationError(space.w_StopIteration, space.w_None)
+            return self._decode_value()
+        if state == STATE_ARRAY_START:
+            if (not self._skip_whitespace() or
+                    self.buf[self.pos] != '['):
+                raise self._error("Expecting '[' at the start of the input",
+                                  self.pos)
+            self.pos += 1
+            state = self.state = STATE_ARRAY_FIRST
+        # inside the top-level array
+        if not self._skip_whitespace():
+            raise self._error("Unterminated array", self.pos)
+        ch = self.buf[self.pos]
+        if state == STATE_ARRAY_NEXT and ch == ',':
+            self.pos += 1
+            if not self._skip_whitespace():
+                raise self._error("Unterminated array", self.pos)
+        elif ch == ']':
+            self.pos += 1
+            if self._skip_whitespace():
+                raise self._error("Extra data", self.pos)
+            self.close_w()
+            raise OperationError(space.w_StopIteration, space.w_None)
+        elif state == STATE_ARRAY_NEXT:
+            raise self._error(
+                "Unexpected '%s' when decoding array" % ch, self.pos)
+        self.state = STATE_ARRAY_NEXT
+        return self._decode_value()
+
+
+@unwrap_spec(items=bool, chunk_size=int)
+def iterload(space, w_source, items=False, chunk_size=65536, w_errorcls=None):
+    """iterload(source, items=False, chunk_size=65536, errorcls=None)
+
+Return an iterator over the JSON values in 'source', which is either a str,
+a file-like object with a read() method (text or binary), or an object
+supporting the buffer protocol containing utf-8.  The input is read
+chunk_size bytes at a time.  By default the values are whitespace-separated
+top-level values, like in the JSON lines format.  With items=True the input
+must be a single top-level array, and its elements are returned one by
+one."""
+    if chunk_size <= 0:
+        raise oefmt(space.w_ValueError, "chunk_size must be positive")
+    if space.isinstance_w(w_source, space.w_unicode):
+        kind = SOURCE_TEXT
+    elif space.findattr(w_source, space.newtext('read')) is not None:
+        kind = SOURCE_READ
+    else:
+        space.buffer_w(w_source, space.BUF_SIMPLE)   # type check
+        kind = SOURCE_BUFFER
+    if space.is_none(w_errorcls):
+        w_errorcls = None
+    return W_JSONStreamDecoder(space, w_source, kind, items, chunk_size,
+                               w_errorcls)
+
+W_JSONStreamDecoder.typedef = TypeDef(
+        '_pypyjson.JSONStreamDecoder',
+        __iter__ = interp2app(W_JSONStreamDecoder.iter_w),
+        __next__ = interp2app(W_JSONStreamDecoder.next_w),
+        close = interp2app(W_JSONStreamDecoder.close_w),
+)
+W_JSONStreamDecoder.typedef.acceptable_as_base_class = False
@@ -555,3 +555,159 @@ class AppTest(object):
         a = '{"abc": "4", "k": 1, "k": 1.5, "c": null, "k": 2}'
         d = _pypyjson.loads(a)
         assert d == {u"abc": u"4", u"c": None, u"k": 2}
+
+    def test_encode_simple(self):
+        import _pypyjson
+        def default(o):
+            raise TypeError("not serializable")
+        def enc(o, ensure_ascii=True, sort_keys=False, indent=None,
+                item_sep=', ', key_sep=': ', allow_nan=True, skipkeys=False):
+            return _pypyjson.encode(o, default, ensure_ascii, True, allow_nan,
+                                    sort_keys, skipkeys, indent, item_sep,
+                                    key_sep)
+        assert enc(None) == 'null'
+        assert enc(True) == 'true'
+        assert enc(False) == 'false'
+        assert enc(42) == '42'
+        assert enc(2 ** 100) == str(2 ** 100)
+        assert enc(1.5) == '1.5'
+        assert enc(float('nan')) == 'NaN'
+        assert enc(float('-inf')) == '-Infinity'
+        raises(ValueError, enc, float('inf'), allow_nan=False)
+        assert enc("a\"b\n\xe9") == '"a\\"b\\n\\u00e9"'
+        assert enc("a\"b\n\xe9", ensure_ascii=False) == '"a\\"b\\n\xe9"'
+        assert enc([]) == '[]'
+        assert enc({}) == '{}'
+        assert enc([1, 2, 3]) == '[1, 2, 3]'
+        assert enc([1.5, 2.0]) == '[1.5, 2.0]'
+        assert enc(["a", "b\t"]) == '["a", "b\\t"]'
+        assert enc((1, "x", None)) == '[1, "x", null]'
+        assert enc({"a": [1, {"b": 2}]}) == '{"a": [1, {"b": 2}]}'
+        assert enc({1: 2}) == '{"1": 2}'
+        assert enc({1.5: 3}) == '{"1.5": 3}'
+        assert enc({None: 4}) == '{"null": 4}'
+        assert enc({False: 5}) == '{"false": 5}'
+        raises(TypeError, enc, {(1,): 2})
+        assert enc({(1,): 2, "a": 1}, skipkeys=True) == '{"a": 1}'
+        raises(TypeError, enc, object())
+
+    def test_encode_sort_keys_indent_separators(self):
+        import _pypyjson
+        def enc(o, sort_keys=False, indent=None, item_sep=', ', key_sep=': '):
+            return _pypyjson.encode(o, None, True, True, True, sort_keys,
+                                    False, indent, item_sep, key_sep)
+        assert enc({"b": 1, "a": 2}, sort_keys=True) == '{"a": 2, "b": 1}'
+        raises(TypeError, enc, {"b": 1, 2: 2}, sort_keys=True)
+        assert enc({"a": [1, 2]}, item_sep=',', key_sep=':') == '{"a":[1,2]}'
+        assert enc({"a": [1, 2]}, indent='  ', item_sep=',') == (
+            '{\n  "a": [\n    1,\n    2\n  ]\n}')
+
+    def test_encode_default_and_circular(self):
+        import _pypyjson
+        class Point(object):
+            def __init__(self, x, y):
+                self.x = x
+                self.y = y
+        def default(o):
+            if isinstance(o, Point):
+                return [o.x, o.y]
+            raise TypeError("nope")
+        def enc(o, check_circular=True):
+            return _pypyjson.encode(o, default, True, check_circular, True,
+                                    False, False, None, ', ', ': ')
+        assert enc({"p": Point(1, 2)}) == '{"p": [1, 2]}'
+        l = [1]
+        l.append(l)
+        exc = raises(ValueError, enc, l)
+        assert str(exc.value) == "Circular reference detected"
+        d = {}
+        d["d"] = d
+        raises(ValueError, enc, d)
+
+    def test_encode_subclasses(self):
+        import _pypyjson
+        class MyInt(int):
+            def __str__(self):
+                return "bad"
+        class MyList(list):
+            def __iter__(self):
+                return iter([1, 2])
+        class MyDict(dict):
+            def items(self):
+                return [("x", 1)]
+        class MyStr(str):
+            pass
+        def enc(o):
+            return _pypyjson.encode(o, None, True, True, True, False, False,
+                                    None, ', ', ': ')
+        assert enc(MyInt(5)) == '5'
+        assert enc(MyList([7])) == '[1, 2]'
+        assert enc(MyDict(a=5)) == '{"x": 1}'
+        assert enc(MyStr("q")) == '"q"'
+
+    def test_iterload_values(self):
+        import _pypyjson
+        s = '{"a": 1, "b": [1, 2]}\n{"a": 2, "b": []}\n  "x" 12 null\n'
+        assert list(_pypyjson.iterload(s)) == [
+            {"a": 1, "b": [1, 2]}, {"a": 2, "b": []}, "x", 12, None]
+        assert list(_pypyjson.iterload('')) == []
+        assert list(_pypyjson.iterload('  \n ')) == []
+
+    def test_iterload_file_chunks(self):
+        import _pypyjson, io
+        lines = ['{"key": %d, "name": "n\\u00e9%d", "f": %d.5}' % (i, i, i)
+                 for i in range(100)]
+        s = '\n'.join(lines)
+        expected = [{"key": i, "name": "n\xe9%d" % i, "f": i + 0.5}
+                    for i in range(100)]
+        for chunk_size in [1, 2, 3, 7, 64, 100000]:
+            res = list(_pypyjson.iterload(io.StringIO(s),
+                                          chunk_size=chunk_size))
+            assert res == expected
+            res = list(_pypyjson.iterload(io.BytesIO(s.encode('utf-8')),
+                                          chunk_size=chunk_size))
+            assert res == expected
+        # utf-8 split across chunks
+        b = '"\xe9€\U0001f600" 1'.encode('utf-8')
+        for chunk_size in range(1, 8):
+            assert list(_pypyjson.iterload(io.BytesIO(b),
+                chunk_size=chunk_size)) == ["\xe9€\U0001f600", 1]
+            assert list(_pypyjson.iterload(bytearray(b),
+                chunk_size=chunk_size)) == ["\xe9€\U0001f600", 1]
+
+    def test_iterload_items(self):
+        import _pypyjson, io
+        s = ' [ {"a": [1, "]"]}, 2, "s\\"}", [], {} ] \n'
+        expected = [{"a": [1, "]"]}, 2, 's"}', [], {}]
+        for chunk_size in [1, 2, 5, 1000]:
+            res = list(_pypyjson.iterload(io.StringIO(s), items=True,
+                                          chunk_size=chunk_size))
+            assert res == expected
+        assert list(_pypyjson.iterload('[]', items=True)) == []
+        assert list(_pypyjson.iterload(' [ ] ', items=True)) == []
+
+    def test_iterload_errors(self):
+        import _pypyjson
+        raises(ValueError, list, _pypyjson.iterload('{"a": 1} {"a": '))
+        raises(ValueError, list, _pypyjson.iterload('1 2', items=True))
+        raises(ValueError, list, _pypyjson.iterload('[1 2]', items=True))
+        raises(ValueError, list, _pypyjson.iterload('[1, 2', items=True))
+        raises(ValueError, list, _pypyjson.iterload('[1] 2', items=True))
+        raises(ValueError, list, _pypyjson.iterload(b'"\xff"'))
+        class MyError(Exception):
+            pass
+        exc = raises(MyError, list, _pypyjson.iterload('1 nul', None, 1,
+                                                       MyError))
+        assert exc.value.args[0] == 'Error when decoding null'
+        it = _pypyjson.iterload('1 2 3')
+        assert next(it) == 1
+        it.close()
+        raises(StopIteration, next, it)
+
+    def test_iterload_keys_reuse(self):
+        import _pypyjson, io
+        s = '{"a_key": 1, "b_\xe9": 2}\n{"a_key": 3, "b_\xe9": 4}'
+        rval = list(_pypyjson.iterload(io.StringIO(s), chunk_size=4))
+        (a, b), (c, d) = sorted(rval[0]), sorted(rval[1])
+        assert a is c
+        assert b is d
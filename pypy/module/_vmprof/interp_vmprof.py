@@ -51,17 +51,26 @@ def VMProfError(space, e):
     return OperationError(w_VMProfError, space.newtext(e.msg))
 
 
-@unwrap_spec(fileno=int, period=float, memory=int, lines=int, native=int, real_time=int)
-def enable(space, fileno, period, memory, lines, native, real_time):
+@unwrap_spec(fileno=int, period=float, memory=int, lines=int, native=int,
+             real_time=int, alloc_interval=int)
+def enable(space, fileno, period, memory, lines, native, real_time,
+           alloc_interval=0):
     """Enable vmprof.  Writes go to the given 'fileno', a file descriptor
     opened for writing.  *The file descriptor must remain open at least
     until disable() is called.*
 
     'interval' is a float representing the sampling interval, in seconds.
     Must be smaller than 1.0
+
+    If 'alloc_interval' is positive, the profile records where memory is
+    allocated instead of where time is spent: the stack is sampled every
+    time about 'alloc_interval' bytes were allocated, checked whenever the
+    nursery is full.  It is thus rounded up to a multiple of the nursery
+    size.
     """
     try:
-        rvmprof.enable(fileno, period, memory, native, real_time)
+        rvmprof.enable(fileno, period, memory, native, real_time,
+                       alloc_interval)
     except rvmprof.VMProfError as e:
         raise VMProfError(space, e)
 
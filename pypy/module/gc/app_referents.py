@@ -49,6 +49,28 @@ def dump_rpy_heap(file):
             fd = file.fileno()
         gc._dump_rpy_heap(fd)
 
+def dump_heap_snapshot(file):
+    """Write a compact summary of the objects in the heap to the given file
+    (which can be a file, a file name, or a file descriptor): for every
+    type, the number of objects and their total size, including the
+    internal memory that belongs to them, and the number of references
+    between objects of each pair of types.  Unlike dump_rpy_heap(), the
+    size of the output does not depend on the size of the heap.  Use
+    pypy/tool/heapdiff.py to compare two snapshots.
+    """
+    data = gc._heap_snapshot()
+    if isinstance(file, str):
+        with open(file, 'wb') as f:
+            f.write(data)
+    elif isinstance(file, int):
+        import os
+        while data:
+            data = data[os.write(file, data):]
+    else:
+        file.write(data)
+        if hasattr(file, 'flush'):
+            file.flush()
+
 class GcStats(object):
     def __init__(self, s):
         self._s = s
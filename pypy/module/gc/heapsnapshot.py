@@ -0,0 +1,150 @@
+""" A compact summary of the heap, meant to be compared with a later one by
+pypy/tool/heapdiff.py to find out which types of objects are growing.
+
+Instead of every object, the snapshot contains one line per group of
+objects and one line per kind of reference between groups.  A group is
+either an app-level type, or the RPython type of internal objects that are
+only reachable from the GC roots without going through an app-level object.
+The internal objects that belong to an app-level object (the storage of a
+list, the map and the storage of an instance, ...) are counted in the size
+of the group of that app-level object, so the size of a group is the memory
+really used by its objects.
+"""
+
+from rpython.rlib import rgc
+from rpython.rlib.rstring import StringBuilder
+from pypy.module.gc.referents import (
+    try_cast_gcref_to_w_root, missing_operation)
+from pypy.objspace.std.typeobject import W_TypeObject
+
+MAGIC = 'pypy-heap-snapshot 1'
+
+
+def _clean_name(name):
+    return name.replace('\t', ' ').replace('\n', ' ')
+
+
+class HeapSnapshot(object):
+    def __init__(self, space):
+        self.space = space
+        self.group_names = []
+        self.group_counts = []
+        self.group_sizes = []
+        self.groups_by_type = {}        # type object -> group index
+        self.groups_by_rpy_type = {}    # RPython type index -> group index
+        self.edges = {}                 # (src group, dst group) -> count
+
+    def _new_group(self, name):
+        index = len(self.group_names)
+        self.group_names.append(_clean_name(name))
+        self.group_counts.append(0)
+        self.group_sizes.append(0)
+        return index
+
+    def _type_name(self, w_type):
+        # must not call app-level code: it would run while the objects
+        # have their gcflag_extra set
+        if not isinstance(w_type, W_TypeObject):
+            return '?'
+        space = self.space
+        name = w_type.getqualname(space)
+        w_mod = w_type.get_module()
+        if w_mod is not None and space.isinstance_w(w_mod, space.w_unicode):
+            mod = space.utf8_w(w_mod)
+            if mod != 'builtins':
+                name = '%s.%s' % (mod, name)
+        return name
+
+    def group_of_w_obj(self, w_obj):
+        w_type = self.space.type(w_obj)
+        try:
+            return self.groups_by_type[w_type]
+        except KeyError:
+            index = self._new_group(self._type_name(w_type))
+            self.groups_by_type[w_type] = index
+            return index
+
+    def group_of_rpy_object(self, gcref):
+        typeindex = rgc.get_rpy_type_index(gcref)
+        try:
+            return self.groups_by_rpy_type[typeindex]
+        except KeyError:
+            index = self._new_group('<rpy type %d>' % typeindex)
+            self.groups_by_rpy_type[typeindex] = index
+            return index
+
+    def add_edge(self, src, dst):
+        key = (src, dst)
+        self.edges[key] = self.edges.get(key, 0) + 1
+
+    def walk(self, roots):
+        try:
+            self._walk(roots)
+        finally:
+            rgc.clear_gcflag_extra(roots)
+        rgc.assert_no_more_gcflags()
+
+    def _walk(self, roots):
+        # 'pending' contains objects that got their gcflag_extra set but
+        # that were not accounted for yet.  The internal objects reachable
+        # from one of them are accounted for immediately, in the same group.
+        pending = []
+        for gcref in roots:
+            if not rgc.get_gcflag_extra(gcref):
+                rgc.toggle_gcflag_extra(gcref)
+                pending.append(gcref)
+        inner = []
+        while pending:
+            gcref = pending.pop()
+            w_obj = try_cast_gcref_to_w_root(gcref)
+            if w_obj is not None:
+                group = self.group_of_w_obj(w_obj)
+            else:
+                group = self.group_of_rpy_object(gcref)
+            self.group_counts[group] += 1
+            size = 0
+            inner.append(gcref)
+            while inner:
+                gcref = inner.pop()
+                size += rgc.get_rpy_memory_usage(gcref)
+                for ref in rgc.get_rpy_referents(gcref):
+                    w_ref = try_cast_gcref_to_w_root(ref)
+                    if w_ref is not None:
+                        self.add_edge(group, self.group_of_w_obj(w_ref))
+                    if rgc.get_gcflag_extra(ref):
+                        continue
+                    rgc.toggle_gcflag_extra(ref)
+                    if w_ref is not None:
+                        pending.append(ref)
+                    else:
+                        inner.append(ref)
+            self.group_sizes[group] += size
+
+    def build(self):
+        builder = StringBuilder()
+        builder.append(MAGIC)
+        builder.append('\n')
+        for i in range(len(self.group_names)):
+            builder.append('T\t%d\t%d\t%s\n' % (self.group_counts[i],
+                                                self.group_sizes[i],
+                                                self.group_names[i]))
+        for key, count in self.edges.items():
+            src, dst = key
+            builder.append('E\t%d\t%d\t%d\n' % (count, src, dst))
+        return builder.build()
+
+
+def _heap_snapshot(space):
+    """Return a compact summary of the heap, see gc.dump_heap_snapshot()."""
+    if not rgc.has_gcflag_extra():
+        raise missing_operation(space)
+    roots = rgc.get_rpy_roots()
+    if roots is None:
+        raise missing_operation(space)
+    roots = [gcref for gcref in roots if gcref]
+    if roots and rgc.get_rpy_memory_usage(roots[0]) < 0:
+        raise missing_operation(space)
+    space.audit('gc.get_objects', [space.newint(-1)])
+    snapshot = HeapSnapshot(space)
+    snapshot.walk(roots)
+    return space.newbytes(snapshot.build())
@@ -1,6 +1,6 @@
 from rpython.memory.gc.hook import GcHooks
 from rpython.memory.gc import incminimark
-from rpython.rlib import rgc
+from rpython.rlib import rgc, rvmprof
 from rpython.rlib.nonconst import NonConstant
 from rpython.rlib.rarithmetic import r_uint, r_longlong, longlongmax
 from pypy.interpreter.gateway import interp2app, unwrap_spec, WrappedDefault
@@ -26,7 +26,8 @@ class LowLevelGcHooks(GcHooks):
         self.w_hooks = space.fromcache(W_AppLevelHooks)
 
     def is_gc_minor_enabled(self):
-        return self.w_hooks.gc_minor_enabled
+        return (self.w_hooks.gc_minor_enabled or
+                rvmprof.is_sampling_allocations())
 
     def is_gc_collect_step_enabled(self):
         return self.w_hooks.gc_collect_step_enabled
@@ -35,6 +36,11 @@ class LowLevelGcHooks(GcHooks):
         return self.w_hooks.gc_collect_enabled
 
     def on_gc_minor(self, duration, total_memory_used, pinned_objects):
+        if rvmprof.is_sampling_allocations():
+            # a minor collection happens every time the nursery is full
+            rvmprof.record_allocation(rgc.get_stats(rgc.NURSERY_SIZE))
+        if not self.w_hooks.gc_minor_enabled:
+            return
         action = self.w_hooks.gc_minor
         action.count += 1
         action.duration += duration
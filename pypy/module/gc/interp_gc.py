@@ -1,6 +1,6 @@
 from pypy.interpreter.gateway import unwrap_spec
 from pypy.interpreter.error import oefmt
-from rpython.rlib import rgc
+from rpython.rlib import rgc, rutf8
 from pypy.module.gc.hook import W_GcCollectStepStats
 
 
@@ -15,6 +15,9 @@ def collect(space, generation=0):
     cache.clear()
     cache = space.fromcache(MapAttrCache)
     cache.clear()
+    # Also free the big indexes of non-ascii strings, which are only
+    # caches too.
+    rutf8.release_index_storages()
 
     rgc.collect()
     _run_finalizers(space)
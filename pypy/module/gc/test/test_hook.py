@@ -200,3 +200,20 @@ class AppTestGcHooks(object):
             (1, 10, 20, 30),
             (2, 41, 50, 60),
             ]
+
+
+def test_gc_minor_records_allocations(space, monkeypatch):
+    from rpython.rlib import rgc, rvmprof
+    recorded = []
+    monkeypatch.setattr(rvmprof, 'is_sampling_allocations', lambda: True)
+    monkeypatch.setattr(rvmprof, 'record_allocation', recorded.append)
+    monkeypatch.setattr(rgc, 'get_stats', lambda stat_no: {
+        rgc.NURSERY_SIZE: 4096}[stat_no])
+    gchooks = space.fromcache(LowLevelGcHooks)
+    gchooks.w_hooks.descr_reset(space)
+    assert gchooks.is_gc_minor_enabled()
+    count = gchooks.w_hooks.gc_minor.count
+    gchooks.fire_gc_minor(1.0, 0, 0)
+    gchooks.fire_gc_minor(1.0, 0, 0)
+    assert recorded == [4096, 4096]
+    assert gchooks.w_hooks.gc_minor.count == count   # no app-level hook
@@ -122,6 +122,70 @@ class AppTestReferents(object):
             if i7 is self.ALL_ROOTS[3][0]: # not the case under runappdirect
                 assert 0, "the tuple (7,) is not found as gc.get_referrers(7)"
 
+    def test_heap_snapshot(self):
+        import gc, io
+        f = io.BytesIO()
+        gc.dump_heap_snapshot(f)
+        lines = f.getvalue().decode('utf-8').split('\n')
+        assert lines[0] == 'pypy-heap-snapshot 1'
+        names = []
+        types = {}
+        edges = {}
+        for line in lines[1:]:
+            words = line.split('\t')
+            if words[0] == 'T':
+                names.append(words[3])
+                count, size = types.get(words[3], (0, 0))
+                types[words[3]] = (count + int(words[1]),
+                                   size + int(words[2]))
+            elif words[0] == 'E':
+                key = (names[int(words[2])], names[int(words[3])])
+                edges[key] = edges.get(key, 0) + int(words[1])
+        if self.runappdirect:
+            assert types['list'][0] >= 3
+        else:
+            # [4], [[2], [7]], [2], [7]
+            assert types['list'][0] == 4
+            assert types['tuple'][0] == 1
+            assert edges[('list', 'list')] == 2
+            assert edges[('tuple', 'list')] == 1
+        assert types['list'][1] > 0
+
+
+class AppTestHeapSnapshot(object):
+
+    def setup_class(cls):
+        from rpython.rlib import rgc
+        cls._backup = [rgc.get_rpy_roots]
+        cls.w_roots = cls.space.newlist([])
+        rgc.get_rpy_roots = lambda: [rgc._GcRef(cls.w_roots)]
+
+    def teardown_class(cls):
+        from rpython.rlib import rgc
+        rgc.get_rpy_roots = cls._backup[0]
+
+    def test_type_names_without_app_level_code(self):
+        import gc, io
+        seen = []
+        class Meta(type):
+            def __getattribute__(cls, name):
+                seen.append(name)
+                raise KeyError(name)
+        Foo = Meta('Foo', (), {})
+        self.roots.append(Foo())
+        try:
+            del seen[:]
+            f = io.BytesIO()
+            gc.dump_heap_snapshot(f)
+        finally:
+            del self.roots[:]
+        assert seen == []
+        names = [line.split('\t')[3]
+                 for line in f.getvalue().decode('utf-8').split('\n')
+                 if line.startswith('T\t')]
+        assert [name for name in names
+                if name == 'Foo' or name.endswith('.Foo')]
+
 
 class AppTestReferentsMore(object):
 
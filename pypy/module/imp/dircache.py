@@ -0,0 +1,199 @@
+"""
+Interp-level part of importlib's FileFinder (see
+lib-python/3/importlib/_bootstrap_external.py): a cached listing of a
+directory on sys.path, revalidated against the directory's mtime, which
+is used to find the file or package directory of a module.
+
+A module that is not in the cached listing is reported as missing
+without any further system call.  On POSIX the listing also records
+which entries are regular files or directories (from the 'd_type' of
+readdir()), so that most lookups need no stat() of their own.
+"""
+
+import errno
+import os
+import stat
+import sys
+
+from rpython.rlib import rposix_stat, rposix_scandir
+
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import OperationError, wrap_oserror
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.typedef import TypeDef, GetSetProperty
+
+_WIN32 = sys.platform == 'win32'
+
+# what we know about an entry of the directory
+KIND_MISSING = 0
+KIND_UNKNOWN = 1        # needs a stat() to know
+KIND_FILE = 2
+KIND_DIR = 3
+
+
+def _list_directory(path):
+    """Return a dict {name: kind} with the entries of the directory."""
+    result = {}
+    if _WIN32:
+        for name in os.listdir(path):
+            # the file suffixes are matched case-insensitively on Windows
+            i = name.find('.')
+            if i >= 0:
+                name = name[:i] + name[i:].lower()
+            result[name] = KIND_UNKNOWN
+        return result
+    dirp = rposix_scandir.opendir_bytes(path)
+    try:
+        while True:
+            entry = rposix_scandir.nextentry(dirp)
+            if not entry:
+                break
+            name = rposix_scandir.get_name_bytes(entry)
+            if name == '.' or name == '..':
+                continue
+            known_type = rposix_scandir.get_known_type(entry)
+            if known_type == rposix_scandir.DT_REG:
+                result[name] = KIND_FILE
+            elif known_type == rposix_scandir.DT_DIR:
+                result[name] = KIND_DIR
+            else:
+                result[name] = KIND_UNKNOWN    # symlink, or no d_type
+    finally:
+        rposix_scandir.closedir(dirp)
+    return result
+
+def _stat_kind(path):
+    try:
+        st = rposix_stat.stat(path)
+    except OSError:
+        return KIND_MISSING
+    if stat.S_ISREG(st.st_mode):
+        return KIND_FILE
+    if stat.S_ISDIR(st.st_mode):
+        return KIND_DIR
+    return KIND_UNKNOWN
+
+def _join(path, name):
+    # like _path_join() in _bootstrap_external
+    path = path.rstrip(os.sep)
+    if _WIN32:
+        path = path.rstrip('/')
+    return path + os.sep + name
+
+
+class W_DirectoryCache(W_Root):
+    def __init__(self, path):
+        self.path = path
+        self.mtime = -1.0
+        self.entries = {}
+        self.relaxed_entries = None     # lower-cased names, built lazily
+
+    def _revalidate(self, space):
+        try:
+            mtime = rposix_stat.stat(self.path).st_mtime
+        except OSError:
+            mtime = -1.0
+        if mtime == self.mtime:
+            return
+        try:
+            entries = _list_directory(self.path)
+        except OSError as e:
+            # the directory has been removed, turned into a file, or
+            # made unreadable
+            if e.errno not in (errno.ENOENT, errno.EACCES, errno.ENOTDIR):
+                raise wrap_oserror(space, e, self.path)
+            entries = {}
+        self.entries = entries
+        self.relaxed_entries = None
+        self.mtime = mtime
+
+    def _get_relaxed_entries(self):
+        relaxed_entries = self.relaxed_entries
+        if relaxed_entries is None:
+            relaxed_entries = {}
+            for name, kind in self.entries.iteritems():
+                name = name.lower()
+                if relaxed_entries.get(name, kind) != kind:
+                    kind = KIND_UNKNOWN
+                relaxed_entries[name] = kind
+            self.relaxed_entries = relaxed_entries
+        return relaxed_entries
+
+    @unwrap_spec(relax_case=bool)
+    def descr_find(self, space, w_tail_module, w_suffixes, relax_case):
+        """find(tail_module, suffixes, relax_case) -> None or tuple
+
+        Look for the module 'tail_module' in the directory, trying the
+        file suffixes in order.  Return (index of the suffix, path of the
+        file, directory of the package or None); a namespace package is
+        returned as (-1, None, directory of the package)."""
+        try:
+            tail_module = space.fsencode_w(w_tail_module)
+        except OperationError as e:
+            if not e.match(space, space.w_UnicodeEncodeError):
+                raise
+            return space.w_None     # cannot be the name of a file
+        except UnicodeEncodeError:
+            return space.w_None     # same, before the codecs are ready
+        suffixes = [space.fsencode_w(w_suffix)
+                    for w_suffix in space.listview(w_suffixes)]
+        self._revalidate(space)
+        if relax_case:
+            entries = self._get_relaxed_entries()
+            cache_module = tail_module.lower()
+        else:
+            entries = self.entries
+            cache_module = tail_module
+        # is the module the name of a directory (and thus a package)?
+        kind = entries.get(cache_module, KIND_MISSING)
+        base_path = None
+        is_namespace = False
+        if kind != KIND_MISSING and kind != KIND_FILE:
+            base_path = _join(self.path, tail_module)
+            for i in range(len(suffixes)):
+                full_path = _join(base_path, '__init__' + suffixes[i])
+                if _stat_kind(full_path) == KIND_FILE:
+                    return self._found(space, i, full_path, base_path)
+            # a namespace package, if no module is found below
+            is_namespace = (kind == KIND_DIR or
+                            _stat_kind(base_path) == KIND_DIR)
+        # is there a file with one of the suffixes?
+        for i in range(len(suffixes)):
+            kind = entries.get(cache_module + suffixes[i], KIND_MISSING)
+            if kind == KIND_MISSING or kind == KIND_DIR:
+                continue
+            full_path = _join(self.path, tail_module + suffixes[i])
+            if kind == KIND_FILE or _stat_kind(full_path) == KIND_FILE:
+                return self._found(space, i, full_path, None)
+        if is_namespace:
+            return self._found(space, -1, None, base_path)
+        return space.w_None
+
+    def _found(self, space, index, full_path, base_path):
+        w_full_path = space.w_None
+        if full_path is not None:
+            w_full_path = space.newfilename(full_path)
+        w_base_path = space.w_None
+        if base_path is not None:
+            w_base_path = space.newfilename(base_path)
+        return space.newtuple([space.newint(index), w_full_path, w_base_path])
+
+    def descr_get_mtime(self, space):
+        return space.newfloat(self.mtime)
+
+    def descr_set_mtime(self, space, w_mtime):
+        self.mtime = space.float_w(w_mtime)
+
+
+@unwrap_spec(path='fsencode')
+def descr_new_directory_cache(space, w_subtype, path):
+    return W_DirectoryCache(path)
+
+W_DirectoryCache.typedef = TypeDef(
+    '_imp._DirectoryCache',
+    __new__ = interp2app(descr_new_directory_cache),
+    find = interp2app(W_DirectoryCache.descr_find),
+    mtime = GetSetProperty(W_DirectoryCache.descr_get_mtime,
+                           W_DirectoryCache.descr_set_mtime),
+)
+W_DirectoryCache.typedef.acceptable_as_base_class = False
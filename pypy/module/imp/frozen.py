@@ -0,0 +1,69 @@
+"""
+Pure-Python modules of the stdlib that are compiled at translation time
+and stored as prebuilt code objects inside the executable (see the
+objspace.frozen_modules option).  Importing them does not need to stat,
+open, read or unmarshal anything; importlib's FrozenImporter finds them
+before the path finders do.  They keep the __file__ and (for packages)
+the __path__ of their source in the stdlib directory found at runtime.
+"""
+
+import os
+
+from pypy.module._frozen_importlib.moduledef import lib_python
+from pypy.module._frozen_importlib.moduledef import Module as FrozenImportlib
+
+lib_pypy = os.path.join(os.path.dirname(__file__),
+                        '..', '..', '..', 'lib_pypy')
+
+
+class FrozenModule(object):
+    _immutable_ = True
+
+    def __init__(self, code_w, relpath, is_package):
+        self.code_w = code_w
+        self.relpath = relpath          # relative to the stdlib directory
+        self.is_package = is_package
+
+
+class FrozenModules(object):
+    def __init__(self, space):
+        self.modules = {}
+
+    def freeze(self, space, names):
+        """NOT_RPYTHON"""
+        for name in names.split(','):
+            name = name.strip()
+            if name and name not in self.modules:
+                self.modules[name] = self._compile(space, name)
+
+    @staticmethod
+    def _compile(space, name):
+        """NOT_RPYTHON"""
+        relbase = name.replace('.', '/')
+        for relpath, is_package in [(relbase + '/__init__.py', True),
+                                    (relbase + '.py', False)]:
+            if os.path.isfile(os.path.join(lib_python, relpath)):
+                break
+        else:
+            raise ValueError("cannot freeze %r: not a pure-Python module "
+                             "of lib-python" % (name,))
+        if (os.path.exists(os.path.join(lib_pypy, relbase + '.py')) or
+                os.path.isdir(os.path.join(lib_pypy, relbase))):
+            raise ValueError("cannot freeze %r: it is shadowed by lib_pypy"
+                             % (name,))
+        with open(os.path.join(lib_python, relpath)) as f:
+            source = f.read()
+        code_w = FrozenImportlib._cached_compile(
+            space, 'frozen_' + name, source, "<frozen %s>" % name, 'exec', 0)
+        return FrozenModule(code_w, relpath.replace('/', os.sep), is_package)
+
+
+def get_frozen_modules(space):
+    return space.fromcache(FrozenModules)
+
+def get_frozen_module(space, w_name):
+    """Return the FrozenModule called w_name, or None."""
+    modules = get_frozen_modules(space).modules
+    if not modules:
+        return None
+    return modules.get(space.text_w(w_name), None)
@@ -494,6 +494,38 @@ def import_name_fast_path(space, w_modulename, w_globals, w_locals, w_fromlist,
     return space.call_function(space.w_default_importlib_import, w_modulename, w_globals,
                                 w_locals, w_fromlist, w_level)
 
+class LazyImportState(object):
+    """Which 'import name' statements at the top level of a module only
+    bind the name to a placeholder, importing the module when the name is
+    first used (see __pypy__.set_lazy_imports())."""
+
+    def __init__(self, space):
+        self.enabled = False
+        self.modules = None      # if not None, only these are lazy
+        self.excluding = []      # these are never lazy
+
+    def set(self, enabled, modules, excluding):
+        self.enabled = enabled
+        self.modules = modules
+        self.excluding = excluding
+
+def _name_in(modulename, names):
+    for name in names:
+        if modulename == name or modulename.startswith(name + '.'):
+            return True
+    return False
+
+def should_import_lazily(space, modulename):
+    state = space.fromcache(LazyImportState)
+    if not state.enabled:
+        return False
+    if state.modules is not None and not _name_in(modulename, state.modules):
+        return False
+    if _name_in(modulename, state.excluding):
+        return False
+    # modules which are already imported are bound directly
+    return check_sys_modules_w(space, modulename) is None
+
 def get_spec(space, w_module):
     try:
         return space.getattr(w_module, space.newtext('__spec__'))
@@ -1,4 +1,8 @@
+import os
+
 from pypy.module.imp import importing
+from pypy.module.imp.frozen import get_frozen_module
+from pypy.module.sys.state import get as get_sys_state
 from rpython.rlib import streamio
 from pypy.interpreter.error import oefmt
 from pypy.interpreter.gateway import unwrap_spec
@@ -93,15 +97,35 @@ def is_frozen(space, w_name):
                 # For tests, not implemented on PyPy
                 "__hello__", "__phello__", "_phello__.spam"):
         return space.w_True
-    return space.w_False
+    return space.newbool(get_frozen_module(space, w_name) is not None)
+
+def _get_frozen_module(space, w_name):
+    frozen = get_frozen_module(space, w_name)
+    if frozen is None:
+        raise oefmt(space.w_ImportError,
+                    "No such frozen object named %R", w_name)
+    return frozen
 
 def get_frozen_object(space, w_name):
-    raise oefmt(space.w_ImportError,
-                "No such frozen object named %R", w_name)
+    return _get_frozen_module(space, w_name).code_w
 
 def is_frozen_package(space, w_name):
-    raise oefmt(space.w_ImportError,
-                "No such frozen object named %R", w_name)
+    return space.newbool(_get_frozen_module(space, w_name).is_package)
+
+def frozen_module_location(space, w_name):
+    """Return (filename, package directory or None) of the source of a
+    module compiled into the executable, or None for other modules."""
+    frozen = get_frozen_module(space, w_name)
+    stdlib_dir = get_sys_state(space).stdlib_dir
+    if frozen is None or stdlib_dir is None:
+        return space.w_None
+    filename = stdlib_dir + os.sep + frozen.relpath
+    w_dirname = space.w_None
+    if frozen.is_package:
+        end = filename.rfind(os.sep)
+        assert end >= 0
+        w_dirname = space.newfilename(filename[:end])
+    return space.newtuple([space.newfilename(filename), w_dirname])
 
 #__________________________________________________________________
 
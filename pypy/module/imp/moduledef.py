@@ -20,12 +20,14 @@ class Module(MixedModule):
         'exec_builtin':    'interp_imp.exec_builtin',
         'get_frozen_object': 'interp_imp.get_frozen_object',
         'is_frozen_package': 'interp_imp.is_frozen_package',
+        '_frozen_module_location': 'interp_imp.frozen_module_location',
 
         'lock_held':       'interp_imp.lock_held',
         'acquire_lock':    'interp_imp.acquire_lock',
         'release_lock':    'interp_imp.release_lock',
 
         '_fix_co_filename': 'interp_imp.fix_co_filename',
+        '_DirectoryCache': 'dircache.W_DirectoryCache',
 
         'source_hash':     'interp_imp.source_hash',
         'check_hash_based_pycs': 'space.newtext("default")',
@@ -42,3 +44,10 @@ class Module(MixedModule):
         add_fork_hook('before', interp_imp.acquire_lock)
         add_fork_hook('parent', interp_imp.release_lock)
         add_fork_hook('child', interp_imp.reinit_lock)
+
+    def setup_after_space_initialization(self):
+        "NOT_RPYTHON"
+        from pypy.module.imp.frozen import get_frozen_modules
+        names = self.space.config.objspace.frozen_modules
+        if names:
+            get_frozen_modules(self.space).freeze(self.space, names)
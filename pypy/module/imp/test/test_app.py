@@ -342,3 +342,133 @@ class AppTestImpModule:
         import _imp
         assert _imp.check_hash_based_pycs == "default"
 
+
+    def test_directory_cache(self):
+        import _imp, os
+        base = os.path.join(self.udir, 'dircache')
+        os.mkdir(base)
+        os.mkdir(os.path.join(base, 'pkg'))
+        with open(os.path.join(base, 'pkg', '__init__.py'), 'w'):
+            pass
+        os.mkdir(os.path.join(base, 'nspkg'))
+        with open(os.path.join(base, 'mod.py'), 'w'):
+            pass
+        os.mkdir(os.path.join(base, 'notamodule.py'))
+        cache = _imp._DirectoryCache(base)
+        assert cache.mtime == -1
+        suffixes = ['.so', '.py']
+        assert cache.find('mod', suffixes, False) == (
+            1, os.path.join(base, 'mod.py'), None)
+        assert cache.mtime == os.stat(base).st_mtime
+        pkg = os.path.join(base, 'pkg')
+        assert cache.find('pkg', suffixes, False) == (
+            1, os.path.join(pkg, '__init__.py'), pkg)
+        assert cache.find('nspkg', suffixes, False) == (
+            -1, None, os.path.join(base, 'nspkg'))
+        assert cache.find('notamodule', suffixes, False) is None
+        assert cache.find('missing', suffixes, False) is None
+        assert cache.find('MOD', suffixes, False) is None
+        assert cache.find('MOD', suffixes, True)[0] == 1
+        # misses are answered from the cache, until the mtime changes
+        with open(os.path.join(base, 'new.py'), 'w'):
+            pass
+        cache.mtime = os.stat(base).st_mtime
+        assert cache.find('new', suffixes, False) is None
+        cache.mtime = -1
+        assert cache.find('new', suffixes, False)[0] == 1
+
+    def test_file_finder(self):
+        import os, sys
+        from importlib.machinery import FileFinder, SourceFileLoader
+        base = os.path.join(self.udir, 'filefinder')
+        os.mkdir(base)
+        with open(os.path.join(base, 'filefindermod.py'), 'w') as f:
+            f.write('x = 42\n')
+        finder = FileFinder(base, (SourceFileLoader, ['.py']))
+        spec = finder.find_spec('filefindermod')
+        assert spec.origin == os.path.join(base, 'filefindermod.py')
+        assert spec.loader.name == 'filefindermod'
+        assert finder.find_spec('nonexistent') is None
+        assert finder.find_spec('nul\x00') is None
+        finder.invalidate_caches()
+        assert finder._path_mtime == -1
+
+    def test_file_finder_verbose_trace(self):
+        import os
+        from importlib import _bootstrap, _bootstrap_external
+        from importlib.machinery import FileFinder, SourceFileLoader
+        base = os.path.join(self.udir, 'filefinderverbose')
+        os.mkdir(base)
+        with open(os.path.join(base, 'verbosemod.py'), 'w'):
+            pass
+        os.mkdir(os.path.join(base, 'verbosepkg'))
+        with open(os.path.join(base, 'verbosepkg', '__init__.py'), 'w'):
+            pass
+        finder = FileFinder(base, (SourceFileLoader, ['.x', '.py', '.z']))
+        messages = []
+        def verbose_message(message, *args, **kwds):
+            messages.append((message.format(*args), kwds['verbosity']))
+        saved = _bootstrap._verbose_message
+        _bootstrap._verbose_message = verbose_message
+        try:
+            for name in ['verbosemod', 'verbosepkg', 'missing']:
+                finder._trace_probes(name, finder._cache.find(
+                    name, finder._suffixes, False))
+        finally:
+            _bootstrap._verbose_message = saved
+        assert _bootstrap_external._bootstrap is _bootstrap
+        assert messages == [
+            ('trying ' + os.path.join(base, 'verbosemod.x'), 2),
+            ('trying ' + os.path.join(base, 'verbosemod.py'), 2),
+            ('trying ' + os.path.join(base, 'missing.x'), 2),
+            ('trying ' + os.path.join(base, 'missing.py'), 2),
+            ('trying ' + os.path.join(base, 'missing.z'), 2)]
+
+    def test_source_loader_mapped_pyc(self):
+        import os, marshal
+        from importlib.machinery import SourceFileLoader
+        from importlib.util import cache_from_source, MAGIC_NUMBER
+        source = os.path.join(self.udir, 'mappedpycmod.py')
+        with open(source, 'w') as f:
+            f.write('x = 1\n')
+        st = os.stat(source)
+        pyc = cache_from_source(source)
+        os.makedirs(os.path.dirname(pyc), exist_ok=True)
+        def write_pyc(mtime):
+            with open(pyc, 'wb') as f:
+                f.write(MAGIC_NUMBER + b'\x00' * 4)
+                f.write(int(mtime).to_bytes(4, 'little'))
+                f.write(st.st_size.to_bytes(4, 'little'))
+                marshal.dump(compile('x = 2', source, 'exec'), f)
+        class DataLoader(SourceFileLoader):
+            def get_data(self, path):
+                return SourceFileLoader.get_data(self, path)
+        seen = []
+        load_pyc = marshal._load_pyc
+        def counting_load_pyc(path, header):
+            seen.append(path)
+            return load_pyc(path, header)
+        marshal._load_pyc = counting_load_pyc
+        try:
+            write_pyc(st.st_mtime)
+            code = SourceFileLoader('mappedpycmod', source).get_code(
+                'mappedpycmod')
+            d = {}
+            exec(code, d)
+            assert d['x'] == 2
+            assert seen == [pyc]
+            assert code.co_filename == source
+            # loaders with their own get_data() read the pyc with it
+            code = DataLoader('mappedpycmod', source).get_code('mappedpycmod')
+            exec(code, d)
+            assert d['x'] == 2
+            assert seen == [pyc]
+            # a stale pyc is ignored
+            write_pyc(st.st_mtime + 1)
+            code = SourceFileLoader('mappedpycmod', source).get_code(
+                'mappedpycmod')
+            exec(code, d)
+            assert d['x'] == 1
+            assert len(seen) == 2
+        finally:
+            marshal._load_pyc = load_pyc
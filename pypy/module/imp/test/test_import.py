@@ -1328,3 +1328,37 @@ class AppTestImportlibMagic:
         assert _bootstrap_external.MAGIC_NUMBER == self.magic
 
 
+
+
+@pytest.mark.skipif('config.option.runappdirect')
+class AppTestFrozenModules:
+    spaceconfig = {
+        "usemodules._frozen_importlib": True,
+        "frozen_modules": "colorsys,json",
+    }
+
+    def test_imp(self):
+        import _imp
+        assert _imp.is_frozen('colorsys')
+        assert not _imp.is_frozen_package('colorsys')
+        assert _imp.is_frozen_package('json')
+        assert not _imp.is_frozen('json.decoder')
+        code = _imp.get_frozen_object('colorsys')
+        assert code.co_filename == '<frozen colorsys>'
+        raises(ImportError, _imp.get_frozen_object, 'json.decoder')
+        assert _imp._frozen_module_location('json.decoder') is None
+
+    def test_import(self):
+        import sys, os
+        import colorsys, json
+        from importlib.machinery import FrozenImporter
+        assert colorsys.__loader__ is FrozenImporter
+        assert colorsys.__spec__.origin.endswith(os.sep + 'colorsys.py')
+        assert os.path.exists(colorsys.__file__)
+        assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        # the submodules of a frozen package are found in its __path__
+        [path] = json.__path__
+        assert json.__file__ == os.path.join(path, '__init__.py')
+        assert json.decoder.__file__ == os.path.join(path, 'decoder.py')
+        assert json.decoder.__loader__ is not FrozenImporter
+        assert json.loads('[1, 2]') == [1, 2]
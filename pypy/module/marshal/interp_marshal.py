@@ -1,7 +1,11 @@
-from pypy.interpreter.error import OperationError, oefmt
+import os
+
+from pypy.interpreter.error import OperationError, oefmt, wrap_oserror
 from pypy.interpreter.gateway import WrappedDefault, unwrap_spec
+from pypy.interpreter.pycode import PyCode
+from rpython.rlib.buffer import LLBuffer
 from rpython.rlib.rarithmetic import intmask
-from rpython.rlib import rstackovf
+from rpython.rlib import rmmap, rstackovf
 from pypy.objspace.std.marshal_impl import marshal, get_unmarshallers
 
 #
@@ -56,6 +60,36 @@ def _loads(space, w_str, hidden_applevel=False):
     obj = u.load_w_obj()
     return obj
 
+@unwrap_spec(path='fsencode', header='bytes')
+def load_pyc(space, path, header):
+    """Return the code object stored after 'header' in the file 'path',
+or None if the file does not start with 'header' or does not contain a
+code object.  The file is memory-mapped instead of read into a string."""
+    space.audit("open", [space.newfilename(path), space.newtext("r"),
+                         space.newint(os.O_RDONLY)])
+    try:
+        fd = os.open(path, os.O_RDONLY, 0)
+        try:
+            m = rmmap.mmap(fd, 0, access=rmmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        raise wrap_oserror(space, e, path)
+    except rmmap.RMMapError:
+        return space.w_None     # an empty file, for example
+    # the pyc files are written with a rename() over the old one, so the
+    # mapped file is never truncated behind our back
+    try:
+        if m.getslice(0, len(header)) != header:
+            return space.w_None
+        u = MappedUnmarshaller(space, m, len(header))
+        w_code = u.load_w_obj()
+    finally:
+        m.close()
+    if not isinstance(w_code, PyCode):
+        return space.w_None
+    return w_code
+
 
 class AbstractReaderWriter(object):
     def __init__(self, space):
@@ -504,3 +538,13 @@ class StringUnmarshaller(Unmarshaller):
             return x
         else:
             self.raise_exc('bad marshal data')
+
+
+class MappedUnmarshaller(StringUnmarshaller):
+    # Unmarshaller reading directly from a memory-mapped file: every string
+    # is copied once, from the mapping into its final object
+    def __init__(self, space, mmap, offset):
+        Unmarshaller.__init__(self, space, None)
+        self.buf = LLBuffer(mmap.data, mmap.size)
+        self.bufpos = offset
+        self.limit = mmap.size
@@ -34,4 +34,5 @@ class Module(MixedModule):
         'load'    : 'interp_marshal.load',
         'loads'   : 'interp_marshal.loads',
         'version' : 'space.newint(interp_marshal.Py_MARSHAL_VERSION)',
+        '_load_pyc': 'interp_marshal.load_pyc',
     }
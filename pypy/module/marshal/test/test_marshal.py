@@ -286,6 +286,32 @@ class AppTestMarshal:
             # TYPE_ASCII but not actually ascii
             marshal.loads(b'a\x01\0\0\0\xff')
 
+    def test_load_pyc(self):
+        import marshal
+        code = compile("x = 42", "test_load_pyc", "exec")
+        header = b'\x01' * 16
+        with open(self.tmpfile, 'wb') as f:
+            f.write(header + marshal.dumps(code))
+        code2 = marshal._load_pyc(self.tmpfile, header)
+        assert code2 == code
+        d = {}
+        exec(code2, d)
+        assert d['x'] == 42
+        assert marshal._load_pyc(self.tmpfile, b'\x02' * 16) is None
+        # not a code object
+        with open(self.tmpfile, 'wb') as f:
+            f.write(header + marshal.dumps((1, 2)))
+        assert marshal._load_pyc(self.tmpfile, header) is None
+        # truncated
+        with open(self.tmpfile, 'wb') as f:
+            f.write(header + marshal.dumps(code)[:-5])
+        raises(EOFError, marshal._load_pyc, self.tmpfile, header)
+        # empty
+        with open(self.tmpfile, 'wb') as f:
+            pass
+        assert marshal._load_pyc(self.tmpfile, header) is None
+        raises(OSError, marshal._load_pyc, self.tmpfile + '.missing', header)
+
 
 @pytest.mark.skipif('config.option.runappdirect or sys.maxint > 2 ** 32')
 class AppTestSmallLong(AppTestMarshal):
@@ -269,6 +269,19 @@ def releaseall(space):
     """
     jit_hooks.stats_memmgr_release_all(None)
 
+@unwrap_spec(limit=int)
+@dont_look_inside
+def compile_deferred(space, limit=-1):
+    """ Compile the loops whose compilation was deferred, oldest first, and
+    return how many were compiled.  With the 'compile_deferred=N' JIT
+    parameter, the traces of up to N loops are queued instead of being
+    optimized and assembled on the spot, and the program keeps running in
+    the interpreter.  Call this at a convenient time, e.g. between two
+    requests, to move the cost of compilation there.  If 'limit' is not
+    negative, compile at most that many loops.
+    """
+    return space.newint(jit_hooks.stats_compile_deferred(None, limit))
+
 # class Cache(object):
 #     in_recursion = False
 
@@ -14,6 +14,10 @@ class Module(MixedModule):
         'trace_next_iteration': 'interp_jit.trace_next_iteration',
         'trace_next_iteration_hash': 'interp_jit.trace_next_iteration_hash',
         'releaseall': 'interp_jit.releaseall',
+        'compile_deferred': 'interp_jit.compile_deferred',
+        'warmup_cache_enable': 'warmup.warmup_cache_enable',
+        'warmup_cache_disable': 'warmup.warmup_cache_disable',
+        'warmup_cache_save': 'warmup.warmup_cache_save',
         'set_compile_hook': 'interp_resop.set_compile_hook',
         'set_abort_hook': 'interp_resop.set_abort_hook',
         'set_trace_too_long_hook': 'interp_resop.set_trace_too_long_hook',
@@ -43,3 +47,7 @@ class Module(MixedModule):
         w_obj = space.wrap(PARAMETERS)
         space.setattr(self, space.newtext('defaults'), w_obj)
         pypy_hooks.space = space
+
+    def shutdown(self, space):
+        from pypy.module.pypyjit.warmup import WarmupCache
+        space.fromcache(WarmupCache).shutdown()
@@ -0,0 +1,117 @@
+import py
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.pycode import PyCode
+from rpython.jit.metainterp.history import ConstInt, ConstPtr, JitCellToken
+from rpython.rtyper.annlowlevel import cast_instance_to_base_ptr
+from rpython.rtyper.lltypesystem import lltype, llmemory
+from rpython.rlib.jit import JitDebugInfo
+from pypy.module.pypyjit.interp_jit import pypyjitdriver
+from pypy.module.pypyjit.hooks import pypy_hooks
+from pypy.module.pypyjit.warmup import WarmupCache, code_hash
+
+
+class MockJitDriverSD(object):
+    jitdriver = pypyjitdriver
+
+
+class AppTestWarmupCache(object):
+    spaceconfig = dict(usemodules=('pypyjit',))
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("Can't run this test with -A")
+        space = cls.space
+        traced = cls.traced = []
+
+        def trace_next_iteration(self, pycode, next_instr, is_being_profiled):
+            traced.append((pycode.co_name, next_instr, is_being_profiled))
+        cls.orig_trace_next_iteration = WarmupCache.trace_next_iteration
+        WarmupCache.trace_next_iteration = trace_next_iteration
+
+        @unwrap_spec(next_instr=int)
+        def interp_on_compile(w_code, next_instr):
+            assert isinstance(w_code, PyCode)
+            ll_code = cast_instance_to_base_ptr(w_code)
+            code_gcref = lltype.cast_opaque_ptr(llmemory.GCREF, ll_code)
+            greenkey = [ConstInt(next_instr), ConstInt(0),
+                        ConstPtr(code_gcref)]
+            di_loop = JitDebugInfo(MockJitDriverSD, None, JitCellToken(), [],
+                                   'loop', greenkey)
+            if pypy_hooks.are_hooks_enabled():
+                pypy_hooks.after_compile(di_loop)
+
+        def interp_get_traced():
+            result = space.newlist([space.newtuple([space.newtext(name),
+                                                    space.newint(i),
+                                                    space.newint(p)])
+                                    for name, i, p in traced])
+            del traced[:]
+            return result
+
+        cls.w_on_compile = space.wrap(interp2app(interp_on_compile))
+        cls.w_get_traced = space.wrap(interp2app(interp_get_traced))
+        cls.w_tmpfile = space.wrap(str(py.test.ensuretemp("jitwarmup")
+                                       .join("cache")))
+
+    def teardown_class(cls):
+        WarmupCache.trace_next_iteration = cls.orig_trace_next_iteration
+
+    def teardown_method(self, meth):
+        self.space.appexec([], """():
+            import pypyjit
+            pypyjit.warmup_cache_disable()
+        """)
+
+    def test_record_and_replay(self):
+        import pypyjit, os
+        src = "def f(n):\n    while n:\n        n -= 1\n"
+        if os.path.exists(self.tmpfile):
+            os.remove(self.tmpfile)
+        pypyjit.warmup_cache_enable(self.tmpfile)
+        d = {}
+        exec(compile(src, 'warmup_test.py', 'exec'), d)
+        self.on_compile(d['f'].__code__, 2)
+        pypyjit.warmup_cache_save(self.tmpfile)
+        pypyjit.warmup_cache_disable()
+        assert self.get_traced() == []
+
+        pypyjit.warmup_cache_enable(self.tmpfile)
+        exec(compile(src, 'warmup_test.py', 'exec'), d)
+        assert self.get_traced() == [('f', 2, 0)]
+        # only once per process
+        exec(compile(src, 'warmup_test.py', 'exec'), d)
+        assert self.get_traced() == []
+
+    def test_changed_code_ignored(self):
+        import pypyjit, os
+        if os.path.exists(self.tmpfile):
+            os.remove(self.tmpfile)
+        pypyjit.warmup_cache_enable(self.tmpfile)
+        d = {}
+        exec(compile("def g(n):\n    while n:\n        n -= 1\n",
+                     'warmup_test2.py', 'exec'), d)
+        self.on_compile(d['g'].__code__, 2)
+        pypyjit.warmup_cache_save(self.tmpfile)
+        pypyjit.warmup_cache_disable()
+
+        pypyjit.warmup_cache_enable(self.tmpfile)
+        exec(compile("def g(n):\n    while n > 0:\n        n -= 1\n",
+                     'warmup_test2.py', 'exec'), d)
+        assert self.get_traced() == []
+
+    def test_other_build_ignored(self):
+        import pypyjit, os
+        with open(self.tmpfile, 'w') as f:
+            f.write('pypy-jit-warmup-cache 1\nsome other build\n'
+                    'warmup_test3.py\th\t1\t0\t2\t0\n')
+        pypyjit.warmup_cache_enable(self.tmpfile)
+        d = {}
+        exec(compile("def h(n):\n    while n:\n        n -= 1\n",
+                     'warmup_test3.py', 'exec'), d)
+        assert self.get_traced() == []
+
+
+def test_code_hash_is_stable():
+    class FakeCode(object):
+        co_code = 'abc'
+    assert code_hash(FakeCode()) == 0xe71fa2190541574b
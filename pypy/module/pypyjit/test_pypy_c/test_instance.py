@@ -31,6 +31,31 @@ class TestInstance(BaseTestPyPyC):
             jump(..., descr=...)
         """)
 
+    def test_virtual_point(self):
+        def main(n):
+            class Point(object):
+                def __init__(self, x, y):
+                    self.x = x
+                    self.y = y
+            #
+            i = 0
+            total = 0
+            while i < n:
+                p = Point(i, 2)
+                total += p.x * p.y
+                i += 1
+            return total
+        #
+        log = self.run(main, [1000], threshold=400)
+        assert log.result == 999000
+        loop, = log.loops_by_filename(self.filepath)
+        # the instance and its storage stay virtual: the sizes of the
+        # lists come from the quasi-immutable size hints of the map
+        opnames = log.opnames(loop.allops())
+        assert opnames.count('new_with_vtable') == 0
+        assert opnames.count('new_array') == 0
+        assert opnames.count('new_array_clear') == 0
+
     def test_load_attr(self):
         src = '''
             class A(object):
@@ -0,0 +1,67 @@
+from pypy.module.pypyjit.test_pypy_c.test_00_model import BaseTestPyPyC
+
+
+class TestMonitoring(BaseTestPyPyC):
+
+    def test_events_of_other_code(self):
+        def main(n):
+            import sys
+            mon = sys.monitoring
+            def other():
+                pass
+            def callback(*args):
+                pass
+            mon.use_tool_id(mon.COVERAGE_ID, "cov")
+            mon.register_callback(mon.COVERAGE_ID, mon.events.LINE, callback)
+            mon.register_callback(mon.COVERAGE_ID, mon.events.BRANCH, callback)
+            mon.set_local_events(mon.COVERAGE_ID, other.__code__,
+                                 mon.events.LINE | mon.events.BRANCH)
+            i = 0
+            while i < n:
+                i += 1
+            mon.free_tool_id(mon.COVERAGE_ID)
+            return i
+        #
+        log = self.run(main, [1000])
+        assert log.result == 1000
+        loop, = log.loops_by_filename(self.filepath)
+        # the events are active, but not for this code: no trace of them
+        assert loop.match("""
+            i7 = int_lt(i5, i6)
+            guard_true(i7, descr=...)
+            guard_not_invalidated(descr=...)
+            i8 = int_add(i5, 1)
+            --TICK--
+            jump(..., descr=...)
+        """)
+
+    def test_disabled_lines(self):
+        def main(n):
+            import sys
+            mon = sys.monitoring
+            seen = []
+            def line(code, lineno):
+                seen.append(lineno)
+                return mon.DISABLE
+            mon.use_tool_id(mon.COVERAGE_ID, "cov")
+            mon.register_callback(mon.COVERAGE_ID, mon.events.LINE, line)
+            mon.set_events(mon.COVERAGE_ID, mon.events.LINE)
+            i = 0
+            while i < n:
+                i += 1
+            mon.free_tool_id(mon.COVERAGE_ID)
+            return len(seen) < 10
+        #
+        log = self.run(main, [1000])
+        assert log.result
+        loop, = log.loops_by_filename(self.filepath)
+        # every line of the loop was seen once and then disabled: the
+        # LINE events are still enabled, but they fold away
+        assert loop.match("""
+            i7 = int_lt(i5, i6)
+            guard_true(i7, descr=...)
+            guard_not_invalidated(descr=...)
+            i8 = int_add(i5, 1)
+            --TICK--
+            jump(..., descr=...)
+        """)
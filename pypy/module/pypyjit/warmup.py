@@ -0,0 +1,210 @@
+""" A persistent cache of the loops that became hot in previous runs.
+
+Machine code, resume data and the quasi-immutable assumptions a trace was
+compiled under are only valid inside the process that produced them, so
+what is stored is just the green key of every loop that got compiled:
+(co_filename, co_name, co_firstlineno, hash of co_code, next_instr,
+is_being_profiled).  When a matching code object is created in a later run,
+the JIT counter of that position is set just below the threshold, so the
+loop is traced again after a couple of iterations instead of after the
+normal warmup.  Freshly traced loops are always consistent with the current
+state of the program, so no revalidation is needed beyond checking that the
+file was written by the same PyPy build and that the bytecode is the same.
+"""
+
+from rpython.rlib import jit_hooks
+from rpython.rlib.rarithmetic import r_uint
+from rpython.rlib.streamio import open_file_as_stream
+from rpython.rtyper.annlowlevel import (
+    cast_base_ptr_to_instance, cast_instance_to_gcref)
+from rpython.rtyper.lltypesystem import lltype
+from rpython.rtyper.rclass import OBJECT
+from pypy.interpreter.error import oefmt, wrap_oserror2
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.interpreter.pycode import PyCode, CodeHookCache
+
+MAGIC = 'pypy-jit-warmup-cache 1'
+
+
+def code_hash(pycode):
+    """ A hash of the bytecode that is stable across processes (FNV-1a), as
+    opposed to compute_hash(), which is randomized. """
+    h = r_uint(0xcbf29ce484222325)
+    for c in pycode.co_code:
+        h = (h ^ r_uint(ord(c))) * r_uint(0x100000001b3)
+    return h
+
+def code_key(pycode):
+    return '%s\t%s\t%d' % (pycode.co_filename, pycode.co_name,
+                           pycode.co_firstlineno)
+
+def valid_key(key):
+    return '\n' not in key and key.count('\t') == 2
+
+
+class WarmupCache(object):
+    def __init__(self, space):
+        self.space = space
+        self.path = None
+        self.recording = False
+        # code_key -> list of (code hash, next_instr, is_being_profiled),
+        # loaded from the file and not yet seen in this process
+        self.pending = {}
+        # the lines to write back, used as an ordered set
+        self.entries = {}
+
+    def build_id(self):
+        # sys.version contains the version, the revision and the build date
+        space = self.space
+        return space.text_w(space.sys.get('version')).replace('\n', ' ')
+
+    def enable(self, path):
+        self.path = path
+        self.recording = True
+        self.pending.clear()
+        self.entries.clear()
+        cache = self.space.fromcache(CodeHookCache)
+        cache._jit_warmup_cache = self
+        try:
+            self.load(path)
+        except (IOError, OSError):
+            pass    # no cache yet
+
+    def load(self, path):
+        stream = open_file_as_stream(path, 'r')
+        try:
+            data = stream.readall()
+        finally:
+            stream.close()
+        lines = data.split('\n')
+        if (len(lines) < 2 or lines[0] != MAGIC or
+                lines[1] != self.build_id()):
+            return 0    # different PyPy build, ignore the file
+        count = 0
+        for i in range(2, len(lines)):
+            line = lines[i]
+            parts = line.split('\t')
+            if len(parts) != 6:
+                continue
+            try:
+                firstlineno = int(parts[2])
+                hash = r_uint(int(parts[3], 16))
+                next_instr = int(parts[4])
+                is_being_profiled = int(parts[5])
+            except ValueError:
+                continue
+            key = '%s\t%s\t%d' % (parts[0], parts[1], firstlineno)
+            positions = self.pending.get(key, None)
+            if positions is None:
+                positions = self.pending[key] = []
+            positions.append((hash, next_instr, is_being_profiled))
+            count += 1
+        return count
+
+    def save(self, path):
+        lines = [MAGIC, self.build_id()]
+        for line in self.entries:
+            lines.append(line)
+        lines.append('')
+        stream = open_file_as_stream(path, 'w')
+        try:
+            stream.write('\n'.join(lines))
+        finally:
+            stream.close()
+
+    def add_entry(self, key, hash, next_instr, is_being_profiled):
+        line = '%s\t%x\t%d\t%d' % (key, hash, next_instr, is_being_profiled)
+        self.entries[line] = None
+
+    def record_loop(self, pycode, next_instr, is_being_profiled):
+        """ Called when a loop starting at this position got compiled. """
+        if not self.recording:
+            return
+        key = code_key(pycode)
+        if valid_key(key):
+            self.add_entry(key, code_hash(pycode), next_instr,
+                           is_being_profiled)
+
+    def new_code(self, pycode):
+        """ Called for every new code object. """
+        if not self.pending:
+            return
+        key = code_key(pycode)
+        positions = self.pending.get(key, None)
+        if positions is None:
+            return
+        del self.pending[key]
+        hash = code_hash(pycode)
+        for expected_hash, next_instr, is_being_profiled in positions:
+            if expected_hash != hash:
+                continue    # the source changed
+            self.add_entry(key, hash, next_instr, is_being_profiled)
+            self.trace_next_iteration(pycode, next_instr, is_being_profiled)
+
+    def trace_next_iteration(self, pycode, next_instr, is_being_profiled):
+        jit_hooks.trace_next_iteration(
+            'pypyjit', r_uint(next_instr), is_being_profiled,
+            cast_instance_to_gcref(pycode))
+
+    def shutdown(self):
+        if self.path is not None and self.recording:
+            try:
+                self.save(self.path)
+            except (IOError, OSError):
+                pass
+
+
+def record_compiled_loop(space, debug_info):
+    """ Called from the compile hook. """
+    cache = space.fromcache(WarmupCache)
+    if not cache.recording:
+        return
+    if debug_info.get_jitdriver().name != 'pypyjit':
+        return
+    greenkey = debug_info.greenkey
+    if greenkey is None:
+        return
+    next_instr = greenkey[0].getint()
+    is_being_profiled = greenkey[1].getint()
+    ll_code = lltype.cast_opaque_ptr(lltype.Ptr(OBJECT),
+                                     greenkey[2].getref_base())
+    pycode = cast_base_ptr_to_instance(PyCode, ll_code)
+    cache.record_loop(pycode, next_instr, is_being_profiled)
+
+
+@unwrap_spec(path='fsencode')
+def warmup_cache_enable(space, path):
+    """ warmup_cache_enable(path)
+
+    Use 'path' as a persistent cache of the loops that got compiled.  Loops
+    recorded there by a previous run of the same PyPy build are traced as
+    soon as the code object that contains them is created, instead of
+    after the normal warmup.  The loops compiled in this run are written
+    back to 'path' when the interpreter exits.  This is also enabled by
+    setting the PYPY_JIT_WARMUP_CACHE environment variable to a path.
+    """
+    space.fromcache(WarmupCache).enable(path)
+
+def warmup_cache_disable(space):
+    """ warmup_cache_disable()
+
+    Stop recording compiled loops and don't write the cache file at exit.
+    """
+    cache = space.fromcache(WarmupCache)
+    cache.recording = False
+    cache.pending.clear()
+    cache.entries.clear()
+    space.fromcache(CodeHookCache)._jit_warmup_cache = None
+
+@unwrap_spec(path='fsencode')
+def warmup_cache_save(space, path):
+    """ warmup_cache_save(path)
+
+    Write the loops recorded so far to 'path' now.
+    """
+    try:
+        space.fromcache(WarmupCache).save(path)
+    except OSError as e:
+        raise wrap_oserror2(space, e, space.newtext(path))
+    except IOError:
+        raise oefmt(space.w_IOError, "cannot write %s", path)
@@ -188,6 +188,9 @@ def compute_stdlib_path_sourcetree(state, platlibdir, prefix):
     return compute_lib_pypy_path(state, python_std_lib, prefix)
 
 def compute_lib_pypy_path(state, python_std_lib, prefix, use_lib_pypy=True):
+    if state is not None:
+        # where the stdlib modules compiled into the executable come from
+        state.stdlib_dir = python_std_lib
     importlist = []
 
     if use_lib_pypy:
@@ -6,6 +6,30 @@ import sys
 
 _WIN = sys.platform == 'win32'
 
+class MonitoringModule(MixedModule):
+    """ sys.monitoring, see PEP 669 """
+
+    appleveldefs = {}
+
+    interpleveldefs = {
+        'use_tool_id'           : 'monitoring.use_tool_id',
+        'free_tool_id'          : 'monitoring.free_tool_id',
+        'get_tool'              : 'monitoring.get_tool',
+        'register_callback'     : 'monitoring.register_callback',
+        'get_events'            : 'monitoring.get_events',
+        'set_events'            : 'monitoring.set_events',
+        'get_local_events'      : 'monitoring.get_local_events',
+        'set_local_events'      : 'monitoring.set_local_events',
+        'restart_events'        : 'monitoring.restart_events',
+        'events'                : 'monitoring.make_events_namespace(space)',
+        'DISABLE'               : 'monitoring.get_state(space).w_DISABLE',
+        'MISSING'               : 'monitoring.get_state(space).w_MISSING',
+        'DEBUGGER_ID'           : 'space.newint(0)',
+        'COVERAGE_ID'           : 'space.newint(1)',
+        'PROFILER_ID'           : 'space.newint(2)',
+        'OPTIMIZER_ID'          : 'space.newint(5)',
+    }
+
 class Module(MixedModule):
     """Sys Builtin Module. """
     _immutable_fields_ = ["defaultencoding", "debug?", "filesystemencoding?"]
@@ -145,6 +169,10 @@ class Module(MixedModule):
         '__stderr__'            : 'std_test.stderr',
     }
 
+    submodules = {
+        'monitoring': MonitoringModule,
+    }
+
     def startup(self, space):
         if space.config.translating:
             assert self.filesystemencoding is None
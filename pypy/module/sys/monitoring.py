@@ -0,0 +1,94 @@
+"""
+The functions of sys.monitoring (PEP 669).  The implementation is in
+pypy/interpreter/monitoring.py.
+"""
+
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.monitoring import get_state, EVENT_NAMES
+from pypy.interpreter.pycode import PyCode
+from pypy.interpreter.typedef import TypeDef
+
+
+class W_MonitoringSentinel(W_Root):
+    """ the type of sys.monitoring.DISABLE and sys.monitoring.MISSING """
+
+    def __init__(self, name):
+        self.name = name
+
+    def descr_repr(self, space):
+        return space.newtext("<sys.monitoring.%s>" % (self.name,))
+
+W_MonitoringSentinel.typedef = TypeDef("sys.monitoring.sentinel",
+    __repr__ = interp2app(W_MonitoringSentinel.descr_repr),
+)
+W_MonitoringSentinel.typedef.acceptable_as_base_class = False
+
+
+@unwrap_spec(tool_id=int)
+def use_tool_id(space, tool_id, w_name):
+    """Register a tool with the given id and name."""
+    if not space.isinstance_w(w_name, space.w_unicode):
+        raise oefmt(space.w_ValueError, "tool name must be a str")
+    get_state(space).use_tool_id(tool_id, w_name)
+
+@unwrap_spec(tool_id=int)
+def free_tool_id(space, tool_id):
+    """Free the given tool id, and unregister its events and callbacks."""
+    get_state(space).free_tool_id(tool_id)
+
+@unwrap_spec(tool_id=int)
+def get_tool(space, tool_id):
+    """Return the name of the tool with the given id, or None."""
+    w_name = get_state(space).get_tool(tool_id)
+    if w_name is None:
+        return space.w_None
+    return w_name
+
+@unwrap_spec(tool_id=int, event=int)
+def register_callback(space, tool_id, event, w_func):
+    """Register the callback of a tool for an event, which must be one of
+    the constants of sys.monitoring.events.  Return the previous callback.
+    Passing None as the callback unregisters it."""
+    if space.is_w(w_func, space.w_None):
+        w_func = None
+    w_previous = get_state(space).register_callback(tool_id, event, w_func)
+    if w_previous is None:
+        return space.w_None
+    return w_previous
+
+@unwrap_spec(tool_id=int)
+def get_events(space, tool_id):
+    """Return the set of events enabled globally for the tool."""
+    return space.newint(get_state(space).get_events(tool_id))
+
+@unwrap_spec(tool_id=int, event_set=int)
+def set_events(space, tool_id, event_set):
+    """Enable the given set of events globally for the tool."""
+    get_state(space).set_events(tool_id, event_set)
+
+@unwrap_spec(tool_id=int, w_code=PyCode)
+def get_local_events(space, tool_id, w_code):
+    """Return the set of events enabled for the tool in the code object."""
+    return space.newint(get_state(space).get_local_events(tool_id, w_code))
+
+@unwrap_spec(tool_id=int, w_code=PyCode, event_set=int)
+def set_local_events(space, tool_id, w_code, event_set):
+    """Enable the given set of events for the tool in the code object."""
+    get_state(space).set_local_events(tool_id, w_code, event_set)
+
+def restart_events(space):
+    """Enable again all the events that callbacks disabled by returning
+    sys.monitoring.DISABLE."""
+    get_state(space).restart_events()
+
+def make_events_namespace(space):
+    w_dict = space.newdict()
+    for i, name in enumerate(EVENT_NAMES):
+        space.setitem_str(w_dict, name, space.newint(1 << i))
+    space.setitem_str(w_dict, 'NO_EVENTS', space.newint(0))
+    return space.appexec([w_dict], """(d):
+        from _structseq import SimpleNamespace
+        return SimpleNamespace(**d)
+    """)
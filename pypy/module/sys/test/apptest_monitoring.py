@@ -0,0 +1,283 @@
+import sys
+from pytest import raises
+
+mon = sys.monitoring
+E = mon.events
+TOOL = mon.COVERAGE_ID
+
+
+class Recorder:
+    __test__ = False
+
+    def __init__(self, *events, result=None):
+        self.seen = []
+        self.events = events
+        self.result = result
+
+    def __enter__(self):
+        mon.use_tool_id(TOOL, "test")
+        for event in self.events:
+            mon.register_callback(TOOL, event, self.make_callback(event))
+        return self
+
+    def __exit__(self, *args):
+        mon.free_tool_id(TOOL)
+        mon.restart_events()
+
+    def make_callback(self, event):
+        def callback(code, *args):
+            self.seen.append((event, code.co_name) + args)
+            return self.result
+        return callback
+
+    def names(self, event, name):
+        return [entry[2:] for entry in self.seen
+                if entry[0] == event and entry[1] == name]
+
+
+def test_tool_ids():
+    assert mon.get_tool(TOOL) is None
+    mon.use_tool_id(TOOL, "cov")
+    try:
+        assert mon.get_tool(TOOL) == "cov"
+        with raises(ValueError):
+            mon.use_tool_id(TOOL, "other")
+        assert mon.get_events(TOOL) == E.NO_EVENTS
+    finally:
+        mon.free_tool_id(TOOL)
+    assert mon.get_tool(TOOL) is None
+    with raises(ValueError):
+        mon.get_tool(6)
+    with raises(ValueError):
+        mon.set_events(TOOL, E.LINE)     # not in use
+    with raises(ValueError):
+        mon.use_tool_id(TOOL, 42)
+
+def test_register_callback():
+    def f(*args):
+        pass
+    assert mon.register_callback(TOOL, E.LINE, f) is None
+    assert mon.register_callback(TOOL, E.LINE, None) is f
+    with raises(ValueError):
+        mon.register_callback(TOOL, E.LINE | E.BRANCH, f)
+
+def test_invalid_event_sets():
+    with Recorder():
+        with raises(ValueError):
+            mon.set_events(TOOL, 1 << 20)
+        with raises(ValueError):
+            mon.set_local_events(TOOL, test_tool_ids.__code__, E.RAISE)
+        with raises(TypeError):
+            mon.set_local_events(TOOL, test_tool_ids, E.LINE)
+
+def test_call_c_return():
+    def g(x, y=0):
+        return x
+    def f(lst):
+        g(5)
+        len(lst)
+        lst.append(6)
+        g(*lst[:1], y=1)
+    lst = [1]
+    with Recorder(E.CALL, E.C_RETURN, E.C_RAISE) as rec:
+        mon.set_events(TOOL, E.CALL | E.C_RETURN | E.C_RAISE)
+        assert mon.get_events(TOOL) == E.CALL | E.C_RETURN | E.C_RAISE
+        f(lst)
+        mon.set_events(TOOL, 0)
+    calls = [entry[1:] for entry in rec.names(E.CALL, 'f')]
+    assert calls == [(g, 5), (len, lst), (list.append, lst), (g, 1)]
+    c_returns = [entry[1:] for entry in rec.names(E.C_RETURN, 'f')]
+    assert c_returns == [(len, lst), (list.append, lst)]
+    assert rec.names(E.C_RAISE, 'f') == []
+
+def test_c_raise():
+    def f():
+        try:
+            int("x")
+        except ValueError:
+            pass
+        return abs()
+    with Recorder(E.CALL, E.C_RETURN, E.C_RAISE) as rec:
+        mon.set_events(TOOL, E.CALL | E.C_RETURN | E.C_RAISE)
+        with raises(TypeError):
+            f()
+        mon.set_events(TOOL, 0)
+    c_raises = [entry[1:] for entry in rec.names(E.C_RAISE, 'f')]
+    assert c_raises == [(int, "x"), (abs, mon.MISSING)]
+    assert rec.names(E.C_RETURN, 'f') == []
+
+def test_local_call():
+    def g():
+        return 1
+    def f():
+        return g()
+    with Recorder(E.CALL) as rec:
+        mon.set_local_events(TOOL, f.__code__, E.CALL)
+        f()
+        g()
+        mon.set_local_events(TOOL, f.__code__, 0)
+    [(offset, func, arg0)] = rec.names(E.CALL, 'f')
+    assert func is g
+    assert arg0 is mon.MISSING
+    assert rec.names(E.CALL, 'test_local_call') == []
+
+def test_exception_handled_reraise():
+    def f():
+        try:
+            raise KeyError(5)
+        except KeyError:
+            pass
+        try:
+            try:
+                raise ValueError(6)
+            finally:
+                pass
+        except ValueError:
+            pass
+    with Recorder(E.EXCEPTION_HANDLED, E.RERAISE) as rec:
+        mon.set_events(TOOL, E.EXCEPTION_HANDLED | E.RERAISE)
+        f()
+        mon.set_events(TOOL, 0)
+    handled = [type(entry[1]) for entry in rec.names(E.EXCEPTION_HANDLED, 'f')]
+    # the ValueError is handled twice: by the 'finally' and by the 'except'
+    assert handled == [KeyError, ValueError, ValueError]
+    [(offset, exc)] = rec.names(E.RERAISE, 'f')
+    assert isinstance(exc, ValueError)
+
+def test_start_return():
+    def f(x):
+        return x + 1
+    with Recorder(E.PY_START, E.PY_RETURN) as rec:
+        mon.set_events(TOOL, E.PY_START | E.PY_RETURN)
+        f(41)
+        mon.set_events(TOOL, 0)
+    assert rec.names(E.PY_START, 'f') == [(0,)]
+    [(offset, retval)] = rec.names(E.PY_RETURN, 'f')
+    assert retval == 42
+
+def test_generator():
+    def gen():
+        yield 1
+        yield 2
+    with Recorder(E.PY_START, E.PY_YIELD, E.PY_RESUME,
+                  E.PY_RETURN) as rec:
+        mon.set_events(TOOL, E.PY_START | E.PY_YIELD | E.PY_RESUME |
+                             E.PY_RETURN)
+        assert list(gen()) == [1, 2]
+        mon.set_events(TOOL, 0)
+    events = [entry[0] for entry in rec.seen if entry[1] == 'gen']
+    assert events == [E.PY_START, E.PY_YIELD, E.PY_RESUME, E.PY_YIELD,
+                      E.PY_RESUME, E.PY_RETURN]
+    assert [args[1] for args in rec.names(E.PY_YIELD, 'gen')] == [1, 2]
+
+def test_line():
+    def f(n):
+        total = 0
+        for i in range(n):
+            total += i
+        return total
+    firstlineno = f.__code__.co_firstlineno
+    with Recorder(E.LINE) as rec:
+        mon.set_events(TOOL, E.LINE)
+        f(3)
+        mon.set_events(TOOL, 0)
+    lines = [line - firstlineno for (line,) in rec.names(E.LINE, 'f')]
+    assert lines == [1, 2, 3, 2, 3, 2, 3, 2, 4]
+
+def test_line_disable():
+    def f(n):
+        total = 0
+        for i in range(n):
+            total += i
+        return total
+    with Recorder(E.LINE, result=mon.DISABLE) as rec:
+        mon.set_events(TOOL, E.LINE)
+        f(10)
+        # every location is only reported once; the 'for' line is
+        # reported both at its start and at the jump back to FOR_ITER
+        lines = [line - f.__code__.co_firstlineno
+                 for (line,) in rec.names(E.LINE, 'f')]
+        assert lines == [1, 2, 3, 2, 4]
+        f(10)
+        assert len(rec.names(E.LINE, 'f')) == 5
+        mon.restart_events()
+        f(10)
+        assert len(rec.names(E.LINE, 'f')) == 10
+        mon.set_events(TOOL, 0)
+
+def test_cannot_disable_raise():
+    def f():
+        raise KeyError
+    with Recorder(E.RAISE, result=mon.DISABLE) as rec:
+        mon.set_events(TOOL, E.RAISE)
+        with raises(ValueError):
+            f()
+        mon.set_events(TOOL, 0)
+
+def test_local_events():
+    def f():
+        return 1
+    def g():
+        return 2
+    with Recorder(E.PY_START) as rec:
+        mon.set_local_events(TOOL, f.__code__, E.PY_START)
+        assert mon.get_local_events(TOOL, f.__code__) == E.PY_START
+        assert mon.get_local_events(TOOL, g.__code__) == 0
+        f()
+        g()
+        mon.set_local_events(TOOL, f.__code__, 0)
+        f()
+    assert [entry[1] for entry in rec.seen] == ['f']
+
+def test_branch_jump():
+    def f(n):
+        for i in range(n):
+            if i % 2:
+                pass
+        return n
+    with Recorder(E.BRANCH, E.JUMP) as rec:
+        mon.set_events(TOOL, E.BRANCH | E.JUMP)
+        f(4)
+        mon.set_events(TOOL, 0)
+    branches = rec.names(E.BRANCH, 'f')
+    # 5 times FOR_ITER, 4 times the 'if'
+    assert len(branches) == 9
+    assert len(set(branches)) == 4
+    assert rec.names(E.JUMP, 'f')
+
+def test_raise_unwind():
+    def f():
+        raise KeyError(5)
+    def g():
+        try:
+            f()
+        except KeyError:
+            pass
+    with Recorder(E.RAISE, E.PY_UNWIND) as rec:
+        mon.set_events(TOOL, E.RAISE | E.PY_UNWIND)
+        g()
+        mon.set_events(TOOL, 0)
+    [(offset, exc)] = rec.names(E.RAISE, 'f')
+    assert isinstance(exc, KeyError)
+    [(offset, exc2)] = rec.names(E.PY_UNWIND, 'f')
+    assert exc2 is exc
+    [(offset, exc3)] = rec.names(E.RAISE, 'g')
+    assert exc3 is exc
+    assert rec.names(E.PY_UNWIND, 'g') == []
+
+def test_no_events_in_callbacks():
+    def f():
+        return 1
+    seen = []
+    def callback(code, offset):
+        seen.append(code.co_name)
+        f()
+    mon.use_tool_id(TOOL, "test")
+    try:
+        mon.register_callback(TOOL, E.PY_START, callback)
+        mon.set_events(TOOL, E.PY_START)
+        f()
+        mon.set_events(TOOL, 0)
+    finally:
+        mon.free_tool_id(TOOL)
+    assert seen == ['f']
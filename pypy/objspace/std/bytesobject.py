@@ -1,6 +1,6 @@
 """The builtin bytes implementation"""
 
-from rpython.rlib import jit, rutf8
+from rpython.rlib import jit, rswar, rutf8
 from rpython.rlib.objectmodel import (
     compute_hash, compute_unique_id, import_from_mixin)
 from rpython.rlib.rstring import StringBuilder
@@ -407,6 +407,28 @@ class W_AbstractBytesObject(W_Root):
         Format bytes objects
         """
 
+    def descr_hex(self, space, w_sep=None, w_bytes_per_sep=None):
+        """
+        Create a str of hexadecimal numbers from a bytes object.
+
+          sep
+            An optional single character or byte to separate hex bytes.
+          bytes_per_sep
+            How many bytes between separators.  Positive values count from the
+            right, negative values count from the left.
+
+        Example:
+        >>> value = b'\\xb9\\x01\\xef'
+        >>> value.hex()
+        'b901ef'
+        >>> value.hex(':')
+        'b9:01:ef'
+        >>> value.hex(':', 2)
+        'b9:01ef'
+        >>> value.hex(':', -2)
+        'b901:ef'
+        """
+
     def descr_removeprefix(self, space, w_prefix):
         """Return a str with the given prefix string removed if present.
 
@@ -625,41 +647,105 @@ class W_BytesObject(W_AbstractBytesObject):
         return space.newint(x)
 
     def descr_isascii(self, space):
-        for i in self._value:
-            if ord(i) > 127:
-                return space.w_False
-        return space.w_True
+        return space.newbool(rswar.first_non_ascii_char(self._value) < 0)
+
+    def descr_isdigit(self, space):
+        return space.newbool(rswar.is_ascii_digits(self._value))
+
+    @unwrap_spec(keepends=bool)
+    def descr_splitlines(self, space, keepends=False):
+        value = self._value
+        length = len(value)
+        strs = []
+        pos = 0
+        while pos < length:
+            sol = pos
+            eol = rswar.find_either_char(value, '\n', '\r', pos, length)
+            if eol < 0:
+                eol = length
+            pos = eol + 1
+            # read CRLF as one line break
+            if pos < length and value[eol] == '\r' and value[pos] == '\n':
+                pos += 1
+            if keepends:
+                eol = min(pos, length)
+            assert eol >= 0
+            strs.append(value[sol:eol])
+        return self._newlist_unwrapped(space, strs)
 
     def descr_eq(self, space, w_other):
+        if space.config.objspace.std.withstrbuf:
+            from pypy.objspace.std.strbufobject import W_StringBufferObject
+            if isinstance(w_other, W_StringBufferObject):
+                return space.newbool(self._value == w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value == w_other._value)
 
     def descr_ne(self, space, w_other):
+        if space.config.objspace.std.withstrbuf:
+            from pypy.objspace.std.strbufobject import W_StringBufferObject
+            if isinstance(w_other, W_StringBufferObject):
+                return space.newbool(self._value != w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value != w_other._value)
 
     def descr_lt(self, space, w_other):
+        if space.config.objspace.std.withstrbuf:
+            from pypy.objspace.std.strbufobject import W_StringBufferObject
+            if isinstance(w_other, W_StringBufferObject):
+                return space.newbool(self._value < w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value < w_other._value)
 
     def descr_le(self, space, w_other):
+        if space.config.objspace.std.withstrbuf:
+            from pypy.objspace.std.strbufobject import W_StringBufferObject
+            if isinstance(w_other, W_StringBufferObject):
+                return space.newbool(self._value <= w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value <= w_other._value)
 
     def descr_gt(self, space, w_other):
+        if space.config.objspace.std.withstrbuf:
+            from pypy.objspace.std.strbufobject import W_StringBufferObject
+            if isinstance(w_other, W_StringBufferObject):
+                return space.newbool(self._value > w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value > w_other._value)
 
     def descr_ge(self, space, w_other):
+        if space.config.objspace.std.withstrbuf:
+            from pypy.objspace.std.strbufobject import W_StringBufferObject
+            if isinstance(w_other, W_StringBufferObject):
+                return space.newbool(self._value >= w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value >= w_other._value)
 
+    _StringMethods_descr_add = descr_add
+    def descr_add(self, space, w_other):
+        if space.config.objspace.std.withstrbuf:
+            from pypy.objspace.std import strbufobject
+            try:
+                other = self._op_val(space, w_other)
+            except OperationError as e:
+                if e.match(space, space.w_TypeError):
+                    return space.w_NotImplemented
+                raise
+            if (len(self._value) + len(other) >=
+                    strbufobject.MIN_BUFFER_LENGTH):
+                builder = StringBuilder()
+                builder.append(self._value)
+                builder.append(other)
+                return strbufobject.W_StringBufferObject(builder)
+            return W_BytesObject(self._value + other)
+        return self._StringMethods_descr_add(space, w_other)
+
     # auto-conversion fun
 
     @unwrap_spec(count=int)
@@ -699,26 +785,6 @@ class W_BytesObject(W_AbstractBytesObject):
         return W_BytesObject(self._value.upper())
 
     def descr_hex(self, space, w_sep=None, w_bytes_per_sep=None):
-        """
-        Create a str of hexadecimal numbers from a bytes object.
-
-          sep
-            An optional single character or byte to separate hex bytes.
-          bytes_per_sep
-            How many bytes between separators.  Positive values count from the
-            right, negative values count from the left.
-
-        Example:
-        >>> value = b'\\xb9\\x01\\xef'
-        >>> value.hex()
-        'b901ef'
-        >>> value.hex(':')
-        'b9:01:ef'
-        >>> value.hex(':', 2)
-        'b9:01ef'
-        >>> value.hex(':', -2)
-        'b901:ef'
-        """
         from pypy.objspace.std.bytearrayobject import _array_to_hexstring, unwrap_hex_sep_arguments
         sep, bytes_per_sep = unwrap_hex_sep_arguments(space, w_sep, w_bytes_per_sep)
         return _array_to_hexstring(space, StringBuffer(self._value), 0, 1,
@@ -957,7 +1023,7 @@ W_BytesObject.typedef = TypeDef(
 
     fromhex = interp2app(W_BytesObject.descr_fromhex, as_classmethod=True),
     maketrans = interp2app(W_BytesObject.descr_maketrans, as_classmethod=True),
-    hex = interp2app(W_BytesObject.descr_hex),
+    hex = interpindirect2app(W_AbstractBytesObject.descr_hex),
 )
 W_BytesObject.typedef.flag_sequence_bug_compat = True
 
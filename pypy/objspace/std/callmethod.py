@@ -10,7 +10,7 @@ like: (on the left, without the new bytecodes; on the right, with them)
     CALL_FUNCTION   n              CALL_METHOD     n
 """
 
-from pypy.interpreter import function
+from pypy.interpreter import function, monitoring
 from rpython.rlib import jit
 from pypy.objspace.std.mapdict import LOAD_METHOD_mapdict, \
     LOAD_METHOD_mapdict_fill_cache_method
@@ -124,7 +124,9 @@ def CALL_METHOD_KW(f, n_arguments, *ignored):
     args = f.argument_factory(
             arguments, keyword_names_w, keywords_w, None, None,
             methodcall=w_self is not None, w_function=w_callable)
-    if f.get_is_being_profiled() and function.is_builtin_code(w_callable):
+    if monitoring.calls_monitored(f):
+        w_result = monitoring.call_args(f, w_callable, args)
+    elif f.get_is_being_profiled() and function.is_builtin_code(w_callable):
         w_result = f.space.call_args_and_c_profile(f, w_callable, args)
     else:
         w_result = f.space.call_args(w_callable, args)
@@ -78,9 +78,10 @@ class ModuleDictStrategy(DictStrategy):
         return self._setitem_str_cell_known(cell, w_dict, key, w_value)
 
     def _setitem_str_cell_known(self, cell, w_dict, key, w_value):
-        w_value = write_cell(self.space, cell, w_value)
-        if w_value is None:
-            return
+        if not isinstance(w_value, LazyImportCell):
+            w_value = write_cell(self.space, cell, w_value)
+            if w_value is None:
+                return
         self.mutated()
         self.unerase(w_dict.dstorage)[key] = w_value
         if self.caches is None:
@@ -142,6 +143,8 @@ class ModuleDictStrategy(DictStrategy):
 
     def getitem_str(self, w_dict, key):
         cell = self.getdictvalue_no_unwrapping(w_dict, key)
+        if isinstance(cell, LazyImportCell):
+            return cell.resolve(self.space)
         return unwrap_cell(self.space, cell)
 
     def w_keys(self, w_dict):
@@ -239,6 +242,59 @@ class ModuleDictStrategy(DictStrategy):
             self.caches[key] = cache
         return cache
 
+class LazyImportCell(MutableCell):
+    """The placeholder stored in a module dict by a lazy 'import name'
+    statement, see IMPORT_NAME.  The module is imported when the name is
+    first read from the dict, either by ModuleDictStrategy.getitem_str() or
+    by a cached LOAD_GLOBAL; both call resolve(), which then replaces the
+    placeholder with the module."""
+
+    def __init__(self, w_modulename, w_globals, key):
+        self.w_modulename = w_modulename
+        self.w_globals = w_globals     # the module dict, None once replaced
+        self.key = key
+        self.w_value = None
+
+    def unwrap_cell(self, space):
+        from pypy.module.imp.importing import import_name_fast_path
+        w_value = self.w_value
+        if w_value is None:
+            w_value = import_name_fast_path(space, self.w_modulename,
+                                            self.w_globals, self.w_globals,
+                                            space.w_None, space.newint(0))
+            self.w_value = w_value
+        return w_value
+
+    def resolve(self, space):
+        w_value = self.unwrap_cell(space)
+        w_globals = self.w_globals
+        if w_globals is not None:
+            assert isinstance(w_globals, W_ModuleDictObject)
+            self.w_globals = None
+            # replace the placeholder with the module itself, unless
+            # importing it already rebound the name
+            strategy = w_globals.get_strategy()
+            if (isinstance(strategy, ModuleDictStrategy) and
+                    strategy.getdictvalue_no_unwrapping(
+                        w_globals, self.key) is self):
+                strategy._setitem_str_cell_known(None, w_globals, self.key,
+                                                 w_value)
+        return w_value
+
+    def __repr__(self):
+        return "<LazyImportCell: %s>" % (self.w_modulename, )
+
+def is_lazy_import(space, w_dict, key):
+    """Is the value of 'key' in the module dict a module which is not
+    imported yet?"""
+    from pypy.objspace.std.dictmultiobject import W_DictMultiObject
+    if isinstance(w_dict, W_DictMultiObject):
+        strategy = w_dict.get_strategy()
+        if isinstance(strategy, ModuleDictStrategy):
+            cell = strategy.getdictvalue_no_unwrapping(w_dict, key)
+            return isinstance(cell, LazyImportCell) and cell.w_value is None
+    return False
+
 def remove_cell(w_dict, space, name):
     from pypy.objspace.std.dictmultiobject import W_DictMultiObject
     if isinstance(w_dict, W_DictMultiObject):
@@ -274,7 +330,10 @@ class GlobalCache(object):
 
     @objectmodel.always_inline
     def getvalue(self, space):
-        return unwrap_cell(space, self.cell)
+        cell = self.cell
+        if isinstance(cell, LazyImportCell):
+            return cell.resolve(space)
+        return unwrap_cell(space, cell)
 
 def LOAD_GLOBAL_cached(self, nameindex, next_instr):
     # indirection for the benefit of looking like py2
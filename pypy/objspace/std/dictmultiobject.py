@@ -263,6 +263,7 @@ class W_DictMultiObject(W_Root):
         otherwise KeyError is raised
         """
         strategy = self.get_strategy()
+        w_key = space.force_str_buffer(w_key)
         try:
             return strategy.pop(self, w_key, w_default)
         except KeyError:
@@ -359,11 +360,12 @@ class W_ModuleDictObject(W_DictMultiObject):
 # called below DictStrategy
 
 def _add_indirections():
-    dict_methods = "getitem getitem_str setitem setdefault \
-                    popitem delitem clear copy \
+    dict_methods = "getitem_str popitem clear copy \
                     length w_keys values items \
                     iterkeys itervalues iteritems iterreversed \
                     listview_bytes listview_ascii listview_int".split()
+    # the methods that take a key: the strategies check its exact class
+    dict_key_methods = "getitem setitem setdefault delitem".split()
 
     def make_method(method):
         def f(self, *args):
@@ -371,9 +373,19 @@ def _add_indirections():
         f.func_name = method
         return f
 
+    def make_key_method(method):
+        def f(self, w_key, *args):
+            w_key = self.space.force_str_buffer(w_key)
+            return getattr(self.get_strategy(), method)(self, w_key, *args)
+        f.func_name = method
+        return f
+
     for method in dict_methods:
         assert hasattr(DictStrategy, method)
         setattr(W_DictMultiObject, method, make_method(method))
+    for method in dict_key_methods:
+        assert hasattr(DictStrategy, method)
+        setattr(W_DictMultiObject, method, make_key_method(method))
 
 
 app = applevel('''
@@ -663,16 +675,20 @@ class EmptyDictStrategy(DictStrategy):
     def get_empty_storage(self):
         return self.erase(None)
 
-    def switch_to_correct_strategy(self, w_dict, w_key):
+    def switch_to_correct_strategy(self, w_dict, w_key, w_value):
         if type(w_key) is self.space.StringObjectCls:
             self.switch_to_bytes_strategy(w_dict)
             return
         if type(w_key) is self.space.UnicodeObjectCls:
-            self.switch_to_unicode_strategy(w_dict)
+            if not self.switch_to_unboxed_values_strategy(w_dict, w_key,
+                                                          w_value):
+                self.switch_to_unicode_strategy(w_dict)
             return
         w_type = self.space.type(w_key)
         if self.space.is_w(w_type, self.space.w_int):
-            self.switch_to_int_strategy(w_dict)
+            if not self.switch_to_unboxed_values_strategy(w_dict, w_key,
+                                                          w_value):
+                self.switch_to_int_strategy(w_dict)
         elif w_type.compares_by_identity():
             self.switch_to_identity_strategy(w_dict)
         else:
@@ -696,6 +712,18 @@ class EmptyDictStrategy(DictStrategy):
         w_dict.set_strategy(strategy)
         w_dict.dstorage = storage
 
+    def switch_to_unboxed_values_strategy(self, w_dict, w_key, w_value):
+        if not self.space.config.objspace.std.withunboxeddictvalues:
+            return False
+        from pypy.objspace.std.unboxeddict import get_unboxed_strategy
+        strategy = get_unboxed_strategy(self.space, w_key, w_value)
+        if strategy is None:
+            return False
+        storage = strategy.get_empty_storage()
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = storage
+        return True
+
     def switch_to_identity_strategy(self, w_dict):
         from pypy.objspace.std.identitydict import IdentityDictStrategy
         strategy = self.space.fromcache(IdentityDictStrategy)
@@ -722,12 +750,12 @@ class EmptyDictStrategy(DictStrategy):
 
     def setdefault(self, w_dict, w_key, w_default):
         # here the dict is always empty
-        self.switch_to_correct_strategy(w_dict, w_key)
+        self.switch_to_correct_strategy(w_dict, w_key, w_default)
         w_dict.setitem(w_key, w_default)
         return w_default
 
     def setitem(self, w_dict, w_key, w_value):
-        self.switch_to_correct_strategy(w_dict, w_key)
+        self.switch_to_correct_strategy(w_dict, w_key, w_value)
         w_dict.setitem(w_key, w_value)
 
     def setitem_str(self, w_dict, key, w_value):
@@ -1257,10 +1285,10 @@ def unicode_eq(w_uni1, w_uni2):
 def unicode_hash(w_uni):
     return w_uni.hash_w()
 
-class UnicodeDictStrategy(AbstractTypedStrategy, DictStrategy):
-    erase, unerase = rerased.new_erasing_pair("unicode")
-    erase = staticmethod(erase)
-    unerase = staticmethod(unerase)
+class UnicodeKeysMixin(object):
+    """The part of UnicodeDictStrategy that is about the keys.  Also used by
+    the strategies with unboxed values, see unboxeddict.py."""
+    _mixin_ = True
 
     def wrap(self, unwrapped):
         return unwrapped
@@ -1294,6 +1322,13 @@ class UnicodeDictStrategy(AbstractTypedStrategy, DictStrategy):
     def wrapkey(space, key):
         return key
 
+
+class UnicodeDictStrategy(UnicodeKeysMixin, AbstractTypedStrategy,
+                          DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("unicode")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
     @jit.look_inside_iff(lambda self, w_dict:
                          w_dict._unrolling_heuristic())
     def view_as_kwargs(self, w_dict):
@@ -1310,10 +1345,10 @@ class UnicodeDictStrategy(AbstractTypedStrategy, DictStrategy):
 create_iterator_classes(UnicodeDictStrategy)
 
 
-class IntDictStrategy(AbstractTypedStrategy, DictStrategy):
-    erase, unerase = rerased.new_erasing_pair("int")
-    erase = staticmethod(erase)
-    unerase = staticmethod(unerase)
+class IntKeysMixin(object):
+    """The part of IntDictStrategy that is about the keys.  Also used by
+    the strategies with unboxed values, see unboxeddict.py."""
+    _mixin_ = True
 
     def wrap(self, unwrapped):
         return self.space.newint(unwrapped)
@@ -1346,6 +1381,12 @@ class IntDictStrategy(AbstractTypedStrategy, DictStrategy):
     def w_keys(self, w_dict):
         return self.space.newlist_int(self.listview_int(w_dict))
 
+
+class IntDictStrategy(IntKeysMixin, AbstractTypedStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("int")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
 create_iterator_classes(IntDictStrategy)
 
 
@@ -333,10 +333,12 @@ class W_ListObject(W_Root):
     def find_or_count(self, w_item, start=0, end=sys.maxint, count=False):
         """Find w_item in list[start:end]. If not found, raise ValueError.
         if count=True, count number of occurences instead"""
+        w_item = self.space.force_str_buffer(w_item)
         return self.strategy.find_or_count(self, w_item, start, end, count)
 
     def append(self, w_item):
         """Append object to the end of the list."""
+        w_item = self.space.force_str_buffer(w_item)
         self.strategy.append(self, w_item)
 
     def length(self):
@@ -424,6 +426,7 @@ class W_ListObject(W_Root):
     def setitem(self, index, w_item):
         """Inserts a wrapped item at the given (unwrapped) index.
         May raise IndexError."""
+        w_item = self.space.force_str_buffer(w_item)
         self.strategy.setitem(self, index, w_item)
 
     def setslice(self, start, step, slicelength, sequence_w):
@@ -435,6 +438,7 @@ class W_ListObject(W_Root):
     def insert(self, index, w_item):
         """Inserts an item at the given position. Item must be wrapped,
         index not."""
+        w_item = self.space.force_str_buffer(w_item)
         self.strategy.insert(self, index, w_item)
 
     def extend(self, w_iterable):
@@ -43,13 +43,21 @@ LIMIT_MAP_ATTRIBUTES = 80
 
 
 class AbstractAttribute(object):
-    _immutable_fields_ = ['terminator']
+    _immutable_fields_ = ['terminator', 'storage_size_hint?',
+                          'unboxed_size_hint?']
     cache_attrs = None
 
     def __init__(self, space, terminator):
         self.space = space
         assert isinstance(terminator, Terminator)
         self.terminator = terminator
+        # the largest storage and the largest list of unboxed values that
+        # instances using this map, or a map derived from it, needed so far.
+        # Used to give the right size to the storage when it has to grow.
+        # Quasi-immutable: they stop changing quickly, and then the JIT
+        # knows the sizes and can keep the storage of new instances virtual.
+        self.storage_size_hint = 0
+        self.unboxed_size_hint = 0
 
     def read(self, obj, name, attrkind):
         attr = self.find_map_attr(name, attrkind)
@@ -134,6 +142,28 @@ class AbstractAttribute(object):
         """ number of attributes represented by self. """
         raise NotImplementedError("abstract base class")
 
+    def storage_size_for_growth(self):
+        """ the size to give to the storage of an instance that has to grow
+        it to use self as its map.  Instances of the same class tend to get
+        the same attributes, so we directly make room for the attributes
+        that instances going through this map got so far, but at most twice
+        the size that is currently needed. """
+        needed = self.storage_needed()
+        if self.storage_size_hint < needed:
+            self._update_size_hints(needed, 0)
+        return min(self.storage_size_hint, 2 * needed)
+
+    @jit.dont_look_inside
+    def _update_size_hints(self, storage_size, unboxed_size):
+        attr = self
+        while (attr.storage_size_hint < storage_size or
+               attr.unboxed_size_hint < unboxed_size):
+            attr.storage_size_hint = max(attr.storage_size_hint, storage_size)
+            attr.unboxed_size_hint = max(attr.unboxed_size_hint, unboxed_size)
+            if not isinstance(attr, PlainAttribute):
+                break
+            attr = attr.back
+
     def get_terminator(self):
         return self.terminator
 
@@ -511,6 +541,12 @@ class UnboxedPlainAttribute(PlainAttribute):
             return self.storageindex + 1
         return self.back.storage_needed()
 
+    def unboxed_size_for_growth(self):
+        """ like storage_size_for_growth(), for the list of unboxed values """
+        needed = self.listindex + 1
+        if self.unboxed_size_hint < needed:
+            self._update_size_hints(0, needed)
+        return min(self.unboxed_size_hint, 2 * needed)
 
     def _unbox(self, w_value):
         space = self.space
@@ -574,7 +610,8 @@ class UnboxedPlainAttribute(PlainAttribute):
         from rpython.rlib.debug import make_sure_not_resized
         val = self._unbox(w_value)
         if self.firstunwrapped:
-            unboxed = erase_unboxed(make_sure_not_resized([val]))
+            size = self.unboxed_size_for_growth()
+            unboxed = erase_unboxed(make_sure_not_resized([val] * size))
             if self.storage_needed() > obj._mapdict_storage_length():
                 obj._set_mapdict_increase_storage(self, unboxed)
                 return
@@ -588,7 +625,8 @@ class UnboxedPlainAttribute(PlainAttribute):
             if len(unboxed) <= self.listindex:
                 # size can only increase by 1
                 assert len(unboxed) == self.listindex
-                unboxed = unboxed + [val]
+                size = self.unboxed_size_for_growth()
+                unboxed = unboxed + [val] * (size - self.listindex)
                 obj._mapdict_write_storage(self.storageindex, erase_unboxed(unboxed))
             else:
                 # the unboxed list is already large enough, due to reordering
@@ -864,7 +902,8 @@ class MapdictStorageMixin(object):
     def _set_mapdict_increase_storage(self, map, value):
         """ increase storage size, adding value """
         len_storage = len(self.storage)
-        new_storage = self.storage + [erase_item(None)] * (map.storage_needed() - len_storage)
+        new_size = map.storage_size_for_growth()
+        new_storage = self.storage + [erase_item(None)] * (new_size - len_storage)
         new_storage[len_storage] = value
         self._set_mapdict_map(map)
         self.storage = new_storage
@@ -985,11 +1024,14 @@ def _make_storage_mixin_size_n(n=SUBCLASSES_NUM_FIELDS):
 
         def _set_mapdict_increase_storage(self, map, value):
             storage_needed = map.storage_needed()
+            new_size = map.storage_size_for_growth()
             if self.map.storage_needed() == n:
                 erased = getattr(self, "_value%s" % nmin1)
-                new_storage = [erased, value]
+                new_storage = [erase_item(None)] * (new_size - nmin1)
+                new_storage[0] = erased
+                new_storage[1] = value
             else:
-                new_storage = [erase_item(None)] * (storage_needed - self._mapdict_storage_length())
+                new_storage = [erase_item(None)] * (new_size - self._mapdict_storage_length())
                 new_storage = self._mapdict_get_storage_list() + new_storage
                 new_storage[storage_needed - n] = value
             self._set_mapdict_map(map)
@@ -1301,6 +1343,7 @@ INVALID_CACHE_ENTRY.map_wref = weakref.ref(_invalid_cache_entry_map)
 def init_mapdict_cache(pycode):
     num_entries = len(pycode.co_names_w)
     pycode._mapdict_caches = [INVALID_CACHE_ENTRY] * num_entries
+    pycode._mapdict_store_caches = [INVALID_STORE_CACHE_ENTRY] * num_entries
 
 @jit.dont_look_inside
 def _fill_cache(pycode, nameindex, map, version_tag, attr, w_method=None):
@@ -1414,3 +1457,130 @@ def LOAD_METHOD_mapdict_fill_cache_method(space, pycode, name, nameindex,
 # XXX fix me: if a function contains a loop with both LOAD_ATTR and
 # XXX LOAD_METHOD on the same attribute name, it keeps trashing and
 # XXX rebuilding the cache
+
+# ____________________________________________________________
+# Magic caching for STORE_ATTR and DELETE_ATTR
+
+class StoreCacheEntry(CacheEntry):
+    """ What 'obj.name = value' does for the objects whose map is
+    'map_wref()', as long as their class has 'version_tag': either
+    'attr_wref()' is already in the map and is written to, or, if
+    'adds_attr' is set, it is the map obtained by adding the attribute.
+    For DELETE_ATTR, 'attr_wref' is None: the entry only records that
+    calling deldictvalue() is what 'del obj.name' does. """
+    attr_wref = None
+    adds_attr = False
+
+INVALID_STORE_CACHE_ENTRY = StoreCacheEntry()
+INVALID_STORE_CACHE_ENTRY.map_wref = weakref.ref(_invalid_cache_entry_map)
+
+@jit.dont_look_inside
+def _fill_store_cache(pycode, nameindex, map, version_tag, attr, adds_attr):
+    if not pycode.space._side_effects_ok():
+        return
+    entry = pycode._mapdict_store_caches[nameindex]
+    if entry is INVALID_STORE_CACHE_ENTRY:
+        entry = StoreCacheEntry()
+        pycode._mapdict_store_caches[nameindex] = entry
+    entry.map_wref = weakref.ref(map)
+    if attr:
+        entry.attr_wref = weakref.ref(attr)
+    else:
+        entry.attr_wref = None
+    entry.adds_attr = adds_attr
+    entry.version_tag = version_tag
+    if pycode.space.config.objspace.std.withmethodcachecounter:
+        entry.failure_counter += 1
+
+def _is_plain_dict_attribute(space, w_type, version_tag, name,
+                             specialname, w_special):
+    """ Check that setting or deleting the attribute 'name' on an instance
+    of 'w_type' just goes to the instance dict: the special method
+    'specialname' (__setattr__ or __delattr__) is the one from object,
+    'w_special', and there is no data descriptor 'name' in the class. """
+    _, w_descr = w_type._pure_lookup_where_with_method_cache(
+        specialname, version_tag)
+    if w_descr is not w_special:
+        return False
+    _, w_descr = w_type._pure_lookup_where_with_method_cache(
+        name, version_tag)
+    if w_descr is None:
+        return True     # common case: no such attr in the class
+    if isinstance(w_descr, MutableCell):
+        return False
+    return not space.is_data_descr(w_descr)
+
+def STORE_ATTR_caching(pycode, w_obj, nameindex, w_value):
+    # like LOAD_ATTR_caching, not used if we_are_jitted()
+    entry = pycode._mapdict_store_caches[nameindex]
+    map = w_obj._get_mapdict_map()
+    if entry.is_valid_for_map(map) and entry.attr_wref is not None:
+        attr = entry.attr_wref()
+        if attr is not None:
+            if entry.adds_attr:
+                attr._switch_map_and_write_storage(w_obj, w_value)
+            else:
+                attr._direct_write(w_obj, w_value)
+            return
+    STORE_ATTR_slowpath(pycode, w_obj, nameindex, map, w_value)
+STORE_ATTR_caching._always_inline_ = True
+
+def STORE_ATTR_slowpath(pycode, w_obj, nameindex, map, w_value):
+    from pypy.objspace.descroperation import object_setattr
+    space = pycode.space
+    w_name = pycode.co_names_w[nameindex]
+    if map is not None:
+        w_type = map.terminator.w_cls
+        version_tag = w_type.version_tag()
+        name = space.text_w(w_name)
+        if version_tag is not None and _is_plain_dict_attribute(
+                space, w_type, version_tag, name, '__setattr__',
+                object_setattr(space)):
+            attr = map.find_map_attr(name, DICT)
+            if w_obj.setdictvalue(space, name, w_value):
+                newmap = w_obj._get_mapdict_map()
+                if attr is not None:
+                    if newmap is map:
+                        _fill_store_cache(pycode, nameindex, map,
+                                          version_tag, attr, False)
+                elif (type(newmap) is PlainAttribute and
+                        newmap.back is map and newmap.name == name and
+                        newmap.attrkind == DICT):
+                    # the attribute was simply added at the end, without
+                    # reordering and without unboxing
+                    _fill_store_cache(pycode, nameindex, map, version_tag,
+                                      newmap, True)
+                return
+    if space.config.objspace.std.withmethodcachecounter:
+        INVALID_STORE_CACHE_ENTRY.failure_counter += 1
+    space.setattr(w_obj, w_name, w_value)
+STORE_ATTR_slowpath._dont_inline_ = True
+
+def DELETE_ATTR_caching(pycode, w_obj, nameindex):
+    entry = pycode._mapdict_store_caches[nameindex]
+    map = w_obj._get_mapdict_map()
+    if entry.is_valid_for_map(map) and entry.attr_wref is None:
+        space = pycode.space
+        name = space.text_w(pycode.co_names_w[nameindex])
+        if w_obj.deldictvalue(space, name):
+            return
+    DELETE_ATTR_slowpath(pycode, w_obj, nameindex, map)
+DELETE_ATTR_caching._always_inline_ = True
+
+def DELETE_ATTR_slowpath(pycode, w_obj, nameindex, map):
+    from pypy.objspace.descroperation import object_delattr
+    space = pycode.space
+    w_name = pycode.co_names_w[nameindex]
+    if map is not None:
+        w_type = map.terminator.w_cls
+        version_tag = w_type.version_tag()
+        name = space.text_w(w_name)
+        if version_tag is not None and _is_plain_dict_attribute(
+                space, w_type, version_tag, name, '__delattr__',
+                object_delattr(space)):
+            if w_obj.deldictvalue(space, name):
+                _fill_store_cache(pycode, nameindex, map, version_tag,
+                                  None, False)
+                return
+    space.delattr(w_obj, w_name)    # raises AttributeError, usually
+DELETE_ATTR_slowpath._dont_inline_ = True
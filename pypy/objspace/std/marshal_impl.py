@@ -21,7 +21,7 @@ from pypy.objspace.std.noneobject import W_NoneObject
 from pypy.objspace.std.setobject import W_FrozensetObject, W_SetObject
 from pypy.objspace.std.tupleobject import W_AbstractTupleObject
 from pypy.objspace.std.typeobject import W_TypeObject
-from pypy.objspace.std.unicodeobject import W_UnicodeObject
+from pypy.objspace.std.unicodeobject import W_AbstractUnicodeObject
 
 
 TYPE_NULL      = '0'
@@ -506,8 +506,9 @@ def _marshal_unicode(space, s, m, w_unicode=None):
 # surrogate-preserving variants
 _decode_utf8 = unicodehelper.decode_utf8sp
 
-@marshaller(W_UnicodeObject)
+@marshaller(W_AbstractUnicodeObject)
 def marshal_unicode(space, w_unicode, m):
+    w_unicode = space.convert_to_w_unicode(w_unicode)
     s = space.utf8_w(w_unicode)
     _marshal_unicode(space, s, m, w_unicode=w_unicode)
 
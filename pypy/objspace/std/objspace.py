@@ -19,7 +19,8 @@ from rpython.rlib.signature import signature, finishsigs
 # Object imports
 from pypy.objspace.std.boolobject import W_BoolObject
 from pypy.objspace.std.bytearrayobject import W_BytearrayObject
-from pypy.objspace.std.bytesobject import W_BytesObject
+from pypy.objspace.std.bytesobject import (
+    W_AbstractBytesObject, W_BytesObject)
 from pypy.objspace.std.complexobject import W_ComplexObject
 from pypy.objspace.std.dictmultiobject import W_DictMultiObject, W_DictObject
 from pypy.objspace.std.floatobject import W_FloatObject
@@ -36,7 +37,8 @@ from pypy.objspace.std.setobject import W_SetObject, W_FrozensetObject
 from pypy.objspace.std.sliceobject import W_SliceObject
 from pypy.objspace.std.tupleobject import W_AbstractTupleObject, W_TupleObject
 from pypy.objspace.std.typeobject import W_TypeObject, TypeCache
-from pypy.objspace.std.unicodeobject import W_UnicodeObject
+from pypy.objspace.std.unicodeobject import (
+    W_AbstractUnicodeObject, W_UnicodeObject)
 
 @finishsigs
 class StdObjSpace(ObjSpace):
@@ -69,7 +71,7 @@ class StdObjSpace(ObjSpace):
         builtin_type_classes = {
             W_BoolObject.typedef: W_BoolObject,
             W_BytearrayObject.typedef: W_BytearrayObject,
-            W_BytesObject.typedef: W_BytesObject,
+            W_BytesObject.typedef: W_AbstractBytesObject,
             W_ComplexObject.typedef: W_ComplexObject,
             W_DictMultiObject.typedef: W_DictMultiObject,
             W_FloatObject.typedef: W_FloatObject,
@@ -84,7 +86,7 @@ class StdObjSpace(ObjSpace):
             W_SliceObject.typedef: W_SliceObject,
             W_TupleObject.typedef: W_TupleObject,
             W_TypeObject.typedef: W_TypeObject,
-            W_UnicodeObject.typedef: W_UnicodeObject,
+            W_UnicodeObject.typedef: W_AbstractUnicodeObject,
         }
         self.builtin_types = {}
         self._interplevel_classes = {}
@@ -450,6 +452,36 @@ class StdObjSpace(ObjSpace):
         assert isinstance(w_starttype, W_TypeObject)
         return w_type.lookup_starting_at(w_starttype, name)
 
+    def new_interned_w_str(self, w_u):
+        # intern the W_UnicodeObject, not a W_UnicodeBufferObject
+        w_u = self.force_str_buffer(w_u)
+        return ObjSpace.new_interned_w_str(self, w_u)
+
+    def force_str_buffer(self, w_obj):
+        if self.config.objspace.std.withstrbuf:
+            from pypy.objspace.std.strbufobject import W_UnicodeBufferObject
+            if type(w_obj) is W_UnicodeBufferObject:
+                return w_obj.force_w()
+        return w_obj
+
+    @specialize.arg(1)
+    def _force_unicode_buffer(self, RequiredClass, w_obj):
+        # the methods of str that W_UnicodeBufferObject doesn't implement
+        # itself work on the forced W_UnicodeObject
+        if RequiredClass is W_UnicodeObject:
+            return self.force_str_buffer(w_obj)
+        return w_obj
+
+    @specialize.arg(1)
+    def descr_self_interp_w(self, RequiredClass, w_obj):
+        w_obj = self._force_unicode_buffer(RequiredClass, w_obj)
+        return ObjSpace.descr_self_interp_w(self, RequiredClass, w_obj)
+
+    @specialize.arg(1)
+    def interp_w(self, RequiredClass, w_obj, can_be_None=False):
+        w_obj = self._force_unicode_buffer(RequiredClass, w_obj)
+        return ObjSpace.interp_w(self, RequiredClass, w_obj, can_be_None)
+
     @specialize.arg(1)
     def allocate_instance(self, cls, w_subtype):
         """Allocate the memory needed for an instance of an internal or
@@ -578,6 +610,7 @@ class StdObjSpace(ObjSpace):
             return w_obj.listview_ascii()
         if type(w_obj) is W_SetObject or type(w_obj) is W_FrozensetObject:
             return w_obj.listview_ascii()
+        w_obj = self.force_str_buffer(w_obj)
         if isinstance(w_obj, W_UnicodeObject) and self._uses_unicode_iter(w_obj):
             return w_obj.listview_ascii()
         if isinstance(w_obj, W_ListObject) and self._uses_list_iter(w_obj):
@@ -596,15 +629,21 @@ class StdObjSpace(ObjSpace):
             return w_obj.listview_int()
         if isinstance(w_obj, W_ListObject) and self._uses_list_iter(w_obj):
             return w_obj.getitems_int()
+        if (isinstance(w_obj, W_AbstractTupleObject) and
+                self._uses_tuple_iter(w_obj)):
+            return w_obj.listview_int()
         return None
 
     def listview_float(self, w_obj):
         if type(w_obj) is W_ListObject:
             return w_obj.getitems_float()
-        # dict and set don't have FloatStrategy, so we can just ignore them
-        # for now
+        if type(w_obj) is W_SetObject or type(w_obj) is W_FrozensetObject:
+            return w_obj.listview_float()
         if isinstance(w_obj, W_ListObject) and self._uses_list_iter(w_obj):
             return w_obj.getitems_float()
+        if (isinstance(w_obj, W_AbstractTupleObject) and
+                self._uses_tuple_iter(w_obj)):
+            return w_obj.listview_float()
         return None
 
     def view_as_kwargs(self, w_dict):
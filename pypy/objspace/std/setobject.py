@@ -1,10 +1,14 @@
+import math
+
 from pypy.interpreter import gateway
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.signature import Signature
 from pypy.interpreter.typedef import TypeDef
 from pypy.objspace.std.bytesobject import W_BytesObject
+from pypy.objspace.std.floatobject import W_FloatObject
 from pypy.objspace.std.listobject import is_plain_int1, plain_int_w
+from pypy.objspace.std.tupleobject import W_AbstractTupleObject
 from pypy.objspace.std.unicodeobject import W_UnicodeObject
 from pypy.objspace.std.util import IDTAG_SPECIAL, IDTAG_SHIFT, \
     generic_alias_class_getitem
@@ -73,10 +77,12 @@ class W_BaseSetObject(W_Root):
 
     def add(self, w_key):
         """ Adds an element to the set. The element must be wrapped. """
+        w_key = self.space.force_str_buffer(w_key)
         self.strategy.add(self, w_key)
 
     def remove(self, w_item):
         """ Removes the given element from the set. Element must be wrapped. """
+        w_item = self.space.force_str_buffer(w_item)
         return self.strategy.remove(self, w_item)
 
     def getdict_w(self):
@@ -95,6 +101,10 @@ class W_BaseSetObject(W_Root):
         """ If this is an int set return its contents as a list of uwnrapped ints. Otherwise return None. """
         return self.strategy.listview_int(self)
 
+    def listview_float(self):
+        """ If this is a float set return its contents as a list of uwnrapped floats. Otherwise return None. """
+        return self.strategy.listview_float(self)
+
     def get_storage_copy(self):
         """ Returns a copy of the storage. Needed when we want to clone all elements from one set and
         put them into another. """
@@ -142,6 +152,7 @@ class W_BaseSetObject(W_Root):
 
     def has_key(self, w_key):
         """ Checks wether this set contains the given wrapped key."""
+        w_key = self.space.force_str_buffer(w_key)
         return self.strategy.has_key(self, w_key)
 
     def equals(self, w_other):
@@ -717,6 +728,9 @@ class SetStrategy(object):
     def listview_int(self, w_set):
         return None
 
+    def listview_float(self, w_set):
+        return None
+
     #def erase(self, storage):
     #    raise NotImplementedError
 
@@ -818,6 +832,10 @@ class EmptySetStrategy(SetStrategy):
             strategy = self.space.fromcache(BytesSetStrategy)
         elif type(w_key) is W_UnicodeObject and w_key.is_ascii():
             strategy = self.space.fromcache(AsciiSetStrategy)
+        elif is_float_set_key(w_key):
+            strategy = self.space.fromcache(FloatSetStrategy)
+        elif is_int_pair_set_key(self.space, w_key):
+            strategy = self.space.fromcache(IntPairSetStrategy)
         elif self.space.type(w_key).compares_by_identity():
             strategy = self.space.fromcache(IdentitySetStrategy)
         else:
@@ -1265,6 +1283,10 @@ class BytesSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def may_contain_equal_elements(self, strategy):
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        elif strategy is self.space.fromcache(FloatSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(IntPairSetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1304,6 +1326,10 @@ class AsciiSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def may_contain_equal_elements(self, strategy):
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        elif strategy is self.space.fromcache(FloatSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(IntPairSetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1345,6 +1371,8 @@ class IntegerSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
             return False
         elif strategy is self.space.fromcache(AsciiSetStrategy):
             return False
+        elif strategy is self.space.fromcache(IntPairSetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1361,6 +1389,104 @@ class IntegerSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
         return IntegerIteratorImplementation(self.space, self, w_set)
 
 
+def is_float_set_key(w_key):
+    # NaNs are not equal to themselves, so they would be added again and
+    # again to an unwrapped set
+    return type(w_key) is W_FloatObject and not math.isnan(w_key.floatval)
+
+def is_int_pair_set_key(space, w_key):
+    if not space.config.objspace.std.withintpairset:
+        return False
+    if (not isinstance(w_key, W_AbstractTupleObject) or
+            w_key.user_overridden_class or w_key.length() != 2):
+        return False
+    return (is_plain_int1(w_key.getitem(space, 0)) and
+            is_plain_int1(w_key.getitem(space, 1)))
+
+
+class FloatSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
+    erase, unerase = rerased.new_erasing_pair("float")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    intersect_jmp = jit.JitDriver(greens = [], reds = 'auto',
+                                  name='set(float).intersect')
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def get_empty_dict(self):
+        return {}
+
+    def listview_float(self, w_set):
+        return self.unerase(w_set.sstorage).keys()
+
+    def is_correct_type(self, w_key):
+        return is_float_set_key(w_key)
+
+    def may_contain_equal_elements(self, strategy):
+        if strategy is self.space.fromcache(BytesSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(AsciiSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(IntPairSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(EmptySetStrategy):
+            return False
+        elif strategy is self.space.fromcache(IdentitySetStrategy):
+            return False
+        return True
+
+    def unwrap(self, w_item):
+        return self.space.float_w(w_item)
+
+    def wrap(self, item):
+        return self.space.newfloat(item)
+
+    def iter(self, w_set):
+        return FloatIteratorImplementation(self.space, self, w_set)
+
+
+class IntPairSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
+    """ Sets of tuples of two ints, used if objspace.std.withintpairset is
+    enabled.  The tuples are stored as RPython tuples, so the elements of
+    such a set are new tuple objects every time they are read. """
+    erase, unerase = rerased.new_erasing_pair("intpair")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    intersect_jmp = jit.JitDriver(greens = [], reds = 'auto',
+                                  name='set(intpair).intersect')
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def get_empty_dict(self):
+        return {}
+
+    def is_correct_type(self, w_key):
+        return is_int_pair_set_key(self.space, w_key)
+
+    def may_contain_equal_elements(self, strategy):
+        if strategy is self.space.fromcache(ObjectSetStrategy):
+            return True
+        return False
+
+    def unwrap(self, w_item):
+        space = self.space
+        assert isinstance(w_item, W_AbstractTupleObject)
+        return (plain_int_w(space, w_item.getitem(space, 0)),
+                plain_int_w(space, w_item.getitem(space, 1)))
+
+    def wrap(self, item):
+        space = self.space
+        a, b = item
+        return space.newtuple2(space.newint(a), space.newint(b))
+
+    def iter(self, w_set):
+        return IntPairIteratorImplementation(self.space, self, w_set)
+
+
 class ObjectSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     erase, unerase = rerased.new_erasing_pair("object")
     erase = staticmethod(erase)
@@ -1436,6 +1562,10 @@ class IdentitySetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
             return False
         if strategy is self.space.fromcache(AsciiSetStrategy):
             return False
+        if strategy is self.space.fromcache(FloatSetStrategy):
+            return False
+        if strategy is self.space.fromcache(IntPairSetStrategy):
+            return False
         return True
 
     def unwrap(self, w_item):
@@ -1537,6 +1667,33 @@ class IntegerIteratorImplementation(IteratorImplementation):
         else:
             return None
 
+class FloatIteratorImplementation(IteratorImplementation):
+    def __init__(self, space, strategy, w_set):
+        IteratorImplementation.__init__(self, space, strategy, w_set)
+        d = strategy.unerase(w_set.sstorage)
+        self.iterator = d.iterkeys()
+
+    def next_entry(self):
+        # note that this 'for' loop only runs once, at most
+        for key in self.iterator:
+            return self.space.newfloat(key)
+        else:
+            return None
+
+class IntPairIteratorImplementation(IteratorImplementation):
+    def __init__(self, space, strategy, w_set):
+        IteratorImplementation.__init__(self, space, strategy, w_set)
+        d = strategy.unerase(w_set.sstorage)
+        self.iterator = d.iterkeys()
+
+    def next_entry(self):
+        # note that this 'for' loop only runs once, at most
+        for a, b in self.iterator:
+            space = self.space
+            return space.newtuple2(space.newint(a), space.newint(b))
+        else:
+            return None
+
 class IdentityIteratorImplementation(IteratorImplementation):
     def __init__(self, space, strategy, w_set):
         IteratorImplementation.__init__(self, space, strategy, w_set)
@@ -1641,6 +1798,13 @@ def set_strategy_and_setdata(space, w_set, w_iterable):
         w_set.sstorage = strategy.get_storage_from_unwrapped_list(intlist)
         return
 
+    floatlist = space.listview_float(w_iterable)
+    if floatlist is not None and _no_nan(floatlist):
+        strategy = space.fromcache(FloatSetStrategy)
+        w_set.strategy = strategy
+        w_set.sstorage = strategy.get_storage_from_unwrapped_list(floatlist)
+        return
+
     length_hint = space.length_hint(w_iterable, 0)
 
     if jit.isconstant(length_hint) and length_hint:
@@ -1651,6 +1815,14 @@ def set_strategy_and_setdata(space, w_set, w_iterable):
     _update_from_iterable(space, w_set, w_iterable)
 
 
+@jit.look_inside_iff(lambda floatlist:
+        jit.loop_unrolling_heuristic(floatlist, len(floatlist), UNROLL_CUTOFF))
+def _no_nan(floatlist):
+    for f in floatlist:
+        if math.isnan(f):
+            return False
+    return True
+
 @jit.unroll_safe
 def _pick_correct_strategy_unroll(space, w_set, w_iterable):
 
@@ -1682,6 +1854,24 @@ def _pick_correct_strategy_unroll(space, w_set, w_iterable):
         w_set.sstorage = w_set.strategy.get_storage_from_list(iterable_w)
         return
 
+    # check for floats
+    for w_item in iterable_w:
+        if not is_float_set_key(w_item):
+            break
+    else:
+        w_set.strategy = space.fromcache(FloatSetStrategy)
+        w_set.sstorage = w_set.strategy.get_storage_from_list(iterable_w)
+        return
+
+    # check for tuples of two ints
+    for w_item in iterable_w:
+        if not is_int_pair_set_key(space, w_item):
+            break
+    else:
+        w_set.strategy = space.fromcache(IntPairSetStrategy)
+        w_set.sstorage = w_set.strategy.get_storage_from_list(iterable_w)
+        return
+
     # check for compares by identity
     for w_item in iterable_w:
         if not space.type(w_item).compares_by_identity():
@@ -3,6 +3,7 @@ from pypy.objspace.std.tupleobject import (W_AbstractTupleObject,
     XXPRIME_1, XXPRIME_2, XXPRIME_5, xxrotate, uhash_type)
 from pypy.objspace.std.util import negate
 from rpython.rlib import jit
+from rpython.rlib.debug import make_sure_not_resized
 from rpython.rlib.objectmodel import specialize
 from rpython.rlib.rarithmetic import intmask
 from rpython.rlib.unroll import unrolling_iterable
@@ -173,6 +174,232 @@ def makespecialisedtuple2(space, w_arg1, w_arg2):
             return Cls_ff(space, space.float_w(w_arg1), space.float_w(w_arg2))
     return Cls_oo(space, w_arg1, w_arg2)
 
+# ---------- tuples of any length with unboxed items ----------
+# Like the int and float strategies of lists, but as tuples are immutable,
+# each kind of storage is simply its own class.  Hashing and comparing two
+# tuples of the same class works directly on the unboxed items.
+
+def make_unboxed_class(typ):
+    if typ == int:
+        wrap = lambda space, x: space.newint(x)
+
+        def is_unboxable(w_obj):
+            from pypy.objspace.std.listobject import is_plain_int1
+            return is_plain_int1(w_obj)
+
+        def unbox(space, w_obj):
+            from pypy.objspace.std.listobject import plain_int_w
+            return plain_int_w(space, w_obj)
+
+        def hash_item(value):
+            from pypy.objspace.std.intobject import _hash_int
+            return _hash_int(value)
+
+    elif typ == float:
+        wrap = lambda space, x: space.newfloat(x)
+
+        def is_unboxable(w_obj):
+            from pypy.objspace.std.floatobject import W_FloatObject
+            return type(w_obj) is W_FloatObject
+
+        def unbox(space, w_obj):
+            return w_obj.float_w(space)
+
+        def hash_item(value):
+            from pypy.objspace.std.floatobject import _hash_float
+            return _hash_float(value)
+
+    else:
+        assert 0
+
+    zero = typ()
+
+    def same_item(x, y):
+        # like space.eq_w() on the wrapped items: two NaNs with the same
+        # bits are identical, so they are equal here
+        if x == y:
+            return True
+        if typ == float:
+            return float2longlong(x) == float2longlong(y)
+        return False
+
+    def unroll_condition(items):
+        return jit.loop_unrolling_heuristic(items, len(items), UNROLL_CUTOFF)
+
+    @jit.look_inside_iff(lambda items: unroll_condition(items))
+    def hash_items(items):
+        # the same as W_TupleObject._descr_hash_unroll()
+        acc = XXPRIME_5
+        for value in items:
+            lane = uhash_type(hash_item(value))
+            acc += lane * XXPRIME_2
+            acc = xxrotate(acc)
+            acc *= XXPRIME_1
+        return acc
+
+    @jit.look_inside_iff(lambda items1, items2: unroll_condition(items1))
+    def first_difference(items1, items2):
+        # the first index where the items differ, or -1
+        for p in range(min(len(items1), len(items2))):
+            if not same_item(items1[p], items2[p]):
+                return p
+        return -1
+
+    @jit.look_inside_iff(lambda items, value: unroll_condition(items))
+    def contains_item(items, value):
+        for x in items:
+            if same_item(x, value):
+                return True
+        return False
+
+    def make_comparison(name):
+        import operator
+        op = getattr(operator, name)
+        base_compare = getattr(W_AbstractTupleObject, 'descr_' + name).im_func
+
+        def compare_tuples(self, space, w_other):
+            if not isinstance(w_other, cls):
+                return base_compare(self, space, w_other)
+            items1 = self.items
+            items2 = w_other.items
+            p = first_difference(items1, items2)
+            if p < 0:
+                return space.newbool(op(len(items1), len(items2)))
+            return space.newbool(op(items1[p], items2[p]))
+
+        compare_tuples.__name__ = 'descr_' + name
+        return compare_tuples
+
+    class cls(W_AbstractTupleObject):
+        _immutable_fields_ = ['items[*]']
+
+        def __init__(self, space, items):
+            make_sure_not_resized(items)
+            self.space = space
+            self.items = items
+
+        @staticmethod
+        @jit.look_inside_iff(lambda space, list_w:
+            jit.loop_unrolling_heuristic(list_w, len(list_w), UNROLL_CUTOFF))
+        def from_list_w(space, list_w):
+            items = [zero] * len(list_w)
+            for i in range(len(list_w)):
+                w_item = list_w[i]
+                if not is_unboxable(w_item):
+                    raise NotSpecialised
+                items[i] = unbox(space, w_item)
+            return cls(space, items)
+
+        def length(self):
+            return len(self.items)
+
+        def tolist(self):
+            items = self.items
+            list_w = [None] * len(items)
+            for i in range(len(items)):
+                list_w[i] = wrap(self.space, items[i])
+            return list_w
+
+        # same source code, but builds and returns a resizable list
+        getitems_copy = func_with_new_name(tolist, 'getitems_copy')
+
+        # return a copy: the items must not end up in the same listdef
+        # as the resizable storage of lists
+        if typ == int:
+            def listview_int(self):
+                return self.items[:]
+        else:
+            def listview_float(self):
+                return self.items[:]
+
+        def descr_hash(self, space):
+            acc = hash_items(self.items)
+            acc += len(self.items) ^ (XXPRIME_5 ^ uhash_type(3527539))
+            acc += (acc == uhash_type(-1)) * uhash_type(1546275796 + 1)
+            return space.newint(intmask(acc))
+
+        def descr_eq(self, space, w_other):
+            if not isinstance(w_other, W_AbstractTupleObject):
+                return space.w_NotImplemented
+            if not isinstance(w_other, cls):
+                return self._descr_eq_generic(space, w_other)
+            items1 = self.items
+            items2 = w_other.items
+            if len(items1) != len(items2):
+                return space.w_False
+            return space.newbool(first_difference(items1, items2) < 0)
+
+        @jit.look_inside_iff(lambda self, space, w_other:
+                             self._unroll_condition())
+        def _descr_eq_generic(self, space, w_other):
+            items = self.items
+            if len(items) != w_other.length():
+                return space.w_False
+            for i in range(len(items)):
+                if not space.eq_w(wrap(space, items[i]),
+                                  w_other.getitem(space, i)):
+                    return space.w_False
+            return space.w_True
+
+        descr_ne = negate(descr_eq)
+
+        descr_lt = make_comparison('lt')
+        descr_le = make_comparison('le')
+        descr_gt = make_comparison('gt')
+        descr_ge = make_comparison('ge')
+
+        def descr_contains(self, space, w_obj):
+            if is_unboxable(w_obj):
+                value = unbox(space, w_obj)
+                return space.newbool(contains_item(self.items, value))
+            return W_AbstractTupleObject.descr_contains(self, space, w_obj)
+
+        def descr_add(self, space, w_other):
+            if isinstance(w_other, cls):
+                return cls(space, self.items + w_other.items)
+            return W_AbstractTupleObject.descr_add(self, space, w_other)
+
+        def getitem(self, space, index):
+            try:
+                value = self.items[index]
+            except IndexError:
+                raise oefmt(space.w_IndexError, "tuple index out of range")
+            return wrap(space, value)
+
+        def _getslice(self, space, w_index):
+            items = self.items
+            start, stop, step, slicelength = w_index.indices4(space,
+                                                              len(items))
+            if slicelength == 0:
+                return space.newtuple([])
+            if step == 1:
+                assert 0 <= start <= stop
+                return cls(space, items[start:stop])
+            subitems = [zero] * slicelength
+            for i in range(slicelength):
+                subitems[i] = items[start]
+                start += step
+            return cls(space, subitems)
+
+        def _unroll_condition(self):
+            return unroll_condition(self.items)
+
+    cls.__name__ = 'W_UnboxedTupleObject_' + typ.__name__[0]
+    cls.is_unboxable = staticmethod(is_unboxable)
+    return cls
+
+Cls_unboxed_i = make_unboxed_class(int)
+Cls_unboxed_f = make_unboxed_class(float)
+
+def makeunboxedtuple(space, list_w):
+    if list_w:
+        w_first = list_w[0]
+        if Cls_unboxed_i.is_unboxable(w_first):
+            return Cls_unboxed_i.from_list_w(space, list_w)
+        if Cls_unboxed_f.is_unboxable(w_first):
+            return Cls_unboxed_f.from_list_w(space, list_w)
+    raise NotSpecialised
+
 # --------------------------------------------------
 # Special code based on list strategies to implement zip(),
 # here with two list arguments only.  This builds a zipped
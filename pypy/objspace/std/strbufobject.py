@@ -0,0 +1,196 @@
+"""The lazy result of bytes and str additions, see objspace.std.withstrbuf"""
+
+import inspect
+
+import py
+
+from rpython.rlib.rstring import StringBuilder
+
+from pypy.interpreter.buffer import SimpleView, StringBuffer
+from pypy.interpreter.error import OperationError
+from pypy.objspace.std.bytesobject import (
+    W_AbstractBytesObject, W_BytesObject)
+from pypy.objspace.std.unicodeobject import (
+    W_AbstractUnicodeObject, W_UnicodeObject)
+
+# additions whose result is shorter than this many bytes still give a flat
+# object: it is not worth it, and the JIT is better at virtualizing those
+MIN_BUFFER_LENGTH = 256
+
+
+class W_StringBufferObject(W_AbstractBytesObject):
+    """A bytes object which is the result of one or more additions.  The
+    StringBuilder can be shared with the W_StringBufferObjects that are
+    the result of adding more bytes to this one: only the first
+    'self.length' characters belong to this object.
+    """
+    w_str = None
+
+    def __init__(self, builder):
+        self.builder = builder             # StringBuilder
+        self.length = builder.getlength()
+
+    def force(self):
+        if self.w_str is None:
+            s = self.builder.build()
+            if self.length < len(s):
+                s = s[:self.length]
+            self.w_str = W_BytesObject(s)
+            return s
+        else:
+            return self.w_str._value
+
+    def force_w(self):
+        self.force()
+        return self.w_str
+
+    def __repr__(self):
+        """representation for debugging purposes"""
+        return "%s(%r[:%d])" % (
+            self.__class__.__name__, self.builder, self.length)
+
+    def unwrap(self, space):
+        return self.force()
+
+    def bytes_w(self, space):
+        return self.force()
+
+    def realunicode_w(self, space):
+        return self.force_w().realunicode_w(space)
+
+    def text_w(self, space):
+        return self.force()
+
+    def utf8_w(self, space):
+        return self.force()
+
+    def buffer_w(self, space, flags):
+        space.check_buf_flags(flags, True)
+        return SimpleView(StringBuffer(self.force()), w_obj=self)
+
+    def listview_int(self):
+        return self.force_w().listview_int()
+
+    def ord(self, space):
+        return self.force_w().ord(space)
+
+    def descr_len(self, space):
+        return space.newint(self.length)
+
+    def descr_add(self, space, w_other):
+        try:
+            other = W_BytesObject._op_val(space, w_other)
+        except OperationError as e:
+            if e.match(space, space.w_TypeError):
+                return space.w_NotImplemented
+            raise
+        if self.builder.getlength() != self.length:
+            # somebody else already appended to the builder
+            builder = StringBuilder()
+            builder.append(self.force())
+        else:
+            builder = self.builder
+        builder.append(other)
+        return W_StringBufferObject(builder)
+
+
+def _make_delegator(name):
+    func = getattr(W_AbstractBytesObject, name).im_func
+    args = inspect.getargs(func.func_code)
+    if args.varargs or args.keywords:
+        raise TypeError("Varargs and keywords not supported in unwrap_spec")
+    argspec = ', '.join([arg for arg in args.args[1:]])
+    func_code = py.code.Source("""
+    def f(self, %(args)s):
+        return self.force_w().%(func_name)s(%(args)s)
+    """ % {'args': argspec, 'func_name': name})
+    d = {}
+    exec func_code.compile() in d
+    f = d['f']
+    f.func_defaults = func.func_defaults
+    f.func_name = name
+    return f
+
+# all the other methods of bytes work on the forced W_BytesObject
+for _name in W_AbstractBytesObject.__dict__.keys():
+    if _name.startswith('descr_') and _name not in W_StringBufferObject.__dict__:
+        setattr(W_StringBufferObject, _name, _make_delegator(_name))
+del _name
+
+W_StringBufferObject.typedef = W_BytesObject.typedef
+
+
+class W_UnicodeBufferObject(W_AbstractUnicodeObject):
+    """Like W_StringBufferObject, but for str.  The StringBuilder contains
+    utf-8: the first 'self.nbytes' bytes belong to this object, and they
+    encode 'self.length' code points.
+    """
+    w_str = None
+
+    def __init__(self, builder, length):
+        self.builder = builder             # StringBuilder
+        self.nbytes = builder.getlength()
+        self.length = length
+
+    def force_w(self):
+        w_str = self.w_str
+        if w_str is None:
+            s = self.builder.build()
+            if self.nbytes < len(s):
+                s = s[:self.nbytes]
+            w_str = W_UnicodeObject(s, self.length)
+            self.w_str = w_str
+        return w_str
+
+    def __repr__(self):
+        """representation for debugging purposes"""
+        return "%s(%r[:%d])" % (
+            self.__class__.__name__, self.builder, self.nbytes)
+
+    def is_w(self, space, w_other):
+        if isinstance(w_other, W_UnicodeBufferObject):
+            w_other = w_other.force_w()
+        return self.force_w().is_w(space, w_other)
+
+    def immutable_unique_id(self, space):
+        return self.force_w().immutable_unique_id(space)
+
+    def unwrap(self, space):
+        return self.force_w().unwrap(space)
+
+    def text_w(self, space):
+        return self.force_w().text_w(space)
+
+    def utf8_w(self, space):
+        return self.force_w().utf8_w(space)
+
+    def convert_to_w_unicode(self, space):
+        return self.force_w()
+
+    def listview_ascii(self):
+        return self.force_w().listview_ascii()
+
+    def ord(self, space):
+        return self.force_w().ord(space)
+
+    def descr_len(self, space):
+        return space.newint(self.length)
+
+    def descr_add(self, space, w_other):
+        try:
+            w_other = W_UnicodeObject.convert_arg_to_w_unicode(
+                space, w_other, strict='__add__')
+        except OperationError as e:
+            if e.match(space, space.w_TypeError):
+                return space.w_NotImplemented
+            raise
+        if self.builder.getlength() != self.nbytes:
+            # somebody else already appended to the builder
+            builder = StringBuilder()
+            builder.append(self.force_w()._utf8)
+        else:
+            builder = self.builder
+        builder.append(w_other._utf8)
+        return W_UnicodeBufferObject(builder, self.length + w_other._len())
+
+W_UnicodeBufferObject.typedef = W_UnicodeObject.typedef
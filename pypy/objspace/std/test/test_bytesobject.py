@@ -572,6 +572,21 @@ class AppTestBytesObject:
         assert b'12\r34\r\n56'.splitlines() == [b'12', b'34', b'56']
         assert b'12\r34\r\n56'.splitlines(1) == [b'12\r', b'34\r\n', b'56']
 
+    def test_long_lines(self):
+        s = b"first line\r\n" + b"x" * 40 + b"\r" + b"0123456789" * 5
+        assert s.splitlines() == [b"first line", b"x" * 40, b"0123456789" * 5]
+        assert s.splitlines(1) == [b"first line\r\n", b"x" * 40 + b"\r",
+                                   b"0123456789" * 5]
+        assert s.split(b"\r") == [b"first line", b"\n" + b"x" * 40,
+                                  b"0123456789" * 5]
+        assert s.count(b"x") == 40
+        assert s.find(b"0", 3, 60) == 53
+        assert s.rfind(b"x", 0, 60) == 51
+        assert s.isascii()
+        assert not (s + b"\x80").isascii()
+        assert (b"0123456789" * 5).isdigit()
+        assert not (b"0123456789" * 5 + b":").isdigit()
+
     def test_find(self):
         assert b'abcdefghiabc'.find(b'abc') == 0
         assert b'abcdefghiabc'.find(b'abc', 1) == 9
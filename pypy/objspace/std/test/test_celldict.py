@@ -293,6 +293,18 @@ class TestCellCache(object):
         assert c2 is c
         assert c.getvalue(space) == 2
 
+    def test_lazy_import_replaced_by_cache(self):
+        from pypy.objspace.std.celldict import LazyImportCell
+        d, key, w_key = self.moduledict_and_key()
+        cell = LazyImportCell(None, d, key)
+        d.setitem(w_key, cell)
+        c = d.get_global_cache(key)
+        w_module = object()
+        cell.w_value = w_module     # as if the module was imported already
+        assert c.getvalue(space) is w_module
+        assert d.get_strategy().getdictvalue_no_unwrapping(d, key) is w_module
+        assert c.cell is w_module
+
     def test_getcache_and_builtins(self):
         space = FakeSpace()
         strategy = ModuleDictStrategy(space)
@@ -1438,6 +1438,9 @@ class FakeSpace:
         assert isinstance(u, str)
         return u
 
+    def force_str_buffer(self, w_obj):
+        return w_obj
+
     def int_w(self, integer, allow_conversion=True):
         assert isinstance(integer, int)
         return integer
@@ -1523,6 +1526,7 @@ class Config:
         class std:
             methodcachesizeexp = 11
             withmethodcachecounter = False
+            withunboxeddictvalues = False
         honor__builtins__ = False
 
 FakeSpace.config = Config()
@@ -66,7 +66,7 @@ class Object(Object):
             if isinstance(curr, Terminator):
                 return
             curr = curr.back
-        assert len(unerase_unboxed(self._mapdict_read_storage(curr.storageindex))) == curr.listindex + 1
+        assert len(unerase_unboxed(self._mapdict_read_storage(curr.storageindex))) >= curr.listindex + 1
 
 
 def test_plain_attribute():
@@ -172,6 +172,55 @@ def test_add_attribute_limit():
     for i in range(1000):
         assert obj.getslotvalue(i) == i
 
+def test_storage_size_hint():
+    cls = Class()
+    obj = cls.instantiate()
+    for attr in "abcd":
+        obj.setdictvalue(space, attr, attr * 2)
+    assert obj.checkstorage == ["aa", "bb", "cc", "dd"]
+
+    # the next instance gets room for the attributes of the first one
+    obj2 = cls.instantiate()
+    obj2.setdictvalue(space, "a", 1)
+    assert obj2.checkstorage == [1, None]
+    obj2.setdictvalue(space, "b", 2)
+    obj2.setdictvalue(space, "c", 3)
+    assert obj2.checkstorage == [1, 2, 3, None]
+    storage = obj2.storage
+    obj2.setdictvalue(space, "d", 4)
+    assert obj2.storage is storage
+    assert obj2.checkstorage == [1, 2, 3, 4]
+    assert obj2.map is obj.map
+
+    # an instance that stops early only makes its storage slightly larger
+    obj3 = cls.instantiate()
+    obj3.setdictvalue(space, "a", 5)
+    obj3.setdictvalue(space, "x", 6)
+    assert obj3.checkstorage == [5, 6]
+    assert obj3.getdictvalue(space, "a") == 5
+    assert obj3.getdictvalue(space, "x") == 6
+
+def test_unboxed_size_hint():
+    cls = Class(allow_unboxing=True)
+    obj = cls.instantiate()
+    for i, attr in enumerate("abcd"):
+        obj.setdictvalue(space, attr, float(i))
+    assert len(unerase_unboxed(obj.storage[0])) == 4
+
+    obj2 = cls.instantiate()
+    obj2.setdictvalue(space, "a", 10.0)
+    assert len(unerase_unboxed(obj2.storage[0])) == 2
+    obj2.setdictvalue(space, "b", 11.0)
+    obj2.setdictvalue(space, "c", 12.0)
+    unboxed = unerase_unboxed(obj2.storage[0])
+    assert len(unboxed) == 4
+    obj2.setdictvalue(space, "d", 13.0)
+    assert unerase_unboxed(obj2.storage[0]) is unboxed
+    obj2._check_unboxed_storage_consistency()
+    for i, attr in enumerate("abcd"):
+        assert obj2.getdictvalue(space, attr) == 10.0 + i
+    assert obj2.map is obj.map
+
 def test_insert_different_orders():
     cls = Class()
     obj = cls.instantiate()
@@ -978,6 +1027,34 @@ def test_specialized_class():
         assert obj2.map is abmap
 
 
+def test_specialized_class_overflow_size_hint():
+    from pypy.objspace.std.mapdict import _make_storage_mixin_size_n
+    from pypy.objspace.std.objectobject import W_ObjectObject
+    class objectcls(W_ObjectObject):
+        objectmodel.import_from_mixin(BaseUserClassMapdict)
+        objectmodel.import_from_mixin(MapdictDictSupport)
+        objectmodel.import_from_mixin(_make_storage_mixin_size_n(5))
+    cls = Class()
+    obj = objectcls()
+    obj.user_setup(space, cls)
+    for i in range(8):
+        obj.setdictvalue(space, str(i), W_Root())
+
+    obj2 = objectcls()
+    obj2.user_setup(space, cls)
+    values = [W_Root() for i in range(8)]
+    for i in range(6):
+        obj2.setdictvalue(space, str(i), values[i])
+    # the overflow list was allocated once, with room for 8 attributes
+    storage_list = obj2._mapdict_get_storage_list()
+    assert len(storage_list) == 4
+    for i in range(6, 8):
+        obj2.setdictvalue(space, str(i), values[i])
+    assert obj2._mapdict_get_storage_list() is storage_list
+    assert obj2.map is obj.map
+    for i in range(8):
+        assert obj2.getdictvalue(space, str(i)) is values[i]
+
 def test_specialized_class_overflow():
     from pypy.objspace.std.mapdict import _make_storage_mixin_size_n
     from pypy.objspace.std.objectobject import W_ObjectObject
@@ -1702,6 +1779,167 @@ class AppTestWithMapDictAndCounters(object):
         assert res2 == "foobar"
 
 
+@pytest.mark.skipif('config.option.runappdirect')
+class AppTestWithMapDictAndStoreCounters(object):
+    spaceconfig = {"objspace.std.withmethodcachecounter": True}
+
+    def setup_class(cls):
+        from pypy.interpreter import gateway
+        #
+        def check(space, w_func, name, w_call=None):
+            # 'w_call' is what to call, by default 'w_func' itself
+            w_code = space.getattr(w_func, space.wrap('__code__'))
+            nameindex = map(space.text_w, w_code.co_names_w).index(name)
+            entry = w_code._mapdict_store_caches[nameindex]
+            entry.failure_counter = 0
+            entry.success_counter = 0
+            INVALID_STORE_CACHE_ENTRY.failure_counter = 0
+            #
+            space.call_function(w_call or w_func)
+            #
+            entry = w_code._mapdict_store_caches[nameindex]
+            if entry is INVALID_STORE_CACHE_ENTRY:
+                failures = successes = 0
+            else:
+                failures = entry.failure_counter
+                successes = entry.success_counter
+            globalfailures = INVALID_STORE_CACHE_ENTRY.failure_counter
+            return space.wrap((failures, successes, globalfailures))
+        check.unwrap_spec = [gateway.ObjSpace, gateway.W_Root, 'text',
+                             gateway.W_Root]
+        cls.w_check = cls.space.wrap(gateway.interp2app(check))
+
+    def test_store_existing_attribute(self):
+        class A(object):
+            pass
+        a = A()
+        a.x = 0
+        def f():
+            a.x += 1
+        #
+        res = self.check(f, 'x')
+        assert res == (1, 0, 0)
+        res = self.check(f, 'x')
+        assert res == (0, 1, 0)
+        res = self.check(f, 'x')
+        assert res == (0, 1, 0)
+        assert a.x == 3
+        #
+        A.y = 5     # unrelated, but changes the version_tag
+        res = self.check(f, 'x')
+        assert res == (1, 0, 0)
+        res = self.check(f, 'x')
+        assert res == (0, 1, 0)
+        assert a.x == 5
+
+    def test_store_new_attribute(self):
+        class A(object):
+            def __init__(self, x, y):
+                self.x = x
+                self.y = y
+        objs = []
+        def f():
+            objs.append(A("a", str(len(objs))))   # not unboxed
+        #
+        res = self.check(A.__init__, 'y', f)
+        assert res == (1, 0, 0)
+        res = self.check(A.__init__, 'y', f)
+        assert res == (0, 1, 0)
+        res = self.check(A.__init__, 'x', f)
+        assert res == (0, 1, 0)
+        res = self.check(A.__init__, 'x', f)
+        assert res == (0, 1, 0)
+        assert [(a.x, a.y) for a in objs] == [("a", str(i)) for i in range(4)]
+        assert [a.__dict__ for a in objs] == [{"x": "a", "y": str(i)}
+                                              for i in range(4)]
+
+    def test_store_data_descriptor(self):
+        class A(object):
+            pass
+        a = A()
+        a.x = 0
+        def f():
+            a.x = 42
+        #
+        res = self.check(f, 'x')
+        assert res == (1, 0, 0)
+        res = self.check(f, 'x')
+        assert res == (0, 1, 0)
+        #
+        seen = []
+        A.x = property(lambda self: -1, lambda self, value: seen.append(value))
+        res = self.check(f, 'x')
+        assert res == (0, 0, 1)
+        res = self.check(f, 'x')
+        assert res == (0, 0, 1)
+        assert seen == [42, 42]
+        assert a.x == -1
+        assert a.__dict__ == {'x': 42}
+
+    def test_store_custom_setattr(self):
+        class A(object):
+            def __setattr__(self, name, value):
+                object.__setattr__(self, name, value * 2)
+        a = A()
+        def f():
+            a.x = 21
+        #
+        res = self.check(f, 'x')
+        assert res == (0, 0, 1)
+        res = self.check(f, 'x')
+        assert res == (0, 0, 1)
+        assert a.x == 42
+
+    def test_store_slots(self):
+        class A(object):
+            __slots__ = ['x']
+        a = A()
+        def f():
+            a.x = 42
+        #
+        res = self.check(f, 'x')
+        assert res == (0, 0, 1)
+        assert a.x == 42
+
+    def test_store_changes_type(self):
+        class A(object):
+            pass
+        a = A()
+        b = A()
+        a.x = 1
+        values = [1, 2, "a", 3.5]
+        def f():
+            b.x = values.pop()
+        #
+        for i in range(4):
+            self.check(f, 'x')
+            assert a.x == 1
+        assert b.x == 1
+        b.x = 2.5
+        assert b.x == 2.5
+        assert a.x == 1
+
+    def test_delete_attribute(self):
+        class A(object):
+            pass
+        a = A()
+        def f():
+            del a.x
+        #
+        a.x = 1
+        res = self.check(f, 'x')
+        assert res == (1, 0, 0)
+        a.x = 2
+        res = self.check(f, 'x')
+        assert res == (0, 1, 0)
+        assert not hasattr(a, 'x')
+        raises(AttributeError, f)
+        a.x = 3
+        res = self.check(f, 'x')
+        assert res == (0, 1, 0)
+        assert a.__dict__ == {}
+
+
 @pytest.mark.skipif('config.option.runappdirect')
 class AppTestGlobalCaching(AppTestWithMapDict):
     spaceconfig = {"objspace.std.withmethodcachecounter": True}
@@ -83,8 +83,7 @@ class TestW_SetObject:
 
     def test_create_set_from_list(self):
         from pypy.interpreter.baseobjspace import W_Root
-        from pypy.objspace.std.setobject import BytesSetStrategy, ObjectSetStrategy, AsciiSetStrategy
-        from pypy.objspace.std.floatobject import W_FloatObject
+        from pypy.objspace.std.setobject import BytesSetStrategy, ObjectSetStrategy, AsciiSetStrategy, FloatSetStrategy
 
         w = self.space.wrap
         wb = self.space.newbytes
@@ -121,9 +120,15 @@ class TestW_SetObject:
         w_list = W_ListObject(self.space, [w(1.0), w(2.0), w(3.0)])
         w_set = W_SetObject(self.space)
         _initialize_set(self.space, w_set, w_list)
+        assert w_set.strategy is self.space.fromcache(FloatSetStrategy)
+        assert w_set.strategy.unerase(w_set.sstorage) == {1.0:None, 2.0:None, 3.0:None}
+
+        w_list = W_ListObject(self.space, [w(1.0), w("2"), w(3.0)])
+        w_set = W_SetObject(self.space)
+        _initialize_set(self.space, w_set, w_list)
         assert w_set.strategy is self.space.fromcache(ObjectSetStrategy)
         for item in w_set.strategy.unerase(w_set.sstorage):
-            assert isinstance(item, W_FloatObject)
+            assert isinstance(item, W_Root)
 
         # changed cached object, need to change it back for other tests to pass
         intstr.get_storage_from_list = tmp_func
@@ -1199,3 +1204,39 @@ class AppTestAppSetTest:
         assert hash(frozenset()) == 133146708735736
         h = hash(frozenset([1, 2, 9]))
         assert h == (-5390384031640186368)
+
+    def test_float_set(self):
+        s = {1.5, 2.0, -0.0}
+        assert 2 in s
+        assert 0 in s
+        assert "a" not in s
+        assert s == {1.5, 2, 0}
+        assert s & {2.0, 3.0} == {2.0}
+        assert s | {2.0, 3.0} == {1.5, 2.0, 0.0, 3.0}
+        assert s - {2.0} == {1.5, 0.0}
+        assert {1.5} <= s
+        nan = float('nan')
+        s.add(nan)
+        s.add(nan)
+        assert len(s) == 4
+        assert nan in s
+        assert hash(frozenset([1.5, 2.0])) == hash(frozenset([2.0, 1.5]))
+
+
+class AppTestIntPairSet:
+    spaceconfig = {"objspace.std.withintpairset": True}
+
+    def test_basic(self):
+        s = {(1, 2), (3, 4)}
+        assert (1, 2) in s
+        assert (1, 2.0) in s
+        assert (1, 2, 3) not in s
+        assert s & {(3, 4), (5, 6)} == {(3, 4)}
+        assert s | {(3, 4), (5, 6)} == {(1, 2), (3, 4), (5, 6)}
+        assert s - {(3, 4)} == {(1, 2)}
+        assert {(1, 2)} < s
+        assert sorted(s) == [(1, 2), (3, 4)]
+        s.add((1, 'a'))
+        assert len(s) == 3
+        assert (1, 'a') in s
+        assert hash(frozenset([(1, 2)])) == hash(frozenset([(1, 2), (1, 2)]))
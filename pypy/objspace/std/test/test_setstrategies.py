@@ -2,7 +2,9 @@ import pytest
 from pypy.objspace.std.setobject import W_SetObject
 from pypy.objspace.std.setobject import (
     BytesIteratorImplementation, BytesSetStrategy, EmptySetStrategy,
-    IntegerIteratorImplementation, IntegerSetStrategy, ObjectSetStrategy,
+    FloatIteratorImplementation, FloatSetStrategy,
+    IntegerIteratorImplementation, IntegerSetStrategy,
+    IntPairIteratorImplementation, IntPairSetStrategy, ObjectSetStrategy,
     UnicodeIteratorImplementation, AsciiSetStrategy)
 from pypy.objspace.std.listobject import W_ListObject
 from pypy.objspace.std.longobject import W_LongObject
@@ -163,3 +165,109 @@ class TestW_SetStrategies:
         #
         s1 = W_SetObject(space, space.newlist([w]))
         assert s1.strategy is space.fromcache(IntegerSetStrategy)
+
+    def test_float_strategy(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped([1.5, 2.5, 1.5]))
+        assert s.strategy is space.fromcache(FloatSetStrategy)
+        assert s.length() == 2
+        assert sorted(space.listview_float(s)) == [1.5, 2.5]
+        assert isinstance(s.iter(), FloatIteratorImplementation)
+        #
+        s = W_SetObject(space, self.wrapped([]))
+        s.add(space.wrap(0.5))
+        assert s.strategy is space.fromcache(FloatSetStrategy)
+        assert s.has_key(space.wrap(0.5))
+        s.add(space.wrap(-0.0))
+        s.add(space.wrap(0.0))
+        assert s.length() == 2
+        #
+        s = W_SetObject(space, self.wrapped([1.5, float('nan')]))
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+        s = W_SetObject(space, self.wrapped([1.5]))
+        s.add(space.wrap(float('nan')))
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+
+    def test_float_strategy_from_float_list(self):
+        space = self.space
+        w_list = self.wrapped([1.5, 2.5])
+        assert space.listview_float(w_list) is not None
+        s = W_SetObject(space, w_list)
+        assert s.strategy is space.fromcache(FloatSetStrategy)
+        w_list = self.wrapped([1.5, float('nan')])
+        s = W_SetObject(space, w_list)
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+
+    def test_float_strategy_bulk_operations(self):
+        space = self.space
+        strategy = space.fromcache(FloatSetStrategy)
+        s1 = W_SetObject(space, self.wrapped([1.5, 2.5, 3.5]))
+        s2 = W_SetObject(space, self.wrapped([2.5, 3.5, 4.5]))
+        for s3 in [s1.intersect(s2), s1.difference(s2),
+                   s1.descr_union(space, [s2])]:
+            assert s3.strategy is strategy
+        assert sorted(space.listview_float(s1.intersect(s2))) == [2.5, 3.5]
+        assert space.listview_float(s1.difference(s2)) == [1.5]
+        assert not s1.issubset(s2)
+        assert s1.intersect(s2).issubset(s2)
+        # floats can be equal to ints, but not to strings
+        s4 = W_SetObject(space, self.wrapped([3]))
+        assert s4.issubset(W_SetObject(space, self.wrapped([3.0])))
+        s5 = W_SetObject(space, self.wrapped(["a"], bytes=True))
+        assert s1.isdisjoint(s5)
+
+    def test_int_pair_strategy_disabled(self):
+        space = self.space
+        w_pair = space.newtuple([space.wrap(1), space.wrap(2)])
+        s = W_SetObject(space, W_ListObject(space, [w_pair]))
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+
+
+class TestW_IntPairSetStrategy:
+    spaceconfig = {"objspace.std.withintpairset": True}
+
+    def pairs(self, l):
+        space = self.space
+        return W_ListObject(space, [
+            space.newtuple([space.wrap(a), space.wrap(b)]) for a, b in l])
+
+    def test_from_list(self):
+        space = self.space
+        strategy = space.fromcache(IntPairSetStrategy)
+        s = W_SetObject(space, self.pairs([(1, 2), (3, 4), (1, 2)]))
+        assert s.strategy is strategy
+        assert s.length() == 2
+        assert isinstance(s.iter(), IntPairIteratorImplementation)
+        assert strategy.unerase(s.sstorage) == {(1, 2): None, (3, 4): None}
+        #
+        s = W_SetObject(space, self.wrapped_empty())
+        s.add(space.newtuple([space.wrap(5), space.wrap(6)]))
+        assert s.strategy is strategy
+        s.add(space.newtuple([space.wrap(5), space.wrap(6), space.wrap(7)]))
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+        assert s.length() == 2
+
+    def wrapped_empty(self):
+        return W_ListObject(self.space, [])
+
+    def test_other_tuples(self):
+        space = self.space
+        for w_item in [space.newtuple([space.wrap(1), space.wrap("a")]),
+                       space.newtuple([space.wrap(1)]),
+                       space.newtuple([space.wrap(1.5), space.wrap(1)])]:
+            s = W_SetObject(space, W_ListObject(space, [w_item]))
+            assert s.strategy is not space.fromcache(IntPairSetStrategy)
+
+    def test_bulk_operations(self):
+        space = self.space
+        strategy = space.fromcache(IntPairSetStrategy)
+        s1 = W_SetObject(space, self.pairs([(1, 2), (3, 4)]))
+        s2 = W_SetObject(space, self.pairs([(3, 4), (5, 6)]))
+        s3 = s1.intersect(s2)
+        assert s3.strategy is strategy
+        assert strategy.unerase(s3.sstorage) == {(3, 4): None}
+        s3 = s1.descr_union(space, [s2])
+        assert s3.strategy is strategy
+        assert s3.length() == 3
+        assert s1.difference(s2).strategy is strategy
+        assert s1.intersect(s2).issubset(s1)
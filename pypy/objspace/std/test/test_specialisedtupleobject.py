@@ -277,3 +277,167 @@ class AppTestW_SpecialisedTupleObject:
 
 class AppTestAll(test_tupleobject.AppTestW_TupleObject):
     spaceconfig = {"objspace.std.withspecialisedtuple": True}
+
+
+class TestW_UnboxedTupleObject():
+    spaceconfig = {"objspace.std.withunboxedtuple": True}
+
+    def test_isunboxed(self):
+        space = self.space
+        w_tuple = space.newtuple([space.wrap(1), space.wrap(2), space.wrap(3)])
+        assert type(w_tuple).__name__ == 'W_UnboxedTupleObject_i'
+        assert w_tuple.items == [1, 2, 3]
+        w_tuple = space.newtuple([space.wrap(1.5), space.wrap(2.5)])
+        assert type(w_tuple).__name__ == 'W_UnboxedTupleObject_f'
+        assert w_tuple.items == [1.5, 2.5]
+        w_tuple = space.newtuple([space.wrap(1), space.wrap(2.5)])
+        assert type(w_tuple) is W_TupleObject
+        w_tuple = space.newtuple([])
+        assert type(w_tuple) is W_TupleObject
+
+    def test_integer_strategy_with_w_long(self):
+        w = W_LongObject(rbigint.fromlong(42))
+        w_tuple = self.space.newtuple([w, w, w])
+        assert type(w_tuple).__name__ == 'W_UnboxedTupleObject_i'
+
+    def test_listview(self):
+        space = self.space
+        w_tuple = space.newtuple([space.wrap(1), space.wrap(2), space.wrap(3)])
+        assert space.listview_int(w_tuple) == [1, 2, 3]
+        assert space.listview_float(w_tuple) is None
+        w_tuple = space.newtuple([space.wrap(1.5), space.wrap(2.5)])
+        assert space.listview_float(w_tuple) == [1.5, 2.5]
+        assert space.listview_int(w_tuple) is None
+
+    def test_hash_against_normal_tuple(self):
+        space = self.space
+        for values in [[-1, -1, -1], [1, 2, 3, 4, 5], [1 << 62, 0, -5],
+                       [-1.0, -1.0], [1.5, 2.8, 0.0, -0.0], [1.0, 2.0, 3.0],
+                       [float('inf'), 1e300]]:
+            N_w_tuple = W_TupleObject([space.wrap(x) for x in values])
+            U_w_tuple = space.newtuple([space.wrap(x) for x in values])
+            assert 'W_UnboxedTupleObject' in type(U_w_tuple).__name__
+            assert space.is_true(space.eq(N_w_tuple, U_w_tuple))
+            assert space.is_true(space.eq(U_w_tuple, N_w_tuple))
+            assert space.int_w(space.hash(N_w_tuple)) == (
+                   space.int_w(space.hash(U_w_tuple)))
+
+
+class AppTestW_UnboxedTupleObject:
+    spaceconfig = {"objspace.std.withunboxedtuple": True}
+
+    def w_isunboxed(self, obj, expected=''):
+        import __pypy__
+        r = __pypy__.internal_repr(obj)
+        return ("UnboxedTupleObject" + expected) in r
+
+    def test_create(self):
+        assert self.isunboxed((1, 2, 3, 4, 5), '_i')
+        assert self.isunboxed(tuple(range(100)), '_i')
+        assert self.isunboxed((1.5,), '_f')
+        assert self.isunboxed(tuple([0.5] * 10), '_f')
+        assert not self.isunboxed((1, 2.5, 3))
+        assert not self.isunboxed((1, 2, '3'))
+        assert not self.isunboxed(())
+
+    def test_subclasses(self):
+        class I(int): pass
+        class F(float): pass
+        t = (I(42), I(43), I(44))
+        assert not self.isunboxed(t)
+        assert type(t[2]) is I
+        t = (F(42), F(43), F(44))
+        assert not self.isunboxed(t)
+        assert type(t[2]) is F
+        class T(tuple): pass
+        t = T([1, 2, 3])
+        assert not self.isunboxed(t)
+        assert t == (1, 2, 3)
+
+    def test_getitem_and_slicing(self):
+        t = (5, 3, 1, -1)
+        assert t[0] == 5
+        assert t[-1] == -1
+        raises(IndexError, "t[4]")
+        raises(IndexError, "t[-5]")
+        assert t[1:3] == (3, 1)
+        assert self.isunboxed(t[1:3], '_i')
+        assert t[::2] == (5, 1)
+        assert self.isunboxed(t[::-1], '_i')
+        assert t[::-1] == (-1, 1, 3, 5)
+        assert t[5:] == ()
+        assert list(t) == [5, 3, 1, -1]
+
+    def test_add(self):
+        t = (1, 2, 3) + (4, 5)
+        assert self.isunboxed(t, '_i')
+        assert t == (1, 2, 3, 4, 5)
+        t = (1, 2, 3) + (4.5,)
+        assert not self.isunboxed(t)
+        assert t == (1, 2, 3, 4.5)
+        t = (1.5, 2.5) + ('x',)
+        assert t == (1.5, 2.5, 'x')
+
+    def test_eq(self):
+        assert (1, 2, 3) == (1, 2, 3)
+        assert (1, 2, 3) != (1, 2, 4)
+        assert (1, 2, 3) != (1, 2)
+        assert (1, 2, 3) == (1.0, 2.0, 3.0)
+        assert (1.0, 2.0, 3.0) == (1, 2, 3)
+        assert (1, 2, 3) == (1, 2.0, 3)
+        assert (1, 2, 3) != (1, 2, '3')
+
+    def test_ordering(self):
+        a = (1, 2, 3)
+        assert a < (1, 2, 4)
+        assert a < (1, 2, 3, 0)
+        assert not a < (1, 2, 3)
+        assert a <= (1, 2, 3)
+        assert a > (1, 2)
+        assert a >= (0, 5, 5)
+        assert not a > (1, 2, 3)
+        assert a < (1, 2.5)
+        assert (0.5, 2.0) < (1.0, 0.0)
+        assert (1.5, 2.0) > (1.5, 1.0)
+        raises(TypeError, "a < (1, 2, 'x')")
+
+    def test_nans(self):
+        N = float('nan')
+        T = (N, N, 1.0)
+        assert self.isunboxed(T, '_f')
+        assert N in T
+        assert T == (N, N, 1.0)
+        assert T <= (N, N, 1.0)
+        assert not T < (N, N, 1.0)
+        assert (0.0, 0.0, 0.0) == (-0.0, -0.0, -0.0)
+
+    def test_contains(self):
+        t = (1, 2, 3)
+        assert 2 in t
+        assert 4 not in t
+        assert 2.0 in t
+        assert 'x' not in t
+        t = (1.5, 2.5)
+        assert 2.5 in t
+        assert 2 not in t
+        t = (1.0, 2.0)
+        assert 2 in t
+
+    def test_hash(self):
+        assert hash((1, 2, 3)) == hash((1.0, 2.0, 3.0)) == hash((1, 2.0, 3))
+        d = {(1, 2, 3): 'a', (1.5, 2.5): 'b'}
+        assert d[(1.0, 2, 3)] == 'a'
+        assert d[tuple([1.5, 2.5])] == 'b'
+
+    def test_list_from_tuple(self):
+        t = (1, 2, 3)
+        l = list(t)
+        l.append(4)
+        assert l == [1, 2, 3, 4]
+        assert t == (1, 2, 3)
+        t = (1.5, 2.5)
+        assert list(t) == [1.5, 2.5]
+
+
+class AppTestAllUnboxed(test_tupleobject.AppTestW_TupleObject):
+    spaceconfig = {"objspace.std.withunboxedtuple": True}
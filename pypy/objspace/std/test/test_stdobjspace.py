@@ -40,13 +40,18 @@ class TestW_StdObjSpace:
         assert space.sliceindices(w_obj, w(3)) == (1,2,3)
 
     def test_fastpath_isinstance(self):
-        from pypy.objspace.std.bytesobject import W_BytesObject
+        from pypy.objspace.std.bytesobject import (
+            W_AbstractBytesObject, W_BytesObject)
         from pypy.objspace.std.intobject import W_AbstractIntObject
         from pypy.objspace.std.iterobject import W_AbstractSeqIterObject
         from pypy.objspace.std.iterobject import W_SeqIterObject
+        from pypy.objspace.std.unicodeobject import W_AbstractUnicodeObject
 
         space = self.space
-        assert space._get_interplevel_cls(space.w_bytes) is W_BytesObject
+        # the abstract classes, so that the buffers of withstrbuf pass too
+        assert space._get_interplevel_cls(space.w_bytes) is W_AbstractBytesObject
+        assert (space._get_interplevel_cls(space.w_unicode) is
+                W_AbstractUnicodeObject)
         assert space._get_interplevel_cls(space.w_int) is W_AbstractIntObject
         class X(W_BytesObject):
             def __init__(self):
@@ -0,0 +1,266 @@
+from pypy.objspace.std import strbufobject
+from pypy.objspace.std.bytesobject import W_BytesObject
+from pypy.objspace.std.strbufobject import (
+    W_StringBufferObject, W_UnicodeBufferObject)
+from pypy.objspace.std.test import test_bytesobject, test_unicodeobject
+from pypy.objspace.std.unicodeobject import W_UnicodeObject
+
+
+class TestStringBufferObject:
+    spaceconfig = {"objspace.std.withstrbuf": True}
+
+    def test_short_additions_stay_flat(self):
+        space = self.space
+        w_a = space.newbytes("a")
+        assert type(space.add(w_a, w_a)) is W_BytesObject
+        w_long = space.newbytes("x" * strbufobject.MIN_BUFFER_LENGTH)
+        assert type(space.add(w_long, w_a)) is W_StringBufferObject
+        #
+        w_a = space.newutf8("\xc3\xa9", 1)
+        assert type(space.add(w_a, w_a)) is W_UnicodeObject
+        w_long = space.newtext("x" * strbufobject.MIN_BUFFER_LENGTH)
+        w_res = space.add(w_long, w_a)
+        assert type(w_res) is W_UnicodeBufferObject
+        assert space.len_w(w_res) == strbufobject.MIN_BUFFER_LENGTH + 1
+        assert space.utf8_w(w_res) == "x" * strbufobject.MIN_BUFFER_LENGTH + "\xc3\xa9"
+
+
+class AppTestStringBufferObject(test_bytesobject.AppTestBytesObject):
+    spaceconfig = {"objspace.std.withstrbuf": True}
+
+    def setup_class(cls):
+        test_bytesobject.AppTestBytesObject.setup_class.im_func(cls)
+        cls.old_min_buffer_length = strbufobject.MIN_BUFFER_LENGTH
+        strbufobject.MIN_BUFFER_LENGTH = 0
+
+    def teardown_class(cls):
+        strbufobject.MIN_BUFFER_LENGTH = cls.old_min_buffer_length
+
+    def test_basic(self):
+        import __pypy__
+        a = b"Hello, "
+        s = a + b"World!"
+        assert type(s) is bytes
+        assert 'W_StringBufferObject' in __pypy__.internal_repr(s)
+        assert s == b"Hello, World!"
+        assert len(s) == 13
+
+    def test_add_twice(self):
+        x = b"a".__add__(b"b")
+        y = x + b"c"
+        c = x + b"d"
+        assert y == b"abc"
+        assert c == b"abd"
+
+    def test_add(self):
+        import __pypy__
+        all = b""
+        for i in range(20):
+            all += str(i).encode()
+        assert 'W_StringBufferObject' in __pypy__.internal_repr(all)
+        assert all == b"012345678910111213141516171819"
+
+    def test_hash(self):
+        import __pypy__
+        def join(s):
+            return s[:len(s) // 2] + s[len(s) // 2:]
+        t = b'a' * 101
+        s = join(t)
+        assert 'W_StringBufferObject' in __pypy__.internal_repr(s)
+        assert hash(s) == hash(t)
+        assert {s: 5}[t] == 5
+
+    def test_compare(self):
+        s = b"abc" + b"def"
+        t = b"ab" + b"cdef"
+        assert s == t
+        assert not (s != t)
+        assert s == b"abcdef"
+        assert b"abcdef" == s
+        assert b"abcdeg" > s
+        assert s < b"abcdeg"
+        assert s >= t and s <= t
+        assert s != b"abc"
+
+    def test_methods(self):
+        s = b"x" + b"y-z"
+        assert s.upper() == b"XY-Z"
+        assert s.split(b"-") == [b"xy", b"z"]
+        assert s[1] == ord(b"y")
+        assert s[1:] == b"y-z"
+        assert s.hex() == "78792d7a"
+        assert list(s) == [120, 121, 45, 122]
+        assert b"%s!" % s == b"xy-z!"
+        assert s + bytearray(b"!") == b"xy-z!"
+        assert bytearray(b"!") + s == bytearray(b"!xy-z")
+        assert memoryview(s).tobytes() == b"xy-z"
+        assert s.decode("ascii") == u"xy-z"
+        assert isinstance(s, bytes)
+
+    def test_add_notimplemented(self):
+        s = b"a" + b"b"
+        raises(TypeError, "s + u'c'")
+        class A(object):
+            def __radd__(self, other):
+                return 42
+        assert s + A() == 42
+
+
+class AppTestUnicodeBufferObject(test_unicodeobject.AppTestUnicodeString):
+    spaceconfig = {"objspace.std.withstrbuf": True,
+                   "usemodules": ["unicodedata", "_io", "_pypyjson"]}
+
+    def setup_class(cls):
+        cls.old_min_buffer_length = strbufobject.MIN_BUFFER_LENGTH
+        strbufobject.MIN_BUFFER_LENGTH = 0
+
+    def teardown_class(cls):
+        strbufobject.MIN_BUFFER_LENGTH = cls.old_min_buffer_length
+
+    def test_basic(self):
+        import __pypy__
+        a = "Hello, "
+        s = a + "W\xf6rld!"
+        assert type(s) is str
+        assert 'W_UnicodeBufferObject' in __pypy__.internal_repr(s)
+        assert s == "Hello, W\xf6rld!"
+        assert len(s) == 13
+
+    def test_add_twice(self):
+        x = "a".__add__("\u1234")
+        y = x + "c"
+        c = x + "d"
+        assert y == "a\u1234c"
+        assert c == "a\u1234d"
+        assert len(x) == 2 and len(y) == 3
+
+    def test_add(self):
+        import __pypy__
+        all = ""
+        for i in range(20):
+            all += str(i)
+        assert 'W_UnicodeBufferObject' in __pypy__.internal_repr(all)
+        assert all == "012345678910111213141516171819"
+        all += all
+        assert all == "012345678910111213141516171819" * 2
+
+    def test_hash(self):
+        import __pypy__
+        def join(s):
+            return s[:len(s) // 2] + s[len(s) // 2:]
+        t = 'a\xe9' * 101
+        s = join(t)
+        assert 'W_UnicodeBufferObject' in __pypy__.internal_repr(s)
+        assert hash(s) == hash(t)
+        assert {s: 5}[t] == 5
+        assert {t: 5}[s] == 5
+
+    def test_compare(self):
+        s = "abc" + "def"
+        t = "ab" + "cdef"
+        assert s == t
+        assert not (s != t)
+        assert s == "abcdef"
+        assert "abcdef" == s
+        assert "abcdeg" > s
+        assert s < "abcdeg"
+        assert s >= t and s <= t
+        assert s != "abc"
+        assert s != b"abcdef"
+
+    def test_methods(self):
+        s = "x" + "y-\u20ac"
+        assert s.upper() == "XY-\u20ac"
+        assert s.split("-") == ["xy", "\u20ac"]
+        assert s[1] == "y"
+        assert s[1:] == "y-\u20ac"
+        assert list(s) == ["x", "y", "-", "\u20ac"]
+        assert "%s!" % s == "xy-\u20ac!"
+        assert "{}!".format(s) == "xy-\u20ac!"
+        assert "-".join([s, s]) == "xy-\u20ac-xy-\u20ac"
+        assert s.encode("utf-8") == b"xy-\xe2\x82\xac"
+        assert ord("a" + "") == 97
+        assert "abc".translate({98: "x" + "y"}) == "axyc"
+        assert str(s) == s
+        class S(str):
+            pass
+        assert S(s) == s and type(S(s)) is S
+        assert isinstance(s, str)
+
+    def test_add_notimplemented(self):
+        s = "a" + "b"
+        raises(TypeError, "s + b'c'")
+        raises(TypeError, "s + 5")
+        class A(object):
+            def __radd__(self, other):
+                return 42
+        assert s + A() == 42
+
+    def test_modules(self):
+        import _io, _pypyjson, sys
+        s = "a" + "b\xe9"
+        assert _io.StringIO(s).read() == "ab\xe9"
+        f = _io.StringIO()
+        f.write(s)
+        assert f.getvalue() == "ab\xe9"
+        res = _pypyjson.encode({s: [s]}, None, True, True, True, False,
+                               False, None, ", ", ": ")
+        assert res == '{"ab\\u00e9": ["ab\\u00e9"]}'
+        assert sys.intern(s) is sys.intern("ab\xe9")
+
+    def test_kwargs(self):
+        s = 'a' * 200 + 'b' * 100
+        assert (lambda **kw: len(kw))(**{s: 1}) == 1
+        assert (lambda **kw: list(kw))(**{s: 1}) == [s]
+        class M(object):
+            def keys(self):
+                return [s]
+            def __getitem__(self, key):
+                return 42
+        assert (lambda **kw: kw[s])(**M()) == 42
+
+    def test_dict_keys(self):
+        import __pypy__
+        s = 'a' * 200 + 'b' * 100
+        d = {}
+        d[s] = 1
+        assert __pypy__.strategy(d) == "UnicodeDictStrategy"
+        d = {'x': 1}
+        d[s] = 2
+        assert __pypy__.strategy(d) == "UnicodeDictStrategy"
+        assert s in d and d[s] == 2 and d.get(s) == 2
+        assert d.setdefault(s, 3) == 2
+        assert d.pop(s) == 2
+        d[s] = 4
+        del d[s]
+        assert d == {'x': 1}
+        assert __pypy__.strategy(d) == "UnicodeDictStrategy"
+
+    def test_set_and_list_items(self):
+        import __pypy__
+        s = 'a' * 200 + 'b' * 100
+        t = set()
+        t.add(s)
+        assert __pypy__.strategy(t) == "AsciiSetStrategy"
+        assert s in t
+        t.remove(s)
+        assert not t
+        l = []
+        l.append(s)
+        l.insert(0, s)
+        l[1] = s
+        assert __pypy__.strategy(l) == "AsciiListStrategy"
+        assert l.index(s) == 0 and l.count(s) == 2
+        assert __pypy__.strategy(list(s)) == "AsciiListStrategy"
+
+    def test_json(self):
+        import _pypyjson
+        s = 'a' * 200 + 'b' * 100
+        d = _pypyjson.loads('{"%s": 1, "x": 2}' % (s,))
+        assert d[s] == 1 and s in d
+        d[s] = 3
+        assert d == {s: 3, 'x': 2}
+        assert _pypyjson.loads('[' + '"%s"' % (s,) + ']') == [s]
+        res = _pypyjson.encode({s: 1}, None, True, True, True, False,
+                               False, None, ", ", ": ")
+        assert res == '{"%s": 1}' % (s,)
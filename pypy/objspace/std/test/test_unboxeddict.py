@@ -0,0 +1,154 @@
+import py
+
+
+class AppTestUnboxedDict(object):
+    spaceconfig = {"objspace.std.withunboxeddictvalues": True}
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("__repr__ doesn't work on appdirect")
+
+    def w_get_strategy(self, obj):
+        import __pypy__
+        r = __pypy__.internal_repr(obj)
+        return r[r.find("(") + 1: r.find(")")]
+
+    def test_int_int(self):
+        d = {}
+        d[1] = 2
+        assert "IntIntDictStrategy" in self.get_strategy(d)
+        for i in range(10):
+            d[i] = d.get(i, 0) + 1
+        assert "IntIntDictStrategy" in self.get_strategy(d)
+        assert d[1] == 3
+        assert d[5] == 1
+        assert 5 in d
+        assert 10 not in d
+        assert d.get(10) is None
+        assert d.get("x", 42) == 42
+        assert sorted(d.keys()) == list(range(10))
+        assert sorted(d.values()) == [1] * 9 + [3]
+        assert sorted(d.items())[:2] == [(0, 1), (1, 3)]
+        assert sum(d.values()) == 12
+        assert d.pop(1) == 3
+        assert d.pop(1, -1) == -1
+        raises(KeyError, d.pop, 1)
+        assert d.setdefault(2, 100) == 1
+        assert d.setdefault(20, 100) == 100
+        key, value = d.popitem()
+        assert d.get(key) is None
+        assert value == 100 or value == 1
+        assert len(d) == 9
+        del d[min(d)]
+        assert len(d) == 8
+        e = d.copy()
+        assert "IntIntDictStrategy" in self.get_strategy(e)
+        assert e == d
+        assert "IntIntDictStrategy" in self.get_strategy(d)
+
+    def test_int_float(self):
+        d = {}
+        d[1] = 2.5
+        assert "IntFloatDictStrategy" in self.get_strategy(d)
+        d[2] = -0.0
+        d[1] += 1.0
+        assert d == {1: 3.5, 2: -0.0}
+        assert str(d[2]) == '-0.0'
+        assert sorted(d.values()) == [0.0, 3.5]
+        assert "IntFloatDictStrategy" in self.get_strategy(d)
+        d[3] = 4
+        assert "IntFloatDictStrategy" not in self.get_strategy(d)
+        assert "IntDictStrategy" in self.get_strategy(d)
+        assert d == {1: 3.5, 2: 0.0, 3: 4}
+        assert type(d[3]) is int
+
+    def test_unicode_int(self):
+        d = {}
+        for word in "a b c a b a".split():
+            d[word] = d.get(word, 0) + 1
+        assert "UnicodeIntDictStrategy" in self.get_strategy(d)
+        assert d == {"a": 3, "b": 2, "c": 1}
+        assert sorted(d) == ["a", "b", "c"]
+        def f(**kwargs):
+            return kwargs
+        assert f(**d) == d
+        assert "UnicodeIntDictStrategy" in self.get_strategy(d)
+
+    def test_counter(self):
+        from collections import Counter
+        c = Counter("abracadabra")
+        assert "UnicodeIntDictStrategy" in self.get_strategy(c)
+        assert c.most_common(1) == [("a", 5)]
+        c.update("aaa")
+        assert c["a"] == 8
+        assert "UnicodeIntDictStrategy" in self.get_strategy(c)
+
+    def test_switch_to_boxed_values(self):
+        d = {1: 10, 2: 20, 3: 30}
+        assert "IntIntDictStrategy" in self.get_strategy(d)
+        d[2] = "x"
+        assert "IntIntDictStrategy" not in self.get_strategy(d)
+        assert "IntDictStrategy" in self.get_strategy(d)
+        assert sorted(d.items()) == [(1, 10), (2, "x"), (3, 30)]
+        #
+        d = {"a": 1, "b": 2}
+        d["a"] = None
+        assert "UnicodeDictStrategy" in self.get_strategy(d)
+        assert d == {"a": None, "b": 2}
+        #
+        d = {1: 1}
+        d.setdefault(2, [])
+        assert "IntDictStrategy" in self.get_strategy(d)
+        assert d == {1: 1, 2: []}
+
+    def test_switch_to_object(self):
+        d = {1: 10, 2: 20}
+        d["x"] = 30
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert d == {1: 10, 2: 20, "x": 30}
+        d = {1: 10, 2: 20}
+        assert d[1.0] == 10
+        assert d.get(2.0) == 20
+        assert d == {1: 10, 2: 20}
+
+    def test_not_unboxed(self):
+        d = {1: True}
+        assert "IntIntDictStrategy" not in self.get_strategy(d)
+        assert d[1] is True
+        d = {1: 2}
+        d[3] = False
+        assert "IntIntDictStrategy" not in self.get_strategy(d)
+        assert d[3] is False
+        class I(int):
+            pass
+        d = {"a": I(5)}
+        assert "UnicodeIntDictStrategy" not in self.get_strategy(d)
+        assert type(d["a"]) is I
+
+    def test_big_values(self):
+        import sys
+        d = {1: sys.maxsize}
+        d[2] = sys.maxsize + 1
+        assert d == {1: sys.maxsize, 2: sys.maxsize + 1}
+
+    def test_update(self):
+        d = {1: 1, 2: 2}
+        e = {3: 3}
+        e.update(d)
+        assert "IntIntDictStrategy" in self.get_strategy(e)
+        assert e == {3: 3, 1: 1, 2: 2}
+        f = {1: "x"}
+        f.update(d)
+        assert f == {1: 1, 2: 2}
+        g = dict(d)
+        assert "IntIntDictStrategy" in self.get_strategy(g)
+        assert g == d
+
+    def test_iter_modified(self):
+        d = {1: 1, 2: 2}
+        it = iter(d.items())
+        next(it)
+        d[3] = 3
+        raises(RuntimeError, next, it)
+        d = {1: 1, 2: 2}
+        assert sorted(reversed(d)) == [1, 2]
@@ -216,6 +216,20 @@ class AppTestUnicodeString:
         assert '\na\nb\n'.splitlines(1) == ['\n', 'a\n', 'b\n']
         assert ((u'a' + b'\xc2\x85'.decode('utf8') + u'b\n').splitlines() ==
                 ['a', 'b'])
+        s = 'first line\x1c' + 'x\t' * 20 + '\u2028' + '\xe9' * 20 + '\r\n'
+        assert s.splitlines() == ['first line', 'x\t' * 20, '\xe9' * 20]
+        assert s.splitlines(True) == ['first line\x1c', 'x\t' * 20 + '\u2028',
+                                      '\xe9' * 20 + '\r\n']
+        assert [len(x) for x in s.splitlines(True)] == [11, 41, 22]
+
+    def test_isdigit_long(self):
+        assert ('0123456789' * 5).isdigit()
+        assert ('0123456789' * 5).isdecimal()
+        assert ('0123456789' * 5).isnumeric()
+        assert ('0123456789' * 5 + '\u0660').isdigit()
+        assert not ('0123456789' * 5 + '/').isdigit()
+        assert ('0123456789' * 5 + '\xbd').isnumeric()
+        assert not ('0123456789' * 5 + '\xbd').isdecimal()
 
     def test_zfill(self):
         assert '123'.zfill(2) == '123'
@@ -83,6 +83,14 @@ class W_AbstractTupleObject(W_Root):
     def getitem(self, space, item):
         raise NotImplementedError
 
+    def listview_int(self):
+        """Returns the items as a list of unboxed ints, or None."""
+        return None
+
+    def listview_float(self):
+        """Returns the items as a list of unboxed floats, or None."""
+        return None
+
     def descr_len(self, space):
         result = self.length()
         return space.newint(result)
@@ -100,6 +108,8 @@ class W_AbstractTupleObject(W_Root):
             return w_sequence
         else:
             tuple_w = space.fixedview(w_sequence)
+        if space.is_w(w_tupletype, space.w_tuple):
+            return space.newtuple(tuple_w)
         w_obj = space.allocate_instance(W_TupleObject, w_tupletype)
         W_TupleObject.__init__(w_obj, tuple_w)
         return w_obj
@@ -265,16 +275,16 @@ If the argument is a tuple, the return value is the same object.""",
 
     __eq__ = interpindirect2app(W_AbstractTupleObject.descr_eq),
     __ne__ = interpindirect2app(W_AbstractTupleObject.descr_ne),
-    __lt__ = interp2app(W_AbstractTupleObject.descr_lt),
-    __le__ = interp2app(W_AbstractTupleObject.descr_le),
-    __gt__ = interp2app(W_AbstractTupleObject.descr_gt),
-    __ge__ = interp2app(W_AbstractTupleObject.descr_ge),
+    __lt__ = interpindirect2app(W_AbstractTupleObject.descr_lt),
+    __le__ = interpindirect2app(W_AbstractTupleObject.descr_le),
+    __gt__ = interpindirect2app(W_AbstractTupleObject.descr_gt),
+    __ge__ = interpindirect2app(W_AbstractTupleObject.descr_ge),
 
     __len__ = interp2app(W_AbstractTupleObject.descr_len),
     __iter__ = interp2app(W_AbstractTupleObject.descr_iter),
-    __contains__ = interp2app(W_AbstractTupleObject.descr_contains),
+    __contains__ = interpindirect2app(W_AbstractTupleObject.descr_contains),
 
-    __add__ = interp2app(W_AbstractTupleObject.descr_add),
+    __add__ = interpindirect2app(W_AbstractTupleObject.descr_add),
     __mul__ = interp2app(W_AbstractTupleObject.descr_mul),
     __rmul__ = interp2app(W_AbstractTupleObject.descr_mul),
 
@@ -410,6 +420,12 @@ def wraptuple(space, list_w):
             return makespecialisedtuple(space, list_w)
         except NotSpecialised:
             pass
+    if space.config.objspace.std.withunboxedtuple:
+        from specialisedtupleobject import makeunboxedtuple, NotSpecialised
+        try:
+            return makeunboxedtuple(space, list_w)
+        except NotSpecialised:
+            pass
     return W_TupleObject(list_w)
 
 def wraptuple2(space, w_a, w_b):
@@ -419,4 +435,6 @@ def wraptuple2(space, w_a, w_b):
             return makespecialisedtuple2(space, w_a, w_b)
         except NotSpecialised:
             pass
+    if space.config.objspace.std.withunboxedtuple:
+        return wraptuple(space, [w_a, w_b])
     return W_TupleObject([w_a, w_b])
@@ -0,0 +1,207 @@
+## ----------------------------------------------------------------------------
+## dict strategies with unboxed values (see dictmultiobject.py)
+
+from rpython.rlib import rerased
+from rpython.rlib.objectmodel import r_dict
+from pypy.objspace.std.dictmultiobject import (
+    AbstractTypedStrategy, DictStrategy, IntDictStrategy, IntKeysMixin,
+    ObjectDictStrategy, UnicodeDictStrategy, UnicodeKeysMixin,
+    create_iterator_classes, unicode_eq, unicode_hash)
+
+
+# these strategies are selected by EmptyDictStrategy.switch_to_correct_strategy
+# if objspace.std.withunboxeddictvalues is enabled
+def get_unboxed_strategy(space, w_key, w_value):
+    """Return the strategy with unboxed values to use for a dict whose
+    first item is (w_key, w_value), or None."""
+    from pypy.objspace.std.floatobject import W_FloatObject
+    from pypy.objspace.std.listobject import is_plain_int1
+    if type(w_key) is space.UnicodeObjectCls:
+        if is_plain_int1(w_value):
+            return space.fromcache(UnicodeIntDictStrategy)
+    elif is_plain_int1(w_key):
+        if is_plain_int1(w_value):
+            return space.fromcache(IntIntDictStrategy)
+        if type(w_value) is W_FloatObject:
+            return space.fromcache(IntFloatDictStrategy)
+    return None
+
+
+class IntValuesMixin(object):
+    _mixin_ = True
+
+    def is_correct_value_type(self, w_value):
+        from pypy.objspace.std.listobject import is_plain_int1
+        return is_plain_int1(w_value)
+
+    def unwrapvalue(self, w_value):
+        from pypy.objspace.std.listobject import plain_int_w
+        return plain_int_w(self.space, w_value)
+
+    def boxvalue(self, value):
+        return self.space.newint(value)
+
+    def wrapvalue(space, value):
+        return space.newint(value)
+
+
+class FloatValuesMixin(object):
+    _mixin_ = True
+
+    def is_correct_value_type(self, w_value):
+        from pypy.objspace.std.floatobject import W_FloatObject
+        return type(w_value) is W_FloatObject
+
+    def unwrapvalue(self, w_value):
+        return self.space.float_w(w_value)
+
+    def boxvalue(self, value):
+        return self.space.newfloat(value)
+
+    def wrapvalue(space, value):
+        return space.newfloat(value)
+
+
+class UnboxedValuesMixin(object):
+    """ The methods of AbstractTypedStrategy that read or write values,
+    for storages where the values are unboxed too.  As soon as a value of
+    another type is stored, the dict switches to get_boxed_strategy(),
+    which has the same kind of keys.
+    """
+    _mixin_ = True
+
+    def get_boxed_strategy(self):
+        raise NotImplementedError("abstract base class")
+
+    def switch_to_boxed_strategy(self, w_dict):
+        d = self.unerase(w_dict.dstorage)
+        strategy = self.get_boxed_strategy()
+        d_new = strategy.unerase(strategy.get_empty_storage())
+        for key, value in d.iteritems():
+            d_new[key] = self.boxvalue(value)
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = strategy.erase(d_new)
+
+    def switch_to_object_strategy(self, w_dict):
+        d = self.unerase(w_dict.dstorage)
+        strategy = self.space.fromcache(ObjectDictStrategy)
+        d_new = strategy.unerase(strategy.get_empty_storage())
+        for key, value in d.iteritems():
+            d_new[self.wrap(key)] = self.boxvalue(value)
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = strategy.erase(d_new)
+
+    def setitem(self, w_dict, w_key, w_value):
+        if self.is_correct_type(w_key) and self.is_correct_value_type(w_value):
+            d = self.unerase(w_dict.dstorage)
+            d[self.unwrap(w_key)] = self.unwrapvalue(w_value)
+        else:
+            self.switch_to_boxed_strategy(w_dict)
+            w_dict.setitem(w_key, w_value)
+
+    def setdefault(self, w_dict, w_key, w_default):
+        if self.is_correct_type(w_key):
+            d = self.unerase(w_dict.dstorage)
+            key = self.unwrap(w_key)
+            try:
+                return self.boxvalue(d[key])
+            except KeyError:
+                pass
+            if self.is_correct_value_type(w_default):
+                d[key] = self.unwrapvalue(w_default)
+                return w_default
+        self.switch_to_boxed_strategy(w_dict)
+        return w_dict.setdefault(w_key, w_default)
+
+    def getitem(self, w_dict, w_key):
+        space = self.space
+        if self.is_correct_type(w_key):
+            d = self.unerase(w_dict.dstorage)
+            try:
+                value = d[self.unwrap(w_key)]
+            except KeyError:
+                return None
+            return self.boxvalue(value)
+        elif self._never_equal_to(space.type(w_key)):
+            return None
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.getitem(w_key)
+
+    def values(self, w_dict):
+        return [self.boxvalue(value)
+                for value in self.unerase(w_dict.dstorage).itervalues()]
+
+    def items(self, w_dict):
+        space = self.space
+        d = self.unerase(w_dict.dstorage)
+        return [space.newtuple2(self.wrap(key), self.boxvalue(value))
+                for (key, value) in d.iteritems()]
+
+    def popitem(self, w_dict):
+        key, value = self.unerase(w_dict.dstorage).popitem()
+        return (self.wrap(key), self.boxvalue(value))
+
+    def pop(self, w_dict, w_key, w_default):
+        space = self.space
+        if self.is_correct_type(w_key):
+            d = self.unerase(w_dict.dstorage)
+            try:
+                value = d.pop(self.unwrap(w_key))
+            except KeyError:
+                if w_default is not None:
+                    return w_default
+                raise KeyError
+            return self.boxvalue(value)
+        elif self._never_equal_to(space.type(w_key)):
+            if w_default is not None:
+                return w_default
+            raise KeyError
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.get_strategy().pop(w_dict, w_key, w_default)
+
+
+class IntIntDictStrategy(UnboxedValuesMixin, IntValuesMixin, IntKeysMixin,
+                         AbstractTypedStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("int_int")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def get_boxed_strategy(self):
+        return self.space.fromcache(IntDictStrategy)
+
+create_iterator_classes(IntIntDictStrategy)
+
+
+class IntFloatDictStrategy(UnboxedValuesMixin, FloatValuesMixin,
+                           IntKeysMixin, AbstractTypedStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("int_float")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def get_boxed_strategy(self):
+        return self.space.fromcache(IntDictStrategy)
+
+create_iterator_classes(IntFloatDictStrategy)
+
+
+class UnicodeIntDictStrategy(UnboxedValuesMixin, IntValuesMixin,
+                             UnicodeKeysMixin, AbstractTypedStrategy,
+                             DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("unicode_int")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def get_empty_storage(self):
+        # not create_empty_unicode_key_dict(), which would give the same
+        # annotation to this dict and to the ones with boxed values
+        res = r_dict(unicode_eq, unicode_hash,
+                     force_non_null=True,
+                     simple_hash_eq=True)
+        return self.erase(res)
+
+    def get_boxed_strategy(self):
+        return self.space.fromcache(UnicodeDictStrategy)
+
+create_iterator_classes(UnicodeIntDictStrategy)
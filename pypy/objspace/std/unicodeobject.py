@@ -9,12 +9,13 @@ from rpython.rlib.nonconst import NonConstant
 from rpython.rlib.rarithmetic import ovfcheck, r_uint
 from rpython.rlib.rstring import (
     StringBuilder, split, rsplit, replace_count, startswith, endswith)
-from rpython.rlib import rutf8, runicode, jit
+from rpython.rlib import rswar, rutf8, runicode, jit
 
 from pypy.interpreter import unicodehelper
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
-from pypy.interpreter.gateway import WrappedDefault, interp2app, unwrap_spec
+from pypy.interpreter.gateway import (
+    WrappedDefault, interp2app, interpindirect2app, unwrap_spec)
 from pypy.interpreter.typedef import TypeDef
 from pypy.module.unicodedata.interp_ucd import unicodedb
 from pypy.objspace.std import newformat
@@ -54,7 +55,18 @@ CHECK_ALL_STRINGS = False
 # CHECK_ALL_STRINGS: after translation.  Set to False to avoid overhead!
 
 
-class W_UnicodeObject(W_Root):
+class W_AbstractUnicodeObject(W_Root):
+    __slots__ = ()
+    exact_class_applevel_name = 'str'
+
+    def descr_add(self, space, w_other):
+        """x.__add__(y) <==> x+y"""
+
+    def descr_len(self, space):
+        """x.__len__() <==> len(x)"""
+
+
+class W_UnicodeObject(W_AbstractUnicodeObject):
     import_from_mixin(StringMethods)
     _immutable_fields_ = ['_utf8', '_length']
 
@@ -175,6 +187,10 @@ class W_UnicodeObject(W_Root):
     def convert_arg_to_w_unicode(space, w_other, strict=None):
         if isinstance(w_other, W_UnicodeObject):
             return w_other
+        if space.config.objspace.std.withstrbuf:
+            from pypy.objspace.std.strbufobject import W_UnicodeBufferObject
+            if isinstance(w_other, W_UnicodeBufferObject):
+                return w_other.force_w()
         if space.isinstance_w(w_other, space.w_bytes):
             raise oefmt(space.w_TypeError,
                     "Can't convert '%T' object to str implicitly", w_other)
@@ -250,6 +266,7 @@ class W_UnicodeObject(W_Root):
         if space.is_w(w_unicodetype, space.w_unicode):
             return w_value
 
+        w_value = w_value.convert_to_w_unicode(space)
         assert isinstance(w_value, W_UnicodeObject)
         w_newobj = space.allocate_instance(W_UnicodeObject, w_unicodetype)
         W_UnicodeObject.__init__(w_newobj, w_value._utf8, w_value._length)
@@ -535,7 +552,8 @@ class W_UnicodeObject(W_Root):
                     continue
                 elif space.isinstance_w(w_newval, space.w_int):
                     codepoint = space.int_w(w_newval)
-                elif isinstance(w_newval, W_UnicodeObject):
+                elif isinstance(w_newval, W_AbstractUnicodeObject):
+                    w_newval = w_newval.convert_to_w_unicode(space)
                     builder.append_utf8(w_newval._utf8, w_newval._length)
                     continue
                 else:
@@ -766,10 +784,19 @@ class W_UnicodeObject(W_Root):
                 builder.append_code(c)
         return W_UnicodeObject.from_utf8builder(builder)
 
+    def descr_isdigit(self, space):
+        if rswar.is_ascii_digits(self._utf8):
+            return space.w_True
+        return self._is_generic(space, '_isdigit')
+
     def descr_isdecimal(self, space):
+        if rswar.is_ascii_digits(self._utf8):
+            return space.w_True
         return self._is_generic(space, '_isdecimal')
 
     def descr_isnumeric(self, space):
+        if rswar.is_ascii_digits(self._utf8):
+            return space.w_True
         return self._is_generic(space, '_isnumeric')
 
     def descr_islower(self, space):
@@ -861,6 +888,15 @@ class W_UnicodeObject(W_Root):
             if e.match(space, space.w_TypeError):
                 return space.w_NotImplemented
             raise
+        if space.config.objspace.std.withstrbuf:
+            from pypy.objspace.std import strbufobject
+            if (len(self._utf8) + len(w_other._utf8) >=
+                    strbufobject.MIN_BUFFER_LENGTH):
+                builder = StringBuilder()
+                builder.append(self._utf8)
+                builder.append(w_other._utf8)
+                return strbufobject.W_UnicodeBufferObject(
+                    builder, self._len() + w_other._len())
         return W_UnicodeObject(self._utf8 + w_other._utf8,
                                self._len() + w_other._len())
 
@@ -901,11 +937,22 @@ class W_UnicodeObject(W_Root):
         pos = 0
         while pos < length:
             sol = pos
-            lgt = 0
-            while pos < length and not self._islinebreak(rutf8.codepoint_at_pos(value, pos)):
+            # all line breaks start with a byte below 0x1f or above 0x7f,
+            # quickly skip the characters that cannot be one
+            while True:
+                pos = rswar.find_outside_ascii_range(value, '\x1f', '\x7f',
+                                                     pos, length)
+                if pos < 0:
+                    pos = length
+                    break
+                if self._islinebreak(rutf8.codepoint_at_pos(value, pos)):
+                    break
                 pos = rutf8.next_codepoint_pos(value, pos)
-                lgt += 1
             eol = pos
+            if self.is_ascii():
+                lgt = eol - sol
+            else:
+                lgt = rutf8.codepoints_in_utf8(value, sol, eol)
             if pos < length:
                 # read CRLF as one line break
                 if (value[pos] == '\r' and pos + 1 < length
@@ -1593,13 +1640,13 @@ def decode_object(space, w_obj, encoding, errors=None):
     w_codec_info = lookup_text_codec(space, 'decode', encoding)
     w_encfunc = space.getitem(w_codec_info, space.newint(1))
     w_retval = _call_codec(space, w_encfunc, w_obj, "decoding", encoding, errors)
-    if not isinstance(w_retval, W_UnicodeObject):
+    if not isinstance(w_retval, W_AbstractUnicodeObject):
         raise oefmt(space.w_TypeError,
                     "'%s' decoder returned '%T' instead of 'str'; "
                     "use codecs.decode() to decode to arbitrary types",
                     encoding,
                     w_retval)
-    return w_retval
+    return w_retval.convert_to_w_unicode(space)
 
 def unicode_from_object(space, w_obj):
     if space.is_w(space.type(w_obj), space.w_unicode):
@@ -2091,13 +2138,11 @@ W_UnicodeObject.typedef = TypeDef(
 
     __iter__ = interp2app(W_UnicodeObject.descr_iter,
                          doc=UnicodeDocstrings.__iter__.__doc__),
-    __len__ = interp2app(W_UnicodeObject.descr_len,
-                         doc=UnicodeDocstrings.__len__.__doc__),
+    __len__ = interpindirect2app(W_AbstractUnicodeObject.descr_len),
     __contains__ = interp2app(W_UnicodeObject.descr_contains,
                               doc=UnicodeDocstrings.__contains__.__doc__),
 
-    __add__ = interp2app(W_UnicodeObject.descr_add,
-                         doc=UnicodeDocstrings.__add__.__doc__),
+    __add__ = interpindirect2app(W_AbstractUnicodeObject.descr_add),
     __mul__ = interp2app(W_UnicodeObject.descr_mul,
                          doc=UnicodeDocstrings.__mul__.__doc__),
     __rmul__ = interp2app(W_UnicodeObject.descr_mul,
@@ -2227,8 +2272,9 @@ W_UnicodeObject.EMPTY = W_UnicodeObject('', 0)
 # UnicodeEncodeError.
 
 def unicode_to_decimal_w(space, w_unistr):
-    if not isinstance(w_unistr, W_UnicodeObject):
+    if not isinstance(w_unistr, W_AbstractUnicodeObject):
         raise oefmt(space.w_TypeError, "expected unicode, got '%T'", w_unistr)
+    w_unistr = w_unistr.convert_to_w_unicode(space)
     if w_unistr.is_ascii():
         # fast path
         return w_unistr._utf8
@@ -0,0 +1,72 @@
+"""
+Run the same CPU-bound pure-Python workloads in 1, 2, 4... threads and
+print how much faster they complete than in a single thread.  With the
+GIL the speedup stays around 1.0; a build with --nogil should get close
+to the number of threads.
+
+    pypy thread-scaling-bench.py [max_threads] [repeat]
+"""
+
+import sys
+import time
+import threading
+
+N = 200000
+
+
+def loop(n):
+    total = 0
+    for i in range(n):
+        total += i % 7
+    return total
+
+def dicts(n):
+    for i in range(n // 10):
+        d = {}
+        for j in range(10):
+            d[str(j)] = j
+        d.pop('5')
+
+def lists(n):
+    for i in range(n // 10):
+        l = []
+        for j in range(10):
+            l.append(j * 1.5)
+        l.sort()
+
+def objects(n):
+    class Point(object):
+        def __init__(self, x, y):
+            self.x = x
+            self.y = y
+    p = Point(0, 0)
+    for i in range(n):
+        p = Point(p.y, p.x + 1)
+
+WORKLOADS = [loop, dicts, lists, objects]
+
+
+def run(func, nthreads, repeat):
+    # every thread does the full work: ideally the time doesn't grow
+    threads = [threading.Thread(target=func, args=(N * repeat,))
+               for i in range(nthreads)]
+    start = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.time() - start
+
+def main(max_threads=4, repeat=10):
+    for func in WORKLOADS:
+        func(N)     # warm up the JIT
+        base = run(func, 1, repeat)
+        nthreads = 1
+        while nthreads <= max_threads:
+            t = run(func, nthreads, repeat)
+            print("%-8s %2d threads: %6.2fs  speedup %.2f" % (
+                func.__name__, nthreads, t, base * nthreads / t))
+            nthreads *= 2
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,98 @@
+#! /usr/bin/env python
+"""
+Compares two heap snapshots produced by gc.dump_heap_snapshot(), and prints
+the types whose total size grew the most between the two, together with the
+types of the objects that hold the new references to them.
+
+Syntax:  heapdiff.py  [-n N]  <before>  <after>
+
+-n N   show the N types that grew the most (default 20)
+"""
+from __future__ import print_function
+import sys
+
+MAGIC = 'pypy-heap-snapshot 1'
+
+
+class Snapshot(object):
+    def __init__(self):
+        self.types = {}     # {name: [count, totalsize]}
+        self.edges = {}     # {(referrer name, referent name): count}
+
+    def load(self, filename_or_lines):
+        if isinstance(filename_or_lines, str):
+            with open(filename_or_lines) as f:
+                lines = f.read().split('\n')
+        else:
+            lines = list(filename_or_lines)
+        if not lines or lines[0] != MAGIC:
+            raise ValueError("not a heap snapshot file")
+        names = []
+        for line in lines[1:]:
+            words = line.split('\t')
+            if words[0] == 'T':
+                name = words[3]
+                names.append(name)
+                # two RPython types can have the same app-level name
+                stat = self.types.setdefault(name, [0, 0])
+                stat[0] += int(words[1])
+                stat[1] += int(words[2])
+            elif words[0] == 'E':
+                key = (names[int(words[2])], names[int(words[3])])
+                self.edges[key] = self.edges.get(key, 0) + int(words[1])
+        return self
+
+
+def diff_types(before, after):
+    """Return a list of (size delta, count delta, name), the biggest growth
+    first."""
+    result = []
+    for name in set(before.types) | set(after.types):
+        count0, size0 = before.types.get(name, (0, 0))
+        count1, size1 = after.types.get(name, (0, 0))
+        if (count0, size0) != (count1, size1):
+            result.append((size1 - size0, count1 - count0, name))
+    result.sort(key=lambda item: (-item[0], -item[1], item[2]))
+    return result
+
+def diff_referrers(before, after, name):
+    """Return a list of (delta, referrer name) for the references to
+    objects of type 'name', the biggest growth first."""
+    result = []
+    keys = set(before.edges) | set(after.edges)
+    for key in keys:
+        if key[1] == name:
+            delta = after.edges.get(key, 0) - before.edges.get(key, 0)
+            if delta != 0:
+                result.append((delta, key[0]))
+    result.sort(key=lambda item: (-item[0], item[1]))
+    return result
+
+def format_size(size):
+    if abs(size) < 1024 * 1024:
+        return '%+.1fK' % (size / 1024.0)
+    return '%+.1fM' % (size / (1024.0 * 1024.0))
+
+def print_diff(before, after, limit=20, out=sys.stdout):
+    types = diff_types(before, after)
+    total = sum([item[0] for item in types])
+    print('total %s' % format_size(total), file=out)
+    print(file=out)
+    print('%10s %10s  %s' % ('size', 'count', 'type'), file=out)
+    for size, count, name in types[:limit]:
+        print('%10s %+10d  %s' % (format_size(size), count, name), file=out)
+        for delta, referrer in diff_referrers(before, after, name)[:3]:
+            print('%21s  %+d references from %s' % ('', delta, referrer),
+                  file=out)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    limit = 20
+    if len(args) >= 2 and args[0] == '-n':
+        limit = int(args[1])
+        del args[:2]
+    if len(args) != 2:
+        print(__doc__, file=sys.stderr)
+        sys.exit(2)
+    print_diff(Snapshot().load(args[0]), Snapshot().load(args[1]), limit)
@@ -0,0 +1,49 @@
+from pypy.tool.heapdiff import Snapshot, diff_types, diff_referrers, print_diff
+
+
+BEFORE = """pypy-heap-snapshot 1
+T\t10\t400\tlist
+T\t5\t200\tdict
+T\t1\t64\tmod.Cache
+E\t3\t2\t0
+E\t5\t0\t1
+"""
+
+AFTER = """pypy-heap-snapshot 1
+T\t1\t64\tmod.Cache
+T\t110\t4400\tlist
+T\t5\t200\tdict
+T\t2\t80\t<rpy type 12>
+E\t103\t0\t1
+E\t5\t1\t2
+"""
+
+def load(text):
+    return Snapshot().load(text.split('\n'))
+
+def test_load():
+    snap = load(AFTER)
+    assert snap.types == {'mod.Cache': [1, 64], 'list': [110, 4400],
+                          'dict': [5, 200], '<rpy type 12>': [2, 80]}
+    assert snap.edges == {('mod.Cache', 'list'): 103, ('list', 'dict'): 5}
+
+def test_diff_types():
+    assert diff_types(load(BEFORE), load(AFTER)) == [
+        (4000, 100, 'list'), (80, 2, '<rpy type 12>')]
+    assert diff_types(load(AFTER), load(BEFORE)) == [
+        (-80, -2, '<rpy type 12>'), (-4000, -100, 'list')]
+
+def test_diff_referrers():
+    assert diff_referrers(load(BEFORE), load(AFTER), 'list') == [
+        (100, 'mod.Cache')]
+    assert diff_referrers(load(BEFORE), load(AFTER), 'dict') == []
+
+def test_print_diff():
+    import StringIO
+    out = StringIO.StringIO()
+    print_diff(load(BEFORE), load(AFTER), limit=1, out=out)
+    lines = out.getvalue().splitlines()
+    assert lines[0] == 'total +4.0K'
+    assert lines[3].split() == ['+3.9K', '+100', 'list']
+    assert lines[4].split() == ['+100', 'references', 'from', 'mod.Cache']
+    assert len(lines) == 5
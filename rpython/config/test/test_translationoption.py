@@ -31,3 +31,13 @@ def test_get_translation_config():
     assert t.context.annotator.binding(retvar).const
 
     assert get_translation_config() is config # check during import time
+
+def test_nogil_not_implemented():
+    from rpython.translator.interactive import Translation
+    config = get_combined_translation_config()
+    config.translation.nogil = True
+    assert config.translation.thread
+    assert config.translation.gc == "incminimark"
+    e = py.test.raises(ConfigError, translationoption.check_nogil, config)
+    assert "thread-local nurseries" in str(e.value)
+    py.test.raises(ConfigError, Translation, lambda x: x, [int], nogil=True)
@@ -106,6 +106,11 @@ translation_optiondescription = OptionDescription(
     # other noticeable options
     BoolOption("thread", "enable use of threading primitives",
                default=False, cmdline="--thread"),
+    BoolOption("nogil", "EXPERIMENTAL: run the threads in parallel, "
+               "without a global interpreter lock (not implemented yet)",
+               default=False, cmdline="--nogil",
+               requires=[("translation.thread", True),
+                         ("translation.gc", "incminimark")]),
     BoolOption("sandbox", "Produce a fully-sandboxed executable",
                default=False, cmdline="--sandbox",
                suggests=[("translation.gc", "generation"),
@@ -407,6 +412,27 @@ def set_opt_level(config, level):
 
 # ----------------------------------------------------------------
 
+# the parts of translation.nogil that are still missing.  Until they
+# are all written, a translation with --nogil stops before annotation
+# instead of producing an executable that would crash.
+NOGIL_MISSING = [
+    "thread-local nurseries and a thread-safe major collection in "
+    "rpython/memory/gc/incminimark.py",
+    "a thread-safe write barrier in rpython/memory/gctransform/framework.py "
+    "and in the JIT backends",
+    "releasing the GIL for good in rpython/rlib/rgil.py and in "
+    "pypy/module/thread/gil.py",
+    "per-object or striped locks around the changes of the list and dict "
+    "strategies in pypy/objspace/std",
+]
+
+def check_nogil(config):
+    """Refuse translation.nogil, which is not implemented yet."""
+    if config.translation.nogil:
+        raise ConfigError("--nogil is not implemented yet; missing:\n  - " +
+                          "\n  - ".join(NOGIL_MISSING))
+
+
 def set_platform(config):
     from rpython.translator.platform import set_platform
     set_platform(config.translation.platform, config.translation.cc)
@@ -2164,6 +2164,10 @@ class MetaInterpStaticData(object):
         self._addr2name_keys = []
         self._addr2name_values = []
 
+        # loops whose trace is finished but which are not compiled yet,
+        # oldest first; see MetaInterp.defer_compile_loop()
+        self.deferred_loops = []
+
         compile.make_and_attach_done_descrs([self, cpu])
 
     def _freeze_(self):
@@ -2288,6 +2292,26 @@ class MetaInterpStaticData(object):
         if self.warmrunnerdesc is not None:       # for tests
             self.warmrunnerdesc.memory_manager.next_generation()
 
+    def compile_deferred_loops(self, limit=-1):
+        """Compile up to 'limit' of the loops waiting in the queue (all of
+        them if 'limit' is negative), oldest first.  Returns the number of
+        loops that were actually compiled.
+        """
+        count = 0
+        while self.deferred_loops and limit != 0:
+            deferred = self.deferred_loops.pop(0)
+            if deferred.compile():
+                count += 1
+            limit -= 1
+        return count
+
+    def make_room_for_deferred_loop(self, max_pending):
+        # called before we start tracing a new loop.  With max_pending == 0
+        # this compiles whatever is still waiting in the queue.
+        extra = len(self.deferred_loops) - max_pending + 1
+        if extra > 0 and self.deferred_loops:
+            self.compile_deferred_loops(extra)
+
     # ---------------- logging ------------------------
 
     def log(self, msg):
@@ -2951,6 +2975,10 @@ class MetaInterp(object):
                     self.staticdata.log('cancelled too many times!')
                     raise SwitchToBlackhole(Counters.ABORT_BAD_LOOP)
             else:
+                if (self.jitdriver_sd.warmstate.compile_deferred > 0 and
+                        self.cancel_count == 0):
+                    self.defer_compile_loop(original_boxes, live_arg_boxes,
+                                            start, can_use_unroll)
                 target_token = self.compile_loop(
                     original_boxes, live_arg_boxes, start,
                     use_unroll=can_use_unroll)
@@ -2984,6 +3012,33 @@ class MetaInterp(object):
             else: assert 0
         return ints[:], refs[:], floats[:]
 
+    def defer_compile_loop(self, original_boxes, live_arg_boxes, start,
+                           use_unroll):
+        """Instead of compiling the loop we just closed, put it in the
+        queue of MetaInterpStaticData.deferred_loops and go back to the
+        interpreter.  The loop is installed later, when the queue is
+        compiled; until then the JitCell is marked JC_COMPILE_PENDING so
+        that we don't trace the same loop again.  A quasi-immutable field
+        that changes in the meantime makes the optimizer reject the trace,
+        as it does when the field changes during tracing.
+        """
+        num_green_args = self.jitdriver_sd.num_green_args
+        greenkey = original_boxes[:num_green_args]
+        self.jitdriver_sd.warmstate.mark_compile_pending(greenkey, True)
+        self.staticdata.deferred_loops.append(
+            DeferredLoop(self, original_boxes, live_arg_boxes, start,
+                         use_unroll))
+        self.staticdata.log('compilation deferred')
+        self._raise_continue_running_normally(live_arg_boxes)
+
+    def _raise_continue_running_normally(self, live_arg_boxes):
+        num_green_args = self.jitdriver_sd.num_green_args
+        gi, gr, gf = self._unpack_boxes(live_arg_boxes, 0, num_green_args)
+        ri, rr, rf = self._unpack_boxes(live_arg_boxes, num_green_args,
+                                        len(live_arg_boxes))
+        CRN = jitexc.ContinueRunningNormally
+        raise CRN(gi, gr, gf, ri, rr, rf)
+
     def raise_continue_running_normally(self, live_arg_boxes, loop_token):
         self.history.inputargs = None
         self.history.operations = None
@@ -2992,12 +3047,7 @@ class MetaInterp(object):
         # interpreted mode, but it should come back very quickly to the
         # JIT, find probably the same 'loop_token', and execute it.
         if we_are_translated():
-            num_green_args = self.jitdriver_sd.num_green_args
-            gi, gr, gf = self._unpack_boxes(live_arg_boxes, 0, num_green_args)
-            ri, rr, rf = self._unpack_boxes(live_arg_boxes, num_green_args,
-                                            len(live_arg_boxes))
-            CRN = jitexc.ContinueRunningNormally
-            raise CRN(gi, gr, gf, ri, rr, rf)
+            self._raise_continue_running_normally(live_arg_boxes)
         else:
             # However, in order to keep the existing tests working
             # (which are based on the assumption that 'loop_token' is
@@ -3639,6 +3689,43 @@ class ChangeFrame(jitexc.JitException):
 
 # ____________________________________________________________
 
+class DeferredLoop(object):
+    """A loop whose trace is finished, waiting to be compiled.  It keeps
+    the MetaInterp that recorded the trace alive until then."""
+
+    def __init__(self, metainterp, original_boxes, live_arg_boxes, start,
+                 use_unroll):
+        self.metainterp = metainterp
+        self.original_boxes = original_boxes
+        self.live_arg_boxes = live_arg_boxes
+        self.start = start
+        self.use_unroll = use_unroll
+
+    def compile(self):
+        metainterp = self.metainterp
+        self.metainterp = None
+        jitdriver_sd = metainterp.jitdriver_sd
+        greenkey = self.original_boxes[:jitdriver_sd.num_green_args]
+        jitdriver_sd.warmstate.mark_compile_pending(greenkey, False)
+        if has_compiled_targets(metainterp.get_procedure_token(greenkey)):
+            return False    # already compiled from somewhere else
+        debug_start('jit-compile-deferred')
+        try:
+            target_token = metainterp.compile_loop(
+                self.original_boxes, self.live_arg_boxes, self.start,
+                use_unroll=self.use_unroll)
+            if target_token is None and self.use_unroll:
+                # we can't trace again to retry, so try once without
+                # unrolling, like we do when retracing failed too often
+                target_token = metainterp.compile_loop(
+                    self.original_boxes, self.live_arg_boxes, self.start,
+                    use_unroll=False)
+        finally:
+            debug_stop('jit-compile-deferred')
+        return target_token is not None
+
+# ____________________________________________________________
+
 def _get_opimpl_method(name, argcodes):
     from rpython.jit.metainterp.blackhole import signedord
     if (name, argcodes) in special_handlers:
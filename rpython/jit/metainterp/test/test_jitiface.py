@@ -1,6 +1,7 @@
 
 import py
 from rpython.rlib.jit import JitDriver, JitHookInterface, Counters, dont_look_inside
+from rpython.rlib.jit import set_param
 from rpython.rlib import jit_hooks
 from rpython.jit.metainterp.test.support import LLJitMixin
 from rpython.jit.codewriter.policy import JitPolicy
@@ -349,6 +350,45 @@ class JitHookInterfaceTests(object):
                                no_stats_history=True)
         assert res == 42
 
+    def test_compile_deferred(self):
+        driver = JitDriver(greens = [], reds = ['i', 's'])
+        def loop(i):
+            s = 0
+            while i > 0:
+                driver.jit_merge_point(i=i, s=s)
+                s += i
+                i -= 1
+            return s
+        def num_loops():
+            return jit_hooks.stats_get_counter_value(None,
+                                           Counters.TOTAL_COMPILED_LOOPS)
+        def main():
+            set_param(driver, 'compile_deferred', 5)
+            if loop(30) != 465:
+                return 1
+            # the trace is finished but waits to be compiled
+            if num_loops() != 0:
+                return 1000 + num_loops()
+            if loop(30) != 465:
+                return 2
+            if num_loops() != 0:
+                return 1500 + num_loops()
+            if jit_hooks.stats_compile_deferred(None, -1) != 1:
+                return 3
+            if num_loops() != 1:
+                return 2000 + num_loops()
+            if jit_hooks.stats_compile_deferred(None, -1) != 0:
+                return 4
+            if loop(30) != 465:
+                return 5
+            if num_loops() != 1:
+                return 2500 + num_loops()
+            return 42
+
+        res = self.meta_interp(main, [], ProfilerClass=Profiler)
+        assert res == 42
+        self.check_jitcell_token_count(1)
+
 
 class LLJitHookInterfaceTests(JitHookInterfaceTests):
     # use this for any backend, instead of the super class
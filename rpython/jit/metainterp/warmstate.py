@@ -133,6 +133,7 @@ JC_DONT_TRACE_HERE = 0x02
 JC_TEMPORARY       = 0x04
 JC_TRACING_OCCURRED= 0x08
 JC_FORCE_FINISH    = 0x10
+JC_COMPILE_PENDING = 0x20
 
 class BaseJitCell(object):
     """Subclasses of BaseJitCell are used in tandem with the single
@@ -183,6 +184,10 @@ class BaseJitCell(object):
         JC_FORCE_FINISH: when from a cell with that flag set, if the trace
         becomes too long, "segment" it, ie finish it with a guard_always_fails.
         this prevents re-tracing and failing this again and again.
+
+        JC_COMPILE_PENDING: the trace of the loop from this greenkey is
+        finished and waits in MetaInterpStaticData.deferred_loops to be
+        compiled.  Until then we keep interpreting without tracing again.
     """
     flags = 0     # JC_xxx flags
     wref_procedure_token = None
@@ -212,7 +217,7 @@ class BaseJitCell(object):
     def should_remove_jitcell(self):
         if self.get_procedure_token() is not None:
             return False    # don't remove JitCells with a procedure_token
-        if self.flags & JC_TRACING:
+        if self.flags & (JC_TRACING | JC_COMPILE_PENDING):
             return False    # don't remove JitCells that are being traced
         if self.flags & JC_DONT_TRACE_HERE:
             # if we have this flag, and we *had* a procedure_token but
@@ -328,6 +333,11 @@ class WarmEnterState(object):
     def set_param_vec_cost(self, ivalue):
         self.vec_cost = ivalue
 
+    def set_param_compile_deferred(self, value):
+        if value < 0:
+            raise ValueError
+        self.compile_deferred = value
+
     def disable_noninlinable_function(self, greenkey):
         cell = self.JitCell.ensure_jit_cell_at_key(greenkey)
         cell.flags |= JC_DONT_TRACE_HERE
@@ -347,6 +357,13 @@ class WarmEnterState(object):
             # is a pointless optimization (it is tiny).
             old_token.record_jump_to(procedure_token)
 
+    def mark_compile_pending(self, greenkey, pending):
+        cell = self.JitCell.ensure_jit_cell_at_key(greenkey)
+        if pending:
+            cell.flags |= JC_COMPILE_PENDING
+        else:
+            cell.flags &= ~JC_COMPILE_PENDING
+
     # ----------
 
     def make_entry_point(self):
@@ -433,6 +450,10 @@ class WarmEnterState(object):
             if cell is None:
                 cell = JitCell(*greenargs)
                 jitcounter.install_new_cell(hash, cell)
+            # make room in the queue of loops waiting to be compiled, so
+            # that the one we are about to trace can be added to it
+            metainterp_sd.make_room_for_deferred_loop(
+                jitdriver_sd.warmstate.compile_deferred)
             # start tracing
             metainterp = MetaInterp(
                 metainterp_sd, jitdriver_sd,
@@ -470,10 +491,11 @@ class WarmEnterState(object):
 
             # Here, we have found 'cell'.
             #
-            if cell.flags & (JC_TRACING | JC_TEMPORARY):
-                if cell.flags & JC_TRACING:
+            if cell.flags & (JC_TRACING | JC_TEMPORARY | JC_COMPILE_PENDING):
+                if cell.flags & (JC_TRACING | JC_COMPILE_PENDING):
                     # tracing already happening in some outer invocation of
-                    # this function. don't trace a second time.
+                    # this function, or the trace is waiting to be compiled.
+                    # don't trace a second time.
                     return
                 # attached by compile_tmp_callback().  count normally
                 if jitcounter.tick(hash, increment_threshold):
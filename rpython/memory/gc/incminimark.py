@@ -52,6 +52,16 @@ Environment variables can be used to fine-tune the following parameters:
                          in time.  Defaults to a conservative value depending
                          on nursery size and maximum object size inside the
                          nursery.  Useful for debugging by setting it to 0.
+
+ PYPY_GC_MARK_PREFETCH   The number of objects whose header is prefetched
+                         ahead of being marked.  Defaults to 8.  Larger
+                         values are clamped to 64, and 0 disables
+                         prefetching.
+
+ PYPY_GC_BACKGROUND_FREE If set to a non-zero value, the memory of the large
+                         objects and of the arenas that die in a major
+                         collection is given back to the system by a
+                         separate thread.  Only in builds with threads.
 """
 # XXX Should find a way to bound the major collection threshold by the
 # XXX total addressable size.  Maybe by keeping some minimarkpage arenas
@@ -194,6 +204,9 @@ FORWARDSTUB = lltype.GcStruct('forwarding_stub',
 FORWARDSTUBPTR = lltype.Ptr(FORWARDSTUB)
 NURSARRAY = lltype.Array(llmemory.Address)
 
+# the maximum value of PYPY_GC_MARK_PREFETCH
+MAX_MARK_PREFETCH = 64
+
 # ____________________________________________________________
 
 
@@ -276,6 +289,10 @@ class IncrementalMiniMarkGC(MovingGCBase):
         # minimal allocated size of the nursery is 2x the following
         # number (by default, at least 132KB on 32-bit and 264KB on 64-bit).
         "large_object": (16384+512)*WORD,
+
+        # During marking, the header of this many objects is prefetched
+        # before we look at them.  See visit_all_objects_step().
+        "mark_prefetch": 8,
         }
 
     def __init__(self, config,
@@ -289,6 +306,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
                  growth_rate_max=2.5,   # for tests
                  card_page_indices=0,
                  large_object=8*WORD,
+                 mark_prefetch=0,
+                 background_free=False,
                  ArenaCollectionClass=None,
                  **kwds):
         "NOT_RPYTHON"
@@ -306,6 +325,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.max_heap_size_already_raised = False
         self.max_delta = float(r_uint(-1))
         self.max_number_of_pinned_objects = 0      # computed later
+        assert 0 <= mark_prefetch <= MAX_MARK_PREFETCH
+        self.mark_prefetch = mark_prefetch
         #
         self.card_page_indices = card_page_indices
         if self.card_page_indices > 0:
@@ -330,6 +351,9 @@ class IncrementalMiniMarkGC(MovingGCBase):
             ArenaCollectionClass = minimarkpage.ArenaCollection
         self.ac = ArenaCollectionClass(arena_size, page_size,
                                        small_request_threshold)
+        self.background_free = False
+        if background_free:
+            self._enable_background_free()
         #
         # Used by minor collection: a list of (mostly non-young) objects that
         # (may) contain a pointer to a young object.  Populated by
@@ -396,6 +420,13 @@ class IncrementalMiniMarkGC(MovingGCBase):
         # collection.
         self.probably_young_objects_with_finalizers = self.AddressDeque()
         self.old_objects_with_finalizers = self.AddressDeque()
+        #
+        # The objects popped from 'objects_to_trace' whose header is being
+        # prefetched, used as a ring by visit_all_objects_step()
+        self.mark_prefetch_ring = lltype.malloc(self._ADDRARRAY,
+                                                MAX_MARK_PREFETCH,
+                                                flavor='raw',
+                                                track_allocation=False)
         p = lltype.malloc(self._ADDRARRAY, 1, flavor='raw',
                           track_allocation=False)
         self.singleaddr = llmemory.cast_ptr_to_adr(p)
@@ -505,6 +536,16 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 self.gc_nursery_debug = True
             else:
                 self.gc_nursery_debug = False
+            #
+            if os.environ.get('PYPY_GC_MARK_PREFETCH'):   # may be 0
+                mark_prefetch = env.read_uint_from_env('PYPY_GC_MARK_PREFETCH')
+                if mark_prefetch > MAX_MARK_PREFETCH:
+                    mark_prefetch = r_uint(MAX_MARK_PREFETCH)
+                self.mark_prefetch = intmask(mark_prefetch)
+            #
+            background_free = env.read_uint_from_env('PYPY_GC_BACKGROUND_FREE')
+            if background_free > 0 and self.config.thread:
+                self._enable_background_free()
             self._minor_collection()    # to empty the nursery
             llarena.arena_free(self.nursery)
             self.nursery_size = newsize
@@ -2611,9 +2652,20 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 arena -= extra_words * WORD
                 allocsize += extra_words * WORD
             #
-            llarena.arena_free(arena)
+            if self.background_free:
+                llarena.arena_free_background(arena)
+            else:
+                llarena.arena_free(arena)
             self.rawmalloced_total_size -= r_uint(allocsize)
 
+    def _enable_background_free(self):
+        # The sweeping itself stays here: it reads and writes the GC
+        # headers, which the mutator uses too.  Only the free() calls of
+        # the dying large objects and empty arenas, which can be slow
+        # (munmap), are done by a separate thread.  See gc_bgfree.c.
+        self.background_free = True
+        self.ac.background_free = True
+
     def start_free_rawmalloc_objects(self):
         ll_assert(not self.raw_malloc_might_sweep.non_empty(),
                   "raw_malloc_might_sweep must be empty")
@@ -2694,6 +2746,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
     TEST_VISIT_SINGLE_STEP = False    # for tests
 
     def visit_all_objects_step(self, size_to_track):
+        if self.mark_prefetch > 0:
+            return self._visit_all_objects_step_prefetch(size_to_track)
         # Objects can be added to pending by visit
         pending = self.objects_to_trace
         while pending.non_empty():
@@ -2703,6 +2757,55 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 return 0
         return size_to_track
 
+    def _visit_all_objects_step_prefetch(self, size_to_track):
+        # Same as above, but the objects popped from 'pending' first wait
+        # in a small ring while their header is prefetched.  Marking a large
+        # heap is mostly waiting for cache misses on the headers of objects
+        # all over the place; this way, 'mark_prefetch' of them are fetched
+        # in parallel instead of one after the other.  The order in which
+        # objects are visited is not important.
+        pending = self.objects_to_trace
+        ring = self.mark_prefetch_ring
+        ringsize = self.mark_prefetch
+        size_gc_header = self.gcheaderbuilder.size_gc_header
+        first = 0    # index of the oldest object in the ring
+        count = 0    # number of objects in the ring
+        while True:
+            if pending.non_empty():
+                obj = pending.pop()
+                llop.raw_prefetch(lltype.Void, obj - size_gc_header)
+                if count < ringsize:
+                    index = first + count
+                    if index >= ringsize:
+                        index -= ringsize
+                    ring[index] = obj
+                    count += 1
+                    continue
+                # the ring is full: visit the oldest object and put the
+                # new one in its place, where it becomes the newest
+                oldest = ring[first]
+                ring[first] = obj
+            elif count > 0:
+                oldest = ring[first]
+                count -= 1
+            else:
+                break
+            first += 1
+            if first == ringsize:
+                first = 0
+            size_to_track -= self.visit(oldest)
+            if size_to_track < 0 or self.TEST_VISIT_SINGLE_STEP:
+                # put the objects still in the ring back into 'pending'
+                # for the next step
+                while count > 0:
+                    pending.append(ring[first])
+                    first += 1
+                    if first == ringsize:
+                        first = 0
+                    count -= 1
+                return 0
+        return size_to_track
+
     def visit(self, obj):
         #
         # 'obj' is a live object.  Check GCFLAG_VISITED to know if we
@@ -137,6 +137,10 @@ class ArenaCollection(object):
         # part of current_arena might still contain uninitialized pages
         self.num_uninitialized_pages = 0
         #
+        # if True, the empty arenas are given to a background thread
+        # to be free()d; set by the GC
+        self.background_free = False
+        #
         # the total memory used, counting every block in use, without
         # the additional bookkeeping stuff.
         self.total_memory_used = r_uint(0)
@@ -406,7 +410,10 @@ class ArenaCollection(object):
                     #
                     # The whole arena is empty.  Free it.
                     llarena.arena_reset(arena.base, self.arena_size, 4)
-                    llarena.arena_free(arena.base)
+                    if self.background_free:
+                        llarena.arena_free_background(arena.base)
+                    else:
+                        llarena.arena_free(arena.base)
                     self.total_memory_alloced -= self.arena_size
                     lltype.free(arena, flavor='raw', track_allocation=False)
                     self.arenas_count -= 1
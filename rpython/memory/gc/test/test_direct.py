@@ -695,6 +695,62 @@ class TestIncrementalMiniMarkGCSimple(TestMiniMarkGCSimple):
         assert obj3.x == 456     # it is populated now
 
 
+class TestIncrementalMiniMarkGCMarkPrefetch(TestIncrementalMiniMarkGCSimple):
+    GC_PARAMS = TestIncrementalMiniMarkGCSimple.GC_PARAMS.copy()
+    GC_PARAMS['mark_prefetch'] = 3
+
+    def test_visit_step_keeps_pending_objects(self):
+        for i in range(10):
+            curobj = self.malloc(S)
+            curobj.x = i
+            self.stackroots.append(curobj)
+        self.gc.debug_gc_step_until(incminimark.STATE_MARKING)
+        self.gc._minor_collection()
+        # stops after the first object; the ones in the prefetch ring
+        # must go back to 'objects_to_trace'
+        self.gc.visit_all_objects_step(1)
+        visited = [obj for obj in self.stackroots
+                   if self.gc.header(llmemory.cast_ptr_to_adr(obj)).tid &
+                      incminimark.GCFLAG_VISITED]
+        assert len(visited) == 1
+        assert self.gc.objects_to_trace.length() >= 9
+        self.gc.visit_all_objects()
+        for obj in self.stackroots:
+            hdr = self.gc.header(llmemory.cast_ptr_to_adr(obj))
+            assert hdr.tid & incminimark.GCFLAG_VISITED
+
+    def test_mark_prefetch_from_env(self, monkeypatch):
+        from rpython.config.translationoption import get_combined_translation_config
+        config = get_combined_translation_config(translating=True).translation
+        monkeypatch.setenv('PYPY_GC_NURSERY', '64KB')
+        for value, expected in [('5', 5), ('0', 0),
+                                ('1000', incminimark.MAX_MARK_PREFETCH)]:
+            monkeypatch.setenv('PYPY_GC_MARK_PREFETCH', value)
+            gc = self.GCClass(config, read_from_env=True,
+                              translated_to_c=False)
+            gc.set_root_walker(self.rootwalker)
+            gc.setup()
+            assert gc.mark_prefetch == expected
+
+
+class TestIncrementalMiniMarkGCBackgroundFree(TestIncrementalMiniMarkGCSimple):
+    GC_PARAMS = TestIncrementalMiniMarkGCSimple.GC_PARAMS.copy()
+    GC_PARAMS['background_free'] = True
+
+    def test_background_free_large_objects(self):
+        assert self.gc.background_free
+        assert self.gc.ac.background_free
+        for i in range(5):
+            self.stackroots.append(self.malloc(VAR, 1000))
+        self.gc.collect()
+        size_before = self.gc.rawmalloced_total_size
+        assert size_before > 0
+        del self.stackroots[1:]
+        self.gc.collect()
+        size_after = self.gc.rawmalloced_total_size
+        assert 0 < size_after < size_before / 4
+
+
 class TestIncrementalMiniMarkGCFull(DirectGCTest):
     from rpython.memory.gc.incminimark import IncrementalMiniMarkGC as GCClass
     def test_malloc_fixedsize_no_cleanup(self):
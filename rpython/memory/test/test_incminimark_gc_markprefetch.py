@@ -0,0 +1,4 @@
+from rpython.memory.test import test_incminimark_gc
+
+class TestIncrementalMiniMarkGCMarkPrefetch(test_incminimark_gc.TestIncrementalMiniMarkGC):
+    GC_PARAMS = {'mark_prefetch': 3}
@@ -583,6 +583,10 @@ PARAMETER_DOCS = {
     'vec_cost': 'threshold for which traces to bail. Unpacking increases the counter,'\
                 ' vector operation decrease the cost',
     'vec_all': 'try to vectorize trace loops that occur outside of the numpypy library',
+    'compile_deferred': 'if non-zero, queue up to this many finished loop '
+                        'traces instead of compiling them immediately; the '
+                        'queue is compiled when it is full or when the '
+                        'interpreter asks for it',
 }
 
 PARAMETERS = {'threshold': 1039, # just above 1024, prime
@@ -602,6 +606,7 @@ PARAMETERS = {'threshold': 1039, # just above 1024, prime
               'vec': 0,
               'vec_all': 0,
               'vec_cost': 0,
+              'compile_deferred': 0,
               }
 unroll_parameters = unrolling_iterable(PARAMETERS.items())
 
@@ -132,6 +132,13 @@ def stats_asmmemmgr_used(warmrunnerdesc):
 def stats_memmgr_release_all(warmrunnerdesc):
     warmrunnerdesc.memory_manager.release_all_loops()
 
+@register_helper(annmodel.SomeInteger())
+def stats_compile_deferred(warmrunnerdesc, limit):
+    """Compile up to 'limit' (or all if negative) of the loops whose
+    compilation was deferred with the 'compile_deferred' parameter.
+    Returns the number of loops compiled."""
+    return warmrunnerdesc.metainterp_sd.compile_deferred_loops(limit)
+
 # ---------------------- jitcell interface ----------------------
 
 def _new_hook(name, resulttype):
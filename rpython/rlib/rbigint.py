@@ -89,6 +89,12 @@ else:
 
 KARATSUBA_SQUARE_CUTOFF = 2 * KARATSUBA_CUTOFF
 
+# Above TOOMCOOK_CUTOFF digits, balanced operands are multiplied with
+# Toom-Cook 3-way, which is O(N**1.465).  It does more additions and
+# exact divisions than Karatsuba, so it only wins on larger numbers.
+
+TOOMCOOK_CUTOFF = 5 * KARATSUBA_CUTOFF
+
 # For exponentiation, use the binary left-to-right algorithm
 # unless the exponent contains more than FIVEARY_CUTOFF digits.
 # In that case, do 5 bits at a time.  The potential drawback is that
@@ -777,6 +783,9 @@ class rbigint(object):
 
             if selfsize <= i:
                 result = _x_mul(self, other)
+            elif (selfsize > TOOMCOOK_CUTOFF and
+                    selfsize > 2 * ((othersize + 2) // 3)):
+                result = _tc_mul(self, other)
             else:
                 result = _k_mul(self, other)
         else:
@@ -2028,6 +2037,92 @@ ah*bh and al*bl too.
 """
 
 
+def _tcmul_split(n, size):
+    """
+    A helper for Toom-Cook multiplication (tc_mul).
+    Like _kmul_split, but splits abs(n) in three pieces such that
+    abs(n) == (high << 2*size) + (mid << size) + low, viewing the shifts
+    as being by digits.
+    """
+    hi = _extract_digits(n, 2 * size, n.numdigits())
+    mid = _extract_digits(n, size, size)
+    lo = _extract_digits(n, 0, size)
+    return hi, mid, lo
+
+def _tc_mul(a, b):
+    """
+    Toom-Cook 3-way multiplication.  Ignores the input signs, and returns
+    the absolute value of the product.  Requires a.numdigits() <=
+    b.numdigits() and a to be big enough that all three pieces of a are
+    non-empty, see rbigint.mul().
+    """
+    asize = a.numdigits()
+    bsize = b.numdigits()
+
+    # Split a & b into three pieces of k digits: a = a2*X*X + a1*X + a0.
+    # The product is a polynomial of degree 4 in X, so it is determined
+    # by its values at 5 points; evaluating a and b at 0, 1, -1, -2 and
+    # infinity, it costs 5 multiplies on numbers a third of the size.
+    # The interpolation sequence is the one from M. Bodrato, "Towards
+    # Optimal Toom-Cook Multiplication for Univariate and Multivariate
+    # Polynomials in Characteristic 2 and 0", WAIFI 2007.
+    k = (bsize + 2) // 3
+    a2, a1, a0 = _tcmul_split(a, k)
+    if a is b:
+        b2, b1, b0 = a2, a1, a0
+    else:
+        b2, b1, b0 = _tcmul_split(b, k)
+
+    # 1. Evaluation.  Only the values at -1 and -2 can be negative.
+    t = a0.add(a2)
+    a_1 = t.add(a1)
+    a_m1 = t.sub(a1)
+    a_m2 = a_m1.add(a2).lshift(1).sub(a0)
+    if a is b:
+        b_1 = a_1
+        b_m1 = a_m1
+        b_m2 = a_m2
+    else:
+        t = b0.add(b2)
+        b_1 = t.add(b1)
+        b_m1 = t.sub(b1)
+        b_m2 = b_m1.add(b2).lshift(1).sub(b0)
+
+    r0 = a0.mul(b0)
+    r1 = a_1.mul(b_1)
+    rm1 = a_m1.mul(b_m1)
+    rm2 = a_m2.mul(b_m2)
+    rinf = a2.mul(b2)
+
+    # 2. Interpolation.  All the divisions are exact, and r1, r2 and r3
+    # end up being the (non-negative) middle coefficients of the product.
+    r3 = rm2.sub(r1).int_floordiv(3)
+    r1 = r1.sub(rm1).rshift(1)
+    r2 = rm1.sub(r0)
+    r3 = r2.sub(r3).rshift(1).add(rinf.lshift(1))
+    r2 = r2.add(r1).sub(rinf)
+    r1 = r1.sub(r3)
+    assert r1.get_sign() >= 0
+    assert r2.get_sign() >= 0
+    assert r3.get_sign() >= 0
+
+    # 3. Recomposition.  r0 < X*X, so r0 and rinf*X**4 don't overlap and
+    # can be copied; the other coefficients are added at their offsets.
+    # Every partial sum is at most the final product, which fits in
+    # asize + bsize digits, so the carries cannot run out of room.
+    ret = rbigint([NULLDIGIT] * (asize + bsize), 1)
+    for i in range(r0.numdigits()):
+        ret._digits[i] = r0._digits[i]
+    assert 4 * k + rinf.numdigits() <= ret.numdigits()
+    for i in range(rinf.numdigits()):
+        ret._digits[4 * k + i] = rinf._digits[i]
+    size = ret.numdigits()
+    _v_iadd(ret, k, size - k, r1, r1.numdigits())
+    _v_iadd(ret, 2 * k, size - 2 * k, r2, r2.numdigits())
+    _v_iadd(ret, 3 * k, size - 3 * k, r3, r3.numdigits())
+    ret._normalize()
+    return ret
+
 def _inplace_divrem1(pout, pin, n):
     """
     Divide bigint pin by non-zero digit n, storing quotient
@@ -0,0 +1,233 @@
+""" Word-at-a-time scanning of RPython byte strings.
+
+The functions in this module look at a whole machine word of a string at
+a time instead of one character at a time.  This style is sometimes
+called SWAR (SIMD Within A Register), see also
+pypy/module/_pypyjson/simd.py.  They give the same results as the obvious
+loops over characters, which are used for short strings and for the
+unaligned head and tail of longer strings.
+
+All functions expect 0 <= start and end <= len(s).
+"""
+
+import sys
+
+from rpython.rlib import jit
+from rpython.rlib.objectmodel import (
+    always_inline, specialize, we_are_translated_to_c)
+from rpython.rlib.rarithmetic import r_uint, intmask, LONG_BIT
+from rpython.rtyper.annlowlevel import llstr
+from rpython.rtyper.lltypesystem import lltype, llmemory
+from rpython.rtyper.lltypesystem.lloperation import llop
+from rpython.rtyper.lltypesystem.rstr import STR
+
+WORD_SIZE = LONG_BIT // 8
+EVERY_BYTE_ONE = r_uint(-1) // 0xff             # 0x0101...01
+EVERY_BYTE_HIGHEST_BIT = EVERY_BYTE_ONE * 0x80  # 0x8080...80
+EVERY_BYTE_LOW_BITS = EVERY_BYTE_ONE * 0x7f     # 0x7f7f...7f
+
+# the index computations below assume that the first character of a word
+# is in its lowest byte
+USE_SWAR = sys.byteorder == 'little'
+
+# strings shorter than that are scanned one character at a time
+MIN_LENGTH = 2 * WORD_SIZE
+
+_STR_CHARS_OFS = (llmemory.offsetof(STR, 'chars') +
+                  llmemory.itemoffsetof(STR.chars, 0))
+_CHAR_SIZE = llmemory.sizeof(lltype.Char)
+
+
+# load_word() and repeat_char() are also called by the low-level helpers
+# of str.find() and str.count(), which are annotated late, during rtyping,
+# with less precise arguments than the other callers: each call site gets
+# its own copy, so that these never have to generalize a rtyped graph
+
+@always_inline
+@specialize.call_location()
+def load_word(s, index):
+    """Return the WORD_SIZE characters of 's' starting at 'index' as an
+    unsigned word, with the first character in the lowest byte.  'index'
+    should be a multiple of WORD_SIZE."""
+    if we_are_translated_to_c():
+        return llop.gc_load_indexed(lltype.Unsigned, llstr(s), index,
+                                    _CHAR_SIZE, _STR_CHARS_OFS)
+    word = r_uint(0)
+    i = WORD_SIZE
+    while i > 0:
+        i -= 1
+        word = (word << 8) | r_uint(ord(s[index + i]))
+    return word
+
+@always_inline
+@specialize.call_location()
+def repeat_char(ch):
+    return EVERY_BYTE_ONE * r_uint(ord(ch))
+
+@always_inline
+def zero_bytes(word):
+    """Return a word with the highest bit set in exactly the bytes of 'word'
+    that are zero.  Unlike the usual (word - 0x0101...) & ~word trick there
+    are no false positives, so the result can be used for counting."""
+    t = (word & EVERY_BYTE_LOW_BITS) + EVERY_BYTE_LOW_BITS
+    return ~(t | word | EVERY_BYTE_LOW_BITS)
+
+@always_inline
+def outside_ascii_range(word, lo, hi):
+    """Return a word with the highest bit set in exactly the bytes of 'word'
+    that are not between 'lo' and 'hi' (inclusive, both below 0x80)."""
+    # the highest bit of every byte of 'ge' is set if the low 7 bits of the
+    # byte are >= lo; the highest bit of every byte of 'gt' is set if they
+    # are > hi.  There are no borrows or carries between bytes.
+    ge = (word | EVERY_BYTE_HIGHEST_BIT) - repeat_char(lo)
+    gt = (word & EVERY_BYTE_LOW_BITS) + repeat_char(chr(0x7f - ord(hi)))
+    return (word | ~ge | gt) & EVERY_BYTE_HIGHEST_BIT
+
+@always_inline
+def count_marked_bytes(mask):
+    """Number of bytes of 'mask' that have their highest bit set, when no
+    other bit is set."""
+    return intmask(((mask >> 7) * EVERY_BYTE_ONE) >> (LONG_BIT - 8))
+
+@always_inline
+def index_first_marked_byte(mask):
+    """Index of the first (lowest) byte of the non-zero 'mask' that has its
+    highest bit set, when no other bit is set."""
+    # (mask - 1) & ~mask has all the bits below the lowest marked one set
+    return count_marked_bytes((mask - 1) & ~mask & EVERY_BYTE_HIGHEST_BIT)
+
+@always_inline
+def index_last_marked_byte(mask):
+    """Index of the last (highest) byte of the non-zero 'mask' that has its
+    highest bit set, when no other bit is set."""
+    i = WORD_SIZE - 1
+    while not (mask >> (8 * i)) & 0x80:
+        i -= 1
+    return i
+
+# ____________________________________________________________
+
+@jit.elidable
+def find_char(s, ch, start, end):
+    """Index of the first 'ch' in s[start:end], or -1."""
+    i = start
+    if USE_SWAR and end - start >= MIN_LENGTH:
+        stop = (start + WORD_SIZE - 1) & ~(WORD_SIZE - 1)
+        while i < stop:
+            if s[i] == ch:
+                return i
+            i += 1
+        pattern = repeat_char(ch)
+        stop = end - WORD_SIZE
+        while i <= stop:
+            mask = zero_bytes(load_word(s, i) ^ pattern)
+            if mask:
+                return i + index_first_marked_byte(mask)
+            i += WORD_SIZE
+    while i < end:
+        if s[i] == ch:
+            return i
+        i += 1
+    return -1
+
+@jit.elidable
+def rfind_char(s, ch, start, end):
+    """Index of the last 'ch' in s[start:end], or -1."""
+    i = end
+    if USE_SWAR and end - start >= MIN_LENGTH:
+        stop = end & ~(WORD_SIZE - 1)
+        while i > stop:
+            i -= 1
+            if s[i] == ch:
+                return i
+        pattern = repeat_char(ch)
+        while i - WORD_SIZE >= start:
+            i -= WORD_SIZE
+            mask = zero_bytes(load_word(s, i) ^ pattern)
+            if mask:
+                return i + index_last_marked_byte(mask)
+    while i > start:
+        i -= 1
+        if s[i] == ch:
+            return i
+    return -1
+
+@jit.elidable
+def count_char(s, ch, start, end):
+    """Number of 'ch' in s[start:end]."""
+    count = 0
+    i = start
+    if USE_SWAR and end - start >= MIN_LENGTH:
+        stop = (start + WORD_SIZE - 1) & ~(WORD_SIZE - 1)
+        while i < stop:
+            if s[i] == ch:
+                count += 1
+            i += 1
+        pattern = repeat_char(ch)
+        stop = end - WORD_SIZE
+        while i <= stop:
+            count += count_marked_bytes(zero_bytes(load_word(s, i) ^ pattern))
+            i += WORD_SIZE
+    while i < end:
+        if s[i] == ch:
+            count += 1
+        i += 1
+    return count
+
+@jit.elidable
+def find_either_char(s, ch1, ch2, start, end):
+    """Index of the first 'ch1' or 'ch2' in s[start:end], or -1."""
+    i = start
+    if USE_SWAR and end - start >= MIN_LENGTH:
+        stop = (start + WORD_SIZE - 1) & ~(WORD_SIZE - 1)
+        while i < stop:
+            if s[i] == ch1 or s[i] == ch2:
+                return i
+            i += 1
+        pattern1 = repeat_char(ch1)
+        pattern2 = repeat_char(ch2)
+        stop = end - WORD_SIZE
+        while i <= stop:
+            word = load_word(s, i)
+            mask = zero_bytes(word ^ pattern1) | zero_bytes(word ^ pattern2)
+            if mask:
+                return i + index_first_marked_byte(mask)
+            i += WORD_SIZE
+    while i < end:
+        if s[i] == ch1 or s[i] == ch2:
+            return i
+        i += 1
+    return -1
+
+@jit.elidable
+def find_outside_ascii_range(s, lo, hi, start, end):
+    """Index of the first character of s[start:end] that is not between 'lo'
+    and 'hi' (inclusive, both must be ASCII), or -1."""
+    assert lo <= hi <= '\x7f'
+    i = start
+    if USE_SWAR and end - start >= MIN_LENGTH:
+        stop = (start + WORD_SIZE - 1) & ~(WORD_SIZE - 1)
+        while i < stop:
+            if not lo <= s[i] <= hi:
+                return i
+            i += 1
+        stop = end - WORD_SIZE
+        while i <= stop:
+            mask = outside_ascii_range(load_word(s, i), lo, hi)
+            if mask:
+                return i + index_first_marked_byte(mask)
+            i += WORD_SIZE
+    while i < end:
+        if not lo <= s[i] <= hi:
+            return i
+        i += 1
+    return -1
+
+def first_non_ascii_char(s):
+    """Index of the first character of 's' that is >= 0x80, or -1."""
+    return find_outside_ascii_range(s, '\x00', '\x7f', 0, len(s))
+
+def is_ascii_digits(s):
+    """True if 's' is non-empty and contains only the characters 0-9."""
+    return (len(s) > 0 and
+            find_outside_ascii_range(s, '0', '9', 0, len(s)) < 0)
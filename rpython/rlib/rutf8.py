@@ -16,10 +16,11 @@ extra code in the middle for error handlers and so on.
 """
 
 import sys
+import weakref
 from rpython.rlib.objectmodel import enforceargs, we_are_translated, specialize
 from rpython.rlib.objectmodel import always_inline, dont_inline, try_inline
 from rpython.rlib.rstring import StringBuilder
-from rpython.rlib import jit, types, rarithmetic
+from rpython.rlib import jit, types, rarithmetic, rswar
 from rpython.rlib.signature import signature, finishsigs
 from rpython.rlib.types import char, none
 from rpython.rlib.rarithmetic import r_uint
@@ -245,12 +246,8 @@ def check_ascii(s):
         return
     raise CheckError(res)
 
-@jit.elidable
 def first_non_ascii_char(s):
-    for i in range(len(s)):
-        if ord(s[i]) > 0x7F:
-            return i
-    return -1
+    return rswar.first_non_ascii_char(s)
 
 def islinebreak(s, pos):
     chr1 = ord(s[pos])
@@ -510,60 +507,211 @@ UTF8_INDEX_STORAGE = lltype.GcArray(lltype.Struct('utf8_loc_elem',
         ('ofs', lltype.FixedSizeArray(lltype.Char, 16)),
     ))
 
-def null_storage():
-    return lltype.nullptr(UTF8_INDEX_STORAGE)
+# accessing a codepoint that is at most CURSOR_MAX_STEP codepoints after
+# the last one accessed walks from there, without building the index
+CURSOR_MAX_STEP = 64
 
-def create_utf8_index_storage(utf8, utf8len):
-    """ Create an index storage which stores index of each 4th character
-    in utf8 encoded unicode string.
+# the indexes with at least RELEASE_MIN_ENTRIES entries (i.e. covering
+# 64 * RELEASE_MIN_ENTRIES codepoints) are freed by release_index_storages()
+RELEASE_MIN_ENTRIES = 1024
+
+
+class Utf8IndexStorage(object):
+    """ The index of the codepoints of an utf8 string with 'length'
+    codepoints.  'entries[k]' stores the byte position of the codepoint
+    64*k (in 'baseindex') and of the codepoints 64*k+1, 64*k+5, ...,
+    64*k+61 (in 'ofs', relative to 'baseindex').  The entries are only
+    computed up to the highest position asked for so far: 'filled' is the
+    number of entries computed, and 'nextpos' the byte position of the
+    codepoint 64*filled.
+
+    The last position found is also remembered in 'cursor_index' and
+    'cursor_pos', so that accessing the codepoints in order just walks
+    forward from there and doesn't need the entries at all.
+
+    Note that the functions that use the storage are @jit.elidable: they
+    can change it, but not in a way that changes any result.
     """
-    arraysize = utf8len // 64 + 1
-    storage = lltype.malloc(UTF8_INDEX_STORAGE, arraysize)
-    baseindex = 0
-    current = 0
-    while True:
-        storage[current].baseindex = baseindex
-        next = baseindex
-        for i in range(16):
-            if utf8len == 0:
-                next += 1      # assume there is an extra '\x00' character
-            else:
+
+    def __init__(self, length):
+        self.length = length
+        self.cursor_index = 0
+        self.cursor_pos = 0
+        self.release()
+
+    def release(self):
+        """ Free the entries; they are computed again if needed. """
+        self.entries = lltype.nullptr(UTF8_INDEX_STORAGE)
+        self.filled = 0
+        self.nextpos = 0
+
+    def _total_entries(self):
+        return self.length // 64 + 1
+
+    def _extend(self, utf8, current):
+        """ Compute the entries up to 'current', included. """
+        total = self._total_entries()
+        assert current < total
+        entries = self.entries
+        if not entries or len(entries) <= current:
+            oldsize = len(entries) if entries else 0
+            newsize = min(max(current + 1, oldsize * 2), total)
+            newentries = lltype.malloc(UTF8_INDEX_STORAGE, newsize)
+            for k in range(self.filled):
+                newentries[k].baseindex = entries[k].baseindex
+                for i in range(16):
+                    newentries[k].ofs[i] = entries[k].ofs[i]
+            self.entries = entries = newentries
+            if oldsize < RELEASE_MIN_ENTRIES <= newsize:
+                _big_index_storages.register(self)
+        k = self.filled
+        baseindex = self.nextpos
+        remaining = self.length - 64 * k
+        while k <= current:
+            entries[k].baseindex = baseindex
+            next = baseindex
+            for i in range(16):
+                if remaining == 0:
+                    next += 1      # assume there is an extra '\x00' character
+                else:
+                    next = next_codepoint_pos(utf8, next)
+                entries[k].ofs[i] = chr(next - baseindex)
+                remaining -= 4
+                if remaining < 0:
+                    assert k + 1 == total
+                    break
+                next = next_codepoint_pos(utf8, next)
+                next = next_codepoint_pos(utf8, next)
                 next = next_codepoint_pos(utf8, next)
-            storage[current].ofs[i] = chr(next - baseindex)
-            utf8len -= 4
-            if utf8len < 0:
-                assert current + 1 == len(storage)
-                break
-            next = next_codepoint_pos(utf8, next)
-            next = next_codepoint_pos(utf8, next)
-            next = next_codepoint_pos(utf8, next)
-        else:
-            current += 1
             baseindex = next
-            continue
-        break
-    return storage
+            k += 1
+        self.filled = k
+        self.nextpos = baseindex
+
+    def _position_from_entries(self, utf8, index):
+        current = index >> 6
+        if current >= self.filled:
+            self._extend(utf8, current)
+        ofs = ord(self.entries[current].ofs[(index >> 2) & 0x0F])
+        bytepos = self.entries[current].baseindex + ofs
+        index &= 0x3
+        if index == 0:
+            return prev_codepoint_pos(utf8, bytepos)
+        elif index == 1:
+            assert bytepos >= 0
+            return bytepos
+        elif index == 2:
+            return next_codepoint_pos(utf8, bytepos)
+        else:
+            return next_codepoint_pos(utf8, next_codepoint_pos(utf8, bytepos))
+
+    def position_at_index(self, utf8, index):
+        step = index - self.cursor_index
+        if 0 <= step <= CURSOR_MAX_STEP and (
+                step <= 2 or (index >> 6) >= self.filled):
+            bytepos = self.cursor_pos
+            for i in range(step):
+                bytepos = next_codepoint_pos(utf8, bytepos)
+        else:
+            bytepos = self._position_from_entries(utf8, index)
+        self.cursor_index = index
+        self.cursor_pos = bytepos
+        return bytepos
+
+    def index_at_position(self, utf8, bytepos):
+        if bytepos == self.cursor_pos:
+            return self.cursor_index
+        # compute the entries up to the one that contains 'bytepos'
+        total = self._total_entries()
+        while self.filled < total and self.nextpos <= bytepos:
+            self._extend(utf8, self.filled)
+
+        # binary search on the entries
+        entries = self.entries
+        index_min = 0
+        index_max = self.filled - 1
+        while index_min < index_max:
+            # this addition can't overflow because storage has a length that
+            # is 1/64 of the length of a string
+            index_middle = (index_min + index_max + 1) // 2
+            base_bytepos = entries[index_middle].baseindex
+            if bytepos < base_bytepos:
+                index_max = index_middle - 1
+            else:
+                index_min = index_middle
+
+        baseindex = entries[index_min].baseindex
+        if baseindex == bytepos:
+            return index_min << 6
+
+        # use ofs to get closer to the correct character index
+        result = index_min << 6
+        bytepos1 = baseindex
+        if index_min == total - 1:
+            maxindex = ((self.length - 1) >> 2) & 0x0F
+        else:
+            maxindex = 16
+        for i in range(maxindex):
+            x = baseindex + ord(entries[index_min].ofs[i])
+            if x >= bytepos:
+                break
+            bytepos1 = x
+            result = (index_min << 6) + (i << 2) + 1
+
+        # this loop should runs at most four times
+        while bytepos1 < bytepos:
+            bytepos1 = next_codepoint_pos(utf8, bytepos1)
+            result += 1
+        return result
+
+
+class _BigIndexStorages(object):
+    """ Weak references to the Utf8IndexStorages that have many entries. """
+
+    def __init__(self):
+        self.refs = []
+        self.limit = 16
+
+    def register(self, storage):
+        if len(self.refs) >= self.limit:
+            self.refs = [ref for ref in self.refs if ref() is not None]
+            self.limit = max(2 * len(self.refs), 16)
+        self.refs.append(weakref.ref(storage))
+
+    def release_all(self):
+        for ref in self.refs:
+            storage = ref()
+            if storage is not None:
+                storage.release()
+        self.refs = []
+
+_big_index_storages = _BigIndexStorages()
+
+def release_index_storages():
+    """ Free the big indexes of all strings, e.g. when memory is needed.
+    They are computed again if the strings are indexed again.
+    """
+    _big_index_storages.release_all()
+
+
+def null_storage():
+    return None
+
+def create_utf8_index_storage(utf8, utf8len):
+    """ Create an index storage for the utf8 encoded unicode string, which
+    has utf8len codepoints.  Nothing is computed yet: the index is built
+    lazily, up to the codepoints actually looked up.
+    """
+    return Utf8IndexStorage(utf8len)
 
 @jit.elidable
 def codepoint_position_at_index(utf8, storage, index):
     """ Return byte index of a character inside utf8 encoded string, given
-    storage of type UTF8_INDEX_STORAGE.  The index must be smaller than
-    or equal to the utf8 length: if needed, check explicitly before calling
-    this function.
+    an index storage made by create_utf8_index_storage().  The index must be
+    smaller than or equal to the utf8 length: if needed, check explicitly
+    before calling this function.
     """
-    current = index >> 6
-    ofs = ord(storage[current].ofs[(index >> 2) & 0x0F])
-    bytepos = storage[current].baseindex + ofs
-    index &= 0x3
-    if index == 0:
-        return prev_codepoint_pos(utf8, bytepos)
-    elif index == 1:
-        assert bytepos >= 0
-        return bytepos
-    elif index == 2:
-        return next_codepoint_pos(utf8, bytepos)
-    else:
-        return next_codepoint_pos(utf8, next_codepoint_pos(utf8, bytepos))
+    return storage.position_at_index(utf8, index)
 
 def _pos_at_index(utf8, index):
     # Slow!
@@ -575,20 +723,9 @@ def _pos_at_index(utf8, index):
 @jit.elidable
 def codepoint_at_index(utf8, storage, index):
     """ Return codepoint of a character inside utf8 encoded string, given
-    storage of type UTF8_INDEX_STORAGE
+    an index storage made by create_utf8_index_storage()
     """
-    current = index >> 6
-    ofs = ord(storage[current].ofs[(index >> 2) & 0x0F])
-    bytepos = storage[current].baseindex + ofs
-    index &= 0x3
-    if index == 0:
-        return codepoint_before_pos(utf8, bytepos)
-    if index == 3:
-        bytepos = next_codepoint_pos(utf8, bytepos)
-        index = 2     # fall-through to the next case
-    if index == 2:
-        bytepos = next_codepoint_pos(utf8, bytepos)
-    return codepoint_at_pos(utf8, bytepos)
+    return codepoint_at_pos(utf8, storage.position_at_index(utf8, index))
 
 @jit.elidable
 def codepoint_index_at_byte_position(utf8, storage, bytepos, num_codepoints):
@@ -600,42 +737,7 @@ def codepoint_index_at_byte_position(utf8, storage, bytepos, num_codepoints):
     """
     if bytepos < 0:
         return bytepos
-    # binary search on elements of storage
-    index_min = 0
-    index_max = len(storage) - 1
-    while index_min < index_max:
-        # this addition can't overflow because storage has a length that is
-        # 1/64 of the length of a string
-        index_middle = (index_min + index_max + 1) // 2
-        base_bytepos = storage[index_middle].baseindex
-        if bytepos < base_bytepos:
-            index_max = index_middle - 1
-        else:
-            index_min = index_middle
-
-    baseindex = storage[index_min].baseindex
-    if baseindex == bytepos:
-        return index_min << 6
-
-    # use ofs to get closer to the correct character index
-    result = index_min << 6
-    bytepos1 = baseindex
-    if index_min == len(storage) - 1:
-        maxindex = ((num_codepoints - 1) >> 2) & 0x0F
-    else:
-        maxindex = 16
-    for i in range(maxindex):
-        x = baseindex + ord(storage[index_min].ofs[i])
-        if x >= bytepos:
-            break
-        bytepos1 = x
-        result = (index_min << 6) + (i << 2) + 1
-
-    # this loop should runs at most four times
-    while bytepos1 < bytepos:
-        bytepos1 = next_codepoint_pos(utf8, bytepos1)
-        result += 1
-    return result
+    return storage.index_at_position(utf8, bytepos)
 
 
 TABLE = '0123456789abcdef'
@@ -32,8 +32,10 @@ def get_unique_id(code):
         return code._vmprof_unique_id
     return 0
 
-def enable(fileno, interval, memory=0, native=0, real_time=0):
-    _get_vmprof().enable(fileno, interval, memory, native, real_time)
+def enable(fileno, interval, memory=0, native=0, real_time=0,
+           alloc_interval=0):
+    _get_vmprof().enable(fileno, interval, memory, native, real_time,
+                         alloc_interval)
 
 def disable():
     _get_vmprof().disable()
@@ -42,6 +44,14 @@ def is_enabled():
     vmp = _get_vmprof()
     return vmp.is_enabled
 
+def is_sampling_allocations():
+    return _get_vmprof().alloc_interval > 0
+
+def record_allocation(nbytes):
+    """Call this from the GC hooks (after a minor collection, with the
+    size of the nursery) when is_sampling_allocations() is true."""
+    _get_vmprof().record_allocation(nbytes)
+
 def get_profile_path(space):
     vmp = _get_vmprof()
     if not vmp.is_enabled:
@@ -149,6 +149,16 @@ def setup():
                                             lltype.Void, compilation_info=eci,
                                             _nowrapper=True)
 
+    vmprof_enable_alloc_sampling = rffi.llexternal(
+                                       "vmprof_enable_alloc_sampling",
+                                       [rffi.INT], rffi.INT,
+                                       compilation_info=eci,
+                                       save_err=rffi.RFFI_SAVE_ERRNO)
+    # called from the GC, so it must not release the GIL or do anything else
+    vmprof_sample_stack_now = rffi.llexternal("vmprof_sample_stack_now", [],
+                                              rffi.INT, compilation_info=eci,
+                                              _nowrapper=True)
+
     return CInterface(locals())
 
 
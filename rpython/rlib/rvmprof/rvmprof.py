@@ -55,6 +55,8 @@ class VMProf(object):
 
     def _cleanup_(self):
         self.is_enabled = False
+        self.alloc_interval = 0
+        self.alloc_countdown = 0
 
     @jit.dont_look_inside
     @specialize.argtype(1)
@@ -129,10 +131,14 @@ class VMProf(object):
         self._gather_all_code_objs = gather_all_code_objs
 
     @jit.dont_look_inside
-    def enable(self, fileno, interval, memory=0, native=0, real_time=0):
+    def enable(self, fileno, interval, memory=0, native=0, real_time=0,
+               alloc_interval=0):
         """Enable vmprof.  Writes go to the given 'fileno'.
         The sampling interval is given by 'interval' as a number of
         seconds, as a float which must be smaller than 1.0.
+        If 'alloc_interval' is positive, there are no timer samples:
+        instead, a sample is taken every 'alloc_interval' bytes allocated,
+        as reported to record_allocation() by the GC hooks.
         Raises VMProfError if something goes wrong.
         """
         assert fileno >= 0
@@ -148,9 +154,14 @@ class VMProf(object):
             raise VMProfError(rffi.charp2str(p_error))
 
         self._gather_all_code_objs()
-        res = self.cintf.vmprof_enable(memory, native, real_time)
+        if alloc_interval > 0:
+            res = self.cintf.vmprof_enable_alloc_sampling(memory)
+        else:
+            res = self.cintf.vmprof_enable(memory, native, real_time)
         if res < 0:
             raise VMProfError(os.strerror(rposix.get_saved_errno()))
+        self.alloc_interval = max(alloc_interval, 0)
+        self.alloc_countdown = self.alloc_interval
         self.is_enabled = True
 
     @jit.dont_look_inside
@@ -161,6 +172,7 @@ class VMProf(object):
         if not self.is_enabled:
             raise VMProfError("vmprof is not enabled")
         self.is_enabled = False
+        self.alloc_interval = 0
         res = self.cintf.vmprof_disable()
         if res < 0:
             raise VMProfError(os.strerror(rposix.get_saved_errno()))
@@ -173,6 +185,22 @@ class VMProf(object):
         if self.cintf.vmprof_register_virtual_function(name, uid, 500000) < 0:
             raise VMProfError("vmprof buffers full!  disk full or too slow")
 
+    @rgc.no_collect
+    def record_allocation(self, nbytes):
+        """
+        Called by the GC hooks after 'nbytes' more bytes were allocated,
+        typically on every minor collection.  When allocation sampling is
+        enabled, this writes a sample of the current stack every
+        'alloc_interval' bytes.
+        """
+        if self.alloc_interval <= 0:
+            return
+        self.alloc_countdown -= nbytes
+        if self.alloc_countdown <= 0:
+            # a single allocation larger than the interval only counts once
+            self.alloc_countdown = self.alloc_interval
+            self.cintf.vmprof_sample_stack_now()
+
     def stop_sampling(self):
         """
         Temporarily stop the sampling of stack frames. Signals are still
@@ -46,3 +46,85 @@ void vmprof_start_sampling(void)
 {
     vmprof_ignore_signals(0);
 }
+
+#ifdef VMPROF_UNIX
+#include <assert.h>
+#include <stddef.h>
+#include "shared/vmprof_memory.h"
+
+int vmprof_enable_alloc_sampling(int memory)
+{
+    /* Like vmprof_enable(), but without installing the signal handler and
+       the timer: the samples are only taken by vmprof_sample_stack_now(),
+       which the GC calls every N bytes allocated.  The profile interval
+       stays 0 so that the atfork hooks don't start the timer either. */
+    assert(vmp_profile_fileno() >= 0);
+    if (memory && setup_rss() == -1)
+        goto error;
+    if (install_pthread_atfork_hooks() == -1)
+        goto error;
+    vmprof_ignore_signals(0);
+    return 0;
+
+ error:
+    vmp_set_profile_fileno(-1);
+    return -1;
+}
+
+int vmprof_sample_stack_now(void)
+{
+    /* Write a sample of the current thread's stack, outside any signal
+       handler.  Returns 1 if a sample was written. */
+    int depth, fd, written = 0;
+    long rss;
+    struct profbuf_s *p;
+    struct prof_stacktrace_s *st;
+
+    if (vmprof_enter_signal() != 0)
+        goto done;        /* not enabled, or sampling is stopped */
+    fd = vmp_profile_fileno();
+    if (fd < 0)
+        goto done;
+    p = reserve_buffer(fd);
+    if (p == NULL)
+        goto done;        /* no free buffers right now */
+
+    st = (struct prof_stacktrace_s *)p->data;
+    st->marker = MARKER_STACKTRACE;
+    st->count = 1;
+    depth = get_stack_trace(get_vmprof_stack(), st->stack,
+                            MAX_STACK_DEPTH-1, 0);
+    if (depth == 0) {
+        cancel_buffer(p);
+        goto done;
+    }
+    st->depth = depth;
+    st->stack[depth++] = NULL;    /* thread state, unused on PyPy */
+    rss = get_current_proc_rss();
+    if (rss >= 0)
+        st->stack[depth++] = (void*)rss;
+    p->data_offset = offsetof(struct prof_stacktrace_s, marker);
+    p->data_size = (depth * sizeof(void *) +
+                    sizeof(struct prof_stacktrace_s) -
+                    offsetof(struct prof_stacktrace_s, marker));
+    commit_buffer(fd, p);
+    written = 1;
+
+ done:
+    vmprof_exit_signal();
+    return written;
+}
+
+#else
+
+int vmprof_enable_alloc_sampling(int memory)
+{
+    return -1;
+}
+
+int vmprof_sample_stack_now(void)
+{
+    return 0;
+}
+
+#endif
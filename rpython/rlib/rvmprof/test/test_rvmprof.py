@@ -148,6 +148,39 @@ class TestEnable(RVMProfSamplingTest):
         assert all(p[-1] > 0 for p in prof.profiles)
 
 
+class TestAllocationSampling(RVMProfSamplingTest):
+
+    ENTRY_POINT_ARGS = (int, int)
+    def entry_point(self, value, alloc_interval):
+        code = self.MyCode('py:code:52:test_alloc')
+        rvmprof.register_code(code, self.MyCode.get_name)
+        fd = os.open(self.tmpfilename, os.O_WRONLY | os.O_CREAT, 0666)
+        rvmprof.enable(fd, self.SAMPLING_INTERVAL,
+                       alloc_interval=alloc_interval)
+        assert rvmprof.is_sampling_allocations()
+        res = self.main(code, value)
+        rvmprof.disable()
+        assert not rvmprof.is_sampling_allocations()
+        os.close(fd)
+        return res
+
+    @rvmprof.vmprof_execute_code("xcode1", lambda self, code, count: code)
+    def main(self, code, count):
+        s = 0
+        for i in range(count):
+            # what the GC hooks do after every minor collection
+            rvmprof.record_allocation(1000)
+            s += i
+        return s
+
+    def test(self):
+        from vmprof import read_profile
+        assert self.rpy_entry_point(100, 10000) == 4950
+        prof = read_profile(self.tmpfilename)
+        tree = prof.get_tree()
+        assert tree.name == 'py:code:52:test_alloc'
+        assert tree.count == 10
+
 class TestNative(RVMProfSamplingTest):
 
     @pytest.fixture
@@ -15,6 +15,7 @@ except ImportError:
 from rpython.rlib import rbigint as lobj
 from rpython.rlib.rarithmetic import r_uint, r_longlong, r_ulonglong, intmask, LONG_BIT
 from rpython.rlib.rbigint import (rbigint, SHIFT, MASK, KARATSUBA_CUTOFF,
+    TOOMCOOK_CUTOFF,
     _store_digit, _mask_digit, InvalidEndiannessError, InvalidSignednessError,
     gcd_lehmer, lehmer_xgcd, gcd_binary, divmod_big, ONERBIGINT, MaxIntError,
     _str_to_int_big_w5pow, _str_to_int_big_base10, _str_to_int_big_inner10)
@@ -69,7 +70,8 @@ MAXDIGITS = 15
 digitsizes = strategies.sampled_from(
     range(1, MAXDIGITS+1) +
     range(KARATSUBA_CUTOFF, KARATSUBA_CUTOFF + 14) +
-    [KARATSUBA_CUTOFF * 3, KARATSUBA_CUTOFF * 1000]
+    [KARATSUBA_CUTOFF * 3, TOOMCOOK_CUTOFF + 1, TOOMCOOK_CUTOFF * 3,
+     KARATSUBA_CUTOFF * 1000]
 )
 
 def make_biglongs_for_division(data):
@@ -608,6 +610,15 @@ class Test_rbigint(object):
             result = f1.mul(f1)
             assert result.tolong() == x * x
 
+    def test_mul_toomcook(self):
+        for i in range(2):
+            x = randint(1, 1 << (SHIFT * TOOMCOOK_CUTOFF * 2))
+            y = randint(1, 1 << (SHIFT * TOOMCOOK_CUTOFF * 2))
+            for a, b in [(x, y), (-x, y), (x, -y), (x, x)]:
+                f1 = rbigint.fromlong(a)
+                f2 = rbigint.fromlong(b)
+                assert f1.mul(f2).tolong() == a * b
+
     def test_int_mul(self):
         for x in gen_signs(long_vals):
             f1 = rbigint.fromlong(x)
@@ -1236,6 +1247,30 @@ class TestInternalFunctions(object):
         ret = lobj._k_mul(f1, f2)
         assert ret.tolong() == f1.tolong() * f2.tolong()
 
+    def test__tcmul_split(self):
+        split = 5
+        diglo = [0] * split
+        digmid = [7] * split
+        dighi = [lobj.MASK] * 2
+        f1 = bigint(diglo + digmid + dighi, 1)
+        hi, mid, lo = lobj._tcmul_split(f1, split)
+        assert lo.get_sign() == 0
+        assert mid._digits == map(_store_digit, digmid)
+        assert hi._digits == map(_store_digit, dighi)
+
+    def test__tc_mul(self):
+        for digs in [TOOMCOOK_CUTOFF + 1, TOOMCOOK_CUTOFF * 3 + 2]:
+            f1 = bigint([lobj.MASK] * digs, 1)
+            f2 = lobj._x_add(f1, bigint([1], 1))
+            ret = lobj._tc_mul(f1, f2)
+            assert ret.tolong() == f1.tolong() * f2.tolong()
+            ret = lobj._tc_mul(f1, f1)
+            assert ret.tolong() == f1.tolong() * f1.tolong()
+            # unbalanced, but all three pieces of the first one non-empty
+            f3 = bigint([lobj.MASK] * (digs * 2 // 3 + 2), 1)
+            ret = lobj._tc_mul(f3, f1)
+            assert ret.tolong() == f3.tolong() * f1.tolong()
+
     def test_longlong(self):
         max = 1L << (r_longlong.BITS-1)
         f1 = rbigint.fromlong(max-1)    # fits in r_longlong
@@ -0,0 +1,97 @@
+from hypothesis import given, strategies
+
+from rpython.rlib import rswar
+from rpython.rlib.rarithmetic import r_uint
+
+
+def word(s):
+    assert len(s) == rswar.WORD_SIZE
+    return rswar.load_word(s, 0)
+
+def test_load_word():
+    s = ''.join([chr(i + 1) for i in range(2 * rswar.WORD_SIZE)])
+    w = rswar.load_word(s, rswar.WORD_SIZE)
+    assert w & 0xff == rswar.WORD_SIZE + 1
+    assert w >> (8 * (rswar.WORD_SIZE - 1)) == 2 * rswar.WORD_SIZE
+
+def test_zero_bytes():
+    n = rswar.WORD_SIZE
+    assert rswar.zero_bytes(word('a' * n)) == 0
+    assert rswar.zero_bytes(word('\x00' * n)) == rswar.EVERY_BYTE_HIGHEST_BIT
+    # no false positive for a 0x01 byte following a zero byte
+    mask = rswar.zero_bytes(word('\x00\x01' + '\x80' * (n - 2)))
+    assert mask == r_uint(0x80)
+    assert rswar.count_marked_bytes(mask) == 1
+
+def test_marked_bytes():
+    n = rswar.WORD_SIZE
+    for i in range(n):
+        for j in range(i, n):
+            s = ['x'] * n
+            s[i] = s[j] = '\x00'
+            mask = rswar.zero_bytes(word(''.join(s)))
+            assert rswar.index_first_marked_byte(mask) == i
+            assert rswar.index_last_marked_byte(mask) == j
+            assert rswar.count_marked_bytes(mask) == 1 + (i != j)
+
+def test_outside_ascii_range():
+    n = rswar.WORD_SIZE
+    for lo, hi in [('0', '9'), ('\x00', '\x7f'), ('\x1f', '\x7f')]:
+        for i in range(256):
+            c = chr(i)
+            mask = rswar.outside_ascii_range(word(c * n), lo, hi)
+            if lo <= c <= hi:
+                assert mask == 0
+            else:
+                assert mask == rswar.EVERY_BYTE_HIGHEST_BIT
+
+
+text = strategies.text(alphabet=u'ab\n\r0\x80', max_size=60).map(
+    lambda u: u.encode('latin-1'))
+
+def bounds(s, start, end):
+    start = min(start, len(s))
+    end = max(min(end, len(s)), start)
+    return start, end
+
+@given(text, strategies.integers(0, 60), strategies.integers(0, 60))
+def test_find_count(s, start, end):
+    start, end = bounds(s, start, end)
+    for ch in 'a\n\x80':
+        assert rswar.find_char(s, ch, start, end) == s.find(ch, start, end)
+        assert rswar.rfind_char(s, ch, start, end) == s.rfind(ch, start, end)
+        assert rswar.count_char(s, ch, start, end) == s.count(ch, start, end)
+
+@given(text, strategies.integers(0, 60), strategies.integers(0, 60))
+def test_find_either_char(s, start, end):
+    start, end = bounds(s, start, end)
+    expected = [i for i in range(start, end) if s[i] in '\r\n']
+    expected = expected[0] if expected else -1
+    assert rswar.find_either_char(s, '\n', '\r', start, end) == expected
+
+@given(text, strategies.integers(0, 60), strategies.integers(0, 60))
+def test_find_outside_ascii_range(s, start, end):
+    start, end = bounds(s, start, end)
+    expected = [i for i in range(start, end) if not 'a' <= s[i] <= 'b']
+    expected = expected[0] if expected else -1
+    assert rswar.find_outside_ascii_range(s, 'a', 'b', start, end) == expected
+
+def test_is_ascii_digits():
+    assert not rswar.is_ascii_digits('')
+    assert rswar.is_ascii_digits('0123456789' * 3)
+    assert not rswar.is_ascii_digits('0123456789' * 3 + '/')
+    assert not rswar.is_ascii_digits('0123456789:' * 3)
+
+def test_compiled():
+    from rpython.translator.c.test.test_genc import compile
+    def f(n):
+        s = ('abc\n' * n) + '\x80' + ('1' * n)
+        res = rswar.find_char(s, '\n', 5, len(s))
+        res = res * 1000 + rswar.rfind_char(s, '\n', 0, len(s) - 3)
+        res = res * 1000 + rswar.count_char(s, 'b', 1, len(s))
+        res = res * 1000 + rswar.first_non_ascii_char(s)
+        res = res * 10 + rswar.is_ascii_digits('1' * n + '23')
+        return res
+    fn = compile(f, [int])
+    for n in [1, 5, 17]:
+        assert fn(n) == f(n)
@@ -155,6 +155,58 @@ def test_codepoint_position_at_index_inverse(u):
                        b, storage, bytepos, len(u)) == i
 
 
+@given(strategies.text(), strategies.lists(strategies.integers(min_value=0)))
+def test_utf8_index_storage_random_order(u, indexes):
+    b = u.encode('utf8')
+    storage = rutf8.create_utf8_index_storage(b, len(u))
+    for i in indexes + range(len(u), -1, -1):
+        i %= len(u) + 1
+        bytepos = len(u[:i].encode('utf8'))
+        assert rutf8.codepoint_position_at_index(b, storage, i) == bytepos
+        assert rutf8.codepoint_index_at_byte_position(
+                       b, storage, bytepos, len(u)) == i
+
+def test_utf8_index_storage_lazy():
+    u = u'\xe4' * (64 * 100)
+    b = u.encode('utf8')
+    storage = rutf8.create_utf8_index_storage(b, len(u))
+    assert storage.filled == 0
+    assert rutf8.codepoint_position_at_index(b, storage, 64 * 10) == 128 * 10
+    assert storage.filled == 11
+    assert rutf8.codepoint_position_at_index(b, storage, 3) == 6
+    assert storage.filled == 11
+    assert rutf8.codepoint_index_at_byte_position(b, storage, 128 * 20,
+                                                  len(u)) == 64 * 20
+    assert storage.filled == 21
+    assert rutf8.codepoint_at_index(b, storage, 64 * 100 - 1) == 0xe4
+    assert storage.filled == 100
+    assert len(storage.entries) == 100
+
+def test_utf8_index_storage_cursor():
+    u = u'\u1234x' * 1000
+    b = u.encode('utf8')
+    storage = rutf8.create_utf8_index_storage(b, len(u))
+    for i in range(len(u)):
+        assert rutf8.codepoint_at_index(b, storage, i) == ord(u[i])
+    assert storage.filled == 0
+    assert rutf8.codepoint_position_at_index(b, storage, 10) == 20
+    assert storage.filled == 1
+
+def test_release_index_storages():
+    u = u'\xe4' * (64 * rutf8.RELEASE_MIN_ENTRIES)
+    b = u.encode('utf8')
+    storage = rutf8.create_utf8_index_storage(b, len(u))
+    small = rutf8.create_utf8_index_storage(b, len(u))
+    assert rutf8.codepoint_position_at_index(b, storage, len(u) - 7) == (
+                                                            2 * len(u) - 14)
+    assert rutf8.codepoint_position_at_index(b, small, 200) == 400
+    rutf8.release_index_storages()
+    assert storage.filled == 0
+    assert small.filled == 4
+    assert rutf8.codepoint_position_at_index(b, storage, 1000) == 2000
+    assert storage.filled == 16
+
+
 repr_func = rutf8.make_utf8_escape_function(prefix='u', pass_printable=False,
                                             quotes=True)
 
@@ -327,6 +327,12 @@ def arena_free(arena_addr):
     assert not arena_addr.arena.objectptrs
     arena_addr.arena.mark_freed()
 
+def arena_free_background(arena_addr):
+    """Release an arena like arena_free(), but the actual call to free()
+    may be done later by a background thread.  Only for arenas that are
+    at least one word large and that nobody will look at any more."""
+    arena_free(arena_addr)
+
 def arena_reset(arena_addr, size, zero):
     """Free all objects in the arena, which can then be reused.
     This can also be used on a subrange of the arena.
@@ -529,6 +535,24 @@ register_external(arena_free, [llmemory.Address], None, 'll_arena.arena_free',
                   llfakeimpl=arena_free,
                   sandboxsafe=True)
 
+def _get_bgfree_eci():
+    from rpython.translator.tool.cbuild import ExternalCompilationInfo
+    from rpython.translator import cdir
+    return ExternalCompilationInfo(
+        includes=['src/gc_bgfree.h'],
+        include_dirs=[cdir],
+        separate_module_files=[os.path.join(cdir, 'src', 'gc_bgfree.c')])
+
+llimpl_free_background = rffi.llexternal('RPyGcFreeInBackground',
+                                         [llmemory.Address], lltype.Void,
+                                         compilation_info=_get_bgfree_eci(),
+                                         sandboxsafe=True, _nowrapper=True)
+register_external(arena_free_background, [llmemory.Address], None,
+                  'll_arena.arena_free_background',
+                  llimpl=llimpl_free_background,
+                  llfakeimpl=arena_free_background,
+                  sandboxsafe=True)
+
 def llimpl_arena_reset(arena_addr, size, zero):
     if zero:
         if zero == 1:
@@ -629,6 +629,9 @@ def op_have_debug_prints_for(prefix):
 def op_debug_nonnull_pointer(x):
     assert x
 
+def op_raw_prefetch(addr):
+    pass
+
 def op_gc_stack_bottom():
     pass       # see llinterp.py for docs
 
@@ -673,6 +673,12 @@ class LLHelpers(AbstractLLHelpers):
         i = start
         if end > len(s.chars):
             end = len(s.chars)
+        if typeOf(s) == string_repr.lowleveltype:
+            from rpython.rtyper.annlowlevel import hlstr
+            from rpython.rlib import rswar
+            if i < 0:
+                i = 0
+            return rswar.find_char(hlstr(s), ch, i, end)
         while i < end:
             if s.chars[i] == ch:
                 return i
@@ -685,6 +691,12 @@ class LLHelpers(AbstractLLHelpers):
     def ll_rfind_char(s, ch, start, end):
         if end > len(s.chars):
             end = len(s.chars)
+        if typeOf(s) == string_repr.lowleveltype:
+            from rpython.rtyper.annlowlevel import hlstr
+            from rpython.rlib import rswar
+            if start < 0:
+                start = 0
+            return rswar.rfind_char(hlstr(s), ch, start, end)
         i = end
         while i > start:
             i -= 1
@@ -699,6 +711,12 @@ class LLHelpers(AbstractLLHelpers):
         i = start
         if end > len(s.chars):
             end = len(s.chars)
+        if typeOf(s) == string_repr.lowleveltype:
+            from rpython.rtyper.annlowlevel import hlstr
+            from rpython.rlib import rswar
+            if i < 0:
+                i = 0
+            return rswar.count_char(hlstr(s), ch, i, end)
         while i < end:
             if s.chars[i] == ch:
                 count += 1
@@ -877,18 +895,12 @@ class LLHelpers(AbstractLLHelpers):
 
     @staticmethod
     def ll_split_chr(LIST, s, c, max):
-        chars = s.chars
-        strlen = len(chars)
+        strlen = len(s.chars)
         count = 1
-        i = 0
-        if max == 0:
-            i = strlen
-        while i < strlen:
-            if chars[i] == c:
-                count += 1
-                if max >= 0 and count > max:
-                    break
-            i += 1
+        if max != 0:
+            count += LLHelpers.ll_count_char(s, c, 0, strlen)
+            if max > 0 and count > max + 1:
+                count = max + 1
         res = LIST.ll_newlist(count)
         items = res.ll_items()
         ITEM = typeOf(items).TO.OF
@@ -896,24 +908,17 @@ class LLHelpers(AbstractLLHelpers):
             items[0] = llmemory.cast_any_ptr(ITEM, s)
             return res
         i = 0
-        j = 0
         resindex = 0
-        if max == 0:
-            j = strlen
-        while j < strlen:
-            if chars[j] == c:
-                item = s.malloc(j - i)
-                item.copy_contents(s, item, i, 0, j - i)
-                items[resindex] = llmemory.cast_any_ptr(ITEM, item)
-                resindex += 1
-                i = j + 1
-                if max >= 0 and resindex >= max:
-                    j = strlen
-                    break
-            j += 1
-        item = s.malloc(j - i)
+        while resindex < count - 1:
+            j = LLHelpers.ll_find_char(s, c, i, strlen)
+            item = s.malloc(j - i)
+            item.copy_contents(s, item, i, 0, j - i)
+            items[resindex] = llmemory.cast_any_ptr(ITEM, item)
+            resindex += 1
+            i = j + 1
+        item = s.malloc(strlen - i)
         items[resindex] = llmemory.cast_any_ptr(ITEM, item)
-        item.copy_contents(s, item, i, 0, j - i)
+        item.copy_contents(s, item, i, 0, strlen - i)
         return res
 
     @staticmethod
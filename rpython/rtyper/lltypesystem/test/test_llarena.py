@@ -361,3 +361,19 @@ class TestStandalone(test_standalone.StandaloneTests):
             cbuilder.cmdexec('2', expect_crash=True)
             if sys.platform.startswith('win'):
                 ctypes.windll.kernel32.SetErrorMode(old_err_mode)
+
+    def test_compiled_arena_free_background(self):
+        def fn(argv):
+            total = 0
+            for i in range(1000):
+                a = arena_malloc(10000 + i * 100, True)
+                p = llmemory.cast_adr_to_ptr(a, rffi.CArrayPtr(lltype.Signed))
+                p[i] = i
+                total += p[i]
+                llarena.arena_free_background(a)
+            print total
+            return 0
+        #
+        t, cbuilder = self.compile(fn)
+        data = cbuilder.cmdexec('')
+        assert data == '%d\n' % (999 * 1000 // 2)
@@ -0,0 +1,119 @@
+#include "common_header.h"
+#include "src/gc_bgfree.h"
+#include <stdlib.h>
+
+/* The GC can give the large blocks it frees during a major collection to
+   a background thread, which does the actual free() calls.  Freeing large
+   blocks usually means munmap() and is comparatively slow.  The pending
+   blocks are chained through their first word, so this never needs to
+   allocate memory itself.  Without pthreads we just call free(). */
+
+#ifndef _WIN32
+#include <pthread.h>
+#include <signal.h>
+
+static pthread_mutex_t bgfree_mutex = PTHREAD_MUTEX_INITIALIZER;
+static pthread_cond_t bgfree_cond = PTHREAD_COND_INITIALIZER;
+static void *bgfree_pending = NULL;
+static int bgfree_state = 0;      /* 0: no thread, 1: running, -1: failed */
+static int bgfree_atfork_done = 0;
+
+static void bgfree_free_chain(void *p)
+{
+    while (p != NULL) {
+        void *next = *(void **)p;
+        free(p);
+        p = next;
+    }
+}
+
+static void *bgfree_thread(void *arg)
+{
+    pthread_mutex_lock(&bgfree_mutex);
+    while (1) {
+        void *p;
+        while (bgfree_pending == NULL)
+            pthread_cond_wait(&bgfree_cond, &bgfree_mutex);
+        p = bgfree_pending;
+        bgfree_pending = NULL;
+        pthread_mutex_unlock(&bgfree_mutex);
+        bgfree_free_chain(p);
+        pthread_mutex_lock(&bgfree_mutex);
+    }
+    return NULL;
+}
+
+static void bgfree_atfork_prepare(void)
+{
+    pthread_mutex_lock(&bgfree_mutex);
+}
+
+static void bgfree_atfork_parent(void)
+{
+    pthread_mutex_unlock(&bgfree_mutex);
+}
+
+static void bgfree_atfork_child(void)
+{
+    /* the thread doesn't exist in the child.  Free the pending blocks here
+       and start a new thread the next time.  A chain that the thread was
+       busy freeing at the time of the fork is leaked in the child. */
+    void *p = bgfree_pending;
+    bgfree_pending = NULL;
+    bgfree_state = 0;
+    pthread_mutex_unlock(&bgfree_mutex);
+    bgfree_free_chain(p);
+}
+
+static void bgfree_start_thread(void)
+{
+    pthread_t th;
+    sigset_t all_signals, old_mask;
+
+    if (!bgfree_atfork_done) {
+        if (pthread_atfork(bgfree_atfork_prepare, bgfree_atfork_parent,
+                           bgfree_atfork_child) != 0) {
+            bgfree_state = -1;
+            return;
+        }
+        bgfree_atfork_done = 1;
+    }
+    /* the thread must not receive the signals meant for the program */
+    sigfillset(&all_signals);
+    pthread_sigmask(SIG_SETMASK, &all_signals, &old_mask);
+    if (pthread_create(&th, NULL, bgfree_thread, NULL) == 0) {
+        pthread_detach(th);
+        bgfree_state = 1;
+    }
+    else
+        bgfree_state = -1;
+    pthread_sigmask(SIG_SETMASK, &old_mask, NULL);
+}
+
+void RPyGcFreeInBackground(void *p)
+{
+    int was_empty;
+    /* only called by the GC, so never concurrently with itself */
+    if (bgfree_state == 0)
+        bgfree_start_thread();
+    if (bgfree_state < 0) {
+        free(p);
+        return;
+    }
+    pthread_mutex_lock(&bgfree_mutex);
+    was_empty = (bgfree_pending == NULL);
+    *(void **)p = bgfree_pending;
+    bgfree_pending = p;
+    if (was_empty)
+        pthread_cond_signal(&bgfree_cond);
+    pthread_mutex_unlock(&bgfree_mutex);
+}
+
+#else   /* _WIN32 */
+
+void RPyGcFreeInBackground(void *p)
+{
+    free(p);
+}
+
+#endif
@@ -0,0 +1,8 @@
+#ifndef _RPY_GC_BGFREE_H
+#define _RPY_GC_BGFREE_H
+
+/* free() the block, possibly later and from a background thread.  The
+   block must be at least one word large. */
+RPY_EXTERN void RPyGcFreeInBackground(void *p);
+
+#endif  /* _RPY_GC_BGFREE_H */
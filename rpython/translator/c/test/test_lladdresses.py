@@ -146,6 +146,19 @@ def test_raw_memmove():
     res = fc()
     assert res
 
+def test_raw_prefetch():
+    from rpython.rtyper.lltypesystem import lltype
+    from rpython.rtyper.lltypesystem.lloperation import llop
+    def f(value):
+        addr = raw_malloc(16)
+        llop.raw_prefetch(lltype.Void, addr)
+        addr.signed[0] = value
+        result = addr.signed[0]
+        raw_free(addr)
+        return result
+    fc = compile(f, [int])
+    assert fc(42) == 42
+
 def test_pointer_comparison():
     def f():
         result = 0
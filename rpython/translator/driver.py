@@ -174,6 +174,8 @@ class TranslationDriver(SimpleTaskEngine):
         return dict.fromkeys(maybe_skip).keys()
 
     def setup(self, entry_point, inputtypes, policy=None, extra={}, empty_translator=None):
+        from rpython.config.translationoption import check_nogil
+        check_nogil(self.config)
         standalone = inputtypes is None
         self.standalone = standalone
 
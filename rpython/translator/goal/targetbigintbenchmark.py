@@ -262,6 +262,50 @@ def entry_point(argv):
 
     sumTime += _time
 
+    # large-integer kernels: numbers of about 100000 decimal digits
+    big1 = rbigint.fromint(3).pow(rbigint.fromint(210000))
+    big2 = rbigint.fromint(7).pow(rbigint.fromint(118000))
+    t = time()
+    for n in xrange(20):
+        big1.mul(big2)
+
+    _time = time() - t
+    sumTime += _time
+    print "100000 digits * 100000 digits:", _time
+
+    t = time()
+    for n in xrange(20):
+        big1.mul(big1)
+
+    _time = time() - t
+    sumTime += _time
+    print "100000 digits ** 2:", _time
+
+    big3 = big1.mul(big2)
+    t = time()
+    for n in xrange(5):
+        big3.divmod(big1)
+
+    _time = time() - t
+    sumTime += _time
+    print "divmod 200000 digits by 100000 digits:", _time
+
+    t = time()
+    for n in xrange(2):
+        s = big1.str()
+
+    _time = time() - t
+    sumTime += _time
+    print "str() of 100000 digits:", _time
+
+    t = time()
+    for n in xrange(2):
+        rbigint.fromstr(s)
+
+    _time = time() - t
+    sumTime += _time
+    print "int() of 100000 digits:", _time
+
     print "Sum: ", sumTime
 
     return 0